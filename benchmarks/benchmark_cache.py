@@ -0,0 +1,333 @@
+"""
+Benchmarks du sous-système de cache GestVenv
+
+Génère des caches synthétiques (1k / 10k / 100k entrées par défaut) puis
+mesure, pour CacheService et AsyncCacheService, les opérations principales :
+cache_package, get_cached_package (avec et sans version), is_package_cached,
+_cleanup_lru, export_cache / import_cache et get_cache_stats.
+
+Chaque opération rapporte débit, latences p50/p99 et pic de RSS.
+
+Usage:
+    python -m benchmarks.benchmark_cache
+    python -m benchmarks.benchmark_cache --sizes 1000 10000 --time-budget 5
+    GESTVENV_BENCH_MAX_ENTRIES=10000 python -m benchmarks.benchmark_cache --json out.json
+
+En CI, --max-entries (ou GESTVENV_BENCH_MAX_ENTRIES) écarte les échelles
+trop grandes et --time-budget borne la durée de chaque opération.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from gestvenv.core.models import Config
+from gestvenv.services.cache_service import CacheService
+
+from benchmarks.common import (
+    BenchmarkResult, build_result, measure, measure_async, print_results, write_json
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+VERSIONS_PER_PACKAGE = 10
+
+Catalog = List[Tuple[str, str]]
+
+
+@contextmanager
+def isolated_home(root: Path) -> Iterator[None]:
+    """Redirige Path.home() vers root (les services de cache y créent ~/.gestvenv)"""
+    saved = {key: os.environ.get(key) for key in ("HOME", "USERPROFILE")}
+    os.environ["HOME"] = os.environ["USERPROFILE"] = str(root)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def make_config() -> Config:
+    """Configuration de cache sans compression ni limite de taille effective"""
+    return Config(cache_settings={
+        "enabled": True,
+        "max_size_mb": 1024 * 1024,
+        "compression": False,
+        "offline_mode": False,
+    })
+
+
+def generate_synthetic_cache(
+    cache_path: Path,
+    entries: int,
+    platform: str,
+    key_func,
+    payload_size: int = 256
+) -> Catalog:
+    """Écrit un cache synthétique de `entries` packages sur disque
+
+    Produit la même disposition que CacheService (packages/pip/<clé>.whl,
+    metadata/<clé>.json, index.json, stats.json), avec des dates
+    d'utilisation croissantes pour un ordre LRU déterministe.
+
+    Returns:
+        Liste des couples (package, version) présents dans le cache
+    """
+    packages_dir = cache_path / "packages" / "pip"
+    metadata_dir = cache_path / "metadata"
+    packages_dir.mkdir(parents=True, exist_ok=True)
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+
+    payload = b"\0" * payload_size
+    base_time = datetime(2024, 1, 1)
+    index = {}
+    catalog: Catalog = []
+
+    for i in range(entries):
+        package = f"bench-pkg-{i // VERSIONS_PER_PACKAGE:06d}"
+        version = f"1.{i % VERSIONS_PER_PACKAGE}.0"
+        cache_key = key_func(package, version, platform)
+        timestamp = (base_time + timedelta(seconds=i)).isoformat()
+        metadata = {
+            "package": package,
+            "version": version,
+            "platform": platform,
+            "backend": "pip",
+            "cached_at": timestamp,
+            "file_size": payload_size,
+            "compressed": False,
+            "checksum": "",
+            "last_used": timestamp,
+        }
+
+        (packages_dir / f"{cache_key}.whl").write_bytes(payload)
+        with open(metadata_dir / f"{cache_key}.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        index[cache_key] = metadata
+        catalog.append((package, version))
+
+    with open(cache_path / "index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    return catalog
+
+
+def _prepare_sync(root: Path, entries: int, payload_size: int) -> Tuple[CacheService, Catalog]:
+    """Construit un CacheService chargé sur un cache synthétique"""
+    with isolated_home(root):
+        service = CacheService(make_config())
+        catalog = generate_synthetic_cache(
+            service.cache_path, entries, service._get_current_platform(),
+            service._generate_cache_key, payload_size
+        )
+        # Nouvelle instance : l'index est chargé comme au démarrage réel
+        service = CacheService(make_config())
+    return service, catalog
+
+
+def bench_sync(
+    root: Path,
+    entries: int,
+    iterations: int,
+    time_budget: Optional[float],
+    payload_size: int = 256,
+    seed: int = 0
+) -> List[BenchmarkResult]:
+    """Mesure CacheService sur un cache synthétique de `entries` entrées"""
+    service, catalog = _prepare_sync(root, entries, payload_size)
+    platform = service._get_current_platform()
+    rng = random.Random(seed)
+    payload = b"\1" * payload_size
+    results: List[BenchmarkResult] = []
+
+    def record(operation: str, func, n: int = iterations) -> None:
+        samples = measure(func, n, time_budget)
+        results.append(build_result("sync", operation, entries, samples))
+
+    def pick() -> Tuple[str, str]:
+        return catalog[rng.randrange(len(catalog))]
+
+    record("cache_package",
+           lambda i: service.cache_package(f"bench-new-{i}", "1.0.0", platform, payload))
+    record("get_cached_package[version]",
+           lambda i: service.get_cached_package(*pick(), platform=platform))
+    record("get_cached_package[latest]",
+           lambda i: service.get_cached_package(pick()[0], platform=platform))
+    record("is_package_cached[version]",
+           lambda i: service.is_package_cached(*pick(), platform=platform))
+    record("is_package_cached[any]",
+           lambda i: service.is_package_cached(pick()[0], platform=platform))
+    record("get_cache_stats", lambda i: service.get_cache_stats())
+    # Chaque itération libère une dizaine d'entrées les moins récemment utilisées
+    record("_cleanup_lru",
+           lambda i: service._cleanup_lru(required_space=payload_size * 10))
+
+    archive = root / "export.tar.gz"
+    record("export_cache", lambda i: service.export_cache(archive), min(iterations, 3))
+    record("import_cache", lambda i: service.import_cache(archive), min(iterations, 3))
+
+    return results
+
+
+async def _bench_async(
+    root: Path,
+    entries: int,
+    iterations: int,
+    time_budget: Optional[float],
+    payload_size: int,
+    seed: int
+) -> List[BenchmarkResult]:
+    from gestvenv.services.async_cache_service import AsyncCacheService
+
+    with isolated_home(root):
+        service = AsyncCacheService(make_config())
+        await service.initialize()
+        catalog = generate_synthetic_cache(
+            service.cache_path, entries, service._get_current_platform(),
+            service._generate_cache_key, payload_size
+        )
+        service = AsyncCacheService(make_config())
+    await service.initialize()
+
+    platform = service._get_current_platform()
+    rng = random.Random(seed)
+    payload = b"\1" * payload_size
+    results: List[BenchmarkResult] = []
+
+    async def record(operation: str, func, n: int = iterations) -> None:
+        samples = await measure_async(func, n, time_budget)
+        results.append(build_result("async", operation, entries, samples))
+
+    def pick() -> Tuple[str, str]:
+        return catalog[rng.randrange(len(catalog))]
+
+    await record("cache_package",
+                 lambda i: service.cache_package(f"bench-new-{i}", "1.0.0", platform, payload))
+    await record("get_cached_package[version]",
+                 lambda i: service.get_cached_package(*pick(), platform=platform))
+    await record("get_cached_package[latest]",
+                 lambda i: service.get_cached_package(pick()[0], platform=platform))
+    await record("is_package_cached[version]",
+                 lambda i: service.is_package_cached(*pick(), platform=platform))
+    await record("is_package_cached[any]",
+                 lambda i: service.is_package_cached(pick()[0], platform=platform))
+    await record("get_cache_stats", lambda i: service.get_cache_stats())
+    await record("_cleanup_lru",
+                 lambda i: service._cleanup_lru(required_space=payload_size * 10))
+
+    archive = root / "export.tar.gz"
+    await record("export_cache", lambda i: service.export_cache(archive), min(iterations, 3))
+    await record("import_cache", lambda i: service.import_cache(archive), min(iterations, 3))
+
+    return results
+
+
+def bench_async(
+    root: Path,
+    entries: int,
+    iterations: int,
+    time_budget: Optional[float],
+    payload_size: int = 256,
+    seed: int = 0
+) -> List[BenchmarkResult]:
+    """Mesure AsyncCacheService sur un cache synthétique de `entries` entrées"""
+    return asyncio.run(
+        _bench_async(root, entries, iterations, time_budget, payload_size, seed)
+    )
+
+
+def async_available() -> bool:
+    """AsyncCacheService dépend d'aiofiles (optionnel)"""
+    try:
+        import aiofiles  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    iterations: int = 200,
+    time_budget: Optional[float] = 10.0,
+    payload_size: int = 256,
+    suites: Sequence[str] = ("sync", "async"),
+    max_entries: Optional[int] = None
+) -> List[BenchmarkResult]:
+    """Exécute les suites demandées pour chaque échelle
+
+    Args:
+        sizes: Nombre d'entrées des caches synthétiques
+        iterations: Itérations max par opération
+        time_budget: Budget en secondes par opération (None = illimité)
+        payload_size: Taille en octets de chaque wheel synthétique
+        suites: "sync" et/ou "async"
+        max_entries: Échelles supérieures ignorées (budget CI)
+    """
+    runners = {"sync": bench_sync, "async": bench_async}
+    if "async" in suites and not async_available():
+        print("aiofiles non installé : suite async ignorée", file=sys.stderr)
+        suites = [s for s in suites if s != "async"]
+
+    results: List[BenchmarkResult] = []
+    for entries in sizes:
+        if max_entries is not None and entries > max_entries:
+            print(f"Échelle {entries} ignorée (budget {max_entries} entrées)", file=sys.stderr)
+            continue
+        for suite in suites:
+            root = Path(tempfile.mkdtemp(prefix=f"gestvenv_bench_cache_{suite}_"))
+            try:
+                results.extend(runners[suite](root, entries, iterations, time_budget, payload_size))
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks du cache GestVenv")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Tailles des caches synthétiques")
+    parser.add_argument("--max-entries", type=int,
+                        default=os.environ.get("GESTVENV_BENCH_MAX_ENTRIES"),
+                        help="Ignore les échelles supérieures (budget CI)")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Itérations max par opération")
+    parser.add_argument("--time-budget", type=float, default=10.0,
+                        help="Budget en secondes par opération")
+    parser.add_argument("--payload-size", type=int, default=256,
+                        help="Taille des wheels synthétiques (octets)")
+    parser.add_argument("--suite", choices=["sync", "async", "all"], default="all")
+    parser.add_argument("--json", type=Path, help="Écrit les résultats en JSON")
+    args = parser.parse_args(argv)
+
+    suites = ("sync", "async") if args.suite == "all" else (args.suite,)
+    max_entries = int(args.max_entries) if args.max_entries is not None else None
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        iterations=args.iterations,
+        time_budget=args.time_budget,
+        payload_size=args.payload_size,
+        suites=suites,
+        max_entries=max_entries,
+    )
+
+    print_results(results, "Benchmarks cache GestVenv")
+    if args.json:
+        write_json(results, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
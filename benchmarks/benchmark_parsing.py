@@ -0,0 +1,120 @@
+"""
+Benchmarks du parsing de dépendances GestVenv
+
+Mesure le parser de spécifications partagé (regex compilée + mémo LRU,
+repli packaging) et ses consommateurs sur des entrées volumineuses :
+fichiers requirements.txt de 10k lignes et pyproject.toml de monorepo.
+
+Usage:
+    python -m benchmarks.benchmark_parsing
+    python -m benchmarks.benchmark_parsing --lines 10000 --deps 2000 --json out.json
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from packaging.requirements import Requirement as PackagingRequirement
+
+from gestvenv.cli.commands.diff import parse_pyproject, parse_requirements
+from gestvenv.utils.dependency_corpus import generate_monorepo_pyproject, generate_requirements
+from gestvenv.utils.pyproject_parser import PyProjectParser
+from gestvenv.utils.requirements_parser import (
+    RequirementsParser,
+    iter_requirement_lines,
+    parse_requirement,
+)
+from gestvenv.utils.toml_handler import TomlHandler
+
+from benchmarks.common import BenchmarkResult, build_result, measure, print_results, write_json
+
+DEFAULT_LINES = 10_000
+DEFAULT_DEPS = 2_000
+
+
+def run_benchmarks(
+    lines: int = DEFAULT_LINES,
+    deps: int = DEFAULT_DEPS,
+    iterations: int = 20,
+    time_budget: Optional[float] = 10.0
+) -> List[BenchmarkResult]:
+    """Exécute les benchmarks de parsing
+
+    Args:
+        lines: Lignes du fichier requirements.txt synthétique
+        deps: Dépendances du pyproject.toml synthétique
+        iterations: Itérations max par opération
+        time_budget: Budget en secondes par opération
+    """
+    results: List[BenchmarkResult] = []
+    root = Path(tempfile.mkdtemp(prefix="gestvenv_bench_parsing_"))
+    try:
+        req_content = generate_requirements(lines)
+        req_path = root / "requirements.txt"
+        req_path.write_text(req_content, encoding="utf-8")
+
+        pyproject_path = root / "pyproject.toml"
+        pyproject_content = generate_monorepo_pyproject(deps)
+        pyproject_path.write_text(pyproject_content, encoding="utf-8")
+
+        logical_lines = [l for l in iter_requirement_lines(req_content) if not l.startswith("-")]
+
+        def record(operation: str, scale: int, func, cold: bool = False) -> None:
+            def run(i: int) -> None:
+                if cold:
+                    parse_requirement.cache_clear()
+                func()
+            samples = measure(run, iterations, time_budget)
+            results.append(build_result("parsing", operation, scale, samples))
+
+        # Référence : packaging seul, sans chemin rapide ni mémo
+        record("packaging.Requirement[baseline]", lines,
+               lambda: [PackagingRequirement(l) for l in logical_lines])
+        record("parse_requirement[cold]", lines,
+               lambda: [parse_requirement(l) for l in logical_lines], cold=True)
+        record("parse_requirement[warm]", lines,
+               lambda: [parse_requirement(l) for l in logical_lines])
+        record("RequirementsParser.parse_file", lines,
+               lambda: RequirementsParser().parse_file(str(req_path)), cold=True)
+        record("diff.parse_requirements", lines,
+               lambda: parse_requirements(req_path), cold=True)
+
+        record("TomlHandler.load", deps, lambda: TomlHandler.load(pyproject_path))
+        record("TomlHandler._parse_basic_toml", deps,
+               lambda: TomlHandler._parse_basic_toml(pyproject_content))
+        record("PyProjectParser.parse_pyproject_toml", deps,
+               lambda: PyProjectParser.parse_pyproject_toml(pyproject_path))
+        record("diff.parse_pyproject", deps,
+               lambda: parse_pyproject(pyproject_path), cold=True)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de parsing GestVenv")
+    parser.add_argument("--lines", type=int, default=DEFAULT_LINES,
+                        help="Lignes du requirements.txt synthétique")
+    parser.add_argument("--deps", type=int, default=DEFAULT_DEPS,
+                        help="Dépendances du pyproject.toml synthétique")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Itérations max par opération")
+    parser.add_argument("--time-budget", type=float, default=10.0,
+                        help="Budget en secondes par opération")
+    parser.add_argument("--json", type=Path, help="Écrit les résultats en JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.lines, args.deps, args.iterations, args.time_budget)
+
+    print_results(results, "Benchmarks parsing GestVenv")
+    if args.json:
+        write_json(results, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
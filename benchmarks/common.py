@@ -0,0 +1,149 @@
+"""
+Outils communs aux benchmarks GestVenv
+
+Mesure de latence (p50/p99), débit, pic de mémoire (RSS)
+et restitution des résultats (tableau console ou JSON).
+"""
+
+import json
+import math
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class BenchmarkResult:
+    """Résultat d'une opération mesurée à une échelle donnée"""
+    suite: str
+    operation: str
+    scale: int
+    iterations: int
+    total_seconds: float
+    ops_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit en dictionnaire sérialisable"""
+        return asdict(self)
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Percentile par rang le plus proche (échantillons non triés acceptés)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus en MB"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en KB sous Linux
+        if sys.platform == "darwin":
+            return peak / (1024 * 1024)
+        return peak / 1024
+    except ImportError:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def build_result(
+    suite: str,
+    operation: str,
+    scale: int,
+    samples: List[float],
+    **extra: Any
+) -> BenchmarkResult:
+    """Construit un BenchmarkResult à partir de durées en secondes"""
+    total = sum(samples)
+    return BenchmarkResult(
+        suite=suite,
+        operation=operation,
+        scale=scale,
+        iterations=len(samples),
+        total_seconds=total,
+        ops_per_second=len(samples) / total if total > 0 else float("inf"),
+        p50_ms=percentile(samples, 50) * 1000,
+        p99_ms=percentile(samples, 99) * 1000,
+        peak_rss_mb=peak_rss_mb(),
+        extra=extra,
+    )
+
+
+def measure(
+    func: Callable[[int], Any],
+    iterations: int,
+    time_budget: Optional[float] = None
+) -> List[float]:
+    """Exécute func(i) jusqu'à `iterations` fois et retourne les durées
+
+    Le budget de temps interrompt la boucle une fois dépassé (au moins
+    une itération est toujours mesurée), ce qui borne la durée en CI.
+    """
+    samples: List[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - t0)
+        if time_budget is not None and time.perf_counter() - started > time_budget:
+            break
+    return samples
+
+
+async def measure_async(
+    func: Callable[[int], Any],
+    iterations: int,
+    time_budget: Optional[float] = None
+) -> List[float]:
+    """Équivalent async de measure() : func(i) retourne un awaitable"""
+    samples: List[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        await func(i)
+        samples.append(time.perf_counter() - t0)
+        if time_budget is not None and time.perf_counter() - started > time_budget:
+            break
+    return samples
+
+
+def print_results(results: Sequence[BenchmarkResult], title: str) -> None:
+    """Affiche les résultats sous forme de tableau"""
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
+    table = Table(title=title)
+    for column in ("Suite", "Opération", "Échelle", "Itér.", "ops/s",
+                   "p50 (ms)", "p99 (ms)", "RSS max (MB)"):
+        justify = "left" if column in ("Suite", "Opération") else "right"
+        table.add_column(column, justify=justify)
+
+    for r in results:
+        table.add_row(
+            escape(r.suite), escape(r.operation), f"{r.scale:,}", str(r.iterations),
+            f"{r.ops_per_second:,.1f}", f"{r.p50_ms:.3f}", f"{r.p99_ms:.3f}",
+            f"{r.peak_rss_mb:.1f}",
+        )
+
+    Console().print(table)
+
+
+def write_json(results: Sequence[BenchmarkResult], output: Path) -> None:
+    """Écrit les résultats au format JSON"""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump([r.to_dict() for r in results], f, indent=2)
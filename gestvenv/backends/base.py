@@ -2,12 +2,19 @@
 Interface abstraite pour les backends de packages GestVenv v1.1
 """
 
+import json
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
 from ..core.models import PackageInfo, InstallResult
+from ..utils.async_process import CommandResult, OutputCallback, run_command_async
+from ..utils.async_utils import run_in_executor
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -101,8 +108,203 @@ class PackageBackend(ABC):
         """Liste les packages installés"""
         pass
         
+    def install_packages(self, env_path: Path, packages: List[str], **kwargs) -> InstallResult:
+        """Installe plusieurs packages en un seul appel
+
+        Implémentation par défaut : installations successives. Les backends
+        capables de résoudre un lot en une commande la surchargent.
+        """
+        installed: List[str] = []
+        failed: List[str] = []
+        execution_time = 0.0
+        for package in packages:
+            result = self.install_package(env_path, package, **kwargs)
+            execution_time += result.execution_time
+            (installed if result.success else failed).append(package)
+
+        return InstallResult(
+            success=not failed,
+            message=f"{len(installed)} package(s) installé(s), {len(failed)} échec(s)",
+            packages_installed=installed,
+            packages_failed=failed,
+            backend_used=self.name,
+            execution_time=execution_time
+        )
+
+    def uninstall_packages(self, env_path: Path, packages: List[str]) -> bool:
+        """Désinstalle plusieurs packages (défaut: désinstallations successives)"""
+        results = [self.uninstall_package(env_path, package) for package in packages]
+        return all(results)
+
+    def sync_packages(self, env_path: Path, requirements: List[str]) -> bool:
+        """Aligne exactement l'environnement sur une liste épinglée (optionnel)"""
+        return False
+
+    # Commandes natives (variantes asynchrones)
+    #
+    # Un backend décrit ses commandes via les méthodes _*_command ; None
+    # signifie « pas de commande directe » et la variante asynchrone délègue
+    # alors à la méthode synchrone dans le pool de threads.
+
+    def _command_cwd(self, env_path: Path) -> Optional[Path]:
+        """Répertoire de travail des commandes du backend"""
+        return None
+
+    def _create_command(self, path: Path, python_version: str) -> Optional[List[str]]:
+        """Commande de création d'environnement"""
+        return None
+
+    def _install_command(self, env_path: Path, packages: List[str], **kwargs) -> Optional[List[str]]:
+        """Commande d'installation d'un lot de packages"""
+        return None
+
+    def _uninstall_command(self, env_path: Path, packages: List[str]) -> Optional[List[str]]:
+        """Commande de désinstallation d'un lot de packages"""
+        return None
+
+    def _list_command(self, env_path: Path) -> Optional[List[str]]:
+        """Commande de listage des packages installés"""
+        return None
+
+    def _parse_list_output(self, stdout: str) -> List[PackageInfo]:
+        """Analyse la sortie de _list_command (format JSON pip list)"""
+        return [
+            PackageInfo(
+                name=pkg_data["name"],
+                version=pkg_data["version"],
+                source="pypi",
+                backend_used=self.name,
+                installed_at=datetime.now()
+            )
+            for pkg_data in json.loads(stdout or "[]")
+        ]
+
+    async def run_command(
+        self,
+        cmd: List[str],
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> CommandResult:
+        """Exécute une commande du backend sans bloquer la boucle événements
+
+        La sortie est diffusée ligne par ligne à on_output ; en cas de
+        délai dépassé ou d'annulation, le groupe de processus est tué.
+        """
+        return await run_command_async(cmd, cwd=cwd, timeout=timeout, on_output=on_output)
+
+    async def create_environment_async(
+        self,
+        path: Path,
+        python_version: str,
+        on_output: Optional[OutputCallback] = None,
+        timeout: Optional[float] = 300
+    ) -> bool:
+        """Crée un environnement virtuel (variante asynchrone)"""
+        # La construction peut sonder les interpréteurs disponibles
+        cmd = await run_in_executor(self._create_command, path, python_version)
+        if cmd is None:
+            return await run_in_executor(self.create_environment, path, python_version)
+
+        result = await self.run_command(cmd, self._command_cwd(path), timeout, on_output)
+        if not result.success:
+            logger.error(f"Erreur création environnement {self.name}: {result.stderr}")
+        return result.success
+
+    async def install_packages_async(
+        self,
+        env_path: Path,
+        packages: List[str],
+        on_output: Optional[OutputCallback] = None,
+        timeout: Optional[float] = 600,
+        **kwargs
+    ) -> InstallResult:
+        """Installe un lot de packages (variante asynchrone)"""
+        invalid = [p for p in packages if not self.validate_package_spec(p)]
+        if invalid:
+            return InstallResult(
+                success=False,
+                message=f"Spécifications package invalides: {', '.join(invalid)}",
+                packages_failed=invalid,
+                backend_used=self.name
+            )
+
+        cmd = self._install_command(env_path, packages, **kwargs)
+        if cmd is None:
+            return await run_in_executor(self.install_packages, env_path, packages, **kwargs)
+
+        result = await self.run_command(cmd, self._command_cwd(env_path), timeout, on_output)
+        if result.timed_out:
+            message = "Timeout lors de l'installation"
+        elif result.success:
+            message = f"{len(packages)} package(s) installé(s)"
+        else:
+            message = f"Erreur installation: {result.stderr}"
+
+        return InstallResult(
+            success=result.success,
+            message=message,
+            packages_installed=list(packages) if result.success else [],
+            packages_failed=[] if result.success else list(packages),
+            backend_used=self.name,
+            execution_time=result.duration
+        )
+
+    async def install_package_async(
+        self,
+        env_path: Path,
+        package: str,
+        on_output: Optional[OutputCallback] = None,
+        timeout: Optional[float] = 300,
+        **kwargs
+    ) -> InstallResult:
+        """Installe un package (variante asynchrone)"""
+        return await self.install_packages_async(env_path, [package], on_output, timeout, **kwargs)
+
+    async def uninstall_packages_async(
+        self,
+        env_path: Path,
+        packages: List[str],
+        on_output: Optional[OutputCallback] = None,
+        timeout: Optional[float] = 120
+    ) -> bool:
+        """Désinstalle un lot de packages (variante asynchrone)"""
+        cmd = self._uninstall_command(env_path, packages)
+        if cmd is None:
+            return await run_in_executor(self.uninstall_packages, env_path, packages)
+
+        result = await self.run_command(cmd, self._command_cwd(env_path), timeout, on_output)
+        if not result.success:
+            logger.error(f"Erreur désinstallation {', '.join(packages)}: {result.stderr}")
+        return result.success
+
+    async def uninstall_package_async(
+        self,
+        env_path: Path,
+        package: str,
+        on_output: Optional[OutputCallback] = None,
+        timeout: Optional[float] = 60
+    ) -> bool:
+        """Désinstalle un package (variante asynchrone)"""
+        return await self.uninstall_packages_async(env_path, [package], on_output, timeout)
+
+    async def list_packages_async(self, env_path: Path, timeout: Optional[float] = 30) -> List[PackageInfo]:
+        """Liste les packages installés (variante asynchrone)"""
+        cmd = self._list_command(env_path)
+        if cmd is None:
+            return await run_in_executor(self.list_packages, env_path)
+
+        result = await self.run_command(cmd, self._command_cwd(env_path), timeout)
+        if not result.success:
+            return []
+        try:
+            return self._parse_list_output(result.stdout)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Erreur listage packages: {e}")
+            return []
+
     def sync_from_pyproject(
-        self, 
+        self,
         env_path: Path, 
         pyproject_path: Path, 
         groups: Optional[List[str]] = None
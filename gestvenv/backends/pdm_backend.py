@@ -105,19 +105,10 @@ class PDMBackend(PackageBackend):
         start_time = time.time()
         
         try:
-            cmd = ["pdm", "add", package]
-            
-            # Options d'installation
-            if kwargs.get('editable'):
-                cmd.append("--editable")
-            
-            if kwargs.get('group'):
-                cmd.extend(["--group", kwargs['group']])
-            
             # Exécution
             result = subprocess.run(
-                cmd,
-                cwd=env_path.parent,
+                self._install_command(env_path, [package], **kwargs),
+                cwd=self._command_cwd(env_path),
                 capture_output=True,
                 text=True,
                 timeout=600
@@ -204,6 +195,23 @@ class PDMBackend(PackageBackend):
             logger.error(f"Erreur gestion groupes PDM: {e}")
             return False
             
+    def _command_cwd(self, env_path: Path) -> Optional[Path]:
+        """Les commandes PDM s'exécutent à la racine du projet"""
+        return env_path.parent
+
+    def _install_command(self, env_path: Path, packages: List[str], **kwargs) -> Optional[List[str]]:
+        """pdm add (ajoute au pyproject.toml et installe)"""
+        cmd = ["pdm", "add", *packages]
+
+        # Options d'installation
+        if kwargs.get('editable'):
+            cmd.append("--editable")
+
+        if kwargs.get('group'):
+            cmd.extend(["--group", kwargs['group']])
+
+        return cmd
+
     def get_performance_score(self) -> int:
         """Score de performance PDM"""
         return 8  # Très performant, proche d'uv
\ No newline at end of file
@@ -7,7 +7,6 @@ import os
 import re
 import subprocess
 import time
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
@@ -184,6 +183,77 @@ class PipBackend(PackageBackend):
             logger.error(f"Erreur désinstallation {package}: {e}")
             return False
             
+    def install_packages(self, env_path: Path, packages: List[str], **kwargs) -> InstallResult:
+        """Installation groupée : une seule résolution pip pour tout le lot"""
+        start_time = time.time()
+
+        invalid = [p for p in packages if not self.validate_package_spec(p)]
+        if invalid:
+            return InstallResult(
+                success=False,
+                message=f"Spécifications package invalides: {', '.join(invalid)}",
+                packages_failed=invalid,
+                backend_used="pip",
+                execution_time=time.time() - start_time
+            )
+
+        pip_exe = self._get_pip_executable(env_path)
+        if not pip_exe.exists():
+            return InstallResult(
+                success=False,
+                message="pip non trouvé dans l'environnement",
+                packages_failed=list(packages),
+                backend_used="pip",
+                execution_time=time.time() - start_time
+            )
+
+        try:
+            result = subprocess.run(
+                self._install_command(env_path, packages, **kwargs),
+                capture_output=True,
+                text=True,
+                timeout=kwargs.get('timeout', 600)
+            )
+        except subprocess.TimeoutExpired:
+            return InstallResult(
+                success=False,
+                message="Timeout lors de l'installation",
+                packages_failed=list(packages),
+                backend_used="pip",
+                execution_time=time.time() - start_time
+            )
+
+        success = result.returncode == 0
+        return InstallResult(
+            success=success,
+            message=f"{len(packages)} package(s) installé(s)" if success
+            else f"Erreur installation: {result.stderr}",
+            packages_installed=list(packages) if success else [],
+            packages_failed=[] if success else list(packages),
+            backend_used="pip",
+            execution_time=time.time() - start_time
+        )
+
+    def uninstall_packages(self, env_path: Path, packages: List[str]) -> bool:
+        """Désinstallation groupée en un seul appel pip"""
+        try:
+            pip_exe = self._get_pip_executable(env_path)
+            if not pip_exe.exists():
+                return False
+
+            result = subprocess.run(
+                self._uninstall_command(env_path, packages),
+                capture_output=True,
+                text=True,
+                timeout=120
+            )
+
+            return result.returncode == 0
+
+        except Exception as e:
+            logger.error(f"Erreur désinstallation {', '.join(packages)}: {e}")
+            return False
+
     def update_package(self, env_path: Path, package: str) -> bool:
         """Met à jour un package"""
         try:
@@ -213,7 +283,7 @@ class PipBackend(PackageBackend):
                 
             # pip list avec format JSON
             result = subprocess.run(
-                [str(pip_exe), "list", "--format=json"],
+                self._list_command(env_path),
                 capture_output=True,
                 text=True,
                 timeout=30
@@ -222,20 +292,7 @@ class PipBackend(PackageBackend):
             if result.returncode != 0:
                 return []
                 
-            import json
-            packages_data = json.loads(result.stdout)
-            
-            packages = []
-            for pkg_data in packages_data:
-                packages.append(PackageInfo(
-                    name=pkg_data["name"],
-                    version=pkg_data["version"],
-                    source="pypi",
-                    backend_used="pip",
-                    installed_at=datetime.now()
-                ))
-                
-            return packages
+            return self._parse_list_output(result.stdout)
             
         except Exception as e:
             logger.error(f"Erreur listage packages: {e}")
@@ -287,6 +344,41 @@ class PipBackend(PackageBackend):
         
     # Méthodes privées
     
+    def _create_command(self, path: Path, python_version: str) -> Optional[List[str]]:
+        """python -m venv avec l'interpréteur demandé"""
+        python_cmd = self._find_python_executable(python_version)
+        if not python_cmd:
+            return None
+        return [python_cmd, "-m", "venv", str(path)]
+
+    def _install_command(self, env_path: Path, packages: List[str], **kwargs) -> Optional[List[str]]:
+        """pip install groupé"""
+        pip_exe = self._get_pip_executable(env_path)
+        if not pip_exe.exists():
+            return None
+        cmd = [str(pip_exe), "install"]
+        if kwargs.get('upgrade', False):
+            cmd.append("--upgrade")
+        if kwargs.get('no_deps', False):
+            cmd.append("--no-deps")
+        for package in packages:
+            cmd.extend(["--editable", package] if kwargs.get('editable', False) else [package])
+        return cmd
+
+    def _uninstall_command(self, env_path: Path, packages: List[str]) -> Optional[List[str]]:
+        """pip uninstall groupé"""
+        pip_exe = self._get_pip_executable(env_path)
+        if not pip_exe.exists():
+            return None
+        return [str(pip_exe), "uninstall", "-y", *packages]
+
+    def _list_command(self, env_path: Path) -> Optional[List[str]]:
+        """pip list au format JSON"""
+        pip_exe = self._get_pip_executable(env_path)
+        if not pip_exe.exists():
+            return None
+        return [str(pip_exe), "list", "--format=json"]
+
     def _get_pip_executable(self, env_path: Path) -> Path:
         """Exécutable pip de l'environnement"""
         if os.name == 'nt':
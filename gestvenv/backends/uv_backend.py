@@ -2,12 +2,11 @@
 Backend uv pour GestVenv v1.1 - Performance optimisée
 """
 
-import json
 import logging
 import re
 import subprocess
+import tempfile
 import time
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
@@ -69,10 +68,8 @@ class UvBackend(PackageBackend):
     def create_environment(self, path: Path, python_version: str) -> bool:
         """Création ultra-rapide avec uv venv"""
         try:
-            cmd = ["uv", "venv", str(path), "--python", python_version]
-            
             result = subprocess.run(
-                cmd,
+                self._create_command(path, python_version),
                 capture_output=True,
                 text=True,
                 timeout=60
@@ -163,6 +160,86 @@ class UvBackend(PackageBackend):
             logger.error(f"Erreur désinstallation {package}: {e}")
             return False
             
+    def install_packages(self, env_path: Path, packages: List[str], **kwargs) -> InstallResult:
+        """Installation groupée : une seule résolution uv pour tout le lot"""
+        start_time = time.time()
+
+        invalid = [p for p in packages if not self.validate_package_spec(p)]
+        if invalid:
+            return InstallResult(
+                success=False,
+                message=f"Spécifications package invalides: {', '.join(invalid)}",
+                packages_failed=invalid,
+                backend_used="uv",
+                execution_time=time.time() - start_time
+            )
+
+        try:
+            result = subprocess.run(
+                self._install_command(env_path, packages, **kwargs),
+                capture_output=True,
+                text=True,
+                timeout=kwargs.get('timeout', 300)
+            )
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            return InstallResult(
+                success=False,
+                message=f"Erreur installation: {e}",
+                packages_failed=list(packages),
+                backend_used="uv",
+                execution_time=time.time() - start_time
+            )
+
+        success = result.returncode == 0
+        return InstallResult(
+            success=success,
+            message=f"{len(packages)} package(s) installé(s)" if success
+            else f"Erreur installation: {result.stderr}",
+            packages_installed=list(packages) if success else [],
+            packages_failed=[] if success else list(packages),
+            backend_used="uv",
+            execution_time=time.time() - start_time
+        )
+
+    def uninstall_packages(self, env_path: Path, packages: List[str]) -> bool:
+        """Désinstallation groupée en un seul appel uv"""
+        try:
+            result = subprocess.run(
+                self._uninstall_command(env_path, packages),
+                capture_output=True,
+                text=True,
+                timeout=120
+            )
+            return result.returncode == 0
+        except Exception as e:
+            logger.error(f"Erreur désinstallation {', '.join(packages)}: {e}")
+            return False
+
+    def sync_packages(self, env_path: Path, requirements: List[str]) -> bool:
+        """Synchronisation exacte avec uv pip sync (installe, met à jour et supprime)"""
+        req_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", suffix=".txt", prefix="gestvenv-sync-", delete=False, encoding="utf-8"
+            ) as f:
+                f.write("\n".join(requirements) + "\n")
+                req_path = Path(f.name)
+
+            result = subprocess.run(
+                ["uv", "pip", "sync", "--python", str(self._get_python_executable(env_path)),
+                 str(req_path)],
+                capture_output=True,
+                text=True,
+                timeout=600
+            )
+            return result.returncode == 0
+        except Exception as e:
+            logger.error(f"Erreur uv pip sync: {e}")
+            return False
+        finally:
+            if req_path is not None:
+                req_path.unlink(missing_ok=True)
+
     def update_package(self, env_path: Path, package: str) -> bool:
         """Met à jour un package"""
         try:
@@ -181,7 +258,7 @@ class UvBackend(PackageBackend):
         """Liste les packages installés"""
         try:
             result = subprocess.run(
-                ["uv", "pip", "list", "--format", "json", "--python", str(self._get_python_executable(env_path))],
+                self._list_command(env_path),
                 capture_output=True,
                 text=True,
                 timeout=30
@@ -190,19 +267,7 @@ class UvBackend(PackageBackend):
             if result.returncode != 0:
                 return []
                 
-            packages_data = json.loads(result.stdout)
-            
-            packages = []
-            for pkg_data in packages_data:
-                packages.append(PackageInfo(
-                    name=pkg_data["name"],
-                    version=pkg_data["version"],
-                    source="pypi",
-                    backend_used="uv",
-                    installed_at=datetime.now()
-                ))
-                
-            return packages
+            return self._parse_list_output(result.stdout)
             
         except Exception as e:
             logger.error(f"Erreur listage packages: {e}")
@@ -294,6 +359,29 @@ class UvBackend(PackageBackend):
         
     # Méthodes privées
     
+    def _create_command(self, path: Path, python_version: str) -> Optional[List[str]]:
+        """uv venv"""
+        return ["uv", "venv", str(path), "--python", python_version]
+
+    def _install_command(self, env_path: Path, packages: List[str], **kwargs) -> Optional[List[str]]:
+        """uv pip install groupé"""
+        cmd = ["uv", "pip", "install", "--python", str(self._get_python_executable(env_path))]
+        if kwargs.get('upgrade', False):
+            cmd.append("--upgrade")
+        if kwargs.get('no_deps', False):
+            cmd.append("--no-deps")
+        for package in packages:
+            cmd.extend(["--editable", package] if kwargs.get('editable', False) else [package])
+        return cmd
+
+    def _uninstall_command(self, env_path: Path, packages: List[str]) -> Optional[List[str]]:
+        """uv pip uninstall groupé"""
+        return ["uv", "pip", "uninstall", "--python", str(self._get_python_executable(env_path)), *packages]
+
+    def _list_command(self, env_path: Path) -> Optional[List[str]]:
+        """uv pip list au format JSON"""
+        return ["uv", "pip", "list", "--format", "json", "--python", str(self._get_python_executable(env_path))]
+
     def _get_python_executable(self, env_path: Path) -> Path:
         """Exécutable Python de l'environnement"""
         if env_path.name == "Scripts" or env_path.name == "bin":
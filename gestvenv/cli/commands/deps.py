@@ -4,6 +4,7 @@ Commande deps - Analyse des dépendances
 Usage:
     gv deps tree [env]                   # Arbre de dépendances
     gv deps outdated [env]               # Packages obsolètes
+    gv deps outdated --all               # Packages obsolètes de tous les environnements
     gv deps check [env]                  # Vérifier conflits
 """
 
@@ -14,6 +15,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
 
+from ..fanout import fanout_options, resolve_targets, run_fanout
+
 
 @dataclass
 class DependencyNode:
@@ -281,11 +284,30 @@ def deps_tree(ctx, env_name: Optional[str], output_json: bool):
 @deps_group.command(name='outdated')
 @click.argument('env_name', required=False)
 @click.option('--json', 'output_json', is_flag=True, help='Sortie au format JSON')
+@fanout_options()
 @click.pass_context
-def deps_outdated(ctx, env_name: Optional[str], output_json: bool):
+def deps_outdated(ctx, env_name: Optional[str], output_json: bool, fanout_all: bool,
+                  fanout_envs: Optional[str], fanout_jobs: Optional[int], fanout_jsonl: bool):
     """Lister les packages obsolètes"""
     env_manager = ctx.obj.get('env_manager') if ctx.obj else None
 
+    if fanout_all or fanout_envs:
+        if not env_manager:
+            raise click.ClickException("Gestionnaire d'environnements indisponible")
+
+        def outdated_one(env_info):
+            packages = get_outdated_packages(env_info.path)
+            return {
+                "success": True,
+                "message": f"{len(packages)} package(s) obsolète(s)",
+                "outdated": [p.__dict__ for p in packages],
+            }
+
+        targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+        run_fanout(env_manager, targets, "Packages obsolètes", outdated_one,
+                   jobs=fanout_jobs, jsonl=fanout_jsonl or output_json)
+        return
+
     if env_name:
         if env_manager:
             env_path = env_manager.get_environment_path(env_name)
@@ -14,6 +14,13 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
+from ...utils.requirements_parser import (
+    iter_requirement_lines,
+    normalize_name,
+    parse_requirement,
+)
+from ...utils.toml_handler import TomlHandler
+
 
 @dataclass
 class PackageInfo:
@@ -63,36 +70,34 @@ def get_env_packages(env_path: Path) -> Dict[str, str]:
         if result.returncode == 0:
             pkg_list = json.loads(result.stdout)
             for pkg in pkg_list:
-                packages[pkg['name'].lower()] = pkg['version']
+                packages[normalize_name(pkg['name'])] = pkg['version']
     except Exception as e:
         raise click.ClickException(f"Erreur lecture packages: {e}")
 
     return packages
 
 
+def _spec_version(spec: str) -> Tuple[Optional[str], str]:
+    """Nom normalisé et version affichable d'une spécification de dépendance"""
+    parsed = parse_requirement(spec)
+    if not parsed:
+        return None, "*"
+    version = parsed.pinned_version or parsed.specifier or "*"
+    return parsed.normalized_name, version
+
+
 def parse_requirements(file_path: Path) -> Dict[str, str]:
     """Parse un fichier requirements.txt"""
     packages = {}
 
     content = file_path.read_text(encoding='utf-8')
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line or line.startswith('#') or line.startswith('-'):
+    for line in iter_requirement_lines(content):
+        if line.startswith('-'):
             continue
 
-        # Parser les différents formats
-        if '==' in line:
-            name, version = line.split('==', 1)
-            packages[name.strip().lower()] = version.strip()
-        elif '>=' in line:
-            name = line.split('>=')[0]
-            packages[name.strip().lower()] = f">={line.split('>=')[1].strip()}"
-        elif '~=' in line:
-            name = line.split('~=')[0]
-            packages[name.strip().lower()] = f"~={line.split('~=')[1].strip()}"
-        else:
-            # Package sans version
-            packages[line.lower()] = "*"
+        name, version = _spec_version(line)
+        if name:
+            packages[name] = version
 
     return packages
 
@@ -101,40 +106,17 @@ def parse_pyproject(file_path: Path) -> Dict[str, str]:
     """Parse un fichier pyproject.toml"""
     packages = {}
 
-    try:
-        import toml
-        data = toml.load(file_path)
-    except ImportError:
-        # Fallback sans toml
-        content = file_path.read_text(encoding='utf-8')
-        # Parser basique
-        in_deps = False
-        for line in content.split('\n'):
-            if '[project.dependencies]' in line or '[tool.poetry.dependencies]' in line:
-                in_deps = True
-                continue
-            if in_deps:
-                if line.startswith('['):
-                    break
-                if '=' in line or '"' in line:
-                    # Extraire le nom du package
-                    parts = line.strip().strip('"').strip("'").split()
-                    if parts:
-                        pkg = parts[0].split('>=')[0].split('==')[0].split('<')[0]
-                        packages[pkg.lower()] = "*"
-        return packages
-
-    # Avec toml
+    data = TomlHandler.load(file_path)
+
     deps = data.get('project', {}).get('dependencies', [])
     if not deps:
         deps = list(data.get('tool', {}).get('poetry', {}).get('dependencies', {}).keys())
 
     for dep in deps:
         if isinstance(dep, str):
-            parts = dep.replace('>=', '==').replace('~=', '==').split('==')
-            name = parts[0].strip()
-            version = parts[1].strip() if len(parts) > 1 else "*"
-            packages[name.lower()] = version
+            name, version = _spec_version(dep)
+            if name:
+                packages[name] = version
 
     return packages
 
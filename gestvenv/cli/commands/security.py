@@ -3,6 +3,7 @@ Commande security - Scan de sécurité et licences
 
 Usage:
     gv security scan [env]               # Scan vulnérabilités
+    gv security scan --all --jobs 4      # Scan de tous les environnements
     gv security audit --fix              # Audit avec corrections
     gv licenses check [env]              # Vérifier licences
     gv licenses export --format csv      # Exporter licences
@@ -17,6 +18,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from ..fanout import fanout_options, resolve_targets, run_fanout
+
 
 @dataclass
 class Vulnerability:
@@ -376,11 +379,31 @@ def security_group():
 @security_group.command(name='scan')
 @click.argument('env_name', required=False)
 @click.option('--json', 'output_json', is_flag=True, help='Sortie au format JSON')
+@fanout_options()
 @click.pass_context
-def security_scan(ctx, env_name: Optional[str], output_json: bool):
+def security_scan(ctx, env_name: Optional[str], output_json: bool, fanout_all: bool,
+                  fanout_envs: Optional[str], fanout_jobs: Optional[int], fanout_jsonl: bool):
     """Scanner les vulnérabilités de sécurité"""
     env_manager = ctx.obj.get('env_manager') if ctx.obj else None
 
+    if fanout_all or fanout_envs:
+        if not env_manager:
+            raise click.ClickException("Gestionnaire d'environnements indisponible")
+
+        def scan_one(env_info):
+            report = scan_vulnerabilities(env_info.path)
+            return {
+                "success": not report.vulnerabilities,
+                "message": f"{len(report.vulnerabilities)} vulnérabilité(s), "
+                           f"{report.vulnerable_packages}/{report.total_packages} package(s) touché(s)",
+                "vulnerabilities": [v.__dict__ for v in report.vulnerabilities],
+            }
+
+        targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+        run_fanout(env_manager, targets, "Scan de sécurité", scan_one,
+                   jobs=fanout_jobs, jsonl=fanout_jsonl or output_json)
+        return
+
     if env_name:
         if env_manager:
             env_path = env_manager.get_environment_path(env_name)
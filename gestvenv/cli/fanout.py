@@ -0,0 +1,161 @@
+"""
+Options et rendu CLI des opérations multi-environnements
+
+Usage:
+    gv sync --all --jobs 8
+    gv doctor --envs api,worker --jsonl
+    gv deps outdated --all
+"""
+
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import click
+from rich.console import Console
+from rich.live import Live
+from rich.markup import escape
+from rich.table import Table
+
+from ..utils.fanout import EnvOperationResult, FanOutExecutor, FanOutSummary
+
+
+def fanout_options(all_flag: str = "--all") -> Callable:
+    """Ajoute --all/--envs/--jobs/--jsonl à une commande
+
+    Args:
+        all_flag: Nom de l'option « tous les environnements » (certaines
+            commandes utilisent déjà --all avec un autre sens)
+    """
+    def decorator(func: Callable) -> Callable:
+        options = [
+            click.option(all_flag, "fanout_all", is_flag=True,
+                         help="Exécuter sur tous les environnements"),
+            click.option("--envs", "fanout_envs",
+                         help="Environnements cibles (séparés par des virgules)"),
+            click.option("--jobs", "-j", "fanout_jobs", type=int,
+                         help="Opérations simultanées (défaut: nombre de CPU)"),
+            click.option("--jsonl", "fanout_jsonl", is_flag=True,
+                         help="Résultats en JSON lines (un objet par environnement)"),
+        ]
+        for option in reversed(options):
+            func = option(func)
+        return func
+    return decorator
+
+
+def resolve_targets(env_manager: Any, fanout_all: bool, fanout_envs: Optional[str]) -> Optional[List[Any]]:
+    """Environnements ciblés, ou None hors mode multi-environnements"""
+    if not fanout_all and not fanout_envs:
+        return None
+
+    if fanout_all:
+        return sorted(env_manager.list_environments(), key=lambda e: e.name)
+
+    targets = []
+    missing = []
+    for name in dict.fromkeys(n.strip() for n in fanout_envs.split(",") if n.strip()):
+        env_info = env_manager.get_environment_info(name)
+        if env_info:
+            targets.append(env_info)
+        else:
+            missing.append(name)
+    if missing:
+        raise click.ClickException(f"Environnement(s) introuvable(s): {', '.join(missing)}")
+    return targets
+
+
+def _backend_limits(env_manager: Any) -> Dict[str, int]:
+    """Plafonds par backend depuis la configuration (backend_configs.<b>.max_concurrent_envs)"""
+    try:
+        configs = env_manager.config_manager.config.backend_configs or {}
+    except AttributeError:
+        return {}
+    return {
+        backend: int(cfg["max_concurrent_envs"])
+        for backend, cfg in configs.items()
+        if isinstance(cfg, dict) and cfg.get("max_concurrent_envs")
+    }
+
+
+class _LiveTable:
+    """Tableau rich mis à jour à chaque démarrage/résultat"""
+
+    def __init__(self, title: str, envs: List[Any]):
+        self.title = title
+        self.rows: Dict[str, List[str]] = {
+            env.name: [escape(env.name), escape(str(getattr(env.backend_type, "value", ""))),
+                       "⏳ en attente", "", ""]
+            for env in envs
+        }
+
+    def start(self, env: Any) -> None:
+        self.rows[env.name][2] = "🔄 en cours"
+
+    def finish(self, result: EnvOperationResult) -> None:
+        self.rows[result.env_name][2:] = [
+            "✅ succès" if result.success else "❌ échec",
+            f"{result.duration:.2f}s",
+            escape(result.message),
+        ]
+
+    def __rich__(self) -> Table:
+        table = Table(title=self.title)
+        for column in ("Environnement", "Backend", "Statut", "Durée", "Détail"):
+            table.add_column(column, justify="right" if column == "Durée" else "left")
+        for row in self.rows.values():
+            table.add_row(*row)
+        return table
+
+
+def run_fanout(
+    env_manager: Any,
+    targets: List[Any],
+    operation_name: str,
+    operation: Callable[[Any], Any],
+    jobs: Optional[int] = None,
+    jsonl: bool = False,
+    console: Optional[Console] = None
+) -> FanOutSummary:
+    """Exécute une opération sur les environnements et affiche les résultats en flux
+
+    La commande se termine avec le code 1 si au moins un environnement échoue.
+    """
+    executor = FanOutExecutor(jobs, _backend_limits(env_manager))
+
+    if jsonl:
+        def emit(result: EnvOperationResult) -> None:
+            click.echo(json.dumps({"type": "result", **result.to_dict()}, default=str))
+
+        summary = executor.run(operation_name, targets, operation, on_result=emit)
+        click.echo(json.dumps({"type": "summary", **summary.to_dict()}, default=str))
+    else:
+        console = console or Console()
+        if not targets:
+            console.print("ℹ️ Aucun environnement ciblé")
+        live_table = _LiveTable(f"{operation_name} — {len(targets)} environnement(s), "
+                                f"{executor.jobs} worker(s)", targets)
+        with Live(live_table, console=console, refresh_per_second=8, transient=False) as live:
+            def started(env: Any) -> None:
+                live_table.start(env)
+                live.refresh()
+
+            def finished(result: EnvOperationResult) -> None:
+                live_table.finish(result)
+                live.refresh()
+
+            summary = executor.run(operation_name, targets, operation, started, finished)
+        if not console.is_terminal:
+            console.line()
+
+        data = summary.to_dict()
+        console.print(
+            f"📊 {data['succeeded']}/{data['total']} réussi(s), {data['failed']} échec(s) — "
+            f"⏱️ {data['total_time']:.2f}s (cumul {data['cumulative_time']:.2f}s)"
+        )
+        if summary.failed:
+            console.print(f"❌ Échecs: {', '.join(data['failed_envs'])}")
+
+    if not summary.success:
+        sys.exit(1)
+    return summary
@@ -29,6 +29,7 @@ from gestvenv.utils.path_utils import PathUtils
 
 # Import des commandes avancées
 from gestvenv.cli.commands import diff_group, deps_group, security_group, python_group
+from gestvenv.cli.fanout import fanout_options, resolve_targets, run_fanout
 
 # Version fixe pour GestVenv 2.0
 __version__ = "2.0.0"
@@ -367,13 +368,17 @@ def create_from_conda(ctx: click.Context, conda_file: str, name: Optional[str],
 
 @cli.command(name='list')
 @click.option('--active-only', is_flag=True, help='Afficher seulement les environnements actifs')
-@click.option('--format', 'output_format', type=click.Choice(['table', 'json']), default='table')
+@click.option('--format', 'output_format', type=click.Choice(['table', 'json', 'ndjson']), default='table',
+              help='ndjson : un environnement JSON par ligne, écrit dès sa lecture')
 @click.option('--backend', help='Filtrer par backend')
-@click.option('--health', help='Filtrer par état de santé')
+@click.option('--health', help='Filtrer par état de santé (plusieurs : séparés par des virgules)')
 @click.option('--sort', type=click.Choice(['name', 'created', 'used', 'size']), default='used')
+@click.option('--limit', type=click.IntRange(min=1), help='Nombre maximal de lignes (ndjson)')
+@click.option('--cursor', help='Reprendre après la page précédente (ndjson)')
 @click.pass_context
 def list_environments(ctx: click.Context, active_only: bool, output_format: str,
-                      backend: Optional[str], health: Optional[str], sort: str) -> None:
+                      backend: Optional[str], health: Optional[str], sort: str,
+                      limit: Optional[int], cursor: Optional[str]) -> None:
     """Lister tous les environnements"""
     env_manager = ctx.obj['env_manager']
     
@@ -385,6 +390,21 @@ def list_environments(ctx: click.Context, active_only: bool, output_format: str,
             filters['backend'] = backend
         if health:
             filters['health'] = health
+        
+        if output_format == 'ndjson':
+            # Filtre, tri et pagination par le catalogue ; chaque ligne est
+            # écrite dès que son environnement est chargé. Une dernière ligne
+            # {"next_cursor": ...} signale qu'une page suivante existe.
+            import json
+            environments, next_cursor = env_manager.query_environments(
+                sort=sort, cursor=cursor, limit=limit, **filters
+            )
+            for env in environments:
+                click.echo(json.dumps(env.to_dict(), default=str))
+                sys.stdout.flush()
+            if next_cursor:
+                click.echo(json.dumps({"next_cursor": next_cursor}))
+            return
             
         environments = env_manager.list_environments(**filters)
         
@@ -623,14 +643,41 @@ def info(ctx: click.Context, name: str) -> None:
         sys.exit(1)
 
 @cli.command()
-@click.argument('name')
+@click.argument('name', required=False)
 @click.option('--groups', help='Groupes à synchroniser (séparés par des virgules)')
 @click.option('--clean', is_flag=True, help='Nettoyer les packages non listés')
 @click.option('--upgrade', is_flag=True, help='Mettre à jour les packages existants')
+@fanout_options()
 @click.pass_context
-def sync(ctx: click.Context, name: str, groups: Optional[str], clean: bool, upgrade: bool) -> None:
-    """Synchroniser un environnement avec pyproject.toml"""
+def sync(ctx: click.Context, name: Optional[str], groups: Optional[str], clean: bool, upgrade: bool,
+         fanout_all: bool, fanout_envs: Optional[str], fanout_jobs: Optional[int],
+         fanout_jsonl: bool) -> None:
+    """Synchroniser un ou plusieurs environnements avec pyproject.toml"""
     env_manager = ctx.obj['env_manager']
+    group_list = [g.strip() for g in groups.split(',') if g.strip()] if groups else None
+    sync_options = {"groups": group_list, "clean": clean, "upgrade": upgrade}
+    
+    targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+    if targets is not None:
+        def sync_one(env_info):
+            if not env_info.pyproject_info:
+                return {"success": True, "message": "Aucun pyproject.toml (ignoré)", "skipped": True}
+            result = env_manager.sync_environment(env_info.name, **sync_options)
+            return {
+                "success": result.success,
+                "message": result.message,
+                "added": result.packages_added,
+                "removed": result.packages_removed,
+                "updated": result.packages_updated,
+            }
+        
+        run_fanout(env_manager, targets, "Synchronisation", sync_one,
+                   jobs=fanout_jobs, jsonl=fanout_jsonl, console=console)
+        return
+    
+    if not name:
+        console.print("❌ Spécifiez un environnement, --envs ou --all")
+        sys.exit(1)
     
     try:
         env_info = env_manager.get_environment_info(name)
@@ -644,7 +691,7 @@ def sync(ctx: click.Context, name: str, groups: Optional[str], clean: bool, upgr
             sys.exit(1)
         
         with console.status(f"[bold blue]Synchronisation de {name}..."):
-            result = env_manager.sync_environment(name)
+            result = env_manager.sync_environment(name, **sync_options)
         
         if result.success:
             console.print(f"✅ Synchronisation de [bold green]{name}[/bold green] réussie!")
@@ -671,8 +718,9 @@ def sync(ctx: click.Context, name: str, groups: Optional[str], clean: bool, upgr
 @cli.command()
 @click.argument('source')
 @click.argument('target')
-@click.option('--python', help='Version Python différente pour le clone')
-@click.option('--backend', type=click.Choice(['pip', 'uv']), help='Backend différent pour le clone')
+@click.option('--python', help='Version Python différente pour le clone (implique une réinstallation)')
+@click.option('--backend', type=click.Choice(['pip', 'uv', 'poetry', 'pdm']),
+              help='Backend différent pour le clone (implique une réinstallation)')
 @click.pass_context
 def clone(ctx: click.Context, source: str, target: str, python: Optional[str], backend: Optional[str]) -> None:
     """Cloner un environnement existant"""
@@ -680,10 +728,16 @@ def clone(ctx: click.Context, source: str, target: str, python: Optional[str], b
     
     try:
         with console.status(f"[bold blue]Clonage de {source} vers {target}..."):
-            result = env_manager.clone_environment(source, target)
+            result = env_manager.clone_environment(
+                source, target, python_version=python, backend=backend
+            )
         
         if result.success:
             console.print(f"✅ Environnement [bold green]{target}[/bold green] cloné depuis [bold blue]{source}[/bold blue]!")
+            clone_stats = result.environment.metadata.get("clone")
+            if clone_stats:
+                console.print(f"⚡ Copie directe ({clone_stats['strategy']}): "
+                              f"{clone_stats['files']} fichiers en {clone_stats['duration']:.2f}s")
             console.print(f"📦 Packages clonés: {len(result.environment.packages)}")
             console.print(f"📁 Chemin: {result.environment.path}")
             
@@ -937,12 +991,33 @@ def uninstall(ctx: click.Context, packages: tuple, env: Optional[str], yes: bool
 @click.option('--env', help='Environnement à mettre à jour')
 @click.option('--all', 'update_all', is_flag=True, help='Mettre à jour tous les packages')
 @click.option('--dry-run', is_flag=True, help='Simulation sans installation')
+@fanout_options(all_flag='--all-envs')
 @click.argument('packages', nargs=-1)
 @click.pass_context
-def update(ctx: click.Context, env: Optional[str], update_all: bool, dry_run: bool, packages: tuple) -> None:
-    """Mettre à jour des packages"""
+def update(ctx: click.Context, env: Optional[str], update_all: bool, dry_run: bool,
+           fanout_all: bool, fanout_envs: Optional[str], fanout_jobs: Optional[int],
+           fanout_jsonl: bool, packages: tuple) -> None:
+    """Mettre à jour des packages (un environnement, --envs ou --all-envs)"""
     env_manager = ctx.obj['env_manager']
     
+    targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+    if targets is not None:
+        if not packages and not update_all:
+            raise click.UsageError("Spécifiez des packages ou --all")
+        if dry_run:
+            for env_info in targets:
+                console.print(f"🔍 Simulation mise à jour dans '{env_info.name}'")
+            return
+        
+        def update_one(env_info):
+            if update_all:
+                return env_manager.package_service.update_all_packages(env_info)
+            return env_manager.package_service.update_packages(env_info, list(packages))
+        
+        run_fanout(env_manager, targets, "Mise à jour", update_one,
+                   jobs=fanout_jobs, jsonl=fanout_jsonl, console=console)
+        return
+    
     try:
         if not env:
             active_envs = [e for e in env_manager.list_environments() if e.is_active]
@@ -1101,6 +1176,50 @@ def cache_add(ctx: click.Context, packages: tuple, requirements: Optional[str],
         console.print(f"❌ Erreur: {e}")
         sys.exit(1)
 
+@cache.command(name='warmup')
+@click.argument('name', required=False)
+@fanout_options()
+@click.pass_context
+def cache_warmup(ctx: click.Context, name: Optional[str], fanout_all: bool,
+                 fanout_envs: Optional[str], fanout_jobs: Optional[int], fanout_jsonl: bool) -> None:
+    """Précharger dans le cache les dépendances d'environnements"""
+    env_manager = ctx.obj['env_manager']
+    cache_service = env_manager.cache_service
+    
+    targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+    if targets is None:
+        env_info = env_manager.get_environment_info(name) if name else None
+        if not env_info:
+            console.print("❌ Spécifiez un environnement existant, --envs ou --all")
+            sys.exit(1)
+        targets = [env_info]
+    
+    def warmup_one(env_info):
+        specs = [f"{pkg.name}=={pkg.version}" for pkg in env_info.packages]
+        if not specs and env_info.pyproject_info:
+            specs = env_info.pyproject_info.extract_dependencies()
+        
+        cached, failed = 0, []
+        for spec in specs:
+            pkg_name, _, version = spec.partition("==")
+            if version and cache_service.is_package_cached(pkg_name, version):
+                cached += 1
+                continue
+            result = cache_service.add_package_to_cache(spec, python_version=env_info.python_version)
+            if result.success:
+                cached += 1
+            else:
+                failed.append(spec)
+        
+        return {
+            "success": not failed,
+            "message": f"{cached}/{len(specs)} packages en cache",
+            "failed": failed,
+        }
+    
+    run_fanout(env_manager, targets, "Préchargement du cache", warmup_one,
+               jobs=fanout_jobs, jsonl=fanout_jsonl, console=console)
+
 @cache.command(name='clean')
 @click.option('--older-than', type=int, help='Nettoyer les éléments plus anciens que X jours')
 @click.option('--size-limit', help='Nettoyer pour atteindre cette taille max (ex: 500MB)')
@@ -1412,19 +1531,38 @@ def backend_info(ctx: click.Context, backend_name: Optional[str], detailed: bool
 @cli.command()
 @click.argument('name', required=False)
 @click.option('--auto-fix', is_flag=True, help='Réparation automatique')
-@click.option('--full', is_flag=True, help='Diagnostic complet avec recommandations')
+@click.option('--full', is_flag=True, help='Diagnostic complet (relance toutes les vérifications) avec recommandations')
 @click.option('--performance', is_flag=True, help='Focus sur l\'analyse de performance')
+@fanout_options()
 @click.pass_context
-def doctor(ctx: click.Context, name: Optional[str], auto_fix: bool, full: bool, performance: bool) -> None:
-    """Diagnostic et réparation"""
+def doctor(ctx: click.Context, name: Optional[str], auto_fix: bool, full: bool, performance: bool,
+           fanout_all: bool, fanout_envs: Optional[str], fanout_jobs: Optional[int],
+           fanout_jsonl: bool) -> None:
+    """Diagnostic et réparation
+    
+    Les vérifications dont les entrées n'ont pas changé depuis le dernier
+    diagnostic sont reprises telles quelles ; --full les relance toutes.
+    """
     env_manager = ctx.obj['env_manager']
     
+    targets = resolve_targets(env_manager, fanout_all, fanout_envs)
+    if targets is not None:
+        def doctor_one(env_info):
+            report = env_manager.doctor_environment(env_info.name, incremental=not full)
+            return {
+                "success": report.overall_status.value != 'error',
+                "message": f"{report.overall_status.value} — {len(report.issues)} problème(s)",
+                "status": report.overall_status.value,
+                "issues": [issue.description for issue in report.issues],
+            }
+        
+        run_fanout(env_manager, targets, "Diagnostic", doctor_one,
+                   jobs=fanout_jobs, jsonl=fanout_jsonl, console=console)
+        return
+    
     try:
         with console.status("[bold blue]Diagnostic en cours..."):
-            if name:
-                result = env_manager.doctor_environment(name)
-            else:
-                result = env_manager.doctor_environment()
+            result = env_manager.doctor_environment(name, incremental=not full)
         
         # Affichage du statut général
         status_icons = {
@@ -1505,6 +1643,11 @@ def doctor(ctx: click.Context, name: Optional[str], auto_fix: bool, full: bool,
                 total_size = PathUtils.get_size_mb(envs_path)
                 console.print(f"   • Espace utilisé: {total_size:.1f} MB")
         
+        checks = result.details.get("checks")
+        if checks and checks.get("cached"):
+            console.print(f"\n♻️ {checks['cached']} vérification(s) reprise(s) du dernier diagnostic "
+                          f"({checks['executed']} relancée(s)) — --full pour tout relancer")
+        
         console.print(f"\n⏱️ Temps d'exécution: {result.execution_time:.2f}s")
         
     except Exception as e:
@@ -1731,8 +1874,9 @@ def template_create(ctx: click.Context, template_name: str, project_name: str,
 @click.argument('name')
 @click.argument('output_file', required=False)
 @click.option('--format', 'export_format', 
-              type=click.Choice(['json', 'requirements', 'pyproject']), 
-              default='json')
+              type=click.Choice(['json', 'requirements', 'pyproject', 'snapshot']), 
+              default='json',
+              help="snapshot: archive binaire relocalisable du venv (import hors ligne)")
 @click.option('--include-cache', is_flag=True, help='Inclure le cache local')
 @click.pass_context
 def export(ctx: click.Context, name: str, output_file: Optional[str], 
@@ -1783,7 +1927,7 @@ def import_env(ctx: click.Context, source_file: str, env_name: Optional[str], fo
         source_path = Path(source_file)
         
         # Vérification format
-        supported_formats = ['.json', '.toml', '.txt', '.yml', '.yaml']
+        supported_formats = ['.json', '.toml', '.txt', '.yml', '.yaml', '.gvsnap']
         if source_path.suffix not in supported_formats:
             console.print(f"❌ Format non supporté: {source_path.suffix}")
             console.print(f"💡 Formats supportés: {', '.join(supported_formats)}")
@@ -1797,6 +1941,8 @@ def import_env(ctx: click.Context, source_file: str, env_name: Optional[str], fo
             import_type = "conda"
         elif source_path.name == "pyproject.toml":
             import_type = "pyproject"
+        elif source_path.suffix == ".gvsnap":
+            import_type = "snapshot"
         
         with console.status(f"[bold blue]Import {import_type} depuis {source_file}..."):
             if import_type == "pipfile":
@@ -1811,6 +1957,8 @@ def import_env(ctx: click.Context, source_file: str, env_name: Optional[str], fo
             console.print(f"📁 Chemin: {result.environment.path}")
             console.print(f"📦 Packages: {len(result.environment.packages)}")
             console.print(f"📋 Type: {import_type}")
+            for warning in result.warnings:
+                console.print(f"⚠️ {warning}")
         else:
             console.print(f"❌ Erreur: {result.message}")
             sys.exit(1)
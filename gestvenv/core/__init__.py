@@ -45,6 +45,7 @@ from .exceptions import (
     CacheError,
     TemplateError,
     DiagnosticError,
+    LockTimeoutError,
 )
 
 __all__ = [
@@ -88,6 +89,7 @@ __all__ = [
     "CacheError",
     "TemplateError",
     "DiagnosticError",
+    "LockTimeoutError",
 ]
 
 # Version du module core
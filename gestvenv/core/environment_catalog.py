@@ -0,0 +1,274 @@
+"""
+Catalogue des environnements pour GestVenv
+
+Index léger des métadonnées (.gestvenv-metadata.json) : un résumé par
+environnement (backend, santé, dates, nombre de packages), relu seulement
+lorsque le fichier de métadonnées change (mtime, taille) et persisté entre
+deux invocations. Filtrage, tri et pagination par curseur s'appliquent aux
+résumés ; les EnvironmentInfo complets ne sont chargés que pour les lignes
+effectivement produites, une à une.
+"""
+
+import base64
+import bisect
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .exceptions import ValidationError
+from .models import EnvironmentInfo
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILENAME = ".gestvenv-metadata.json"
+
+# Version du format de l'index persisté
+CATALOG_VERSION = 1
+
+# Critères de tri : name croissant, les autres du plus récent/grand au plus petit
+SORT_KEYS = ("name", "used", "created", "size")
+
+
+def _timestamp(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class EnvironmentSummary:
+    """Résumé d'un environnement, suffisant pour filtrer et trier"""
+    name: str
+    backend: str = "auto"
+    health: str = "unknown"
+    is_active: bool = False
+    created_at: float = 0.0
+    last_used: float = 0.0
+    package_count: int = 0
+    # (mtime_ns, taille) du fichier de métadonnées ; None : pas de fichier
+    signature: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_metadata(
+        cls,
+        name: str,
+        data: Dict[str, Any],
+        signature: Optional[Tuple[int, int]]
+    ) -> 'EnvironmentSummary':
+        return cls(
+            name=name,
+            backend=data.get("backend_type", "auto"),
+            health=data.get("health", "unknown"),
+            is_active=bool(data.get("is_active", False)),
+            created_at=_timestamp(data.get("created_at")),
+            last_used=_timestamp(data.get("last_used")),
+            package_count=len(data.get("packages") or []),
+            signature=signature,
+        )
+
+    @classmethod
+    def from_environment(cls, env_info: EnvironmentInfo) -> 'EnvironmentSummary':
+        return cls(
+            name=env_info.name,
+            backend=env_info.backend_type.value,
+            health=env_info.health.value,
+            is_active=env_info.is_active,
+            created_at=env_info.created_at.timestamp(),
+            last_used=env_info.last_used.timestamp(),
+            package_count=len(env_info.packages),
+        )
+
+    def matches(self, filters: Dict[str, Any]) -> bool:
+        """Mêmes filtres que EnvironmentManager.list_environments"""
+        if filters.get('active_only') and not self.is_active:
+            return False
+        if filters.get('backend') and self.backend != filters['backend']:
+            return False
+        if filters.get('health') and self.health not in filters['health'].split(','):
+            return False
+        return True
+
+    def sort_key(self, sort: str) -> Tuple[Any, str]:
+        """Clé croissante pour le tri demandé (nom en départage)"""
+        if sort == "name":
+            return (self.name, self.name)
+        if sort == "created":
+            return (-self.created_at, self.name)
+        if sort == "size":
+            return (-self.package_count, self.name)
+        return (-self.last_used, self.name)
+
+
+def encode_cursor(sort: str, key: Tuple[Any, str]) -> str:
+    """Curseur opaque désignant la position après la clé donnée"""
+    raw = json.dumps([sort, list(key)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """Clé encodée dans un curseur (ValidationError si invalide ou d'un autre tri)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+        primary, name = key
+    except (ValueError, TypeError) as e:
+        raise ValidationError(f"Curseur invalide: {cursor}") from e
+    if cursor_sort != sort:
+        raise ValidationError(f"Curseur obtenu avec le tri '{cursor_sort}', pas '{sort}'")
+    return (primary, name)
+
+
+class EnvironmentCatalog:
+    """Index des environnements d'un répertoire, requêtable par page"""
+
+    def __init__(
+        self,
+        environments_path: Callable[[], Path],
+        load: Callable[[str], Optional[EnvironmentInfo]],
+        index_path: Optional[Path] = None
+    ):
+        self._environments_path = environments_path
+        self._load = load
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._summaries: Optional[Dict[str, EnvironmentSummary]] = None
+        self.reads = 0
+
+    def summaries(self) -> List[EnvironmentSummary]:
+        """Résumés à jour de tous les environnements"""
+        envs_path = self._environments_path()
+        with self._lock:
+            if self._summaries is None:
+                self._summaries = self._read_index(envs_path)
+            previous = self._summaries
+            current: Dict[str, EnvironmentSummary] = {}
+            changed = False
+
+            try:
+                entries = list(os.scandir(envs_path))
+            except OSError:
+                entries = []
+
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                summary = self._summary(Path(entry.path), entry.name, previous.get(entry.name))
+                if summary is None:
+                    continue
+                current[entry.name] = summary
+                if summary.signature is not None and summary is not previous.get(entry.name):
+                    changed = True
+
+            changed = changed or previous.keys() != current.keys()
+            self._summaries = current
+            if changed:
+                self._write_index(envs_path, current)
+            return list(current.values())
+
+    def _summary(
+        self,
+        env_dir: Path,
+        name: str,
+        cached: Optional[EnvironmentSummary]
+    ) -> Optional[EnvironmentSummary]:
+        try:
+            stat = (env_dir / METADATA_FILENAME).stat()
+        except OSError:
+            # Environnement sans métadonnées : détection complète, jamais mise en cache
+            env_info = self._load(name)
+            return EnvironmentSummary.from_environment(env_info) if env_info else None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if cached is not None and cached.signature == signature:
+            return cached
+        self.reads += 1
+        try:
+            with open(env_dir / METADATA_FILENAME, 'r', encoding='utf-8') as f:
+                return EnvironmentSummary.from_metadata(name, json.load(f), signature)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def query(
+        self,
+        sort: str = "used",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters
+    ) -> Tuple[List[EnvironmentSummary], Optional[str]]:
+        """
+        Page de résumés filtrés et triés
+
+        Returns:
+            (résumés de la page, curseur de la page suivante ou None)
+        """
+        if sort not in SORT_KEYS:
+            raise ValidationError(f"Tri inconnu: {sort} (attendu: {', '.join(SORT_KEYS)})")
+
+        rows = sorted(
+            (summary for summary in self.summaries() if summary.matches(filters)),
+            key=lambda summary: summary.sort_key(sort)
+        )
+        start = 0
+        if cursor:
+            after = decode_cursor(cursor, sort)
+            start = bisect.bisect_right([row.sort_key(sort) for row in rows], after)
+
+        end = len(rows) if limit is None else min(len(rows), start + max(limit, 0))
+        page = rows[start:end]
+        next_cursor = encode_cursor(sort, page[-1].sort_key(sort)) if page and end < len(rows) else None
+        return page, next_cursor
+
+    def iter_environments(self, summaries: List[EnvironmentSummary]) -> Iterator[EnvironmentInfo]:
+        """Charge les environnements complets d'une page, au fil de l'itération"""
+        for summary in summaries:
+            env_info = self._load(summary.name)
+            if env_info is not None:
+                yield env_info
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._summaries = None
+
+    def _read_index(self, envs_path: Path) -> Dict[str, EnvironmentSummary]:
+        if self.index_path is None:
+            return {}
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data.get("version") != CATALOG_VERSION or data.get("environments_path") != str(envs_path):
+                return {}
+            summaries = {}
+            for row in data.get("environments", []):
+                if row.get("signature") is not None:
+                    row["signature"] = tuple(row["signature"])
+                summaries[row["name"]] = EnvironmentSummary(**row)
+            return summaries
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.debug(f"Index du catalogue ignoré: {e}")
+            return {}
+
+    def _write_index(self, envs_path: Path, summaries: Dict[str, EnvironmentSummary]) -> None:
+        if self.index_path is None:
+            return
+        data = {
+            "version": CATALOG_VERSION,
+            "environments_path": str(envs_path),
+            # Seuls les résumés issus d'un fichier de métadonnées sont réutilisables
+            "environments": [asdict(s) for s in summaries.values() if s.signature is not None],
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.debug(f"Impossible d'enregistrer l'index du catalogue: {e}")
@@ -2,13 +2,14 @@
 Gestionnaire principal d'environnements pour GestVenv v1.1
 """
 
+import copy
 import json
 import os
 import shutil
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 
 from .models import (
     EnvironmentInfo,
@@ -29,8 +30,10 @@ from .exceptions import (
     EnvironmentNotFoundError,
     EnvironmentExistsError,
     ValidationError,
-    BackendError
+    BackendError,
+    LockTimeoutError
 )
+from ..utils.file_locks import FileLock, environment_lock, write_json_atomic
 
 
 class EnvironmentManager:
@@ -80,6 +83,18 @@ class EnvironmentManager:
             self._diagnostic_service = DiagnosticService(self)
         return self._diagnostic_service
     
+    @property
+    def catalog(self):
+        """Catalogue des environnements (index des métadonnées) lazy loading"""
+        if not hasattr(self, '_catalog'):
+            from .environment_catalog import EnvironmentCatalog
+            self._catalog = EnvironmentCatalog(
+                self.config_manager.get_environments_path,
+                self._load_environment_metadata,
+                index_path=self.config_manager.get_cache_path() / "environment-catalog.json"
+            )
+        return self._catalog
+    
     @property
     def system_service(self):
         """System service lazy loading"""
@@ -98,6 +113,25 @@ class EnvironmentManager:
         **options
     ) -> EnvironmentResult:
         """Crée un nouvel environnement virtuel"""
+        # Verrou pris avant la vérification d'existence : deux processus ne
+        # créent pas le même environnement
+        try:
+            with self.environment_lock(name):
+                return self._create_environment(
+                    name, python_version, backend, initial_packages, custom_path, **options
+                )
+        except LockTimeoutError as e:
+            return EnvironmentResult(success=False, message=str(e))
+    
+    def _create_environment(
+        self,
+        name: str,
+        python_version: Optional[str],
+        backend: str,
+        initial_packages: Optional[List[str]],
+        custom_path: Optional[Path],
+        **options
+    ) -> EnvironmentResult:
         start_time = time.time()
         
         try:
@@ -340,29 +374,30 @@ class EnvironmentManager:
     def delete_environment(self, name: str, force: bool = False) -> bool:
         """Supprime un environnement"""
         try:
-            env_info = self.get_environment_info(name)
-            if not env_info:
-                raise EnvironmentNotFoundError(f"Environnement '{name}' introuvable")
-            
-            # Vérification si actif
-            if env_info.is_active and not force:
-                raise EnvironmentError(
-                    f"Environnement '{name}' est actif. Utilisez --force pour forcer la suppression"
-                )
+            with self.environment_lock(name):
+                env_info = self.get_environment_info(name)
+                if not env_info:
+                    raise EnvironmentNotFoundError(f"Environnement '{name}' introuvable")
+            
+                # Vérification si actif
+                if env_info.is_active and not force:
+                    raise EnvironmentError(
+                        f"Environnement '{name}' est actif. Utilisez --force pour forcer la suppression"
+                    )
             
-            # Sauvegarde avant suppression
-            backup_path = self._backup_environment(env_info)
+                # Sauvegarde avant suppression
+                backup_path = self._backup_environment(env_info)
             
-            # Suppression répertoire
-            if env_info.path.exists():
-                shutil.rmtree(env_info.path)
+                # Suppression répertoire
+                if env_info.path.exists():
+                    shutil.rmtree(env_info.path)
             
-            # Suppression métadonnées
-            metadata_path = self._get_metadata_path(name)
-            if metadata_path.exists():
-                metadata_path.unlink()
+                # Suppression métadonnées
+                metadata_path = self._get_metadata_path(name)
+                if metadata_path.exists():
+                    metadata_path.unlink()
             
-            return True
+                return True
             
         except Exception as e:
             raise EnvironmentError(f"Erreur suppression environnement: {e}")
@@ -383,35 +418,61 @@ class EnvironmentManager:
         
         return sorted(environments, key=lambda x: x.last_used, reverse=True)
     
-    def sync_environment(self, name: str) -> SyncResult:
-        """Synchronise un environnement avec son pyproject.toml"""
+    def query_environments(
+        self,
+        sort: str = "used",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters
+    ) -> Tuple[Iterator[EnvironmentInfo], Optional[str]]:
+        """Page d'environnements filtrés et triés par le catalogue
+        
+        Les environnements sont chargés au fil de l'itération ; le curseur
+        renvoyé (None en fin de liste) donne la page suivante.
+        """
+        summaries, next_cursor = self.catalog.query(sort, cursor, limit, **filters)
+        return self.catalog.iter_environments(summaries), next_cursor
+    
+    def sync_environment(self, name: str, groups: Optional[List[str]] = None,
+                         clean: bool = False, upgrade: bool = False) -> SyncResult:
+        """Synchronise un environnement avec son pyproject.toml
+
+        Args:
+            name: Nom de l'environnement
+            groups: Extras / groupes de dépendances à inclure en plus du groupe principal
+            clean: Supprimer les distributions non requises
+            upgrade: Mettre à jour les dépendances déjà satisfaites
+        """
         start_time = time.time()
         
         try:
-            env_info = self.get_environment_info(name)
-            if not env_info:
-                return SyncResult(
-                    success=False,
-                    message=f"Environnement '{name}' introuvable",
-                    execution_time=time.time() - start_time
-                )
+            with self.environment_lock(name):
+                env_info = self.get_environment_info(name)
+                if not env_info:
+                    return SyncResult(
+                        success=False,
+                        message=f"Environnement '{name}' introuvable",
+                        execution_time=time.time() - start_time
+                    )
             
-            if not env_info.pyproject_info:
-                return SyncResult(
-                    success=False,
-                    message="Aucun pyproject.toml associé",
-                    execution_time=time.time() - start_time
-                )
+                if not env_info.pyproject_info:
+                    return SyncResult(
+                        success=False,
+                        message="Aucun pyproject.toml associé",
+                        execution_time=time.time() - start_time
+                    )
             
-            # Synchronisation avec service packages
-            sync_result = self.package_service.sync_environment(env_info)
-            sync_result.execution_time = time.time() - start_time
+                # Synchronisation avec service packages
+                sync_result = self.package_service.sync_environment(
+                    env_info, groups=groups, clean=clean, upgrade=upgrade
+                )
+                sync_result.execution_time = time.time() - start_time
             
-            if sync_result.success:
-                env_info.updated_at = datetime.now()
-                self._save_environment_metadata(env_info)
+                if sync_result.success:
+                    env_info.updated_at = datetime.now()
+                    self._save_environment_metadata(env_info)
             
-            return sync_result
+                return sync_result
             
         except Exception as e:
             return SyncResult(
@@ -420,18 +481,40 @@ class EnvironmentManager:
                 execution_time=time.time() - start_time
             )
     
-    def clone_environment(self, source: str, target: str) -> EnvironmentResult:
-        """Clone un environnement existant"""
+    def clone_environment(
+        self,
+        source: str,
+        target: str,
+        python_version: Optional[str] = None,
+        backend: Optional[str] = None
+    ) -> EnvironmentResult:
+        """Clone un environnement existant
+
+        Même version Python et même backend : copie directe de l'arborescence
+        (reflinks ou liens physiques, chemins réécrits), sans réseau. Sinon,
+        ou si la copie échoue, création d'un nouvel environnement puis
+        réinstallation des packages.
+        """
         try:
             source_env = self.get_environment_info(source)
             if not source_env:
                 raise EnvironmentNotFoundError(f"Environnement source '{source}' introuvable")
             
+            python_version = python_version or source_env.python_version
+            backend = backend or source_env.backend_type.value
+            
+            warnings = []
+            if python_version == source_env.python_version and backend == source_env.backend_type.value:
+                result = self._clone_environment_tree(source_env, target)
+                if result.success or not result.warnings:
+                    return result
+                warnings.extend(result.warnings)
+            
             # Création nouvel environnement
             result = self.create_environment(
                 name=target,
-                python_version=source_env.python_version,
-                backend=source_env.backend_type.value
+                python_version=python_version,
+                backend=backend
             )
             
             if not result.success:
@@ -439,7 +522,7 @@ class EnvironmentManager:
             
             # Clonage packages
             target_env = result.environment
-            warnings = result.warnings.copy()
+            warnings.extend(result.warnings)
             
             for package in source_env.packages:
                 install_result = self.package_service.install_package(
@@ -474,6 +557,63 @@ class EnvironmentManager:
                 message=f"Erreur clonage: {e}"
             )
     
+    def _clone_environment_tree(self, source_env: EnvironmentInfo, target: str) -> EnvironmentResult:
+        """Clone par copie de l'arborescence du venv source
+
+        Un échec avec avertissement signale que la réinstallation peut prendre
+        le relais ; un échec sans avertissement est définitif (cible existante).
+        """
+        from ..utils.venv_clone import clone_venv
+
+        start_time = time.time()
+        self._validate_environment_name(target)
+
+        # Cible réservée, source en lecture seule pendant la copie
+        with self.environment_lock(target), self.environment_lock(source_env.name, exclusive=False):
+            if self._environment_exists(target):
+                return EnvironmentResult(
+                    success=False,
+                    message=f"Environnement '{target}' existe déjà",
+                    execution_time=time.time() - start_time
+                )
+
+            target_path = self._get_environment_path(target)
+            try:
+                stats = clone_venv(source_env.path, target_path)
+            except OSError as e:
+                return EnvironmentResult(
+                    success=False,
+                    message=f"Copie directe impossible: {e}",
+                    warnings=[f"Copie directe impossible ({e}), réinstallation des packages"],
+                    execution_time=time.time() - start_time
+                )
+
+        now = datetime.now()
+        target_env = EnvironmentInfo(
+            name=target,
+            path=target_path,
+            python_version=source_env.python_version,
+            backend_type=source_env.backend_type,
+            source_file_type=source_env.source_file_type,
+            pyproject_info=source_env.pyproject_info,
+            packages=copy.deepcopy(source_env.packages),
+            dependency_groups=copy.deepcopy(source_env.dependency_groups),
+            health=EnvironmentHealth.HEALTHY,
+            created_at=now,
+            updated_at=now,
+            last_used=now,
+            metadata={"cloned_from": source_env.name, "clone": stats.to_dict()}
+        )
+        self._save_environment_metadata(target_env)
+
+        return EnvironmentResult(
+            success=True,
+            message=f"Environnement '{target}' cloné depuis '{source_env.name}' "
+                    f"({stats.strategy}, {stats.files} fichiers)",
+            environment=target_env,
+            execution_time=time.time() - start_time
+        )
+
     def export_environment(self, name: str, format: ExportFormat) -> ExportResult:
         """Exporte un environnement"""
         try:
@@ -504,6 +644,13 @@ class EnvironmentManager:
                 output_path.write_text('\n'.join(lines), encoding='utf-8')
                 items_exported = len(lines)
                 
+            elif format == ExportFormat.SNAPSHOT:
+                # Instantané binaire relocalisable (venv complet, hors ligne)
+                from ..utils.snapshot import SNAPSHOT_SUFFIX, export_snapshot
+                output_path = output_path.with_suffix(SNAPSHOT_SUFFIX)
+                stats = export_snapshot(env_info.path, output_path, env_info.to_dict())
+                items_exported = stats.files
+                
             elif format == ExportFormat.PYPROJECT:
                 # Export pyproject.toml
                 if env_info.pyproject_info:
@@ -554,6 +701,9 @@ class EnvironmentManager:
                     message=f"Fichier source introuvable: {source}"
                 )
             
+            if source.suffix == '.gvsnap':
+                return self._import_snapshot(source, options.get('name'))
+            
             env_name = options.get('name') or source.stem
             
             if source.suffix == '.json':
@@ -595,12 +745,92 @@ class EnvironmentManager:
                 message=f"Erreur import: {e}"
             )
     
-    def doctor_environment(self, name: Optional[str] = None) -> DiagnosticReport:
-        """Diagnostic d'un environnement ou du système complet"""
-        if name:
-            return self.diagnostic_service.diagnose_environment(name)
+    def _import_snapshot(self, source: Path, name: Optional[str] = None) -> EnvironmentResult:
+        """Restaure un environnement depuis un instantané .gvsnap (sans réseau)"""
+        from ..utils.snapshot import import_snapshot, read_snapshot_header
+        
+        start_time = time.time()
+        header = read_snapshot_header(source)
+        metadata = header.get("environment") or {}
+        env_name = name or metadata.get("name") or source.stem
+        
+        self._validate_environment_name(env_name)
+        if self._environment_exists(env_name):
+            return EnvironmentResult(
+                success=False,
+                message=f"Environnement '{env_name}' existe déjà",
+                execution_time=time.time() - start_time
+            )
+        
+        # Magasin adressé par contenu partagé entre imports
+        object_store = None
+        if self.cache_service.enabled:
+            object_store = self.cache_service.cache_path / "objects"
+        
+        env_path = self._get_environment_path(env_name)
+        stats = import_snapshot(source, env_path, object_store=object_store)
+        
+        if metadata:
+            env_info = EnvironmentInfo.from_dict(metadata)
         else:
+            env_info = EnvironmentInfo(env_name, env_path, self._read_pyvenv_version(env_path))
+        env_info.name = env_name
+        env_info.path = env_path
+        env_info.is_active = False
+        env_info.updated_at = env_info.last_used = datetime.now()
+        env_info.metadata["imported_from"] = str(source)
+        
+        warnings = []
+        home = self._read_pyvenv_cfg(env_path).get("home")
+        if home and not Path(home).exists():
+            env_info.health = EnvironmentHealth.HAS_ERRORS
+            warnings.append(f"Interpréteur de base introuvable: {home}")
+        if stats.deduplicated_files:
+            warnings.append(
+                f"{stats.deduplicated_files} fichier(s) repris du cache "
+                f"({stats.deduplicated_bytes / 1024 / 1024:.1f} MB non réécrits)"
+            )
+        
+        self._save_environment_metadata(env_info)
+        
+        return EnvironmentResult(
+            success=True,
+            message=f"Environnement '{env_name}' restauré depuis {source.name} "
+                    f"({stats.files} fichiers)",
+            environment=env_info,
+            warnings=warnings,
+            execution_time=time.time() - start_time
+        )
+    
+    @staticmethod
+    def _read_pyvenv_cfg(env_path: Path) -> Dict[str, str]:
+        """Lit pyvenv.cfg (clé = valeur)"""
+        values = {}
+        cfg_path = env_path / "pyvenv.cfg"
+        if cfg_path.exists():
+            for line in cfg_path.read_text(encoding="utf-8").splitlines():
+                key, sep, value = line.partition("=")
+                if sep:
+                    values[key.strip()] = value.strip()
+        return values
+    
+    def _read_pyvenv_version(self, env_path: Path) -> str:
+        """Version Python (majeure.mineure) déclarée dans pyvenv.cfg"""
+        cfg = self._read_pyvenv_cfg(env_path)
+        version = cfg.get("version") or cfg.get("version_info") or ""
+        return ".".join(version.split(".")[:2]) or self.config_manager.config.default_python_version
+    
+    def doctor_environment(self, name: Optional[str] = None, incremental: bool = False) -> DiagnosticReport:
+        """Diagnostic d'un environnement ou du système complet
+        
+        En mode incrémental, les résultats dont les entrées n'ont pas changé
+        sont repris du dernier diagnostic.
+        """
+        if not incremental:
+            if name:
+                return self.diagnostic_service.diagnose_environment(name)
             return self.diagnostic_service.run_full_diagnostic()
+        return self.diagnostic_service.run_full_diagnostic(name, incremental=True)
     
     def get_environment_info(self, name: str) -> Optional[EnvironmentInfo]:
         """Récupère les informations d'un environnement"""
@@ -634,13 +864,17 @@ class EnvironmentManager:
         """Chemin du fichier métadonnées"""
         return self._get_environment_path(name) / ".gestvenv-metadata.json"
     
+    def environment_lock(self, name: str, exclusive: bool = True) -> FileLock:
+        """Verrou inter-processus d'un environnement (exclusif pour le modifier)"""
+        return environment_lock(self._get_environment_path(name), exclusive=exclusive)
+    
     def _save_environment_metadata(self, env_info: EnvironmentInfo) -> None:
         """Sauvegarde les métadonnées d'un environnement"""
         metadata_path = self._get_metadata_path(env_info.name)
-        metadata_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(env_info.to_dict(), f, indent=2, default=str)
+        # Remplacement atomique : les lecteurs ne voient jamais un fichier partiel
+        with self.environment_lock(env_info.name):
+            write_json_atomic(metadata_path, env_info.to_dict(), indent=2, default=str)
     
     def _load_environment_metadata(self, name: str) -> Optional[EnvironmentInfo]:
         """Charge les métadonnées d'un environnement"""
@@ -709,7 +943,7 @@ class EnvironmentManager:
         if filters.get('backend') and env_info.backend_type.value != filters['backend']:
             return False
         
-        if filters.get('health') and env_info.health.value != filters['health']:
+        if filters.get('health') and env_info.health.value not in filters['health'].split(','):
             return False
         
         return True
\ No newline at end of file
@@ -9,7 +9,10 @@ from .models import (
     EphemeralStatus,
     IsolationLevel,
     StorageBackend,
-    SecurityMode
+    SecurityMode,
+    LimitPolicy,
+    LimitAction,
+    EvictionOrder
 )
 from .manager import EphemeralManager
 from .exceptions import (
@@ -47,6 +50,9 @@ __all__ = [
     'IsolationLevel',
     'StorageBackend',
     'SecurityMode',
+    'LimitPolicy',
+    'LimitAction',
+    'EvictionOrder',
     
     # Manager
     'EphemeralManager',
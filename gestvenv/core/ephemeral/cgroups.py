@@ -64,6 +64,29 @@ class CgroupInfo:
     pids_current: int = 0
 
 
+def _read_int(path: Path) -> Optional[int]:
+    """Entier d'un fichier cgroup ("max" -> None, fichier absent -> None)"""
+    try:
+        value = path.read_text().strip()
+    except OSError:
+        return None
+    return None if value == "max" else int(value)
+
+
+def _read_flat_keyed(path: Path) -> Dict[str, int]:
+    """Fichier « clé valeur » par ligne (cpu.stat, memory.stat)"""
+    stats = {}
+    try:
+        content = path.read_text()
+    except OSError:
+        return stats
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1].isdigit():
+            stats[parts[0]] = int(parts[1])
+    return stats
+
+
 class CgroupsNotAvailableError(Exception):
     """cgroups v2 non disponible sur ce système"""
     pass
@@ -274,11 +297,11 @@ class CgroupManager:
                 str(limits.max_memory_mb * 1024 * 1024)
             )
 
-            if limits.memory_high_mb:
-                await self._write_cgroup_file(
-                    cgroup_path / "memory.high",
-                    str(limits.memory_high_mb * 1024 * 1024)
-                )
+            # "max" lève un ralentissement précédent
+            await self._write_cgroup_file(
+                cgroup_path / "memory.high",
+                str(limits.memory_high_mb * 1024 * 1024) if limits.memory_high_mb else "max"
+            )
 
             if limits.swap_max_mb is not None:
                 await self._write_cgroup_file(
@@ -287,11 +310,11 @@ class CgroupManager:
                 )
 
         # Limites CPU
-        if limits.max_cpu_percent and "cpu" in self._controllers:
+        if "cpu" in self._controllers:
             # cpu.max format: "quota period"
-            # quota en microsecondes par période
+            # quota en microsecondes par période ("max" : pas de quota)
             period = 100000  # 100ms
-            quota = int(period * limits.max_cpu_percent / 100)
+            quota = int(period * limits.max_cpu_percent / 100) if limits.max_cpu_percent else "max"
             await self._write_cgroup_file(
                 cgroup_path / "cpu.max",
                 f"{quota} {period}"
@@ -427,6 +450,59 @@ class CgroupManager:
             logger.error(f"Failed to get statistics for {env_id}: {e}")
             return None
 
+    def sample_counters(self, env_id: str) -> Optional[CgroupInfo]:
+        """Lecture synchrone des compteurs cumulés d'un cgroup
+
+        Coût constant quel que soit le nombre de processus (cinq petits
+        fichiers de l'interface cgroup v2), sans parcours de l'arbre des
+        processus. Met à jour les statistiques du CgroupInfo.
+
+        Args:
+            env_id: Identifiant de l'environnement
+
+        Returns:
+            CgroupInfo mis à jour, ou None si le cgroup n'existe pas (ou plus)
+        """
+        cgroup_info = self._cgroups.get(env_id)
+        if cgroup_info is None or not cgroup_info.path.is_dir():
+            return None
+
+        path = cgroup_info.path
+        memory_current = _read_int(path / "memory.current")
+        if memory_current is not None:
+            cgroup_info.memory_current = memory_current
+        # memory.peak n'existe qu'à partir de Linux 5.19
+        memory_peak = _read_int(path / "memory.peak")
+        cgroup_info.memory_peak = max(
+            memory_peak or 0, cgroup_info.memory_peak, cgroup_info.memory_current
+        )
+
+        cpu_stats = _read_flat_keyed(path / "cpu.stat")
+        if "usage_usec" in cpu_stats:
+            cgroup_info.cpu_usage_usec = cpu_stats["usage_usec"]
+
+        try:
+            io_lines = (path / "io.stat").read_text().splitlines()
+        except OSError:
+            io_lines = None
+        if io_lines is not None:
+            read_bytes = write_bytes = 0
+            for line in io_lines:
+                for field_ in line.split()[1:]:
+                    key, _, value = field_.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+            cgroup_info.io_read_bytes = read_bytes
+            cgroup_info.io_write_bytes = write_bytes
+
+        pids_current = _read_int(path / "pids.current")
+        if pids_current is not None:
+            cgroup_info.pids_current = pids_current
+
+        return cgroup_info
+
     async def _read_memory_stats(self, cgroup_path: Path) -> Dict[str, Any]:
         """Lit les statistiques mémoire"""
         stats = {}
@@ -563,6 +639,23 @@ class CgroupManager:
             logger.error(f"Failed to update limits for {env_id}: {e}")
             return False
 
+    async def set_frozen(self, env_id: str, frozen: bool) -> bool:
+        """Gèle ou dégèle tous les processus d'un cgroup (cgroup.freeze)
+
+        Args:
+            env_id: Identifiant de l'environnement
+            frozen: True pour geler, False pour dégeler
+
+        Returns:
+            True si succès
+        """
+        cgroup_info = self._cgroups.get(env_id)
+        if cgroup_info is None or not (cgroup_info.path / "cgroup.freeze").exists():
+            return False
+
+        await self._write_cgroup_file(cgroup_info.path / "cgroup.freeze", "1" if frozen else "0")
+        return True
+
     async def delete_cgroup(self, env_id: str) -> bool:
         """Supprime le cgroup d'un environnement
 
@@ -1,11 +1,21 @@
 """
 Planificateur de nettoyage pour environnements éphémères
+
+Les échéances (TTL, inactivité, nettoyage forcé) sont rangées dans un tas :
+un unique minuteur dort jusqu'à la prochaine échéance, sans parcours
+périodique des environnements. Une activité repousse l'échéance
+d'inactivité ; l'entrée périmée est réarmée lorsqu'elle arrive à terme.
+Un nettoyage en échec est retenté avec un délai croissant, et les
+environnements en échec sont balayés tous les cleanup_interval.
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
 import time
-from typing import List, Optional, Dict
+from pathlib import Path
+from typing import List, Optional, Dict, Set, Tuple
 
 from .models import (
     EphemeralEnvironment,
@@ -16,6 +26,18 @@ from .exceptions import CleanupException
 
 logger = logging.getLogger(__name__)
 
+# Raisons de nettoyage associées aux échéances
+TTL_EXPIRED = "ttl_expired"
+INACTIVE_TIMEOUT = "inactive_timeout"
+FORCE_CLEANUP_OLD = "force_cleanup_old"
+
+# Nombre de nettoyages conservés dans l'historique
+MAX_HISTORY = 100
+
+# Nouvelle tentative après un nettoyage en échec (délai doublé à chaque échec)
+RETRY_DELAY = 60.0
+MAX_RETRY_DELAY = 1800.0
+
 
 class CleanupScheduler:
     """Planificateur automatique de nettoyage"""
@@ -25,11 +47,26 @@ class CleanupScheduler:
         self.cleanup_task: Optional[asyncio.Task] = None
         self._shutdown = False
         self.cleanup_history: List[CleanupReason] = []
+        
+        # Tas d'échéances : (timestamp, séquence, env_id, raison)
+        self._deadlines: List[Tuple[float, int, str, str]] = []
+        self._sequence = itertools.count()
+        self._tracked: Dict[str, EphemeralEnvironment] = {}
+        self._idle_armed: Set[str] = set()
+        self._cleaning: Set[str] = set()
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+        self._failures: Dict[str, int] = {}
+        self._failed_sweep: Optional[asyncio.Task] = None
+        self._next_sweep = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
     
     async def start(self):
         """Démarrage du planificateur"""
         if self.cleanup_task is None:
             logger.info("Starting cleanup scheduler")
+            self._ensure_primitives()
+            self._next_sweep = time.time() + self.manager.config.cleanup_interval
             self.cleanup_task = asyncio.create_task(self._cleanup_loop())
     
     async def stop(self):
@@ -42,8 +79,80 @@ class CleanupScheduler:
             except asyncio.CancelledError:
                 pass
             self.cleanup_task = None
+        if self._failed_sweep is not None:
+            await asyncio.gather(self._failed_sweep, return_exceptions=True)
+            self._failed_sweep = None
+        if self._cleanup_tasks:
+            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
         logger.info("Cleanup scheduler stopped")
     
+    def register(self, env: EphemeralEnvironment):
+        """Suivi d'un environnement : armement de ses échéances"""
+        self._tracked[env.id] = env
+        env.activity_listener = self.touch
+        
+        if env.expires_at is not None:
+            self._push(env.expires_at, env.id, TTL_EXPIRED)
+        self._push(
+            env.created_at.timestamp() + self.manager.config.force_cleanup_after,
+            env.id, FORCE_CLEANUP_OLD
+        )
+        self._arm_idle(env)
+    
+    def unregister(self, env_id: str):
+        """Fin du suivi (les entrées du tas sont ignorées à leur échéance)"""
+        env = self._tracked.pop(env_id, None)
+        if env is not None and env.activity_listener == self.touch:
+            env.activity_listener = None
+        self._idle_armed.discard(env_id)
+        self._failures.pop(env_id, None)
+    
+    def touch(self, env: EphemeralEnvironment):
+        """Activité d'un environnement : réarmement de l'échéance d'inactivité
+        
+        Une échéance déjà armée est plus proche que la nouvelle : elle est
+        revalidée et repoussée à son terme, sans réveiller le minuteur.
+        """
+        if env.id in self._tracked and env.id not in self._idle_armed:
+            self._arm_idle(env)
+    
+    def next_deadline(self) -> Optional[float]:
+        """Prochaine échéance armée (timestamp)"""
+        while self._deadlines and self._deadlines[0][2] not in self._tracked:
+            heapq.heappop(self._deadlines)
+        return self._deadlines[0][0] if self._deadlines else None
+    
+    def request_cleanup(
+        self,
+        env: EphemeralEnvironment,
+        reason: str,
+        forced: bool = False
+    ) -> Optional[asyncio.Task]:
+        """Nettoyage immédiat hors échéance (éviction), sous la même borne de concurrence
+        
+        Returns:
+            Tâche de nettoyage, ou None si l'environnement est déjà en cours de nettoyage
+        """
+        self._ensure_primitives()
+        if env.id in self._cleaning:
+            return None
+        self._cleaning.add(env.id)
+        task = asyncio.create_task(self._run_cleanup(env, reason, forced=forced))
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+        return task
+    
+    async def run_due(self) -> int:
+        """Traite immédiatement les échéances atteintes et attend leurs nettoyages
+        
+        Returns:
+            Nombre de nettoyages lancés
+        """
+        tasks = self._dispatch_due()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return len(tasks)
+    
     async def cleanup_inactive(self):
         """Nettoyage des environnements inactifs"""
         environments = await self.manager.list_environments()
@@ -59,7 +168,7 @@ class CleanupScheduler:
                         reason="inactive_timeout",
                         triggered_by="cleanup_scheduler"
                     )
-                    self.cleanup_history.append(reason)
+                    self._record(reason)
                     
                     logger.info(f"Cleaned up inactive environment: {env.id}")
                     
@@ -86,7 +195,7 @@ class CleanupScheduler:
                         reason="ttl_expired",
                         triggered_by="cleanup_scheduler"
                     )
-                    self.cleanup_history.append(reason)
+                    self._record(reason)
                     
                     logger.info(f"Cleaned up expired environment: {env.id} (age: {env.age_seconds}s)")
                     
@@ -104,7 +213,7 @@ class CleanupScheduler:
         cleaned_count = 0
         
         for env in environments:
-            if env.status == EphemeralStatus.FAILED:
+            if env.status == EphemeralStatus.FAILED and env.id not in self._cleaning:
                 try:
                     await self.manager._cleanup_environment(env, force=True)
                     cleaned_count += 1
@@ -114,7 +223,7 @@ class CleanupScheduler:
                         triggered_by="cleanup_scheduler",
                         forced=True
                     )
-                    self.cleanup_history.append(reason)
+                    self._record(reason)
                     
                     logger.info(f"Cleaned up failed environment: {env.id}")
                     
@@ -166,7 +275,7 @@ class CleanupScheduler:
                         triggered_by="cleanup_scheduler",
                         forced=True
                     )
-                    self.cleanup_history.append(reason)
+                    self._record(reason)
                     
                     logger.warning(
                         f"Force cleaned up old environment: {env.id} (age: {env.age_seconds}s)"
@@ -181,39 +290,126 @@ class CleanupScheduler:
         return cleaned_count
     
     async def _cleanup_loop(self):
-        """Boucle principale de nettoyage"""
-        cycle_count = 0
+        """Minuteur unique : sommeil jusqu'à la prochaine échéance"""
         
         while not self._shutdown:
             try:
-                cycle_count += 1
-                logger.debug(f"Cleanup cycle {cycle_count}")
-                
-                # Nettoyage des environnements expirés
-                await self.cleanup_expired()
+                self._wakeup.clear()
+                deadline = self.next_deadline()
+                wake_at = self._next_sweep if deadline is None else min(deadline, self._next_sweep)
                 
-                # Nettoyage des environnements inactifs
-                await self.cleanup_inactive()
-                
-                # Nettoyage des environnements en échec
-                await self.cleanup_failed()
-                
-                # Nettoyage forcé périodique (toutes les 10 minutes)
-                if cycle_count % 10 == 0:
-                    await self.force_cleanup_old()
-                
-                # Nettoyage de l'historique de cleanup
-                if cycle_count % 60 == 0:  # Toutes les heures
-                    await self._cleanup_history()
+                delay = wake_at - time.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
                 
-                # Attente avant le prochain cycle
-                await asyncio.sleep(self.manager.config.cleanup_interval)
+                self._dispatch_due()
+                self._sweep_failed()
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Cleanup loop error: {e}")
-                await asyncio.sleep(60)  # Attente plus longue en cas d'erreur
+                await asyncio.sleep(1)
+    
+    def _ensure_primitives(self):
+        """Primitives asyncio créées dans la boucle courante"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(
+                max(1, self.manager.config.max_concurrent_cleanups)
+            )
+    
+    def _push(self, deadline: float, env_id: str, reason: str):
+        """Ajout d'une échéance ; réveil du minuteur si elle devient la prochaine"""
+        entry = (deadline, next(self._sequence), env_id, reason)
+        heapq.heappush(self._deadlines, entry)
+        if self._wakeup is not None and self._deadlines[0] is entry:
+            self._wakeup.set()
+    
+    def _sweep_failed(self):
+        """Balayage des environnements en échec, au plus un à la fois"""
+        now = time.time()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.manager.config.cleanup_interval
+        if self._failed_sweep is None or self._failed_sweep.done():
+            self._failed_sweep = asyncio.create_task(self.cleanup_failed())
+    
+    def _arm_idle(self, env: EphemeralEnvironment):
+        if env.auto_cleanup:
+            self._idle_armed.add(env.id)
+            self._push(env.idle_deadline, env.id, INACTIVE_TIMEOUT)
+    
+    def _dispatch_due(self) -> List[asyncio.Task]:
+        """Dépile les échéances atteintes et lance les nettoyages correspondants"""
+        self._ensure_primitives()
+        now = time.time()
+        tasks = []
+        
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, env_id, reason = heapq.heappop(self._deadlines)
+            env = self._tracked.get(env_id)
+            if env is None or env_id in self._cleaning:
+                continue
+            
+            if reason == INACTIVE_TIMEOUT and env_id not in self._failures:
+                self._idle_armed.discard(env_id)
+                if not env.auto_cleanup or not env.is_active:
+                    continue
+                deadline = env.idle_deadline
+                if env.status == EphemeralStatus.RUNNING:
+                    # Commande en cours : l'environnement n'est pas inactif
+                    deadline = max(deadline, now + env.max_idle_time)
+                if deadline > now:
+                    # Activité depuis l'armement : report à la nouvelle échéance
+                    self._idle_armed.add(env_id)
+                    self._push(deadline, env_id, reason)
+                    continue
+            
+            tasks.append(self.request_cleanup(env, reason, forced=reason == FORCE_CLEANUP_OLD))
+        
+        return tasks
+    
+    async def _run_cleanup(self, env: EphemeralEnvironment, reason: str, forced: bool) -> bool:
+        """Nettoyage d'un environnement arrivé à échéance (concurrence bornée)
+
+        Returns:
+            True si le nettoyage a abouti
+        """
+        try:
+            async with self._semaphore:
+                await self.manager._cleanup_environment(env, force=forced)
+            self._record(CleanupReason(
+                reason=reason,
+                triggered_by="cleanup_scheduler",
+                forced=forced
+            ))
+            logger.info(f"Cleaned up environment {env.id} ({reason}, age: {env.age_seconds}s)")
+            self._failures.pop(env.id, None)
+            return True
+        except Exception as e:
+            failures = self._failures.get(env.id, 0) + 1
+            delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+            logger.error(
+                f"Failed to cleanup environment {env.id} ({reason}): {e}, retrying in {delay:.0f}s"
+            )
+            if env.id in self._tracked:
+                # Échéance déjà dépilée : nouvelle tentative (sans revalidation d'inactivité)
+                self._failures[env.id] = failures
+                self._push(time.time() + delay, env.id, reason)
+            return False
+        finally:
+            self._cleaning.discard(env.id)
+    
+    def _record(self, reason: CleanupReason):
+        """Historique borné aux MAX_HISTORY derniers nettoyages"""
+        self.cleanup_history.append(reason)
+        if len(self.cleanup_history) > MAX_HISTORY:
+            del self.cleanup_history[:-MAX_HISTORY]
     
     async def _should_cleanup_inactive(self, env: EphemeralEnvironment) -> bool:
         """Détermine si un environnement doit être nettoyé pour inactivité"""
@@ -235,7 +431,7 @@ class CleanupScheduler:
                 triggered_by="cleanup_scheduler",
                 forced=True
             )
-            self.cleanup_history.append(reason)
+            self._record(reason)
             
             return True
             
@@ -243,13 +439,6 @@ class CleanupScheduler:
             logger.error(f"Emergency cleanup failed for {env.id}: {e}")
             return False
     
-    async def _cleanup_history(self):
-        """Nettoyage de l'historique de cleanup"""
-        # Conservation des 100 derniers nettoyages seulement
-        if len(self.cleanup_history) > 100:
-            self.cleanup_history = self.cleanup_history[-100:]
-            logger.debug("Cleaned up cleanup history")
-    
     async def get_cleanup_stats(self) -> Dict[str, int]:
         """Statistiques de nettoyage"""
         total_cleanups = len(self.cleanup_history)
@@ -0,0 +1,436 @@
+"""
+Pool de containers pour l'isolation CONTAINER des environnements éphémères
+
+Au lieu de vérifier (voire construire) l'image puis créer et démarrer un
+container par environnement, des containers démarrés d'avance sont gardés
+par profil (runtime, version de Python, réseau, limites mémoire/CPU,
+toutes fixées à la création) :
+- acquisition : container inactif du profil, sinon démarrage d'un nouveau ;
+  le pool est ensuite réalimenté en arrière-plan ;
+- espace de travail : chaque container monte sur /ephemeral son propre
+  répertoire (stockage/.container-slots/<nom>), jamais la racine du
+  stockage. Un montage ne pouvant être changé sur un container démarré, le
+  répertoire de l'environnement loué y est déplacé (slot/workspace,
+  /workspace dans le container) et remplacé sur l'hôte par un lien
+  symbolique ;
+- libération : processus tués, /workspace et /tmp vidés, répertoire de
+  l'environnement remis en place, puis retour au pool ; un container dont
+  la réinitialisation échoue est supprimé.
+
+L'existence des images est mémorisée dans le processus. Le runtime est
+accessible via l'interface ContainerRuntime (CliContainerRuntime pour
+docker/podman), remplaçable dans les tests.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from .exceptions import EnvironmentCreationException
+from .models import EphemeralConfig, EphemeralEnvironment
+from ...utils.async_process import CommandResult, run_command_async
+
+logger = logging.getLogger(__name__)
+
+CONTAINER_STORAGE_MOUNT = "/ephemeral"
+CONTAINER_WORKSPACE = "/workspace"
+
+# Répertoires privés des containers du pool, sous la racine du stockage
+# (même système de fichiers : déplacement par simple renommage)
+SLOTS_DIR = ".container-slots"
+SLOT_WORKSPACE = "workspace"
+
+# Réinitialisation entre deux environnements : kill -1 épargne PID 1 (sleep)
+RESET_SCRIPT = (
+    f"kill -9 -1 2>/dev/null; rm -f {CONTAINER_WORKSPACE}; "
+    "find /tmp -mindepth 1 -delete 2>/dev/null; true"
+)
+
+DOCKERFILE_TEMPLATE = """
+FROM python:{python_version}-slim
+
+RUN apt-get update && apt-get install -y --no-install-recommends git \\
+    && rm -rf /var/lib/apt/lists/*
+RUN pip install --no-cache-dir uv
+
+WORKDIR {storage_mount}
+
+ENV PYTHONUNBUFFERED=1
+ENV PYTHONDONTWRITEBYTECODE=1
+
+CMD ["sleep", "infinity"]
+"""
+
+
+@dataclass
+class ContainerSpec:
+    """Paramètres de création d'un container (indépendants de l'environnement)"""
+    image: str
+    name: str
+    volumes: List[str] = field(default_factory=list)
+    environment: Dict[str, str] = field(default_factory=dict)
+    working_dir: str = CONTAINER_STORAGE_MOUNT
+    memory: Optional[str] = None
+    cpus: Optional[str] = None
+    network: Optional[str] = None
+    command: List[str] = field(default_factory=lambda: ["sleep", "infinity"])
+
+
+class ContainerRuntime(ABC):
+    """Interface d'un runtime de containers"""
+
+    name: str = "runtime"
+
+    @abstractmethod
+    async def available(self) -> bool:
+        """Runtime utilisable sur cette machine"""
+
+    @abstractmethod
+    async def image_exists(self, image: str) -> bool:
+        """Image présente localement"""
+
+    @abstractmethod
+    async def build_image(self, image: str, dockerfile: str) -> None:
+        """Construction d'une image depuis le contenu d'un Dockerfile"""
+
+    @abstractmethod
+    async def run(self, spec: ContainerSpec) -> str:
+        """Création et démarrage d'un container, renvoie son identifiant"""
+
+    @abstractmethod
+    async def exec(self, container_id: str, argv: Sequence[str],
+                   timeout: Optional[float] = None) -> CommandResult:
+        """Exécution d'une commande dans un container démarré"""
+
+    @abstractmethod
+    async def remove(self, container_id: str) -> None:
+        """Arrêt et suppression d'un container"""
+
+
+class CliContainerRuntime(ContainerRuntime):
+    """Runtime docker/podman piloté par sa ligne de commande"""
+
+    def __init__(self, executable: str = "docker"):
+        self.executable = executable
+        self.name = executable
+
+    async def _call(self, *args: str, timeout: Optional[float] = 60) -> CommandResult:
+        return await run_command_async([self.executable, *args], timeout=timeout)
+
+    async def available(self) -> bool:
+        return (await self._call("--version", timeout=10)).success
+
+    async def image_exists(self, image: str) -> bool:
+        return (await self._call("image", "inspect", image)).success
+
+    async def build_image(self, image: str, dockerfile: str) -> None:
+        with tempfile.TemporaryDirectory() as context:
+            (Path(context) / "Dockerfile").write_text(dockerfile)
+            result = await self._call("build", "-t", image, context, timeout=1800)
+        if not result.success:
+            raise EnvironmentCreationException(f"Failed to build container image: {result.stderr}")
+        logger.info(f"Built container image: {image}")
+
+    async def run(self, spec: ContainerSpec) -> str:
+        args = ["run", "--detach", "--rm", "--name", spec.name, "--workdir", spec.working_dir]
+        for volume in spec.volumes:
+            args += ["-v", volume]
+        for key, value in spec.environment.items():
+            args += ["-e", f"{key}={value}"]
+        if spec.memory:
+            args += ["--memory", spec.memory]
+        if spec.cpus:
+            args += ["--cpus", spec.cpus]
+        if spec.network:
+            args += ["--network", spec.network]
+        result = await self._call(*args, spec.image, *spec.command)
+        if not result.success:
+            raise EnvironmentCreationException(f"Failed to start container: {result.stderr}")
+        return result.stdout.strip()
+
+    async def exec(self, container_id: str, argv: Sequence[str],
+                   timeout: Optional[float] = None) -> CommandResult:
+        return await self._call("exec", container_id, *argv, timeout=timeout)
+
+    async def remove(self, container_id: str) -> None:
+        await self._call("rm", "-f", container_id)
+
+
+async def detect_runtime(candidates: Sequence[str] = ("docker", "podman")) -> Optional[ContainerRuntime]:
+    """Premier runtime disponible parmi les candidats"""
+    for executable in candidates:
+        runtime = CliContainerRuntime(executable)
+        if await runtime.available():
+            logger.debug(f"Found container runtime: {executable}")
+            return runtime
+    return None
+
+
+# Profil de pool : (runtime, version de Python, réseau, mémoire, CPU)
+PoolKey = Tuple[str, str, bool, Optional[str], Optional[str]]
+
+
+@dataclass
+class PooledContainer:
+    """Container démarré appartenant au pool"""
+    id: str
+    key: PoolKey
+    slot: Path
+    uses: int = 0
+
+
+class ContainerPool:
+    """Containers démarrés d'avance, réutilisés d'un environnement à l'autre"""
+
+    def __init__(
+        self,
+        config: EphemeralConfig,
+        storage_root: Callable[[], Path],
+        runtime: Optional[ContainerRuntime] = None,
+        shared_cache=None
+    ):
+        self.config = config
+        self._storage_root = storage_root
+        self.runtime = runtime
+        self.shared_cache = shared_cache
+        self._runtime_checked = runtime is not None
+        self._known_images: Set[Tuple[str, str]] = set()
+        self._image_locks: Dict[str, asyncio.Lock] = {}
+        self._idle: Dict[PoolKey, Deque[PooledContainer]] = {}
+        self._leases: Dict[str, PooledContainer] = {}
+        self._starting: Dict[PoolKey, int] = {}
+        self._refills: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    async def get_runtime(self) -> Optional[ContainerRuntime]:
+        """Runtime injecté, sinon détecté une seule fois"""
+        if not self._runtime_checked:
+            self._runtime_checked = True
+            preferred = self.config.container_runtime
+            self.runtime = await detect_runtime((preferred,) if preferred else ("docker", "podman"))
+        return self.runtime
+
+    def key_for(self, env: EphemeralEnvironment) -> PoolKey:
+        limits = env.resource_limits
+        return (
+            self.runtime.name if self.runtime else "",
+            env.python_version,
+            bool(limits.network_access),
+            f"{limits.max_memory}m" if limits.max_memory else None,
+            str(limits.max_cpu_percent / 100.0) if limits.max_cpu_percent else None,
+        )
+
+    # === ACQUISITION / LIBÉRATION ===
+
+    async def acquire(self, env: EphemeralEnvironment) -> str:
+        """Container prêt, dont /workspace désigne le stockage de env
+
+        Raises:
+            EnvironmentCreationException: runtime indisponible ou démarrage impossible
+        """
+        if await self.get_runtime() is None:
+            raise EnvironmentCreationException("No container runtime available")
+
+        key = self.key_for(env)
+        idle = self._idle.get(key)
+        while idle:
+            container = idle.popleft()
+            if await self._attach(container, env):
+                self.hits += 1
+                break
+            await self._discard(container)
+        else:
+            self.misses += 1
+            container = await self._start(key)
+            if not await self._attach(container, env):
+                await self._discard(container)
+                raise EnvironmentCreationException(f"Failed to prepare container {container.id[:12]}")
+
+        container.uses += 1
+        self._leases[env.id] = container
+        self._schedule_refill(key)
+        return container.id
+
+    async def release(self, env: EphemeralEnvironment) -> None:
+        """Réinitialise le container de env et le rend au pool (ou le supprime)"""
+        container = self._leases.pop(env.id, None)
+        if container is None:
+            return
+
+        idle = self._idle.setdefault(container.key, deque())
+        reusable = (
+            len(idle) < self.config.container_pool_size
+            and container.uses < self.config.container_max_reuse
+        )
+        if reusable:
+            result = await self.runtime.exec(container.id, ["sh", "-c", RESET_SCRIPT], timeout=30)
+            reusable = result.success
+        if reusable:
+            # Processus tués : le répertoire peut être rendu à l'environnement
+            self._detach(container, env)
+            idle.append(container)
+        else:
+            await self._discard(container, env)
+
+    async def prewarm(self, env: EphemeralEnvironment) -> None:
+        """Remplit le pool du profil de env jusqu'à container_pool_size"""
+        if await self.get_runtime() is None:
+            return
+        await self._refill(self.key_for(env))
+
+    async def shutdown(self) -> None:
+        """Suppression des containers inactifs et arrêt des réalimentations"""
+        for task in list(self._refills):
+            task.cancel()
+        if self._refills:
+            await asyncio.gather(*self._refills, return_exceptions=True)
+        for idle in self._idle.values():
+            while idle:
+                await self._discard(idle.popleft())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            "leased": len(self._leases),
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+        }
+
+    # === INTERNE ===
+
+    async def _attach(self, container: PooledContainer, env: EphemeralEnvironment) -> bool:
+        """Déplace le répertoire de env dans le slot du container"""
+        workspace = container.slot / SLOT_WORKSPACE
+        try:
+            if workspace.exists():
+                shutil.rmtree(workspace)
+            if env.storage_path.is_symlink():
+                return False
+            if env.storage_path.exists():
+                os.rename(env.storage_path, workspace)
+            else:
+                workspace.mkdir(mode=0o700)
+            env.storage_path.symlink_to(workspace, target_is_directory=True)
+        except OSError as e:
+            logger.warning(f"Failed to attach {env.storage_path} to container {container.id[:12]}: {e}")
+            self._detach(container, env)
+            return False
+
+        result = await self.runtime.exec(
+            container.id,
+            ["sh", "-c", f"ln -sfn {CONTAINER_STORAGE_MOUNT}/{SLOT_WORKSPACE} {CONTAINER_WORKSPACE}"],
+            timeout=30
+        )
+        if not result.success:
+            self._detach(container, env)
+        return result.success
+
+    def _detach(self, container: PooledContainer, env: EphemeralEnvironment) -> None:
+        """Remet le répertoire de env à sa place (lien symbolique remplacé)"""
+        workspace = container.slot / SLOT_WORKSPACE
+        if not workspace.exists():
+            return
+        try:
+            if env.storage_path.is_symlink():
+                env.storage_path.unlink()
+            os.rename(workspace, env.storage_path)
+        except OSError as e:
+            logger.warning(f"Failed to detach {env.storage_path} from container {container.id[:12]}: {e}")
+
+    async def _start(self, key: PoolKey) -> PooledContainer:
+        python_version = key[1]
+        slot = None
+        self._starting[key] = self._starting.get(key, 0) + 1
+        try:
+            image = await self._ensure_image(python_version)
+            spec = self._spec(image, key)
+            slot = self._slot_path(spec.name)
+            slot.mkdir(parents=True, mode=0o700)
+            container_id = await self.runtime.run(spec)
+        except BaseException:
+            if slot is not None:
+                shutil.rmtree(slot, ignore_errors=True)
+            raise
+        finally:
+            self._starting[key] -= 1
+        logger.debug(f"Started pooled container {container_id[:12]} ({image})")
+        return PooledContainer(container_id, key, slot)
+
+    def _slot_path(self, name: str) -> Path:
+        return self._storage_root() / SLOTS_DIR / name
+
+    def _spec(self, image: str, key: PoolKey) -> ContainerSpec:
+        _, _, network_access, memory, cpus = key
+        name = f"gestvenv-pool-{uuid.uuid4().hex[:12]}"
+        spec = ContainerSpec(
+            image=image,
+            name=name,
+            # Slot privé : les autres environnements ne sont pas visibles
+            volumes=[f"{self._slot_path(name)}:{CONTAINER_STORAGE_MOUNT}:rw"],
+            environment={"PYTHONPATH": CONTAINER_WORKSPACE},
+            memory=memory,
+            cpus=cpus,
+            network=None if network_access else "none",
+        )
+        if self.shared_cache is not None:
+            # Cache de packages partagé monté depuis l'hôte
+            self.shared_cache.ensure()
+            spec.volumes += [
+                f"{self.shared_cache.pip_dir}:/cache/pip:rw",
+                f"{self.shared_cache.uv_dir}:/cache/uv:rw",
+            ]
+            spec.environment.update(self.shared_cache.env_vars("/cache/pip", "/cache/uv"))
+        return spec
+
+    async def _ensure_image(self, python_version: str) -> str:
+        image = f"gestvenv-ephemeral-{python_version}"
+        cache_key = (self.runtime.name, image)
+        if cache_key in self._known_images:
+            return image
+
+        lock = self._image_locks.setdefault(image, asyncio.Lock())
+        async with lock:
+            if cache_key not in self._known_images:
+                if not await self.runtime.image_exists(image):
+                    await self.runtime.build_image(image, DOCKERFILE_TEMPLATE.format(
+                        python_version=python_version, storage_mount=CONTAINER_STORAGE_MOUNT
+                    ))
+                self._known_images.add(cache_key)
+        return image
+
+    def _schedule_refill(self, key: PoolKey) -> None:
+        task = asyncio.create_task(self._refill(key))
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    async def _refill(self, key: PoolKey) -> None:
+        idle = self._idle.setdefault(key, deque())
+        while len(idle) + self._starting.get(key, 0) < self.config.container_pool_size:
+            try:
+                container = await self._start(key)
+            except Exception as e:
+                logger.warning(f"Container pool refill failed: {e}")
+                return
+            idle.append(container)
+
+    async def _discard(self, container: PooledContainer,
+                       env: Optional[EphemeralEnvironment] = None) -> None:
+        self.discarded += 1
+        try:
+            await self.runtime.remove(container.id)
+        except Exception as e:
+            logger.warning(f"Failed to remove container {container.id[:12]}: {e}")
+        if env is not None:
+            self._detach(container, env)
+        shutil.rmtree(container.slot, ignore_errors=True)
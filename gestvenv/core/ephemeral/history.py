@@ -0,0 +1,179 @@
+"""
+Historique borné des ressources des environnements éphémères
+
+Stockage en colonnes (array('d') : horodatage, mémoire, disque, CPU,
+processus) dans des tampons circulaires de capacité fixe : ajout en O(1),
+aucune allocation par mesure, requêtes min/max/moyenne/percentile sur une
+colonne contiguë.
+
+Deux niveaux par environnement :
+- récent : chaque mesure (capacité history_samples) ;
+- long terme : agrégats par intervalle de history_downsample_seconds
+  (moyenne du CPU, maximum de la mémoire, du disque et des processus).
+"""
+
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .models import ResourceUsage
+
+COLUMNS = ("timestamp", "memory_mb", "disk_mb", "cpu_percent", "active_processes")
+
+# Agrégation du niveau long terme : pics conservés, CPU moyenné
+_BUCKET_MAX = ("memory_mb", "disk_mb", "active_processes")
+
+
+class ResourceRing:
+    """Tampon circulaire en colonnes de capacité fixe"""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._columns: Dict[str, array] = {
+            name: array("d", bytes(8 * capacity)) for name in COLUMNS
+        }
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, memory_mb: float, disk_mb: float,
+               cpu_percent: float, active_processes: float) -> None:
+        """Ajout en O(1), la mesure la plus ancienne est écrasée si plein"""
+        index = self._next
+        columns = self._columns
+        columns["timestamp"][index] = timestamp
+        columns["memory_mb"][index] = memory_mb
+        columns["disk_mb"][index] = disk_mb
+        columns["cpu_percent"][index] = cpu_percent
+        columns["active_processes"][index] = active_processes
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def column(self, name: str, since: Optional[float] = None) -> array:
+        """Colonne dans l'ordre chronologique (copie), éventuellement depuis since"""
+        data = self._columns[name]
+        start = (self._next - self._size) % self.capacity
+        if start + self._size <= self.capacity:
+            values = data[start:start + self._size]
+        else:
+            values = data[start:] + data[:self._next]
+        if since is not None:
+            values = values[self._first_index_since(since):]
+        return values
+
+    def _first_index_since(self, since: float) -> int:
+        """Position (chronologique) de la première mesure >= since (recherche dichotomique)"""
+        timestamps = self._columns["timestamp"]
+        start = (self._next - self._size) % self.capacity
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[(start + middle) % self.capacity] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def last(self) -> Optional[Dict[str, float]]:
+        """Dernière ligne, None si vide"""
+        if not self._size:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {name: column[index] for name, column in self._columns.items()}
+
+    def summary(self, name: str, since: Optional[float] = None) -> Dict[str, float]:
+        """min / max / moyenne / p50 / p95 d'une colonne (dict vide sans mesure)"""
+        values = self.column(name, since)
+        if not values:
+            return {}
+        ordered = sorted(values)
+        return {
+            "min": ordered[0],
+            "max": ordered[-1],
+            "mean": sum(values) / len(values),
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+        }
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Percentile par rang le plus proche sur des valeurs triées"""
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+class ResourceHistory:
+    """Historique d'un environnement : niveau récent et niveau sous-échantillonné"""
+
+    def __init__(self, samples: int = 720, downsample_seconds: int = 60, longterm_buckets: int = 1440):
+        self.recent = ResourceRing(samples)
+        self.longterm = ResourceRing(longterm_buckets)
+        self.downsample_seconds = downsample_seconds
+        self._bucket_start: Optional[float] = None
+        self._bucket: Dict[str, float] = {}
+        self._bucket_count = 0
+
+    def __len__(self) -> int:
+        return len(self.recent)
+
+    def record(self, usage: ResourceUsage) -> None:
+        """Enregistre une mesure dans les deux niveaux"""
+        timestamp = usage.timestamp.timestamp()
+        row = (timestamp, usage.memory_mb, usage.disk_mb, usage.cpu_percent, usage.active_processes)
+        self.recent.append(*row)
+
+        bucket_start = timestamp - timestamp % self.downsample_seconds
+        if self._bucket_start is not None and bucket_start != self._bucket_start:
+            self._flush_bucket()
+        if self._bucket_start is None:
+            self._bucket_start = bucket_start
+            self._bucket = dict.fromkeys(COLUMNS[1:], 0.0)
+            self._bucket_count = 0
+
+        self._bucket_count += 1
+        for name, value in zip(COLUMNS[1:], row[1:]):
+            if name in _BUCKET_MAX:
+                self._bucket[name] = max(self._bucket[name], value)
+            else:
+                self._bucket[name] += value
+
+    def _flush_bucket(self) -> None:
+        bucket = self._bucket
+        self.longterm.append(
+            self._bucket_start,
+            bucket["memory_mb"],
+            bucket["disk_mb"],
+            bucket["cpu_percent"] / self._bucket_count,
+            bucket["active_processes"],
+        )
+        self._bucket_start = None
+
+    def latest(self) -> Optional[ResourceUsage]:
+        """Dernière mesure"""
+        row = self.recent.last()
+        return _to_usage(row) if row else None
+
+    def usages(self, since: Optional[float] = None) -> List[ResourceUsage]:
+        """Mesures récentes sous forme de ResourceUsage (API historique)"""
+        columns = [self.recent.column(name, since) for name in COLUMNS]
+        return [_to_usage(dict(zip(COLUMNS, row))) for row in zip(*columns)]
+
+    def summary(self, since: Optional[float] = None, longterm: bool = False) -> Dict[str, Dict[str, float]]:
+        """Statistiques de chaque métrique sur le niveau choisi"""
+        ring = self.longterm if longterm else self.recent
+        return {name: ring.summary(name, since) for name in COLUMNS[1:]}
+
+
+def _to_usage(row: Dict[str, float]) -> ResourceUsage:
+    return ResourceUsage(
+        memory_mb=row["memory_mb"],
+        disk_mb=row["disk_mb"],
+        cpu_percent=row["cpu_percent"],
+        active_processes=int(row["active_processes"]),
+        timestamp=datetime.fromtimestamp(row["timestamp"]),
+    )
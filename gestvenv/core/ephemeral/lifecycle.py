@@ -2,12 +2,13 @@
 Contrôleur de cycle de vie des environnements éphémères
 
 Security Note:
-    This module intentionally uses shell execution (create_subprocess_shell) for
-    command execution within virtual environments. This is necessary because:
-    1. Virtual environment activation requires sourcing shell scripts
-    2. Users expect to run arbitrary commands in their environments
+    Commands are executed directly (create_subprocess_exec) with executables
+    resolved from the virtual environment's bin directory. Shell execution
+    (create_subprocess_shell) is only used when the command string relies on
+    shell features (pipes, redirections, variable expansion, globbing...),
+    because users expect to run arbitrary commands in their environments.
 
-    The shell execution is controlled and isolated:
+    Execution is controlled and isolated:
     - Commands run within isolated virtual environment contexts
     - Environment variables are explicitly controlled
     - Working directory is restricted to the environment's storage path
@@ -19,11 +20,13 @@ Security Note:
 import asyncio
 import logging
 import os
+import re
 import shlex
 import shutil
 import subprocess
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence, Tuple, Union
 
 from .models import (
     EphemeralEnvironment,
@@ -34,7 +37,8 @@ from .models import (
 from .exceptions import (
     EnvironmentCreationException,
     CleanupException,
-    IsolationException
+    IsolationException,
+    TimeoutException
 )
 from .cgroups import (
     CgroupManager,
@@ -43,17 +47,69 @@ from .cgroups import (
     CgroupOperationError,
     cgroup_manager,
 )
+from .shared_cache import is_pip_command, uses_package_cache
 from ..models import BackendType
+from ...utils.async_process import OutputCallback, terminate_process_group, wait_streaming
 
 logger = logging.getLogger(__name__)
 
+# Caractères interprétés par le shell hors guillemets / entre guillemets doubles
+_SHELL_UNQUOTED = frozenset("|&;<>()$`*?[]{}~!#\n")
+_SHELL_DOUBLE_QUOTED = frozenset("$`!")
+_SHELL_BUILTINS = frozenset({
+    ".", "alias", "cd", "eval", "exec", "exit", "export", "set",
+    "source", "trap", "ulimit", "umask", "unset", "wait",
+})
+_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+
+
+def needs_shell(command: str) -> bool:
+    """Indique si une commande utilise des fonctionnalités du shell
+
+    Pipes, redirections, enchaînements, expansions ($, `, globbing, ~),
+    commandes internes ou affectations en tête imposent le shell ; les
+    caractères entre guillemets simples (et, hors $ ` !, entre guillemets
+    doubles) sont littéraux. En cas de doute (guillemets non fermés), le
+    shell est conservé.
+    """
+    quote = None
+    escaped = False
+    for char in command:
+        if escaped:
+            escaped = False
+        elif quote == "'":
+            if char == "'":
+                quote = None
+        elif char == "\\":
+            escaped = True
+        elif quote == '"':
+            if char == '"':
+                quote = None
+            elif char in _SHELL_DOUBLE_QUOTED:
+                return True
+        elif char in "'\"":
+            quote = char
+        elif char in _SHELL_UNQUOTED:
+            return True
+    if quote or escaped:
+        return True
+
+    argv = shlex.split(command)
+    return not argv or argv[0] in _SHELL_BUILTINS or bool(_ASSIGNMENT.match(argv[0]))
+
+
+@asynccontextmanager
+async def _no_cache_access():
+    """Accès sans verrou (pas de cache partagé)"""
+    yield
+
 
 class LifecycleController:
     """Contrôleur de cycle de vie des environnements"""
     
     def __init__(self, manager):
         self.manager = manager
-        self.process_manager = ProcessManager()
+        self.process_manager = ProcessManager(getattr(manager, "shared_cache", None))
     
     async def create(self, env: EphemeralEnvironment) -> EphemeralEnvironment:
         """Création complète d'un environnement"""
@@ -104,11 +160,19 @@ class LifecycleController:
     async def execute_command(
         self,
         env: EphemeralEnvironment,
-        command: str,
+        command: Union[str, Sequence[str]],
         timeout: Optional[int] = None,
-        capture_output: bool = True
+        capture_output: bool = True,
+        on_output: Optional[OutputCallback] = None
     ) -> OperationResult:
-        """Exécution d'une commande dans l'environnement"""
+        """Exécution d'une commande dans l'environnement
+
+        Args:
+            command: Chaîne de commande ou liste d'arguments (exécution directe)
+            timeout: Délai maximal en secondes
+            capture_output: Capture de stdout/stderr
+            on_output: Rappel (flux, ligne) appelé au fil de la sortie
+        """
         
         if not env.is_active:
             raise RuntimeError(f"Environment {env.id} is not active")
@@ -119,7 +183,8 @@ class LifecycleController:
         
         try:
             result = await self.process_manager.run_command(
-                env, command, timeout=timeout, capture_output=capture_output
+                env, command, timeout=timeout, capture_output=capture_output,
+                on_output=on_output
             )
             
             if env.status == EphemeralStatus.RUNNING and result.success:
@@ -135,30 +200,31 @@ class LifecycleController:
         self,
         env: EphemeralEnvironment,
         packages: List[str],
-        upgrade: bool = False
+        upgrade: bool = False,
+        on_output: Optional[OutputCallback] = None
     ) -> OperationResult:
         """Installation de packages dans l'environnement"""
         
         if not packages:
             return OperationResult(0, "", "", 0.0, "")
         
-        # Construction de la commande selon le backend
+        # Construction de la commande selon le backend (liste d'arguments :
+        # les spécificateurs comme "requests>=2.0" ne passent pas par un shell)
         if env.backend == BackendType.UV:
-            base_cmd = "uv pip install"
+            cmd = ["uv", "pip", "install"]
         elif env.backend == BackendType.PDM:
-            base_cmd = "pdm add"
+            cmd = ["pdm", "add"]
         elif env.backend == BackendType.POETRY:
-            base_cmd = "poetry add"
+            cmd = ["poetry", "add"]
         else:
-            base_cmd = "pip install"
+            cmd = ["pip", "install"]
         
         if upgrade and env.backend in [BackendType.PIP, BackendType.UV]:
-            base_cmd += " --upgrade"
+            cmd.append("--upgrade")
         
-        packages_str = " ".join(packages)
-        command = f"{base_cmd} {packages_str}"
+        cmd.extend(packages)
         
-        result = await self.execute_command(env, command, timeout=300)
+        result = await self.execute_command(env, cmd, timeout=300, on_output=on_output)
         
         if result.success:
             env.packages.extend(packages)
@@ -185,11 +251,39 @@ class LifecycleController:
         logger.debug(f"Created isolated directory: {env.storage_path}")
     
     async def _create_virtual_environment(self, env: EphemeralEnvironment):
-        """Création optimisée du virtual environment"""
+        """Création optimisée du virtual environment
+
+        Avec le cache de templates, le venv (packages initiaux inclus) est
+        cloné depuis un template construit lors du premier usage de la même
+        combinaison (version Python, backend, packages).
+        """
         
         venv_path = env.storage_path / "venv"
         env.venv_path = venv_path
         
+        template_cache = getattr(self.manager, "template_cache", None)
+        if template_cache is not None:
+            try:
+                stats = await template_cache.materialize(
+                    env.python_version,
+                    env.backend.value,
+                    env.packages,
+                    venv_path,
+                    lambda path: self._build_virtual_environment(env, path)
+                )
+                env.tags["template_clone"] = stats.strategy
+                logger.debug(f"Cloned virtual environment from template: {venv_path}")
+                return
+            except OSError as e:
+                # Clonage impossible : création directe
+                logger.warning(f"Template clone failed for {env.id}, creating directly: {e}")
+                shutil.rmtree(venv_path, ignore_errors=True)
+        
+        await self._build_virtual_environment(env, venv_path)
+    
+    async def _build_virtual_environment(self, env: EphemeralEnvironment, venv_path: Path):
+        """Création du venv et installation des packages initiaux"""
+        
         if env.backend == BackendType.UV:
             # uv est le plus rapide pour les créations
             cmd = [
@@ -220,29 +314,72 @@ class LifecycleController:
                 "--upgrade-deps"
             ]
         
-        # Exécution avec timeout
+        # Téléchargements (seed, packages initiaux) via le cache partagé
+        shared_cache = self.process_manager.shared_cache
+        creation_env = None
+        if shared_cache is not None:
+            creation_env = {**os.environ, **shared_cache.env_vars()}
+        
+        # Création rapide requise
+        await self._run_creation_step(
+            cmd, env.storage_path, 60, "Failed to create virtual environment",
+            "Virtual environment creation timed out", creation_env
+        )
+        logger.debug(f"Created virtual environment: {venv_path}")
+        
+        if env.packages:
+            install_cmd = self._initial_install_command(env, venv_path)
+            async with self.process_manager.cache_access(install_cmd, timeout=300):
+                await self._run_creation_step(
+                    install_cmd, env.storage_path, 300, "Failed to install initial packages",
+                    "Initial package installation timed out", creation_env
+                )
+            logger.debug(f"Installed {len(env.packages)} initial package(s) in {venv_path}")
+    
+    def _initial_install_command(self, env: EphemeralEnvironment, venv_path: Path) -> List[str]:
+        """Installation directe dans un venv (hors projet pdm/poetry)"""
+        
+        bin_dir = "Scripts" if os.name == "nt" else "bin"
+        python = venv_path / bin_dir / ("python.exe" if os.name == "nt" else "python")
+        
+        if env.backend == BackendType.UV:
+            return ["uv", "pip", "install", "--python", str(python), *env.packages]
+        return [str(python), "-m", "pip", "install", *env.packages]
+    
+    async def _run_creation_step(
+        self,
+        cmd: List[str],
+        cwd: Path,
+        timeout: int,
+        error_message: str,
+        timeout_message: str,
+        env: Optional[Dict[str, str]] = None
+    ):
+        """Exécution d'une étape de création avec timeout"""
+        
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=env.storage_path
+                cwd=cwd,
+                env=env
             )
             
             stdout, stderr = await asyncio.wait_for(
                 process.communicate(),
-                timeout=60  # Création rapide requise
+                timeout=timeout
             )
             
             if process.returncode != 0:
                 raise EnvironmentCreationException(
-                    f"Failed to create virtual environment: {stderr.decode()}"
+                    f"{error_message}: {stderr.decode()}"
                 )
             
-            logger.debug(f"Created virtual environment: {venv_path}")
-            
         except asyncio.TimeoutError:
-            raise EnvironmentCreationException("Virtual environment creation timed out")
+            process.kill()
+            await process.wait()
+            raise EnvironmentCreationException(timeout_message)
     
     async def _setup_isolation(self, env: EphemeralEnvironment):
         """Configuration de l'isolation de sécurité"""
@@ -263,31 +400,16 @@ class LifecycleController:
         pass  # Implémenté dans ProcessManager
     
     async def _setup_container_isolation(self, env: EphemeralEnvironment):
-        """Isolation par container Docker/Podman"""
+        """Isolation par container Docker/Podman (pool de containers démarrés)"""
+        pool = getattr(self.manager, "container_pool", None)
         try:
-            # Détection du runtime de container disponible
-            container_runtime = await self._detect_container_runtime()
-            
-            if not container_runtime:
+            if pool is None or await pool.get_runtime() is None:
                 logger.warning("No container runtime available, falling back to process isolation")
                 await self._setup_process_isolation(env)
                 return
             
-            # Construction de l'image de base
-            image_name = f"gestvenv-ephemeral-{env.python_version}"
-            await self._ensure_container_image(container_runtime, image_name, env.python_version)
-            
-            # Configuration du container
-            container_config = await self._build_container_config(env, image_name)
-            
-            # Création du container
-            container_id = await self._create_container(container_runtime, container_config)
-            env.container_id = container_id
-            
-            # Démarrage du container
-            await self._start_container(container_runtime, container_id)
-            
-            logger.info(f"Container isolation configured: {container_id[:12]}")
+            env.container_id = await pool.acquire(env)
+            logger.info(f"Container isolation configured: {env.container_id[:12]}")
             
         except Exception as e:
             logger.error(f"Container isolation setup failed: {e}")
@@ -429,13 +551,10 @@ class LifecycleController:
                 logger.warning(f"Failed to cleanup cgroup for {env.id}: {e}")
 
         if env.container_id:
-            # Nettoyage du container
+            # Retour du container au pool (réinitialisé ou supprimé)
             try:
-                await asyncio.create_subprocess_exec(
-                    "docker", "rm", "-f", env.container_id,
-                    stdout=asyncio.subprocess.DEVNULL,
-                    stderr=asyncio.subprocess.DEVNULL
-                )
+                await self.manager.container_pool.release(env)
+                env.container_id = None
             except Exception as e:
                 logger.warning(f"Failed to cleanup container {env.container_id}: {e}")
     
@@ -458,109 +577,152 @@ class LifecycleController:
 
 
 class ProcessManager:
-    """Gestionnaire de processus pour environnements éphémères"""
+    """Gestionnaire de processus pour environnements éphémères
+
+    Les commandes sont exécutées directement (sans shell ni activation du
+    venv) : l'exécutable est résolu dans venv/bin via le PATH de
+    l'environnement d'exécution, calculé une seule fois par environnement.
+    Le shell n'est utilisé que si la commande en a besoin (needs_shell).
+    La sortie est lue au fil de l'eau et transmise au rappel on_output.
+    Avec un cache partagé, pip et uv y lisent et écrivent sous ses verrous.
+    """
     
-    def __init__(self):
+    def __init__(self, shared_cache=None):
+        self.shared_cache = shared_cache
         self.active_processes: Dict[str, List[asyncio.subprocess.Process]] = {}
+        # Environnement d'exécution par environnement éphémère (venv_path, variables)
+        self._exec_environments: Dict[str, Tuple[Optional[Path], Dict[str, str]]] = {}
+    
+    def cache_access(self, command: Union[str, Sequence[str]], timeout: Optional[float] = None):
+        """Verrous du cache partagé requis par une commande
+
+        Seules les commandes pip/uv prennent les verrous ; leur attente est
+        bornée par timeout.
+        """
+        if self.shared_cache is None or not uses_package_cache(command):
+            return _no_cache_access()
+        return self.shared_cache.access(pip=is_pip_command(command), timeout=timeout)
     
     async def run_command(
         self,
         env: EphemeralEnvironment,
-        command: str,
+        command: Union[str, Sequence[str]],
         timeout: Optional[int] = None,
-        capture_output: bool = True
+        capture_output: bool = True,
+        on_output: Optional[OutputCallback] = None
     ) -> OperationResult:
-        """Exécution d'une commande avec gestion des processus"""
+        """Exécution d'une commande avec gestion des processus
+
+        Args:
+            env: Environnement éphémère
+            command: Chaîne de commande ou liste d'arguments (jamais via un shell)
+            timeout: Délai maximal en secondes
+            capture_output: Capture de stdout/stderr (sinon hérités)
+            on_output: Rappel (flux, ligne) appelé au fil de la sortie capturée
+        """
         
         import time
         start_time = time.time()
         
-        # Construction de l'environnement d'exécution
-        exec_env = await self._build_execution_environment(env)
+        exec_env = self._build_execution_environment(env)
         
-        # Construction de la commande complète
-        full_command = await self._build_command(env, command)
+        if isinstance(command, str):
+            display = command
+            argv = None if needs_shell(command) else shlex.split(command)
+        else:
+            argv = [str(part) for part in command]
+            display = shlex.join(argv)
+        
+        pipe = asyncio.subprocess.PIPE if capture_output else None
+        options = dict(
+            stdout=pipe,
+            stderr=pipe,
+            env=exec_env,
+            cwd=env.storage_path,
+            # Groupe de processus dédié : délai et nettoyage atteignent les descendants
+            start_new_session=os.name != "nt",
+        )
+        if capture_output:
+            options["stdin"] = asyncio.subprocess.DEVNULL
         
-        try:
-            # Création du processus
-            # Note: Shell execution is required for venv activation (source command)
-            # Command runs in isolated environment with controlled env vars and cwd
-            if capture_output:
-                process = await asyncio.create_subprocess_shell(  # nosec B602
-                    full_command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    env=exec_env,
-                    cwd=env.storage_path
+        async with AsyncExitStack() as cache_locks:
+            # L'attente des verrous est décomptée du délai de la commande
+            try:
+                await cache_locks.enter_async_context(self.cache_access(command, timeout))
+            except TimeoutException:
+                return OperationResult(
+                    returncode=-1,
+                    stdout="",
+                    stderr="Command timed out waiting for the shared package cache",
+                    duration=time.time() - start_time,
+                    command=display
                 )
-            else:
-                process = await asyncio.create_subprocess_shell(  # nosec B602
-                    full_command,
-                    env=exec_env,
-                    cwd=env.storage_path
+            if timeout is not None:
+                timeout = max(0.0, timeout - (time.time() - start_time))
+            
+            try:
+                if argv is None:
+                    # Fonctionnalités du shell requises ; PATH et VIRTUAL_ENV
+                    # désignent déjà le venv, aucune activation n'est nécessaire
+                    process = await asyncio.create_subprocess_shell(  # nosec B602
+                        command, **options
+                    )
+                else:
+                    argv[0] = self._resolve_executable(argv[0], exec_env)
+                    process = await asyncio.create_subprocess_exec(*argv, **options)
+            except (FileNotFoundError, PermissionError) as e:
+                return OperationResult(
+                    returncode=127,
+                    stdout="",
+                    stderr=str(e),
+                    duration=time.time() - start_time,
+                    command=display
                 )
             
             # Enregistrement du processus
             env.pid = process.pid
-            if env.id not in self.active_processes:
-                self.active_processes[env.id] = []
-            self.active_processes[env.id].append(process)
-
-            # Ajouter le processus au cgroup si disponible
-            if hasattr(env, 'cgroup_path') and env.cgroup_path:
-                try:
-                    await cgroup_manager.add_process_to_cgroup(env.id, process.pid)
-                except Exception as e:
-                    logger.debug(f"Could not add process to cgroup: {e}")
+            self.active_processes.setdefault(env.id, []).append(process)
             
-            # Attente avec timeout
-            if timeout:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
-            else:
-                stdout, stderr = await process.communicate()
-            
-            duration = time.time() - start_time
-            
-            return OperationResult(
-                returncode=process.returncode,
-                stdout=stdout.decode() if stdout else "",
-                stderr=stderr.decode() if stderr else "",
-                duration=duration,
-                command=command
-            )
-            
-        except asyncio.TimeoutError:
-            # Nettoyage en cas de timeout
-            if process:
-                process.kill()
-                await process.wait()
-            
-            duration = time.time() - start_time
-            return OperationResult(
-                returncode=-1,
-                stdout="",
-                stderr="Command timed out",
-                duration=duration,
-                command=command
-            )
-        
-        finally:
-            # Nettoyage du processus de la liste active
-            if env.id in self.active_processes and process in self.active_processes[env.id]:
-                self.active_processes[env.id].remove(process)
+            try:
+                # Ajouter le processus au cgroup si disponible
+                if hasattr(env, 'cgroup_path') and env.cgroup_path:
+                    try:
+                        await cgroup_manager.add_process_to_cgroup(env.id, process.pid)
+                    except Exception as e:
+                        logger.debug(f"Could not add process to cgroup: {e}")
+                
+                result = await wait_streaming(process, timeout, on_output, describe=display)
+            
+            finally:
+                # Nettoyage du processus de la liste active
+                if process in self.active_processes.get(env.id, []):
+                    self.active_processes[env.id].remove(process)
+        
+        return OperationResult(
+            returncode=-1 if result.timed_out else result.returncode,
+            stdout=result.stdout,
+            stderr="Command timed out" if result.timed_out else result.stderr,
+            duration=time.time() - start_time,
+            command=display
+        )
     
-    async def _build_execution_environment(self, env: EphemeralEnvironment) -> Dict[str, str]:
-        """Construction de l'environnement d'exécution"""
+    def _build_execution_environment(self, env: EphemeralEnvironment) -> Dict[str, str]:
+        """Environnement d'exécution, calculé une fois par environnement
+
+        Le dictionnaire renvoyé est partagé entre les commandes et ne doit pas
+        être modifié.
+        """
+        
+        cached = self._exec_environments.get(env.id)
+        if cached is not None and cached[0] == env.venv_path:
+            return cached[1]
         
         exec_env = os.environ.copy()
         
         if env.venv_path:
             # Configuration du virtual environment
             exec_env["VIRTUAL_ENV"] = str(env.venv_path)
-            exec_env["PATH"] = f"{env.venv_path}/bin:{exec_env.get('PATH', '')}"
+            exec_env["PATH"] = f"{env.venv_path}/bin{os.pathsep}{exec_env.get('PATH', '')}"
             
             # Suppression de PYTHONHOME si présent
             exec_env.pop("PYTHONHOME", None)
@@ -571,30 +733,37 @@ class ProcessManager:
         exec_env["PYTHONUNBUFFERED"] = "1"
         
         # Configuration de pip/uv
-        exec_env["PIP_CACHE_DIR"] = str(env.storage_path / "cache" / "pip")
-        exec_env["UV_CACHE_DIR"] = str(env.storage_path / "cache" / "uv")
+        exec_env.update(self._cache_vars(env))
         
         # Variables de sécurité
         if env.security_mode.value == "restricted":
             exec_env["HOME"] = str(env.storage_path)
             exec_env["TMPDIR"] = str(env.storage_path / "tmp")
         
+        self._exec_environments[env.id] = (env.venv_path, exec_env)
         return exec_env
     
-    async def _build_command(self, env: EphemeralEnvironment, command: str) -> str:
-        """Construction de la commande avec activation du venv"""
-        
-        if env.venv_path and env.backend != BackendType.POETRY:
-            # Activation explicite du virtual environment
-            activate_script = env.venv_path / "bin" / "activate"
-            if activate_script.exists():
-                return f"source {activate_script} && {command}"
-        
-        return command
+    def _cache_vars(self, env: EphemeralEnvironment) -> Dict[str, str]:
+        """Caches pip/uv : partagés si disponibles, sinon propres à l'environnement"""
+        if self.shared_cache is not None:
+            return self.shared_cache.env_vars()
+        return {
+            "PIP_CACHE_DIR": str(env.storage_path / "cache" / "pip"),
+            "UV_CACHE_DIR": str(env.storage_path / "cache" / "uv"),
+        }
+    
+    @staticmethod
+    def _resolve_executable(name: str, exec_env: Dict[str, str]) -> str:
+        """Résolution d'un exécutable via le PATH de l'environnement (venv/bin en tête)"""
+        if os.sep in name or (os.altsep and os.altsep in name):
+            return name
+        return shutil.which(name, path=exec_env.get("PATH")) or name
     
     async def cleanup_processes(self, env: EphemeralEnvironment):
         """Nettoyage de tous les processus d'un environnement"""
         
+        self._exec_environments.pop(env.id, None)
+        
         if env.id not in self.active_processes:
             return
         
@@ -603,12 +772,7 @@ class ProcessManager:
         for process in processes:
             try:
                 if process.returncode is None:  # Processus encore actif
-                    process.terminate()
-                    try:
-                        await asyncio.wait_for(process.wait(), timeout=5)
-                    except asyncio.TimeoutError:
-                        process.kill()
-                        await process.wait()
+                    await terminate_process_group(process, grace_period=5)
             except Exception as e:
                 logger.warning(f"Failed to cleanup process: {e}")
         
@@ -618,188 +782,6 @@ class ProcessManager:
     
     # === MÉTHODES D'ISOLATION ===
     
-    async def _detect_container_runtime(self) -> Optional[str]:
-        """Détection du runtime de container disponible"""
-        runtimes = ['docker', 'podman']
-        
-        for runtime in runtimes:
-            try:
-                process = await asyncio.create_subprocess_exec(
-                    runtime, '--version',
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await process.communicate()
-                
-                if process.returncode == 0:
-                    logger.debug(f"Found container runtime: {runtime}")
-                    return runtime
-                    
-            except FileNotFoundError:
-                continue
-        
-        return None
-    
-    async def _ensure_container_image(self, runtime: str, image_name: str, python_version: str):
-        """Assure qu'une image de container existe"""
-        # Vérification si l'image existe
-        try:
-            process = await asyncio.create_subprocess_exec(
-                runtime, 'image', 'inspect', image_name,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await process.communicate()
-            
-            if process.returncode == 0:
-                return  # Image existe déjà
-                
-        except Exception:
-            pass
-        
-        # Construction de l'image
-        dockerfile_content = f"""
-FROM python:{python_version}-slim
-
-# Installation des outils de base
-RUN apt-get update && apt-get install -y \\
-    curl \\
-    git \\
-    && rm -rf /var/lib/apt/lists/*
-
-# Installation d'uv
-RUN curl -LsSf https://astral.sh/uv/install.sh | sh
-ENV PATH="/root/.cargo/bin:$PATH"
-
-# Configuration des répertoires de travail
-WORKDIR /workspace
-RUN mkdir -p /workspace/tmp /workspace/cache
-
-# Configuration de l'environnement
-ENV PYTHONUNBUFFERED=1
-ENV PYTHONDONTWRITEBYTECODE=1
-
-CMD ["/bin/bash"]
-"""
-        
-        # Création d'un contexte temporaire
-        import tempfile
-        with tempfile.TemporaryDirectory() as temp_dir:
-            dockerfile_path = Path(temp_dir) / "Dockerfile"
-            dockerfile_path.write_text(dockerfile_content)
-            
-            # Construction de l'image
-            process = await asyncio.create_subprocess_exec(
-                runtime, 'build', 
-                '-t', image_name,
-                str(temp_dir),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise EnvironmentCreationException(f"Failed to build container image: {stderr.decode()}")
-            
-            logger.info(f"Built container image: {image_name}")
-    
-    async def _build_container_config(self, env: EphemeralEnvironment, image_name: str) -> dict:
-        """Construction de la configuration du container"""
-        config = {
-            'image': image_name,
-            'name': f"gestvenv-{env.id[:8]}",
-            'volumes': [
-                f"{env.storage_path}:/workspace:rw"
-            ],
-            'environment': {
-                'GESTVENV_ENV_ID': env.id,
-                'PYTHONPATH': '/workspace',
-                'PIP_CACHE_DIR': '/workspace/cache/pip',
-                'UV_CACHE_DIR': '/workspace/cache/uv'
-            },
-            'working_dir': '/workspace',
-            'detach': True,
-            'remove': True  # Auto-cleanup
-        }
-        
-        # Limites de ressources
-        if env.resource_limits.max_memory:
-            config['memory'] = f"{env.resource_limits.max_memory}m"
-        
-        if env.resource_limits.max_cpu_percent:
-            config['cpus'] = str(env.resource_limits.max_cpu_percent / 100.0)
-        
-        # Isolation réseau
-        if not env.resource_limits.network_access:
-            config['network'] = 'none'
-        
-        return config
-    
-    async def _create_container(self, runtime: str, config: dict) -> str:
-        """Création du container"""
-        cmd = [runtime, 'create']
-        
-        # Ajout des options
-        cmd.extend(['--name', config['name']])
-        cmd.extend(['--workdir', config['working_dir']])
-        
-        if config.get('detach'):
-            cmd.append('--detach')
-        
-        if config.get('remove'):
-            cmd.append('--rm')
-        
-        # Volumes
-        for volume in config.get('volumes', []):
-            cmd.extend(['-v', volume])
-        
-        # Variables d'environnement
-        for key, value in config.get('environment', {}).items():
-            cmd.extend(['-e', f"{key}={value}"])
-        
-        # Limites de ressources
-        if 'memory' in config:
-            cmd.extend(['--memory', config['memory']])
-        
-        if 'cpus' in config:
-            cmd.extend(['--cpus', config['cpus']])
-        
-        if 'network' in config:
-            cmd.extend(['--network', config['network']])
-        
-        # Image et commande
-        cmd.append(config['image'])
-        cmd.extend(['sleep', 'infinity'])  # Garder le container vivant
-        
-        # Exécution
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            raise EnvironmentCreationException(f"Failed to create container: {stderr.decode()}")
-        
-        container_id = stdout.decode().strip()
-        return container_id
-    
-    async def _start_container(self, runtime: str, container_id: str):
-        """Démarrage du container"""
-        process = await asyncio.create_subprocess_exec(
-            runtime, 'start', container_id,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            raise EnvironmentCreationException(f"Failed to start container: {stderr.decode()}")
-    
     async def _check_namespace_support(self) -> bool:
         """Vérification du support des namespaces"""
         try:
@@ -855,6 +837,8 @@ CMD ["/bin/bash"]
         if config.get('uts'):
             unshare_options.append('--uts')
         
+        cache_vars = self._cache_vars(env)
+        
         # Script d'isolation
         script_content = f"""#!/bin/bash
 set -e
@@ -867,8 +851,8 @@ exec unshare {' '.join(unshare_options)} \\
         export PYTHONPATH="{env.storage_path}"
         export PYTHONUNBUFFERED=1
         export PYTHONDONTWRITEBYTECODE=1
-        export PIP_CACHE_DIR="{env.storage_path}/cache/pip"
-        export UV_CACHE_DIR="{env.storage_path}/cache/uv"
+        export PIP_CACHE_DIR="{cache_vars['PIP_CACHE_DIR']}"
+        export UV_CACHE_DIR="{cache_vars['UV_CACHE_DIR']}"
         export TMPDIR="{env.storage_path}/tmp"
         
         # Changement de répertoire
@@ -931,4 +915,4 @@ exec unshare {' '.join(unshare_options)} \\
             except Exception as e:
                 logger.debug(f"Failed to create device {name}: {e}")
         
-        logger.info(f"Chroot environment setup completed: {chroot_path}")
\ No newline at end of file
+        logger.info(f"Chroot environment setup completed: {chroot_path}")
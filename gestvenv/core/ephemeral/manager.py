@@ -26,6 +26,10 @@ from .lifecycle import LifecycleController
 from .monitoring import ResourceTracker
 from .cleanup import CleanupScheduler
 from .storage import StorageManager
+from .templates import TemplateCache
+from .policies import LimitPolicyEngine
+from .shared_cache import SharedPackageCache
+from .containers import ContainerPool
 
 logger = logging.getLogger(__name__)
 
@@ -33,17 +37,39 @@ logger = logging.getLogger(__name__)
 class EphemeralManager:
     """Gestionnaire principal des environnements éphémères"""
     
-    def __init__(self, config: Optional[EphemeralConfig] = None):
+    def __init__(
+        self,
+        config: Optional[EphemeralConfig] = None,
+        cache_service=None,
+        container_runtime=None
+    ):
         self.config = config or EphemeralConfig()
         self.active_environments: Dict[str, EphemeralEnvironment] = {}
         self._lock = asyncio.Lock()
         self._shutdown = False
         
+        # Cache de packages partagé, versé dans le CacheService persistant si fourni
+        self.cache_service = cache_service
+        self.shared_cache = (
+            SharedPackageCache(self.config.shared_cache_path, self.config.shared_cache_max_mb)
+            if self.config.enable_shared_cache else None
+        )
+        self._cache_maintenance: Optional[asyncio.Task] = None
+        
         # Composants principaux
         self.lifecycle_controller = LifecycleController(self)
         self.resource_tracker = ResourceTracker(self)
         self.cleanup_scheduler = CleanupScheduler(self)
+        self.policy_engine = LimitPolicyEngine(self)
         self.storage_manager = StorageManager(self.config)
+        self.template_cache = (
+            TemplateCache(self.config, lambda: self.storage_manager.storage_path)
+            if self.config.enable_template_cache else None
+        )
+        self.container_pool = ContainerPool(
+            self.config, lambda: self.storage_manager.storage_path,
+            runtime=container_runtime, shared_cache=self.shared_cache
+        )
         
         # Tâches d'arrière-plan
         self._background_tasks: List[asyncio.Task] = []
@@ -77,6 +103,7 @@ class EphemeralManager:
         await self.cleanup_scheduler.emergency_cleanup_all()
         
         # Arrêt des composants
+        await self.container_pool.shutdown()
         await self.cleanup_scheduler.stop()
         await self.resource_tracker.stop()
         
@@ -147,25 +174,36 @@ class EphemeralManager:
         """Récupération de l'usage global des ressources"""
         total_memory = 0
         total_disk = 0
+        peak_memory = 0
         active_count = 0
         
         async with self._lock:
             for env in self.active_environments.values():
                 if env.is_active:
                     active_count += 1
+                    # Usage courant (dernière mesure), pas les pics passés
+                    current = self.resource_tracker.current_usage(env.id)
+                    if current:
+                        total_memory += current.memory_mb
+                        total_disk += current.disk_mb
                     if env.peak_memory_mb:
-                        total_memory += env.peak_memory_mb
-                    if env.peak_disk_mb:
-                        total_disk += env.peak_disk_mb
+                        peak_memory += env.peak_memory_mb
         
-        return {
+        usage = {
             "active_environments": active_count,
             "total_memory_mb": total_memory,
             "total_disk_mb": total_disk,
+            "peak_memory_mb": peak_memory,
             "max_concurrent": self.config.max_concurrent,
             "max_total_memory_mb": self.config.max_total_memory_mb,
             "max_total_disk_mb": self.config.max_total_disk_mb
         }
+        if self.template_cache is not None:
+            usage["template_cache"] = self.template_cache.stats()
+        if self.shared_cache is not None:
+            usage["shared_cache"] = self.shared_cache.stats()
+        usage["container_pool"] = self.container_pool.stats()
+        return usage
     
     async def _create_environment(
         self,
@@ -210,6 +248,7 @@ class EphemeralManager:
         """Enregistrement d'un environnement"""
         async with self._lock:
             self.active_environments[env.id] = env
+        self.cleanup_scheduler.register(env)
         
         # Démarrage du monitoring si activé
         if self.config.enable_monitoring:
@@ -241,9 +280,12 @@ class EphemeralManager:
             async with self._lock:
                 if env.id in self.active_environments:
                     del self.active_environments[env.id]
+            self.cleanup_scheduler.unregister(env.id)
+            self.policy_engine.forget(env.id)
             
             env.cleanup_time = time.time() - cleanup_start
             env.status = EphemeralStatus.DESTROYED
+            self._schedule_cache_maintenance()
             
             logger.info(
                 f"Environment {env.id} cleaned up in {env.cleanup_time:.2f}s"
@@ -253,6 +295,25 @@ class EphemeralManager:
             logger.error(f"Failed to cleanup environment {env.id}: {e}")
             raise CleanupException(f"Cleanup failed: {e}")
     
+    def _schedule_cache_maintenance(self) -> Optional[asyncio.Task]:
+        """Réchauffement et quota du cache partagé, une seule tâche à la fois"""
+        if self.shared_cache is None or self._shutdown:
+            return None
+        if self._cache_maintenance is not None and not self._cache_maintenance.done():
+            return self._cache_maintenance
+        self._cache_maintenance = asyncio.create_task(
+            self.shared_cache.maintain(self.cache_service)
+        )
+        self._background_tasks.append(self._cache_maintenance)
+        self._cache_maintenance.add_done_callback(self._finish_cache_maintenance)
+        return self._cache_maintenance
+    
+    def _finish_cache_maintenance(self, task: asyncio.Task):
+        if task in self._background_tasks:
+            self._background_tasks.remove(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Shared cache maintenance failed: {task.exception()}")
+    
     async def _emergency_cleanup(self, env: EphemeralEnvironment):
         """Nettoyage d'urgence en cas d'erreur"""
         try:
@@ -270,22 +331,32 @@ class EphemeralManager:
     
     async def _check_resource_limits(self):
         """Vérification des limites de ressources globales"""
-        async with self._lock:
-            active_count = len(self.active_environments)
+        if len(self.active_environments) >= self.config.max_concurrent:
+            # Échéances atteintes mais pas encore traitées (sans parcours complet)
+            await self.cleanup_scheduler.run_due()
             
-            if active_count >= self.config.max_concurrent:
-                # Tentative de nettoyage préventif
-                await self.cleanup_scheduler.cleanup_inactive()
-                
-                # Nouvelle vérification
-                active_count = len(self.active_environments)
-                if active_count >= self.config.max_concurrent:
+            if (len(self.active_environments) >= self.config.max_concurrent
+                    and self.config.limit_policy.evict_for_admission):
+                await self.policy_engine.make_room()
+            
+            async with self._lock:
+                if len(self.active_environments) >= self.config.max_concurrent:
                     raise ResourceExhaustedException(
                         f"Maximum concurrent environments reached: {self.config.max_concurrent}"
                     )
         
-        # Vérification de l'usage mémoire total
+        # Vérification de l'usage mémoire total (usage courant mesuré)
         usage = await self.get_resource_usage()
+        if self.config.limit_policy.evict_for_admission and (
+            usage["total_memory_mb"] > self.config.max_total_memory_mb
+            or usage["total_disk_mb"] > self.config.max_total_disk_mb
+        ):
+            await self.policy_engine.enforce_global({
+                env.id: current
+                for env in await self.list_environments()
+                if (current := self.resource_tracker.current_usage(env.id))
+            }, wait=True)
+            usage = await self.get_resource_usage()
         
         if usage["total_memory_mb"] > self.config.max_total_memory_mb:
             raise ResourceExhaustedException(
@@ -7,7 +7,7 @@ from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, List, Any
+from typing import Callable, Dict, Optional, List, Any
 
 from ..models import BackendType as Backend
 
@@ -96,12 +96,18 @@ class EphemeralEnvironment:
     tags: Dict[str, str] = field(default_factory=dict)
     parent_session: Optional[str] = None
     packages: List[str] = field(default_factory=list)
+    priority: int = 0                # Éviction : priorité basse évincée d'abord
     
     # Statistiques
     creation_time: Optional[float] = None
     cleanup_time: Optional[float] = None
     peak_memory_mb: Optional[float] = None
     peak_disk_mb: Optional[float] = None
+    
+    # Notifié à chaque activité (réarmement du planificateur de nettoyage)
+    activity_listener: Optional[Callable[["EphemeralEnvironment"], None]] = field(
+        default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
         """Post-initialisation"""
@@ -129,6 +135,20 @@ class EphemeralEnvironment:
     def update_activity(self):
         """Met à jour le timestamp de dernière activité"""
         self.last_activity = datetime.now()
+        if self.activity_listener is not None:
+            self.activity_listener(self)
+    
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Échéance TTL (timestamp), None sans TTL"""
+        if self.ttl is None:
+            return None
+        return self.created_at.timestamp() + self.ttl
+    
+    @property
+    def idle_deadline(self) -> float:
+        """Échéance d'inactivité (timestamp)"""
+        return self.last_activity.timestamp() + self.max_idle_time
     
     def is_expired(self) -> bool:
         """Vérifie si l'environnement a expiré"""
@@ -141,6 +161,37 @@ class EphemeralEnvironment:
         return self.idle_seconds > self.max_idle_time
 
 
+class LimitAction(Enum):
+    """Action appliquée lors d'un dépassement de limite"""
+    WARN = "warn"            # Alerte uniquement
+    THROTTLE = "throttle"    # Ralentissement (memory.high, cpu.max)
+    FREEZE = "freeze"        # Gel des processus (cgroup.freeze)
+    EVICT = "evict"          # Nettoyage de l'environnement
+
+
+class EvictionOrder(Enum):
+    """Ordre de choix des environnements évincés"""
+    LRU = "lru"              # Moins récemment actif d'abord
+    PRIORITY = "priority"    # Priorité la plus basse d'abord, puis LRU
+
+
+@dataclass
+class LimitPolicy:
+    """Politique d'application des limites (ratios de la limite configurée)"""
+    warn_ratio: float = 0.8
+    throttle_ratio: float = 0.9
+    # Actions en dépassement (usage >= limite), escaladées toutes les
+    # escalate_after mesures consécutives en dépassement
+    breach_actions: List[LimitAction] = field(
+        default_factory=lambda: [LimitAction.THROTTLE, LimitAction.FREEZE, LimitAction.EVICT]
+    )
+    escalate_after: int = 3
+    throttle_memory_ratio: float = 0.8   # memory.high en fraction de la limite mémoire
+    throttle_cpu_percent: int = 50       # cpu.max pendant le ralentissement
+    eviction_order: EvictionOrder = EvictionOrder.LRU
+    evict_for_admission: bool = False    # Évincer pour admettre un nouvel environnement
+
+
 @dataclass 
 class EphemeralConfig:
     """Configuration globale pour environnements éphémères"""
@@ -151,7 +202,8 @@ class EphemeralConfig:
     max_total_disk_mb: int = 20480       # 20GB maximum total
     
     # Nettoyage
-    cleanup_interval: int = 60           # Nettoyage toutes les minutes
+    cleanup_interval: int = 60           # Balayage des environnements en échec
+    max_concurrent_cleanups: int = 4     # Nettoyages simultanés maximum
     force_cleanup_after: int = 7200      # Nettoyage forcé après 2h
     
     # Stockage
@@ -165,11 +217,23 @@ class EphemeralConfig:
     # Monitoring
     enable_monitoring: bool = True
     monitoring_interval: int = 5         # Surveillance toutes les 5 secondes
+    limit_policy: LimitPolicy = field(default_factory=LimitPolicy)
+    history_samples: int = 720           # Mesures récentes conservées (1h à 5s)
+    history_downsample_seconds: int = 60 # Intervalle du niveau long terme
+    history_longterm_buckets: int = 1440 # Intervalles long terme conservés (24h)
     
     # Performance
     enable_preallocation: bool = True    # Pré-allocation d'environnements
     pool_size: int = 3                   # Taille du pool de pré-allocation
     enable_template_cache: bool = True   # Cache des templates
+    template_cache_max_mb: int = 2048    # Taille maximale du cache de templates
+    template_cache_max_entries: int = 16 # Nombre maximal de templates conservés
+    enable_shared_cache: bool = True     # Cache uv/pip partagé entre environnements
+    shared_cache_path: Optional[Path] = None
+    shared_cache_max_mb: int = 4096      # Quota du cache partagé
+    container_pool_size: int = 2         # Containers démarrés d'avance par profil
+    container_max_reuse: int = 50        # Réutilisations avant remplacement d'un container
+    container_runtime: Optional[str] = None  # docker, podman (défaut: détection)
     
     def __post_init__(self):
         """Post-initialisation de la configuration"""
@@ -180,6 +244,9 @@ class EphemeralConfig:
                 self.base_storage_path = Path("/dev/shm/gestvenv-ephemeral")
             else:
                 self.base_storage_path = Path.home() / ".cache/gestvenv/ephemeral"
+        if self.shared_cache_path is None:
+            # Hors du stockage des environnements (souvent tmpfs) : survit aux redémarrages
+            self.shared_cache_path = Path.home() / ".cache/gestvenv/ephemeral-packages"
 
 
 @dataclass
@@ -7,13 +7,15 @@ avec les cgroups v2, et un système d'alertes.
 
 import asyncio
 import logging
+import os
 import psutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, List, Callable, Any
+from typing import Dict, Optional, List, Callable, Any, Tuple
 
 from .models import (
     EphemeralEnvironment,
@@ -22,6 +24,7 @@ from .models import (
 )
 from .exceptions import EphemeralException
 from .cgroups import cgroup_manager, CgroupInfo
+from .history import ResourceHistory
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +87,9 @@ class MonitoringMetrics:
     io_read_bytes: int = 0
     io_write_bytes: int = 0
 
+    # Statistiques sur l'historique récent (min/max/mean/p50/p95 par métrique)
+    history: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
     # État
     is_healthy: bool = True
     alerts: List[Alert] = field(default_factory=list)
@@ -134,6 +140,7 @@ class MonitoringMetrics:
                 "read_bytes": self.io_read_bytes,
                 "write_bytes": self.io_write_bytes,
             },
+            "history": self.history,
             "is_healthy": self.is_healthy,
             "alerts_count": len(self.alerts),
         }
@@ -142,6 +149,71 @@ class MonitoringMetrics:
 # Type pour les callbacks d'alerte
 AlertCallback = Callable[[Alert], None]
 
+# Threads de lecture des compteurs (un tick couvre tous les environnements)
+SAMPLING_WORKERS = 8
+
+
+class IncrementalDiskUsage:
+    """Taille d'une arborescence recalculée pour les seuls répertoires modifiés
+
+    Chaque répertoire est mis en cache avec son mtime : un répertoire inchangé
+    (aucune entrée créée, supprimée ou renommée) réutilise la somme de ses
+    fichiers et la liste de ses sous-répertoires, seul un stat() est fait.
+    Un fichier modifié en place ne change pas le mtime de son répertoire :
+    un recalcul complet a lieu toutes les full_scan_every mesures.
+    """
+
+    def __init__(self, root: Path, full_scan_every: int = 12):
+        self.root = root
+        self.full_scan_every = full_scan_every
+        self._dirs: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {}
+        self._measures = 0
+
+    def measure(self) -> int:
+        """Taille totale en octets"""
+        full_scan = self._measures % self.full_scan_every == 0
+        self._measures += 1
+
+        cache: Dict[str, Tuple[int, int, Tuple[str, ...]]] = {}
+        total = 0
+        stack = [str(self.root)]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = self._dirs.get(path)
+            if cached is None or cached[0] != mtime or full_scan:
+                cached = self._scan(path, mtime)
+                if cached is None:
+                    continue
+            cache[path] = cached
+            total += cached[1]
+            stack.extend(cached[2])
+
+        self._dirs = cache
+        return total
+
+    @staticmethod
+    def _scan(path: str, mtime: int) -> Optional[Tuple[int, int, Tuple[str, ...]]]:
+        size = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return mtime, size, tuple(subdirs)
+
 
 class ResourceTracker:
     """Suivi des ressources en temps réel avec intégration cgroups"""
@@ -149,7 +221,7 @@ class ResourceTracker:
     def __init__(self, manager):
         self.manager = manager
         self.monitoring_task: Optional[asyncio.Task] = None
-        self.resource_history: Dict[str, List[ResourceUsage]] = {}
+        self.resource_history: Dict[str, ResourceHistory] = {}
         self.metrics_history: Dict[str, List[MonitoringMetrics]] = {}
         self.alerts: List[Alert] = []
         self.alert_callbacks: List[AlertCallback] = []
@@ -165,6 +237,12 @@ class ResourceTracker:
         # Durée maximale d'inactivité avant alerte (secondes)
         self.stale_threshold_seconds = 300  # 5 minutes
 
+        # État d'échantillonnage par environnement
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._disk_usage: Dict[str, IncrementalDiskUsage] = {}
+        self._cpu_samples: Dict[str, Tuple[int, float]] = {}
+        self._processes: Dict[str, Dict[int, psutil.Process]] = {}
+
     def register_alert_callback(self, callback: AlertCallback) -> None:
         """Enregistre un callback pour les alertes"""
         self.alert_callbacks.append(callback)
@@ -213,22 +291,31 @@ class ResourceTracker:
             except asyncio.CancelledError:
                 pass
             self.monitoring_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         logger.info("Resource monitoring stopped")
     
     async def start_monitoring(self, env: EphemeralEnvironment):
         """Démarrage du monitoring pour un environnement spécifique"""
         if env.id not in self.resource_history:
-            self.resource_history[env.id] = []
+            config = getattr(self.manager, "config", None)
+            self.resource_history[env.id] = ResourceHistory(
+                samples=getattr(config, "history_samples", 720),
+                downsample_seconds=getattr(config, "history_downsample_seconds", 60),
+                longterm_buckets=getattr(config, "history_longterm_buckets", 1440),
+            )
         logger.debug(f"Started monitoring for environment {env.id}")
     
     async def stop_monitoring(self, env_id: str):
         """Arrêt du monitoring pour un environnement"""
-        if env_id in self.resource_history:
-            # Conservation de l'historique pendant un court moment
-            history = self.resource_history[env_id]
-            if history:
-                logger.debug(f"Stopped monitoring for {env_id}, peak memory: {max(r.memory_mb for r in history):.1f}MB")
-            del self.resource_history[env_id]
+        history = self.resource_history.pop(env_id, None)
+        if history:
+            peak = history.summary(longterm=False)["memory_mb"].get("max", 0.0)
+            logger.debug(f"Stopped monitoring for {env_id}, peak memory: {peak:.1f}MB")
+        self._disk_usage.pop(env_id, None)
+        self._cpu_samples.pop(env_id, None)
+        self._processes.pop(env_id, None)
     
     async def get_current_usage(self, env: EphemeralEnvironment) -> Optional[ResourceUsage]:
         """Récupération de l'usage actuel d'un environnement"""
@@ -238,9 +325,34 @@ class ResourceTracker:
             logger.warning(f"Failed to get usage for {env.id}: {e}")
             return None
     
-    async def get_resource_history(self, env_id: str) -> List[ResourceUsage]:
-        """Récupération de l'historique des ressources"""
-        return self.resource_history.get(env_id, [])
+    async def get_resource_history(
+        self,
+        env_id: str,
+        since: Optional[datetime] = None
+    ) -> List[ResourceUsage]:
+        """Récupération de l'historique récent des ressources"""
+        history = self.resource_history.get(env_id)
+        if history is None:
+            return []
+        return history.usages(since.timestamp() if since else None)
+    
+    def get_history_summary(
+        self,
+        env_id: str,
+        since: Optional[datetime] = None,
+        longterm: bool = False
+    ) -> Dict[str, Dict[str, float]]:
+        """min / max / moyenne / p50 / p95 de chaque métrique
+        
+        Args:
+            env_id: Identifiant de l'environnement
+            since: Début de la fenêtre (défaut: tout l'historique du niveau)
+            longterm: Niveau sous-échantillonné (heures) au lieu du niveau récent
+        """
+        history = self.resource_history.get(env_id)
+        if history is None:
+            return {}
+        return history.summary(since.timestamp() if since else None, longterm=longterm)
 
     async def get_metrics(self, env: EphemeralEnvironment) -> MonitoringMetrics:
         """Récupère les métriques complètes d'un environnement
@@ -260,6 +372,11 @@ class ResourceTracker:
             metrics.disk_usage_mb = usage.disk_mb
             metrics.active_processes = usage.active_processes
 
+        # Statistiques de l'historique (colonnes du tampon circulaire)
+        metrics.history = self.get_history_summary(env.id)
+        memory_peak = metrics.history.get("memory_mb", {}).get("max", 0.0)
+        metrics.memory_peak_mb = max(memory_peak, metrics.memory_current_mb)
+
         # Métriques enrichies via cgroups
         if hasattr(env, 'cgroup_path') and env.cgroup_path:
             cgroup_stats = await cgroup_manager.get_statistics(env.id)
@@ -492,17 +609,23 @@ class ResourceTracker:
         """Boucle principale de monitoring"""
         while not self._shutdown:
             try:
-                # Monitoring de tous les environnements actifs
-                environments = await self.manager.list_environments()
+                # Un seul tick de mesure pour tous les environnements actifs
+                environments = [
+                    env for env in await self.manager.list_environments()
+                    if env.is_active and env.id in self.resource_history
+                ]
                 
-                for env in environments:
-                    if env.is_active and env.id in self.resource_history:
-                        usage = await self._measure_environment_resources(env)
-                        if usage:
-                            await self._record_usage(env, usage)
+                samples = await self.sample_environments(environments)
+                for env, usage in zip(environments, samples):
+                    if usage:
+                        await self._record_usage(env, usage)
                 
-                # Nettoyage de l'historique ancien
-                await self._cleanup_old_history()
+                # Plafonds globaux sur l'usage courant
+                policy_engine = getattr(self.manager, "policy_engine", None)
+                if policy_engine is not None:
+                    await policy_engine.enforce_global({
+                        env.id: usage for env, usage in zip(environments, samples) if usage
+                    })
                 
                 # Attente avant la prochaine mesure
                 await asyncio.sleep(self.manager.config.monitoring_interval)
@@ -513,41 +636,50 @@ class ResourceTracker:
                 logger.error(f"Monitoring loop error: {e}")
                 await asyncio.sleep(30)  # Attente plus longue en cas d'erreur
     
+    async def sample_environments(
+        self,
+        environments: List[EphemeralEnvironment]
+    ) -> List[Optional[ResourceUsage]]:
+        """Mesure groupée : lectures de fichiers réparties sur le pool de threads"""
+        if not environments:
+            return []
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=SAMPLING_WORKERS, thread_name_prefix="gestvenv-monitor"
+            )
+        
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._sample_environment, env)
+            for env in environments
+        ))
+    
     async def _measure_environment_resources(self, env: EphemeralEnvironment) -> Optional[ResourceUsage]:
         """Mesure des ressources d'un environnement"""
+        return (await self.sample_environments([env]))[0]
+    
+    def _sample_environment(self, env: EphemeralEnvironment) -> Optional[ResourceUsage]:
+        """Mesure synchrone : compteurs cgroup v2, psutil en repli"""
         try:
-            # Mesure de l'usage disque
+            # Mesure incrémentale de l'usage disque
             disk_usage_mb = 0.0
             if env.storage_path and env.storage_path.exists():
-                disk_usage_mb = await self._get_directory_size(env.storage_path)
+                disk = self._disk_usage.get(env.id)
+                if disk is None or disk.root != env.storage_path:
+                    disk = self._disk_usage[env.id] = IncrementalDiskUsage(env.storage_path)
+                disk_usage_mb = disk.measure() / (1024 * 1024)
             
-            # Mesure de l'usage mémoire et CPU
-            memory_mb = 0.0
-            cpu_percent = 0.0
-            active_processes = 0
+            counters = None
+            if getattr(env, 'cgroup_path', None):
+                counters = cgroup_manager.sample_counters(env.id)
             
-            if env.pid:
-                try:
-                    # Processus principal
-                    main_process = psutil.Process(env.pid)
-                    if main_process.is_running():
-                        memory_mb += main_process.memory_info().rss / (1024 * 1024)
-                        cpu_percent += main_process.cpu_percent()
-                        active_processes += 1
-                        
-                        # Processus enfants
-                        for child in main_process.children(recursive=True):
-                            try:
-                                if child.is_running():
-                                    memory_mb += child.memory_info().rss / (1024 * 1024)
-                                    cpu_percent += child.cpu_percent()
-                                    active_processes += 1
-                            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                continue
-                                
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    # Processus terminé ou accès refusé
-                    pass
+            if counters is not None:
+                memory_mb = counters.memory_current / (1024 * 1024)
+                cpu_percent = self._cpu_percent(env.id, counters.cpu_usage_usec)
+                active_processes = counters.pids_current
+            else:
+                memory_mb, cpu_percent, active_processes = self._sample_processes(env)
             
             return ResourceUsage(
                 memory_mb=memory_mb,
@@ -560,36 +692,58 @@ class ResourceTracker:
             logger.warning(f"Failed to measure resources for {env.id}: {e}")
             return None
     
-    async def _get_directory_size(self, path: Path) -> float:
-        """Calcul de la taille d'un répertoire en MB"""
-        try:
-            def get_size():
-                total_size = 0
-                for dirpath, dirnames, filenames in path.walk():
-                    for filename in filenames:
-                        try:
-                            file_path = dirpath / filename
-                            total_size += file_path.stat().st_size
-                        except (OSError, FileNotFoundError):
-                            continue
-                return total_size / (1024 * 1024)  # Conversion en MB
-            
-            # Exécution dans un thread pour éviter le blocage
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, get_size)
-            
-        except Exception:
+    def _cpu_percent(self, env_id: str, usage_usec: int) -> float:
+        """% CPU depuis le compteur cumulé (100 = un cœur), 0 à la première mesure"""
+        now = time.monotonic()
+        previous = self._cpu_samples.get(env_id)
+        self._cpu_samples[env_id] = (usage_usec, now)
+        if previous is None or now <= previous[1]:
             return 0.0
+        return max(0.0, (usage_usec - previous[0]) / ((now - previous[1]) * 1_000_000) * 100)
+    
+    def _sample_processes(self, env: EphemeralEnvironment) -> Tuple[float, float, int]:
+        """Repli sans cgroups : parcours de l'arbre des processus avec psutil
+        
+        Les objets Process sont conservés d'une mesure à l'autre pour que
+        cpu_percent() porte sur l'intervalle écoulé.
+        """
+        memory_mb = 0.0
+        cpu_percent = 0.0
+        active_processes = 0
+        
+        if not env.pid:
+            return memory_mb, cpu_percent, active_processes
+        
+        known = self._processes.get(env.id, {})
+        current: Dict[int, psutil.Process] = {}
+        try:
+            main_process = known.get(env.pid) or psutil.Process(env.pid)
+            processes = [main_process] + main_process.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # Processus terminé ou accès refusé
+            self._processes.pop(env.id, None)
+            return memory_mb, cpu_percent, active_processes
+        
+        for process in processes:
+            process = known.get(process.pid, process)
+            try:
+                if process.is_running():
+                    memory_mb += process.memory_info().rss / (1024 * 1024)
+                    cpu_percent += process.cpu_percent()
+                    active_processes += 1
+                    current[process.pid] = process
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        self._processes[env.id] = current
+        return memory_mb, cpu_percent, active_processes
     
     async def _record_usage(self, env: EphemeralEnvironment, usage: ResourceUsage):
         """Enregistrement d'une mesure d'usage"""
-        # Ajout à l'historique
-        if env.id in self.resource_history:
-            self.resource_history[env.id].append(usage)
-            
-            # Limitation de la taille de l'historique (30 dernières mesures)
-            if len(self.resource_history[env.id]) > 30:
-                self.resource_history[env.id] = self.resource_history[env.id][-30:]
+        # Ajout à l'historique (tampon circulaire borné)
+        history = self.resource_history.get(env.id)
+        if history is not None:
+            history.record(usage)
         
         # Mise à jour des pics dans l'environnement
         if env.peak_memory_mb is None or usage.memory_mb > env.peak_memory_mb:
@@ -602,49 +756,41 @@ class ResourceTracker:
         await self._check_resource_limits(env, usage)
     
     async def _check_resource_limits(self, env: EphemeralEnvironment, usage: ResourceUsage):
-        """Vérification des limites de ressources"""
-        limits = env.resource_limits
-        
-        # Vérification mémoire
-        if limits.max_memory and usage.memory_mb > limits.max_memory:
-            logger.warning(
-                f"Environment {env.id} exceeded memory limit: "
-                f"{usage.memory_mb:.1f}MB > {limits.max_memory}MB"
-            )
-            # TODO: Déclencher action de limite (warning, throttling, cleanup)
-        
-        # Vérification disque
-        if limits.max_disk and usage.disk_mb > limits.max_disk:
-            logger.warning(
-                f"Environment {env.id} exceeded disk limit: "
-                f"{usage.disk_mb:.1f}MB > {limits.max_disk}MB"
-            )
-        
-        # Vérification nombre de processus
-        if usage.active_processes > limits.max_processes:
-            logger.warning(
-                f"Environment {env.id} exceeded process limit: "
-                f"{usage.active_processes} > {limits.max_processes}"
-            )
+        """Vérification des limites de ressources (actions du moteur de politiques)"""
+        policy_engine = getattr(self.manager, "policy_engine", None)
+        if policy_engine is not None:
+            await policy_engine.evaluate(env, usage)
     
-    async def _cleanup_old_history(self):
-        """Nettoyage de l'historique ancien"""
-        current_time = time.time()
-        
-        for env_id, history in list(self.resource_history.items()):
-            # Suppression des mesures de plus de 5 minutes
-            cutoff_time = current_time - 300
-            
-            filtered_history = [
-                usage for usage in history
-                if usage.timestamp.timestamp() > cutoff_time
-            ]
-            
-            if filtered_history:
-                self.resource_history[env_id] = filtered_history
-            else:
-                # Environnement probablement terminé
-                del self.resource_history[env_id]
+    def current_usage(self, env_id: str) -> Optional[ResourceUsage]:
+        """Dernière mesure d'un environnement"""
+        history = self.resource_history.get(env_id)
+        return history.latest() if history is not None else None
+    
+    async def emit_limit_alert(
+        self,
+        env: EphemeralEnvironment,
+        resource: str,
+        ratio: float,
+        action: Any
+    ) -> None:
+        """Alerte d'approche ou de dépassement d'une limite"""
+        exceeded = ratio >= 1.0
+        alert_type = {
+            "memory": AlertType.MEMORY_EXCEEDED if exceeded else AlertType.MEMORY_HIGH,
+            "disk": AlertType.DISK_EXCEEDED if exceeded else AlertType.DISK_HIGH,
+            "processes": AlertType.PROCESSES_EXCEEDED,
+            "cpu": AlertType.CPU_HIGH,
+        }[resource]
+        await self._emit_alert(Alert(
+            level=AlertLevel.CRITICAL if exceeded else AlertLevel.WARNING,
+            alert_type=alert_type,
+            env_id=env.id,
+            message=(
+                f"Environment {env.id} {resource} at {ratio * 100:.0f}% of limit "
+                f"(action: {action.value})"
+            ),
+            details={"resource": resource, "ratio": ratio, "action": action.value}
+        ))
 
 
 class PerformanceMonitor:
@@ -0,0 +1,301 @@
+"""
+Moteur de politiques de limites pour environnements éphémères
+
+À chaque mesure, l'usage courant d'un environnement est rapporté à ses
+limites (mémoire, disque, processus, CPU). Selon LimitPolicy :
+- au-delà de warn_ratio : alerte ;
+- au-delà de throttle_ratio : ralentissement via cgroups (memory.high, cpu.max) ;
+- au-delà de la limite : actions de breach_actions, escaladées toutes les
+  escalate_after mesures consécutives (ralentir, geler, évincer).
+Le retour sous throttle_ratio lève ralentissement et gel.
+
+Au niveau global, si l'usage courant total dépasse les plafonds de
+EphemeralConfig, des environnements inactifs (READY, sans processus) sont
+évincés (LRU ou priorité). Une éviction dont le nettoyage échoue rend
+l'environnement à l'état NORMAL.
+"""
+
+import asyncio
+import dataclasses
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Optional
+
+import psutil
+
+from .cgroups import ResourceLimits as CgroupLimits, cgroup_manager
+from .models import (
+    EphemeralEnvironment,
+    EphemeralStatus,
+    EvictionOrder,
+    LimitAction,
+    LimitPolicy,
+    ResourceUsage
+)
+
+logger = logging.getLogger(__name__)
+
+LIMIT_EXCEEDED = "limit_exceeded"
+GLOBAL_LIMIT_EXCEEDED = "global_limit_exceeded"
+ADMISSION_EVICTION = "admission_eviction"
+
+
+class LimitState(Enum):
+    """État d'application des limites d'un environnement"""
+    NORMAL = "normal"
+    THROTTLED = "throttled"
+    FROZEN = "frozen"
+    EVICTING = "evicting"
+
+
+@dataclass
+class PolicyDecision:
+    """Décision prise pour une mesure"""
+    env_id: str
+    action: Optional[LimitAction]
+    resource: Optional[str] = None
+    ratio: float = 0.0
+
+
+@dataclass
+class _EnvLimitState:
+    state: LimitState = LimitState.NORMAL
+    breaches: int = 0
+    warned: bool = False
+    original_limits: Optional[CgroupLimits] = None
+
+
+def usage_ratios(env: EphemeralEnvironment, usage: ResourceUsage) -> Dict[str, float]:
+    """Usage rapporté à chaque limite définie (1.0 = limite atteinte)"""
+    limits = env.resource_limits
+    ratios = {}
+    if limits.max_memory:
+        ratios["memory"] = usage.memory_mb / limits.max_memory
+    if limits.max_disk:
+        ratios["disk"] = usage.disk_mb / limits.max_disk
+    if limits.max_processes:
+        ratios["processes"] = usage.active_processes / limits.max_processes
+    if limits.max_cpu_percent:
+        ratios["cpu"] = usage.cpu_percent / limits.max_cpu_percent
+    return ratios
+
+
+class LimitPolicyEngine:
+    """Application active des limites par environnement et globales"""
+
+    def __init__(self, manager, policy: Optional[LimitPolicy] = None):
+        self.manager = manager
+        self.policy = policy or manager.config.limit_policy
+        self._states: Dict[str, _EnvLimitState] = {}
+
+    def state_of(self, env_id: str) -> LimitState:
+        state = self._states.get(env_id)
+        return state.state if state else LimitState.NORMAL
+
+    def forget(self, env_id: str) -> None:
+        """Oubli de l'état d'un environnement nettoyé"""
+        self._states.pop(env_id, None)
+
+    async def evaluate(self, env: EphemeralEnvironment, usage: ResourceUsage) -> PolicyDecision:
+        """Applique la politique à une mesure d'un environnement"""
+        ratios = usage_ratios(env, usage)
+        if not ratios:
+            return PolicyDecision(env.id, None)
+
+        resource, ratio = max(ratios.items(), key=lambda item: item[1])
+        state = self._states.setdefault(env.id, _EnvLimitState())
+        policy = self.policy
+
+        if state.state == LimitState.EVICTING:
+            return PolicyDecision(env.id, None, resource, ratio)
+
+        if ratio < policy.throttle_ratio:
+            state.breaches = 0
+            await self._restore(env, state)
+            if ratio >= policy.warn_ratio:
+                if not state.warned:
+                    state.warned = True
+                    await self._alert(env, resource, ratio, LimitAction.WARN)
+                return PolicyDecision(env.id, LimitAction.WARN, resource, ratio)
+            state.warned = False
+            return PolicyDecision(env.id, None, resource, ratio)
+
+        if ratio < 1.0:
+            state.breaches = 0
+            if state.state == LimitState.FROZEN:
+                await self._thaw(env, state)
+            await self._throttle(env, state)
+            return PolicyDecision(env.id, LimitAction.THROTTLE, resource, ratio)
+
+        # Dépassement : escalade selon la durée
+        state.breaches += 1
+        actions = policy.breach_actions or [LimitAction.WARN]
+        step = (state.breaches - 1) // max(1, policy.escalate_after)
+        action = actions[min(step, len(actions) - 1)]
+
+        if action == LimitAction.THROTTLE:
+            await self._throttle(env, state)
+        elif action == LimitAction.FREEZE:
+            await self._throttle(env, state)
+            await self._freeze(env, state)
+        elif action == LimitAction.EVICT:
+            self._evict(env, LIMIT_EXCEEDED)
+
+        if (state.breaches - 1) % max(1, policy.escalate_after) == 0:
+            # Alerte au premier dépassement et à chaque escalade
+            await self._alert(env, resource, ratio, action)
+        return PolicyDecision(env.id, action, resource, ratio)
+
+    async def enforce_global(
+        self,
+        usages: Dict[str, ResourceUsage],
+        wait: bool = False
+    ) -> List[str]:
+        """Évince des environnements tant que l'usage courant total dépasse les plafonds
+
+        Args:
+            usages: Dernière mesure de chaque environnement actif
+            wait: Attendre la fin des nettoyages (admission)
+
+        Returns:
+            Identifiants des environnements évincés
+        """
+        config = self.manager.config
+        memory = sum(u.memory_mb for u in usages.values())
+        disk = sum(u.disk_mb for u in usages.values())
+        evicted = []
+        tasks = []
+
+        for env in await self._eviction_candidates():
+            if memory <= config.max_total_memory_mb and disk <= config.max_total_disk_mb:
+                break
+            usage = usages.get(env.id)
+            if usage is None:
+                continue
+            task = self._evict(env, GLOBAL_LIMIT_EXCEEDED)
+            if task is not None:
+                tasks.append(task)
+            memory -= usage.memory_mb
+            disk -= usage.disk_mb
+            evicted.append(env.id)
+
+        if evicted:
+            logger.warning(f"Global limits exceeded, evicting {len(evicted)} environment(s)")
+        if wait and tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return evicted
+
+    async def make_room(self, count: int = 1) -> List[str]:
+        """Évince des environnements pour admettre count nouveaux environnements"""
+        evicted = []
+        for env in await self._eviction_candidates():
+            if len(evicted) >= count:
+                break
+            task = self._evict(env, ADMISSION_EVICTION)
+            if task is not None and await task:
+                evicted.append(env.id)
+        return evicted
+
+    async def _eviction_candidates(self) -> List[EphemeralEnvironment]:
+        """Environnements inactifs évinçables, dans l'ordre de la politique"""
+        active_processes = self.manager.lifecycle_controller.process_manager.active_processes
+        environments = [
+            env for env in await self.manager.list_environments()
+            if env.status == EphemeralStatus.READY
+            and not active_processes.get(env.id)
+            and self.state_of(env.id) != LimitState.EVICTING
+        ]
+        if self.policy.eviction_order == EvictionOrder.PRIORITY:
+            return sorted(environments, key=lambda env: (env.priority, env.last_activity))
+        return sorted(environments, key=lambda env: env.last_activity)
+
+    def _evict(self, env: EphemeralEnvironment, reason: str) -> Optional[asyncio.Task]:
+        """Nettoyage forcé ; la tâche renvoie False si le nettoyage a échoué"""
+        task = self.manager.cleanup_scheduler.request_cleanup(env, reason, forced=True)
+        if task is None:
+            # Nettoyage déjà en cours, hors de cette éviction
+            return None
+        state = self._states.setdefault(env.id, _EnvLimitState())
+        previous, state.state = state.state, LimitState.EVICTING
+        logger.warning(f"Evicting environment {env.id} ({reason})")
+        task.add_done_callback(lambda done: self._eviction_done(env.id, state, previous, done))
+        return task
+
+    def _eviction_done(self, env_id: str, state: _EnvLimitState, previous: LimitState,
+                       task: asyncio.Task) -> None:
+        """Échec du nettoyage : retour à l'état d'avant l'éviction"""
+        if (task.cancelled() or task.result() is False) and state.state == LimitState.EVICTING:
+            state.state = previous
+            logger.warning(f"Eviction of environment {env_id} failed, back to {previous.value}")
+
+    async def _throttle(self, env: EphemeralEnvironment, state: _EnvLimitState) -> None:
+        """Ralentissement via cgroups (sans effet hors cgroups)"""
+        if state.state != LimitState.NORMAL:
+            return
+        state.state = LimitState.THROTTLED
+
+        cgroup_info = cgroup_manager._cgroups.get(env.id)
+        if cgroup_info is None or cgroup_info.limits is None:
+            logger.debug(f"Throttling unavailable for {env.id} (no cgroup)")
+            return
+
+        original = state.original_limits = cgroup_info.limits
+        cpu_caps = [c for c in (original.max_cpu_percent, self.policy.throttle_cpu_percent) if c]
+        throttled = dataclasses.replace(original, max_cpu_percent=min(cpu_caps) if cpu_caps else None)
+        if original.max_memory_mb:
+            throttled.memory_high_mb = int(original.max_memory_mb * self.policy.throttle_memory_ratio)
+        await cgroup_manager.update_limits(env.id, throttled)
+        logger.info(f"Throttled environment {env.id}")
+
+    async def _freeze(self, env: EphemeralEnvironment, state: _EnvLimitState) -> None:
+        """Gel des processus (cgroup.freeze, SIGSTOP hors cgroups)"""
+        if state.state == LimitState.FROZEN:
+            return
+        state.state = LimitState.FROZEN
+        if not await cgroup_manager.set_frozen(env.id, True):
+            for process in _process_tree(env.pid):
+                try:
+                    process.suspend()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        logger.warning(f"Froze environment {env.id}")
+
+    async def _thaw(self, env: EphemeralEnvironment, state: _EnvLimitState) -> None:
+        if not await cgroup_manager.set_frozen(env.id, False):
+            for process in _process_tree(env.pid):
+                try:
+                    process.resume()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        state.state = LimitState.THROTTLED
+        logger.info(f"Thawed environment {env.id}")
+
+    async def _restore(self, env: EphemeralEnvironment, state: _EnvLimitState) -> None:
+        """Retour à la normale : dégel et limites d'origine"""
+        if state.state == LimitState.FROZEN:
+            await self._thaw(env, state)
+        if state.state == LimitState.THROTTLED:
+            if state.original_limits is not None:
+                await cgroup_manager.update_limits(env.id, state.original_limits)
+                state.original_limits = None
+            state.state = LimitState.NORMAL
+            logger.info(f"Restored limits of environment {env.id}")
+
+    async def _alert(self, env: EphemeralEnvironment, resource: str, ratio: float,
+                     action: LimitAction) -> None:
+        tracker = getattr(self.manager, "resource_tracker", None)
+        if tracker is not None:
+            await tracker.emit_limit_alert(env, resource, ratio, action)
+        else:
+            logger.warning(f"Environment {env.id} {resource} at {ratio:.0%} of limit ({action.value})")
+
+
+def _process_tree(pid: Optional[int]) -> List[psutil.Process]:
+    if not pid:
+        return []
+    try:
+        process = psutil.Process(pid)
+        return [process] + process.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return []
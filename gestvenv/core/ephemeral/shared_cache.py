@@ -0,0 +1,407 @@
+"""
+Cache de packages partagé entre environnements éphémères
+
+Un seul cache par hôte (uv et pip) au lieu d'un cache par environnement
+supprimé au nettoyage :
+- uv gère lui-même les écritures concurrentes dans son cache ;
+- pip non : les commandes pip sont sérialisées par un verrou fichier
+  (fcntl, inter-processus) ;
+- chaque commande pip/uv détient un verrou partagé, le ramasse-miettes un
+  verrou exclusif : il ne supprime rien pendant qu'une commande s'exécute,
+  et un passage trouvant le cache occupé est réarmé plus tard.
+
+Le ramasse-miettes applique un quota (shared_cache_max_mb) : fichiers pip
+les moins récemment utilisés d'abord, puis `uv cache prune`, puis
+suppression du cache uv. Les wheels trouvées dans le cache (corps HTTP et
+wheels construites par pip, archives décompressées d'uv) peuvent être
+versées dans le CacheService persistant de gestvenv.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+import zipfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ...utils.async_utils import run_in_executor
+from .exceptions import TimeoutException
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrous limités au processus courant
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+GC_LOCK = "gc.lock"
+PIP_LOCK = "pip.lock"
+WARMED_INDEX = "warmed.json"
+
+# Attente entre deux tentatives de verrouillage
+LOCK_POLL_INTERVAL = 0.05
+
+# Après dépassement du quota, le cache est ramené à cette fraction
+GC_TARGET_RATIO = 0.8
+
+# Délai avant un nouveau passage du ramasse-miettes quand le cache est occupé
+GC_RETRY_INTERVAL = 30.0
+
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+class _FileLock:
+    """Verrou fichier partagé/exclusif (flock), attente asynchrone par scrutation"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self, exclusive: bool) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            self._fd = fd
+            return True
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def acquire(self, exclusive: bool, timeout: Optional[float] = None) -> None:
+        """Attente du verrou, bornée par timeout (secondes) si fourni
+
+        Raises:
+            TimeoutException: Verrou toujours détenu à l'échéance
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(exclusive):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutException(f"Verrou {self.path.name} toujours occupé après {timeout}s")
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            # La fermeture libère le verrou
+            os.close(self._fd)
+            self._fd = None
+
+
+def is_pip_command(command: Union[str, Sequence[str]]) -> bool:
+    """Indique si une commande invoque pip (pip, pip3, pip3.11, python -m pip)
+
+    `uv pip` utilise le cache d'uv et n'est pas concerné.
+    """
+    words = command.split() if isinstance(command, str) else [str(part) for part in command]
+    previous = ""
+    for word in words:
+        name = os.path.basename(word)
+        if previous == "-m" and word == "pip":
+            return True
+        if os.path.basename(previous) != "uv" and (
+            name == "pip" or (name.startswith("pip") and name[3:].replace(".", "").isdigit())
+        ):
+            return True
+        previous = word
+    return False
+
+
+def uses_package_cache(command: Union[str, Sequence[str]]) -> bool:
+    """Indique si une commande utilise le cache partagé (pip ou uv/uvx)"""
+    if is_pip_command(command):
+        return True
+    words = command.split() if isinstance(command, str) else [str(part) for part in command]
+    previous = ""
+    for word in words:
+        if os.path.basename(word) in ("uv", "uvx") or (previous == "-m" and word == "uv"):
+            return True
+        previous = word
+    return False
+
+
+def _wheel_metadata(names: List[str], read) -> Optional[Tuple[str, str, str]]:
+    """(nom, version, plateforme) d'une wheel d'après son répertoire .dist-info"""
+    for name in names:
+        parts = name.split("/")
+        if len(parts) == 2 and parts[1] == "WHEEL" and parts[0].endswith(".dist-info"):
+            package, _, version = parts[0][:-len(".dist-info")].rpartition("-")
+            platform = "any"
+            for line in read(name).decode("utf-8", errors="replace").splitlines():
+                if line.startswith("Tag:"):
+                    platform = line.split(":", 1)[1].strip().rsplit("-", 1)[-1]
+                    break
+            if package and version:
+                return package, version, platform
+    return None
+
+
+class SharedPackageCache:
+    """Cache uv/pip partagé, verrouillé, borné et relié au cache persistant"""
+
+    def __init__(self, root: Path, max_mb: int = 4096):
+        self.root = Path(root)
+        self.max_mb = max_mb
+        self.collections = 0
+        self.bytes_collected = 0
+        self.warmed = 0
+        # Dernier passage du ramasse-miettes reporté (cache occupé)
+        self.gc_pending = False
+
+    @property
+    def pip_dir(self) -> Path:
+        return self.root / "pip"
+
+    @property
+    def uv_dir(self) -> Path:
+        return self.root / "uv"
+
+    def env_vars(self, pip_dir: Optional[str] = None, uv_dir: Optional[str] = None) -> Dict[str, str]:
+        """Variables pointant pip et uv vers le cache (chemins de montage en container)"""
+        return {
+            "PIP_CACHE_DIR": pip_dir or str(self.pip_dir),
+            "UV_CACHE_DIR": uv_dir or str(self.uv_dir),
+        }
+
+    def ensure(self) -> None:
+        self.pip_dir.mkdir(parents=True, exist_ok=True)
+        self.uv_dir.mkdir(parents=True, exist_ok=True)
+
+    @asynccontextmanager
+    async def access(self, pip: bool = False, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Accès au cache le temps d'une commande
+
+        Verrou partagé (bloque le ramasse-miettes) ; verrou pip exclusif en
+        plus pour les commandes pip.
+
+        Args:
+            pip: Commande pip (sérialisée avec les autres commandes pip)
+            timeout: Attente maximale des verrous, en secondes
+
+        Raises:
+            TimeoutException: Verrous non obtenus dans le délai
+        """
+        self.ensure()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        shared = _FileLock(self.root / GC_LOCK)
+        await shared.acquire(exclusive=False, timeout=timeout)
+        pip_lock = _FileLock(self.root / PIP_LOCK) if pip else None
+        try:
+            if pip_lock is not None:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                await pip_lock.acquire(exclusive=True, timeout=remaining)
+            yield
+        finally:
+            if pip_lock is not None:
+                pip_lock.release()
+            shared.release()
+
+    # === QUOTA ===
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._files(self.root))
+
+    def collect(self) -> int:
+        """Ramène le cache sous le quota
+
+        Si une commande utilise le cache, rien n'est supprimé et le passage
+        est marqué en attente (gc_pending) pour être repris par maintain().
+
+        Returns:
+            Octets libérés
+        """
+        lock = _FileLock(self.root / GC_LOCK)
+        if not self.root.exists():
+            return 0
+        if not lock.try_acquire(exclusive=True):
+            self.gc_pending = True
+            return 0
+        self.gc_pending = False
+        try:
+            quota = self.max_mb * 1024 * 1024
+            total = self.size()
+            if total <= quota:
+                return 0
+            target = int(quota * GC_TARGET_RATIO)
+            freed = 0
+
+            # Entrées pip indépendantes : les moins récemment utilisées d'abord
+            for path, size, _ in sorted(self._files(self.pip_dir), key=lambda item: item[2]):
+                if total - freed <= target:
+                    break
+                try:
+                    path.unlink()
+                    freed += size
+                except OSError:
+                    continue
+
+            # Le cache uv n'est réduit que par uv lui-même, ou en entier
+            if total - freed > target and self.uv_dir.exists():
+                freed += self._shrink_uv(target, total - freed)
+
+            self.collections += 1
+            self.bytes_collected += freed
+            logger.info(f"Shared package cache: freed {freed / (1024 * 1024):.1f} MB")
+            return freed
+        finally:
+            lock.release()
+
+    def _shrink_uv(self, target: int, current: int) -> int:
+        before = sum(size for _, size, _ in self._files(self.uv_dir))
+        uv = shutil.which("uv")
+        if uv:
+            try:
+                subprocess.run(
+                    [uv, "cache", "prune", "--cache-dir", str(self.uv_dir)],
+                    capture_output=True, timeout=300, check=False
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.debug(f"uv cache prune failed: {e}")
+        after = sum(size for _, size, _ in self._files(self.uv_dir))
+        if current - (before - after) > target:
+            shutil.rmtree(self.uv_dir, ignore_errors=True)
+            self.uv_dir.mkdir(parents=True, exist_ok=True)
+            after = 0
+        return before - after
+
+    @staticmethod
+    def _files(root: Path) -> Iterator[Tuple[Path, int, float]]:
+        """(chemin, taille, dernier usage) des fichiers sous root"""
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                try:
+                    stat = path.lstat()
+                except OSError:
+                    continue
+                yield path, stat.st_size, max(stat.st_atime, stat.st_mtime)
+
+    # === RÉCHAUFFEMENT DU CACHE PERSISTANT ===
+
+    def warm(self, cache_service: Any) -> int:
+        """Verse dans cache_service les wheels apparues dans le cache partagé
+
+        Seules les entrées nouvelles ou modifiées depuis le dernier passage
+        sont lues (index warmed.json).
+
+        Returns:
+            Nombre de wheels ajoutées
+        """
+        if cache_service is None or not getattr(cache_service, "enabled", True):
+            return 0
+        index_path = self.root / WARMED_INDEX
+        try:
+            seen: Dict[str, float] = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            seen = {}
+
+        current: Dict[str, float] = {}
+        added = 0
+        for key, mtime, source in self._wheel_sources():
+            current[key] = mtime
+            if seen.get(key) == mtime:
+                continue
+            wheel = source()
+            if wheel is None:
+                continue
+            (package, version, platform), data, backend = wheel
+            if cache_service.is_package_cached(package, version, platform):
+                continue
+            if cache_service.cache_package(package, version, platform, data, backend=backend):
+                added += 1
+
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            index_path.write_text(json.dumps(current))
+        except OSError as e:
+            logger.debug(f"Could not save warmed index: {e}")
+        self.warmed += added
+        if added:
+            logger.info(f"Warmed persistent cache with {added} wheel(s) from ephemeral runs")
+        return added
+
+    def _wheel_sources(self):
+        """(clé, mtime, lecteur) des wheels candidates du cache partagé"""
+        for path, size, _ in self._files(self.pip_dir):
+            if size < len(_ZIP_MAGIC):
+                continue
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            yield str(path.relative_to(self.root)), mtime, lambda path=path: self._read_wheel_file(path)
+
+        # uv : archives décompressées (archive-v*/<id>/<nom>.dist-info/WHEEL)
+        if self.uv_dir.exists():
+            for bucket in self.uv_dir.glob("archive-v*"):
+                for archive in bucket.iterdir():
+                    if not archive.is_dir():
+                        continue
+                    try:
+                        mtime = archive.stat().st_mtime
+                    except OSError:
+                        continue
+                    yield (str(archive.relative_to(self.root)), mtime,
+                           lambda archive=archive: self._zip_directory(archive))
+
+    @staticmethod
+    def _read_wheel_file(path: Path):
+        try:
+            with open(path, "rb") as handle:
+                if handle.read(len(_ZIP_MAGIC)) != _ZIP_MAGIC:
+                    return None
+            data = path.read_bytes()
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                metadata = _wheel_metadata(archive.namelist(), archive.read)
+        except (OSError, zipfile.BadZipFile):
+            return None
+        return (metadata, data, "pip") if metadata else None
+
+    @staticmethod
+    def _zip_directory(root: Path):
+        files = sorted(
+            path.relative_to(root).as_posix()
+            for path in root.rglob("*") if path.is_file()
+        )
+        metadata = _wheel_metadata(files, lambda name: (root / name).read_bytes())
+        if metadata is None:
+            return None
+        buffer = io.BytesIO()
+        try:
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name in files:
+                    archive.write(root / name, name)
+        except OSError:
+            return None
+        return metadata, buffer.getvalue(), "uv"
+
+    async def maintain(self, cache_service: Any = None) -> Dict[str, int]:
+        """Réchauffement du cache persistant puis application du quota
+
+        Un cache occupé ne dispense pas du quota : le ramasse-miettes est
+        retenté tous les GC_RETRY_INTERVAL jusqu'à obtenir le verrou exclusif.
+        """
+        warmed = await run_in_executor(self.warm, cache_service)
+        freed = await run_in_executor(self.collect)
+        while self.gc_pending:
+            await asyncio.sleep(GC_RETRY_INTERVAL)
+            freed += await run_in_executor(self.collect)
+        return {"warmed": warmed, "freed_bytes": freed}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.root),
+            "size_mb": self.size() / (1024 * 1024) if self.root.exists() else 0.0,
+            "max_mb": self.max_mb,
+            "collections": self.collections,
+            "collected_mb": self.bytes_collected / (1024 * 1024),
+            "warmed_wheels": self.warmed,
+        }
@@ -125,7 +125,8 @@ class StorageManager:
         
         try:
             for item in self.storage_path.iterdir():
-                if item.is_dir():
+                # Répertoires internes (cache de templates)
+                if item.is_dir() and not item.name.startswith("."):
                     # Vérification si le répertoire est orphelin
                     # (aucun processus actif, pas de lock file, etc.)
                     if await self._is_orphaned_directory(item):
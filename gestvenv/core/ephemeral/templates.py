@@ -0,0 +1,281 @@
+"""
+Cache de templates pour environnements éphémères
+
+Un template est un venv pré-construit (interpréteur, outils d'installation et
+packages demandés) identifié par (version Python, backend, ensemble trié des
+packages). Le premier environnement d'une combinaison construit le template ;
+les suivants en reçoivent un clone (reflink ou liens physiques) dans leur
+répertoire de stockage, sans accès réseau ni réinstallation.
+
+Les templates sont rangés sous <stockage>/.templates, sur le même système de
+fichiers que les environnements (condition des liens physiques), et évincés
+par ordre d'utilisation (LRU) au-delà de la taille ou du nombre maximal.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+from ...utils.async_utils import run_in_executor
+from ...utils.requirements_parser import parse_requirement
+from ...utils.venv_clone import CloneStats, clone_venv, relocate_venv
+from .models import EphemeralConfig
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIRNAME = ".templates"
+INDEX_FILENAME = "index.json"
+BUILDING_MARKER = ".building-"
+
+# Construit un venv complet (packages inclus) au chemin donné
+TemplateBuilder = Callable[[Path], Awaitable[None]]
+
+
+def _canonical_requirement(spec: str) -> str:
+    """Forme canonique d'une spécification (nom normalisé, extras triés)"""
+    parsed = parse_requirement(spec.strip())
+    if parsed is None:
+        return spec.strip()
+    canonical = parsed.normalized_name
+    if parsed.extras:
+        canonical += "[" + ",".join(sorted(parsed.extras)) + "]"
+    if parsed.url:
+        canonical += f" @ {parsed.url}"
+    canonical += ",".join(sorted(filter(None, parsed.specifier.split(","))))
+    if parsed.marker:
+        canonical += f" ; {parsed.marker}"
+    return canonical
+
+
+def template_key(python_version: str, backend: str, packages: Iterable[str]) -> str:
+    """Clé d'un template : empreinte de (version Python, backend, packages triés)"""
+    canonical = sorted({_canonical_requirement(p) for p in packages if p and p.strip()})
+    payload = json.dumps([str(python_version), backend, canonical], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _tree_size(path: Path) -> int:
+    """Taille d'une arborescence (fichiers liés comptés une fois)"""
+    seen = set()
+    total = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+            total += st.st_size
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class TemplateCache:
+    """Cache LRU de venvs pré-construits, clonés à chaque création"""
+
+    def __init__(self, config: EphemeralConfig, storage_root: Callable[[], Path]):
+        self.config = config
+        self._storage_root = storage_root
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._in_use: Dict[str, int] = {}
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def root(self) -> Path:
+        return self._storage_root() / TEMPLATES_DIRNAME
+
+    @property
+    def max_bytes(self) -> int:
+        return self.config.template_cache_max_mb * 1024 * 1024
+
+    def template_path(self, key: str) -> Path:
+        return self.root / key / "venv"
+
+    async def materialize(
+        self,
+        python_version: str,
+        backend: str,
+        packages: Iterable[str],
+        target: Path,
+        builder: TemplateBuilder
+    ) -> CloneStats:
+        """Clone le template correspondant vers target, en le construisant au besoin
+
+        Args:
+            python_version: Version Python de l'environnement
+            backend: Nom du backend (uv, pip, ...)
+            packages: Packages à pré-installer
+            target: Chemin du venv à créer (ne doit pas exister)
+            builder: Construction d'un venv complet, appelée au premier usage
+
+        Returns:
+            CloneStats du clonage
+        """
+        packages = list(packages)
+        key = template_key(python_version, backend, packages)
+        self._load()
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and not (self.template_path(key) / "pyvenv.cfg").is_file():
+                self._entries.pop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                entry = await self._build(key, python_version, backend, packages, builder)
+            else:
+                self.hits += 1
+
+            entry["last_used"] = time.time()
+            entry["uses"] = entry.get("uses", 0) + 1
+            self._entries.move_to_end(key)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+
+        try:
+            stats = await run_in_executor(clone_venv, self.template_path(key), target)
+        finally:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+            await self._evict()
+            self._save()
+
+        logger.debug(
+            f"Template {key} cloned to {target} ({stats.strategy}, {stats.duration:.3f}s)"
+        )
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du cache"""
+        self._load()
+        return {
+            "entries": len(self._entries),
+            "size_mb": sum(e.get("size_bytes", 0) for e in self._entries.values()) / (1024 * 1024),
+            "max_mb": self.config.template_cache_max_mb,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def _build(
+        self,
+        key: str,
+        python_version: str,
+        backend: str,
+        packages: list,
+        builder: TemplateBuilder
+    ) -> Dict[str, Any]:
+        """Construit un template dans un répertoire temporaire puis le publie"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f"{key}{BUILDING_MARKER}{os.getpid()}"
+        final = self.root / key
+        await run_in_executor(shutil.rmtree, staging, ignore_errors=True)
+        await run_in_executor(shutil.rmtree, final, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        start = time.perf_counter()
+        try:
+            await builder(staging / "venv")
+            os.replace(staging, final)
+            # Chemins absolus du répertoire de construction -> emplacement définitif
+            await run_in_executor(relocate_venv, final / "venv", [str(staging / "venv")])
+        except BaseException:
+            await run_in_executor(shutil.rmtree, staging, ignore_errors=True)
+            raise
+
+        entry = {
+            "python_version": str(python_version),
+            "backend": backend,
+            "packages": sorted(packages),
+            "size_bytes": await run_in_executor(_tree_size, final),
+            "build_time": time.perf_counter() - start,
+            "created_at": time.time(),
+            "uses": 0,
+        }
+        self._entries[key] = entry
+        logger.info(
+            f"Built ephemeral template {key} (Python {python_version}, {backend}, "
+            f"{len(packages)} package(s)) in {entry['build_time']:.2f}s"
+        )
+        return entry
+
+    async def _evict(self) -> None:
+        """Évince les templates les moins récemment utilisés au-delà des limites"""
+        total = sum(e.get("size_bytes", 0) for e in self._entries.values())
+        for key in list(self._entries):
+            over_size = total > self.max_bytes
+            over_count = len(self._entries) > self.config.template_cache_max_entries
+            if not (over_size or over_count):
+                break
+            lock = self._locks.get(key)
+            if key in self._in_use or (lock is not None and lock.locked()):
+                continue
+            entry = self._entries.pop(key)
+            total -= entry.get("size_bytes", 0)
+            self._locks.pop(key, None)
+            self.evictions += 1
+            logger.debug(f"Evicting ephemeral template {key}")
+            # Les clones existants restent valides (reflinks / liens physiques)
+            await run_in_executor(shutil.rmtree, self.root / key, ignore_errors=True)
+
+    def _load(self) -> None:
+        """Chargement de l'index (entrées triées par dernière utilisation)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        index_path = self.root / INDEX_FILENAME
+        try:
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+
+        entries = sorted(
+            (item for item in data.items() if isinstance(item[1], dict)),
+            key=lambda item: item[1].get("last_used", 0)
+        )
+        for key, entry in entries:
+            if (self.template_path(key) / "pyvenv.cfg").is_file():
+                self._entries[key] = entry
+
+        if not self.root.is_dir():
+            return
+        for item in self.root.iterdir():
+            # Constructions interrompues d'un processus disparu
+            name, marker, pid = item.name.partition(BUILDING_MARKER)
+            if marker and pid.isdigit() and not _pid_alive(int(pid)):
+                shutil.rmtree(item, ignore_errors=True)
+
+    def _save(self) -> None:
+        """Écriture atomique de l'index"""
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            index_path = self.root / INDEX_FILENAME
+            tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(self._entries, indent=2), encoding="utf-8")
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.debug(f"Failed to save template index: {e}")
@@ -11,7 +11,8 @@ Hiérarchie des exceptions :
   ├── MigrationError (migration)
   ├── CacheError (cache)
   ├── TemplateError (templates)
-  └── DiagnosticError (diagnostic)
+  ├── DiagnosticError (diagnostic)
+  └── LockTimeoutError (verrous inter-processus)
 """
 
 from typing import Optional, Dict, Any, List
@@ -120,6 +121,16 @@ class DiagnosticError(GestVenvError):
         self.environment_name = environment_name
 
 
+class LockTimeoutError(GestVenvError):
+    """Verrou inter-processus non obtenu dans le délai imparti"""
+    
+    def __init__(self, message: str, lock_path: Optional[str] = None,
+                 holder: Optional[Dict[str, Any]] = None, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, details)
+        self.lock_path = lock_path
+        self.holder = holder
+
+
 class BackendNotAvailableError(BackendError):
     """Backend non disponible sur le système"""
     pass
@@ -135,6 +146,11 @@ class EnvironmentExistsError(EnvironmentError):
     pass
 
 
+class SnapshotError(EnvironmentError):
+    """Archive d'instantané invalide, corrompue ou incompatible"""
+    pass
+
+
 class PackageInstallationError(BackendError):
     """Erreur d'installation de package"""
     
@@ -50,6 +50,7 @@ class ExportFormat(Enum):
     YAML = "yaml"
     POETRY = "poetry"
     CONDA = "conda"
+    SNAPSHOT = "snapshot"
 
 
 class IssueLevel(Enum):
@@ -279,13 +280,14 @@ class EnvironmentInfo:
         if not self.pyproject_info:
             return False
         
-        expected_packages = set(
-            dep.split('>=')[0].split('==')[0].split('[')[0] 
-            for dep in self.pyproject_info.dependencies
-        )
-        installed_packages = set(pkg.name for pkg in self.packages)
+        from ..utils.sync_planner import plan_sync
         
-        return expected_packages != installed_packages
+        plan = plan_sync(
+            self.pyproject_info.dependencies,
+            {pkg.name: pkg.version for pkg in self.packages},
+            python_version=self.python_version
+        )
+        return not plan.is_empty
 
 
 @dataclass
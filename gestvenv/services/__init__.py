@@ -7,6 +7,7 @@ Ce module contient tous les services de logique métier :
 - MigrationService : Migration et conversion de formats
 - SystemService : Intégration système et commandes
 - DiagnosticService : Diagnostic et réparation automatique
+- DiagnosticScheduler : Vérifications parallèles et incrémentales
 - TemplateService : Gestion des templates de projets
 """
 
@@ -15,6 +16,7 @@ from .cache_service import CacheService
 from .migration_service import MigrationService
 from .system_service import SystemService
 from .diagnostic_service import DiagnosticService
+from .diagnostic_scheduler import DiagnosticScheduler
 from .template_service import TemplateService
 
 __all__ = [
@@ -23,6 +25,7 @@ __all__ = [
     "MigrationService",
     "SystemService",
     "DiagnosticService",
+    "DiagnosticScheduler",
     "TemplateService",
 ]
 
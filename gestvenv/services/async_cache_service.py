@@ -13,9 +13,10 @@ import json
 import logging
 import os
 import shutil
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 from ..core.models import (
     Config,
@@ -30,6 +31,7 @@ from ..utils.async_utils import (
     AsyncCache,
     gather_with_concurrency,
 )
+from ..utils.file_locks import cache_entry_lock, cache_index_lock, write_json_atomic
 from ..utils.retry import retry, RETRY_CACHE
 from ..utils.error_handling import (
     ErrorCode,
@@ -57,7 +59,8 @@ class AsyncCacheService:
         self.index_path = self.cache_path / "index.json"
         self.stats_path = self.cache_path / "stats.json"
 
-        # Locks pour accès concurrents
+        # Locks pour accès concurrents : asyncio dans le processus, doublés de
+        # verrous fichier (file_locks) pour les autres processus gestvenv
         self._index_lock = AsyncLock()
         self._stats_lock = AsyncLock()
         self._file_locks: Dict[str, AsyncLock] = {}
@@ -110,8 +113,7 @@ class AsyncCacheService:
                 await self._make_space_for(len(data))
 
             # Lock pour ce fichier spécifique
-            file_lock = self._get_file_lock(cache_key)
-            async with file_lock:
+            async with self._entry_lock(cache_key):
                 # Chemins
                 backend_dir = self.packages_path / backend
                 await run_in_executor(backend_dir.mkdir, parents=True, exist_ok=True)
@@ -140,9 +142,7 @@ class AsyncCacheService:
                     "last_used": datetime.now().isoformat()
                 }
 
-                await run_in_executor(self.metadata_path.mkdir, parents=True, exist_ok=True)
-                async with aiofiles.open(metadata_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(metadata, indent=2))
+                await run_in_executor(write_json_atomic, metadata_file, metadata, indent=2)
 
                 # Mise à jour index
                 await self._update_cache_index(cache_key, metadata)
@@ -375,13 +375,11 @@ class AsyncCacheService:
                 return await self._cleanup_lru()
             else:
                 # Nettoyage complet
-                if self.cache_path.exists():
-                    await run_in_executor(shutil.rmtree, self.cache_path)
-                await self._ensure_cache_structure()
-
-                async with self._index_lock:
+                async with self._index_lock, self._stats_lock, cache_index_lock():
+                    if self.cache_path.exists():
+                        await run_in_executor(shutil.rmtree, self.cache_path)
+                    await run_in_executor(self._write_cache_structure)
                     self._cache_index = {}
-                async with self._stats_lock:
                     self._stats = self._init_stats()
 
                 await self._memory_cache.clear()
@@ -559,6 +557,29 @@ class AsyncCacheService:
             self._file_locks[cache_key] = AsyncLock(timeout=30)
         return self._file_locks[cache_key]
 
+    @asynccontextmanager
+    async def _entry_lock(self, cache_key: str, exclusive: bool = True) -> AsyncIterator[None]:
+        """Verrou d'une entrée, dans le processus puis entre processus
+
+        Une lecture (partagée) ne prend que le verrou fichier : les lectures
+        concurrentes d'une même entrée ne se bloquent pas.
+        """
+        if not exclusive:
+            async with cache_entry_lock(cache_key, exclusive=False):
+                yield
+            return
+        async with self._get_file_lock(cache_key):
+            async with cache_entry_lock(cache_key):
+                yield
+
+    def _write_cache_structure(self) -> None:
+        """Répertoires, index et statistiques vides (appelé sous verrou de l'index)"""
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        self.packages_path.mkdir(exist_ok=True)
+        self.metadata_path.mkdir(exist_ok=True)
+        write_json_atomic(self.index_path, {}, indent=2)
+        write_json_atomic(self.stats_path, self._init_stats(), indent=2)
+
     async def _ensure_cache_structure(self) -> None:
         """Assure la structure du cache"""
         await run_in_executor(self.cache_path.mkdir, parents=True, exist_ok=True)
@@ -612,15 +633,31 @@ class AsyncCacheService:
             logger.warning(f"Erreur chargement index: {e}")
         return {}
 
-    async def _save_cache_index(self, index: Dict[str, Any] = None) -> None:
-        """Sauvegarde l'index du cache"""
+    async def _save_cache_index(self, index: Dict[str, Any]) -> None:
+        """Remplace l'index du cache (modifications : _change_cache_index)"""
         try:
-            if index is None:
-                async with self._index_lock:
-                    index = self._cache_index or {}
+            async with cache_index_lock():
+                await run_in_executor(write_json_atomic, self.index_path, index, indent=2)
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde index cache: {e}")
+
+    async def _change_cache_index(
+        self,
+        updates: Optional[Dict[str, Any]] = None,
+        removed: List[str] = ()
+    ) -> None:
+        """Modifie l'index sous verrou inter-processus (index relu avant écriture)
 
-            async with aiofiles.open(self.index_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(index, indent=2))
+        Appelé avec self._index_lock détenu.
+        """
+        try:
+            async with cache_index_lock():
+                index = await self._load_cache_index()
+                index.update(updates or {})
+                for cache_key in removed:
+                    index.pop(cache_key, None)
+                self._cache_index = index
+                await run_in_executor(write_json_atomic, self.index_path, index, indent=2)
         except Exception as e:
             logger.error(f"Erreur sauvegarde index cache: {e}")
 
@@ -646,38 +683,39 @@ class AsyncCacheService:
             "created_at": datetime.now().isoformat()
         }
 
-    async def _save_cache_stats(self, stats: Dict[str, Any] = None) -> None:
-        """Sauvegarde les statistiques"""
+    async def _save_cache_stats(self, stats: Dict[str, Any]) -> None:
+        """Remplace les statistiques (compteurs : _update_stats)"""
         try:
-            if stats is None:
-                async with self._stats_lock:
-                    stats = self._stats or self._init_stats()
-
-            async with aiofiles.open(self.stats_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(stats, indent=2))
+            async with cache_index_lock():
+                await run_in_executor(write_json_atomic, self.stats_path, stats, indent=2)
         except Exception as e:
             logger.error(f"Erreur sauvegarde stats cache: {e}")
 
     async def _update_cache_index(self, cache_key: str, metadata: Dict[str, Any]) -> None:
         """Met à jour l'index du cache"""
         async with self._index_lock:
-            self._cache_index[cache_key] = metadata
-            await self._save_cache_index(self._cache_index)
+            await self._change_cache_index(updates={cache_key: metadata})
 
     async def _update_stats(self, operation: str, package: str, size: int) -> None:
-        """Met à jour les statistiques"""
+        """Met à jour les statistiques (compteurs relus sous verrou inter-processus)"""
         async with self._stats_lock:
-            if operation == "cache_add":
-                self._stats["packages_cached"] += 1
-                self._stats["space_saved_mb"] += size / (1024 * 1024)
-            elif operation == "cache_hit":
-                self._stats["cache_hits"] += 1
-            elif operation == "cache_miss":
-                self._stats["cache_misses"] += 1
-            elif operation == "cache_install":
-                self._stats["cache_hits"] += 1
-
-            await self._save_cache_stats(self._stats)
+            try:
+                async with cache_index_lock():
+                    stats = await self._load_cache_stats()
+                    if operation == "cache_add":
+                        stats["packages_cached"] += 1
+                        stats["space_saved_mb"] += size / (1024 * 1024)
+                    elif operation == "cache_hit":
+                        stats["cache_hits"] += 1
+                    elif operation == "cache_miss":
+                        stats["cache_misses"] += 1
+                    elif operation == "cache_install":
+                        stats["cache_hits"] += 1
+
+                    self._stats = stats
+                    await run_in_executor(write_json_atomic, self.stats_path, stats, indent=2)
+            except Exception as e:
+                logger.error(f"Erreur sauvegarde stats cache: {e}")
 
     async def _would_exceed_cache_limit(self, additional_size: int) -> bool:
         """Vérifie si l'ajout dépasserait la limite"""
@@ -736,17 +774,16 @@ class AsyncCacheService:
             metadata_file = self.metadata_path / f"{cache_key}.json"
 
             file_size = 0
-            if cache_file.exists():
-                file_size = cache_file.stat().st_size
-                await run_in_executor(cache_file.unlink)
+            async with self._entry_lock(cache_key):
+                if cache_file.exists():
+                    file_size = cache_file.stat().st_size
+                    await run_in_executor(cache_file.unlink)
 
-            if metadata_file.exists():
-                await run_in_executor(metadata_file.unlink)
+                if metadata_file.exists():
+                    await run_in_executor(metadata_file.unlink)
 
             async with self._index_lock:
-                if cache_key in self._cache_index:
-                    del self._cache_index[cache_key]
-                await self._save_cache_index(self._cache_index)
+                await self._change_cache_index(removed=[cache_key])
 
             return file_size
 
@@ -766,11 +803,12 @@ class AsyncCacheService:
             backend = metadata.get("backend", "pip")
             cache_file = self.packages_path / backend / f"{cache_key}.whl"
 
-            if not cache_file.exists():
-                return None
+            async with self._entry_lock(cache_key, exclusive=False):
+                if not cache_file.exists():
+                    return None
 
-            async with aiofiles.open(cache_file, 'rb') as f:
-                data = await f.read()
+                async with aiofiles.open(cache_file, 'rb') as f:
+                    data = await f.read()
 
             if metadata.get("compressed", False):
                 data = await run_in_executor(self._decompress_data, data)
@@ -838,6 +876,6 @@ class async_cache_context:
         return self.service
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        # Sauvegarde finale des stats
-        await self.service._save_cache_stats()
-        await self.service._save_cache_index()
+        # Rien à sauvegarder : index et statistiques sont écrits à chaque
+        # modification (relus sous verrou, sans écraser les autres processus)
+        pass
@@ -9,10 +9,11 @@ import logging
 import os
 import shutil
 import subprocess
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 
 import tempfile
 from ..core.models import (
@@ -23,6 +24,7 @@ from ..core.models import (
     CacheAddResult
 )
 from ..core.exceptions import CacheError
+from ..utils.file_locks import cache_entry_lock, cache_index_lock, write_json_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +46,10 @@ class CacheService:
         self.index_path = self.cache_path / "index.json"
         self.stats_path = self.cache_path / "stats.json"
         
-        # Index et stats en mémoire
+        # Index et stats en mémoire (partagés entre threads : opérations multi-environnements).
+        # Entre processus : verrou de l'index, relecture du fichier avant chaque
+        # écriture, verrou par entrée pour les fichiers de packages
+        self._lock = threading.RLock()
         self._cache_index = self._load_cache_index()
         self._stats = self._load_cache_stats()
         
@@ -65,46 +70,12 @@ class CacheService:
         try:
             cache_key = self._generate_cache_key(package, version, platform)
             
-            # Vérification taille avant ajout
-            if self._would_exceed_cache_limit(len(data)):
-                self._make_space_for(len(data))
-            
-            # Chemins
-            backend_dir = self.packages_path / backend
-            backend_dir.mkdir(parents=True, exist_ok=True)
-            
-            cache_file = backend_dir / f"{cache_key}.whl"
-            metadata_file = self.metadata_path / f"{cache_key}.json"
-            
-            # Compression si activée
+            # Compression si activée (hors verrou)
             if self.compression:
                 data = self._compress_data(data)
             
-            # Sauvegarde fichier
-            cache_file.write_bytes(data)
-            
-            # Métadonnées
-            metadata = {
-                "package": package,
-                "version": version,
-                "platform": platform,
-                "backend": backend,
-                "cached_at": datetime.now().isoformat(),
-                "file_size": len(data),
-                "compressed": self.compression,
-                "checksum": self._calculate_checksum(data),
-                "last_used": datetime.now().isoformat()
-            }
-            
-            self.metadata_path.mkdir(parents=True, exist_ok=True)
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-            
-            # Mise à jour index
-            self._update_cache_index(cache_key, metadata)
-            
-            # Statistiques
-            self._update_stats("cache_add", package, len(data))
+            with self._lock:
+                self._store_package(cache_key, package, version, platform, data, backend)
             
             logger.debug(f"Package {package}=={version} mis en cache")
             return True
@@ -113,6 +84,51 @@ class CacheService:
             logger.error(f"Erreur mise en cache {package}: {e}")
             return False
     
+    def _store_package(
+        self,
+        cache_key: str,
+        package: str,
+        version: str,
+        platform: str,
+        data: bytes,
+        backend: str
+    ) -> None:
+        """Écrit le package, ses métadonnées et met à jour l'index"""
+        # Vérification taille avant ajout
+        if self._would_exceed_cache_limit(len(data)):
+            self._make_space_for(len(data))
+        
+        # Chemins
+        backend_dir = self.packages_path / backend
+        backend_dir.mkdir(parents=True, exist_ok=True)
+        
+        cache_file = backend_dir / f"{cache_key}.whl"
+        metadata_file = self.metadata_path / f"{cache_key}.json"
+        
+        # Métadonnées
+        metadata = {
+            "package": package,
+            "version": version,
+            "platform": platform,
+            "backend": backend,
+            "cached_at": datetime.now().isoformat(),
+            "file_size": len(data),
+            "compressed": self.compression,
+            "checksum": self._calculate_checksum(data),
+            "last_used": datetime.now().isoformat()
+        }
+        
+        # Sauvegarde fichier et métadonnées
+        with cache_entry_lock(cache_key):
+            cache_file.write_bytes(data)
+            write_json_atomic(metadata_file, metadata, indent=2)
+        
+        # Mise à jour index
+        self._update_cache_index(cache_key, metadata)
+        
+        # Statistiques
+        self._update_stats("cache_add", package, len(data))
+    
     def get_cached_package(
         self, 
         package: str, 
@@ -396,11 +412,12 @@ class CacheService:
                 return self._cleanup_lru()
             else:
                 # Nettoyage complet
-                if self.cache_path.exists():
-                    shutil.rmtree(self.cache_path)
-                self._ensure_cache_structure()
-                self._cache_index = {}
-                self._stats = self._init_stats()
+                with cache_index_lock():
+                    if self.cache_path.exists():
+                        shutil.rmtree(self.cache_path)
+                    self._cache_index = {}
+                    self._stats = self._init_stats()
+                    self._ensure_cache_structure()
                 return True
         except Exception as e:
             logger.error(f"Erreur nettoyage cache: {e}")
@@ -583,8 +600,29 @@ class CacheService:
     def _save_cache_index(self) -> None:
         """Sauvegarde l'index du cache"""
         try:
-            with open(self.index_path, 'w', encoding='utf-8') as f:
-                json.dump(self._cache_index, f, indent=2)
+            with cache_index_lock():
+                write_json_atomic(self.index_path, self._cache_index, indent=2)
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde index cache: {e}")
+    
+    def _change_cache_index(
+        self,
+        updates: Optional[Dict[str, Any]] = None,
+        removed: Iterable[str] = ()
+    ) -> None:
+        """Modifie l'index sous verrou inter-processus
+        
+        L'index est relu avant écriture : les entrées ajoutées ou retirées
+        par d'autres processus depuis le chargement sont conservées.
+        """
+        try:
+            with cache_index_lock():
+                index = self._load_cache_index()
+                index.update(updates or {})
+                for cache_key in removed:
+                    index.pop(cache_key, None)
+                self._cache_index = index
+                write_json_atomic(self.index_path, index, indent=2)
         except Exception as e:
             logger.error(f"Erreur sauvegarde index cache: {e}")
     
@@ -612,29 +650,34 @@ class CacheService:
     def _save_cache_stats(self) -> None:
         """Sauvegarde les statistiques"""
         try:
-            with open(self.stats_path, 'w', encoding='utf-8') as f:
-                json.dump(self._stats, f, indent=2)
+            with cache_index_lock():
+                write_json_atomic(self.stats_path, self._stats, indent=2)
         except Exception as e:
             logger.error(f"Erreur sauvegarde stats cache: {e}")
     
     def _update_cache_index(self, cache_key: str, metadata: Dict[str, Any]) -> None:
         """Met à jour l'index du cache"""
-        self._cache_index[cache_key] = metadata
-        self._save_cache_index()
+        self._change_cache_index(updates={cache_key: metadata})
     
     def _update_stats(self, operation: str, package: str, size: int) -> None:
-        """Met à jour les statistiques"""
-        if operation == "cache_add":
-            self._stats["packages_cached"] += 1
-            self._stats["space_saved_mb"] += size / (1024 * 1024)
-        elif operation == "cache_hit":
-            self._stats["cache_hits"] += 1
-        elif operation == "cache_miss":
-            self._stats["cache_misses"] += 1
-        elif operation == "cache_install":
-            self._stats["cache_hits"] += 1
-        
-        self._save_cache_stats()
+        """Met à jour les statistiques (compteurs relus sous verrou inter-processus)"""
+        try:
+            with cache_index_lock():
+                stats = self._load_cache_stats()
+                if operation == "cache_add":
+                    stats["packages_cached"] += 1
+                    stats["space_saved_mb"] += size / (1024 * 1024)
+                elif operation == "cache_hit":
+                    stats["cache_hits"] += 1
+                elif operation == "cache_miss":
+                    stats["cache_misses"] += 1
+                elif operation == "cache_install":
+                    stats["cache_hits"] += 1
+                
+                self._stats = stats
+                write_json_atomic(self.stats_path, stats, indent=2)
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde stats cache: {e}")
     
     def _would_exceed_cache_limit(self, additional_size: int) -> bool:
         """Vérifie si l'ajout dépasserait la limite"""
@@ -693,16 +736,16 @@ class CacheService:
             metadata_file = self.metadata_path / f"{cache_key}.json"
             
             file_size = 0
-            if cache_file.exists():
-                file_size = cache_file.stat().st_size
-                cache_file.unlink()
-            
-            if metadata_file.exists():
-                metadata_file.unlink()
+            with cache_entry_lock(cache_key):
+                if cache_file.exists():
+                    file_size = cache_file.stat().st_size
+                    cache_file.unlink()
+                
+                if metadata_file.exists():
+                    metadata_file.unlink()
             
             # Suppression de l'index
-            del self._cache_index[cache_key]
-            self._save_cache_index()
+            self._change_cache_index(removed=[cache_key])
             
             return file_size
             
@@ -720,10 +763,11 @@ class CacheService:
             backend = metadata.get("backend", "pip")
             cache_file = self.packages_path / backend / f"{cache_key}.whl"
             
-            if not cache_file.exists():
-                return None
-            
-            data = cache_file.read_bytes()
+            # Verrou partagé : l'entrée n'est ni réécrite ni supprimée pendant la lecture
+            with cache_entry_lock(cache_key, exclusive=False):
+                if not cache_file.exists():
+                    return None
+                data = cache_file.read_bytes()
             
             # Décompression si nécessaire
             if metadata.get("compressed", False):
@@ -786,9 +830,12 @@ class CacheService:
     def _cleanup_orphaned_metadata(self) -> None:
         """Nettoie les métadonnées orphelines"""
         try:
-            for metadata_file in self.metadata_path.glob("*.json"):
-                cache_key = metadata_file.stem
-                if cache_key not in self._cache_index:
-                    metadata_file.unlink()
+            # Index relu : une entrée ajoutée par un autre processus n'est pas orpheline
+            with cache_index_lock():
+                self._cache_index = self._load_cache_index()
+                for metadata_file in self.metadata_path.glob("*.json"):
+                    cache_key = metadata_file.stem
+                    if cache_key not in self._cache_index:
+                        metadata_file.unlink()
         except Exception as e:
             logger.error(f"Erreur nettoyage métadonnées orphelines: {e}")
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Planification incrémentale des diagnostics pour GestVenv
+
+Les vérifications par environnement s'exécutent en parallèle et leurs
+résultats sont conservés (fichier JSON) avec l'empreinte de leurs entrées :
+- mtime de pyvenv.cfg, des répertoires site-packages et de l'exécutable Python ;
+- métadonnées utiles (backend, dépendances déclarées, packages installés).
+
+Chaque vérificateur déclare les entrées dont il dépend (attribut `inputs`) ;
+une vérification n'est relancée que si l'une d'elles a changé, sauf
+exécution complète demandée. Le rafraîchissement périodique est assuré par
+l'API web (HealthService), qui relance `gestvenv doctor` à intervalle
+régulier : seules les vérifications dont les entrées ont changé s'exécutent.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ..core.models import DiagnosticIssue, EnvironmentInfo, IssueLevel
+from ..utils.fanout import default_jobs
+from ..utils.sync_planner import _site_packages_dirs
+
+logger = logging.getLogger(__name__)
+
+# Version du format du fichier de résultats
+STORE_VERSION = 1
+
+
+def _stat_signature(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _python_executable(env_path: Path) -> Path:
+    if os.name == 'nt':
+        return env_path / "Scripts" / "python.exe"
+    return env_path / "bin" / "python"
+
+
+def environment_inputs(env_info: EnvironmentInfo) -> Dict[str, Any]:
+    """Entrées observables d'un environnement, par nom"""
+    env_path = Path(env_info.path)
+    pyproject = env_info.pyproject_info
+    return {
+        "path": _stat_signature(env_path),
+        "pyvenv": _stat_signature(env_path / "pyvenv.cfg"),
+        "python": _stat_signature(_python_executable(env_path)),
+        "site_packages": [
+            [str(site_dir), _stat_signature(site_dir)]
+            for site_dir in _site_packages_dirs(env_path)
+        ],
+        "backend": env_info.backend_type.value,
+        "python_version": env_info.python_version,
+        "dependencies": sorted(pyproject.dependencies) if pyproject else None,
+        "packages": sorted(f"{pkg.name}=={pkg.version}" for pkg in env_info.packages),
+    }
+
+
+def check_fingerprint(checker: Any, inputs: Dict[str, Any]) -> Optional[str]:
+    """Empreinte des entrées d'un vérificateur (None : à relancer à chaque fois)"""
+    names = getattr(checker, "inputs", None)
+    if names is None:
+        return None
+    payload = json.dumps([inputs.get(name) for name in names], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _issue_to_dict(issue: DiagnosticIssue) -> Dict[str, Any]:
+    return {
+        "level": issue.level.value,
+        "category": issue.category,
+        "description": issue.description,
+        "solution": issue.solution,
+        "auto_fixable": issue.auto_fixable,
+        "metadata": issue.metadata,
+    }
+
+
+def _issue_from_dict(data: Dict[str, Any]) -> DiagnosticIssue:
+    return DiagnosticIssue(
+        level=IssueLevel(data["level"]),
+        category=data["category"],
+        description=data["description"],
+        solution=data.get("solution"),
+        auto_fixable=data.get("auto_fixable", False),
+        metadata=data.get("metadata") or {},
+    )
+
+
+@dataclass
+class CheckResult:
+    """Résultat d'une vérification sur un environnement"""
+    checker: str
+    fingerprint: Optional[str]
+    checked_at: datetime
+    issues: List[DiagnosticIssue] = field(default_factory=list)
+    error: Optional[str] = None
+    cached: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checker": self.checker,
+            "fingerprint": self.fingerprint,
+            "checked_at": self.checked_at.isoformat(),
+            "issues": [_issue_to_dict(issue) for issue in self.issues],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CheckResult':
+        return cls(
+            checker=data["checker"],
+            fingerprint=data.get("fingerprint"),
+            checked_at=datetime.fromisoformat(data["checked_at"]),
+            issues=[_issue_from_dict(issue) for issue in data.get("issues", [])],
+            cached=True,
+        )
+
+
+class DiagnosticResultStore:
+    """Résultats de vérification persistés, par environnement et vérificateur"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else Path.home() / ".gestvenv" / "cache" / "diagnostics.json"
+        self._lock = threading.Lock()
+        self._results: Optional[Dict[str, Dict[str, CheckResult]]] = None
+
+    def _loaded(self) -> Dict[str, Dict[str, CheckResult]]:
+        if self._results is None:
+            self._results = {}
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == STORE_VERSION:
+                    for env_name, checks in data.get("environments", {}).items():
+                        self._results[env_name] = {
+                            name: CheckResult.from_dict(check) for name, check in checks.items()
+                        }
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Résultats de diagnostic illisibles, ignorés: {e}")
+        return self._results
+
+    def get(self, env_name: str, checker: str) -> Optional[CheckResult]:
+        with self._lock:
+            return self._loaded().get(env_name, {}).get(checker)
+
+    def put(self, env_name: str, results: Iterable[CheckResult]) -> None:
+        """Enregistre les résultats réussis d'un environnement"""
+        with self._lock:
+            checks = self._loaded().setdefault(env_name, {})
+            for result in results:
+                if result.error is None:
+                    checks[result.checker] = result
+
+    def prune(self, env_names: Iterable[str]) -> None:
+        """Oublie les environnements absents de env_names"""
+        keep = set(env_names)
+        with self._lock:
+            results = self._loaded()
+            for env_name in [name for name in results if name not in keep]:
+                del results[env_name]
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": STORE_VERSION,
+                "environments": {
+                    env_name: {name: result.to_dict() for name, result in checks.items()}
+                    for env_name, checks in self._loaded().items()
+                },
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(data, default=str), encoding="utf-8")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Impossible d'enregistrer les résultats de diagnostic: {e}")
+
+
+class DiagnosticScheduler:
+    """Exécute les vérifications en parallèle et réutilise les résultats inchangés"""
+
+    def __init__(
+        self,
+        checkers: Sequence[Any],
+        store: Optional[DiagnosticResultStore] = None,
+        jobs: Optional[int] = None
+    ):
+        self.checkers = checkers
+        self.store = store or DiagnosticResultStore()
+        self.jobs = default_jobs(jobs)
+        self.executed = 0
+        self.reused = 0
+        self._counter_lock = threading.Lock()
+
+    def check_environment(self, env_info: EnvironmentInfo, full: bool = False) -> List[CheckResult]:
+        """Vérifications d'un environnement (relancées seulement si nécessaire)"""
+        inputs = environment_inputs(env_info)
+        results = []
+        for checker in self.checkers:
+            name = checker.__class__.__name__
+            fingerprint = check_fingerprint(checker, inputs)
+            cached = self.store.get(env_info.name, name)
+            if (not full and fingerprint is not None and cached is not None
+                    and cached.fingerprint == fingerprint):
+                results.append(replace(cached, cached=True))
+                with self._counter_lock:
+                    self.reused += 1
+                continue
+
+            result = CheckResult(checker=name, fingerprint=fingerprint, checked_at=datetime.now())
+            try:
+                result.issues = checker.check_environment(env_info)
+            except Exception as e:
+                result.error = str(e)
+            results.append(result)
+            with self._counter_lock:
+                self.executed += 1
+
+        self.store.put(env_info.name, results)
+        return results
+
+    def check_environments(
+        self,
+        environments: Sequence[EnvironmentInfo],
+        full: bool = False
+    ) -> Dict[str, List[CheckResult]]:
+        """Vérifications de plusieurs environnements en parallèle
+
+        Returns:
+            Résultats par nom d'environnement, dans l'ordre reçu
+        """
+        results: Dict[str, List[CheckResult]] = {}
+        if environments:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(self.jobs, len(environments)),
+                thread_name_prefix="gestvenv_doctor_"
+            ) as executor:
+                futures = {
+                    env.name: executor.submit(self.check_environment, env, full)
+                    for env in environments
+                }
+                results = {name: future.result() for name, future in futures.items()}
+        self.store.save()
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "reused": self.reused, "jobs": self.jobs}
@@ -21,6 +21,9 @@ from ..core.models import (
 )
 from ..core.exceptions import DiagnosticError
 from ..core.exceptions import ValidationError
+from ..utils.requirements_parser import normalize_name, requirement_name
+from ..utils.sync_planner import plan_sync
+from .diagnostic_scheduler import DiagnosticScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -37,15 +40,27 @@ class DiagnosticService:
             SecurityChecker(),
             CacheHealthChecker()
         ]
+        self._scheduler: Optional[DiagnosticScheduler] = None
         
-    def run_full_diagnostic(self, target: Optional[str] = None) -> DiagnosticReport:
-        """Diagnostic complet du système ou d'un environnement"""
+    @property
+    def scheduler(self) -> DiagnosticScheduler:
+        """Planificateur des vérifications (résultats réutilisés si inchangés)"""
+        if self._scheduler is None:
+            self._scheduler = DiagnosticScheduler(self.checkers)
+        return self._scheduler
+        
+    def run_full_diagnostic(self, target: Optional[str] = None, incremental: bool = False) -> DiagnosticReport:
+        """Diagnostic complet du système ou d'un environnement
+        
+        En mode incrémental, seules les vérifications dont les entrées ont
+        changé depuis le dernier diagnostic sont relancées.
+        """
         start_time = datetime.now()
         
         if target:
-            report = self._diagnose_environment(target)
+            report = self._diagnose_environment(target, incremental)
         else:
-            report = self._diagnose_system()
+            report = self._diagnose_system(incremental)
             
         report.execution_time = (datetime.now() - start_time).total_seconds()
         report.generated_at = datetime.now()
@@ -154,17 +169,26 @@ class DiagnosticService:
         issues = []
         
         if env_info.pyproject_info:
-            expected_packages = set(
-                dep.split('>=')[0].split('==')[0].split('[')[0] 
-                for dep in env_info.pyproject_info.dependencies
+            installed = {pkg.name: pkg.version for pkg in env_info.packages}
+            plan = plan_sync(
+                env_info.pyproject_info.dependencies,
+                installed,
+                python_version=env_info.python_version
             )
-            installed_packages = set(pkg.name for pkg in env_info.packages)
             
-            missing = expected_packages - installed_packages
-            if missing:
+            if plan.install:
+                missing = [requirement_name(spec) for spec in plan.install]
                 issues.append(f"Packages manquants: {', '.join(missing)}")
                 
-            extra = installed_packages - expected_packages
+            mismatched = plan.upgrade + plan.downgrade
+            if mismatched:
+                issues.append(f"Versions incompatibles: {', '.join(mismatched)}")
+                
+            expected = {requirement_name(dep) for dep in env_info.pyproject_info.dependencies}
+            extra = sorted(
+                name for name in (normalize_name(n) for n in installed)
+                if name not in expected
+            )
             if extra:
                 issues.append(f"Packages supplémentaires: {', '.join(extra)}")
         
@@ -185,7 +209,7 @@ class DiagnosticService:
     
     # Méthodes privées
     
-    def _diagnose_environment(self, env_name: str) -> DiagnosticReport:
+    def _diagnose_environment(self, env_name: str, incremental: bool = False) -> DiagnosticReport:
         """Diagnostic environnement spécifique"""
         env_info = self.env_manager.get_environment_info(env_name)
         if not env_info:
@@ -199,34 +223,21 @@ class DiagnosticService:
             )
             
         report = DiagnosticReport()
-        
-        for checker in self.checkers:
-            try:
-                checker_issues = checker.check_environment(env_info)
-                report.issues.extend(checker_issues)
-            except Exception as e:
-                report.warnings.append(f"Erreur checker {checker.__class__.__name__}: {e}")
+        results = self.scheduler.check_environments([env_info], full=not incremental)
+        self._collect_results(report, results)
                 
         report.recommendations = self._generate_recommendations(env_info, report.issues)
         
         return report
         
-    def _diagnose_system(self) -> DiagnosticReport:
-        """Diagnostic système complet"""
+    def _diagnose_system(self, incremental: bool = False) -> DiagnosticReport:
+        """Diagnostic système complet (environnements vérifiés en parallèle)"""
         report = DiagnosticReport()
         
         environments = self.env_manager.list_environments()
-        
-        for env in environments:
-            env_issues = []
-            for checker in self.checkers:
-                try:
-                    issues = checker.check_environment(env)
-                    env_issues.extend(issues)
-                except Exception as e:
-                    report.warnings.append(f"Erreur check {env.name}: {e}")
-                    
-            report.issues.extend(env_issues)
+        self.scheduler.store.prune(env.name for env in environments)
+        results = self.scheduler.check_environments(environments, full=not incremental)
+        self._collect_results(report, results)
             
         config_issues = self._check_configuration()
         report.issues.extend(config_issues)
@@ -238,6 +249,23 @@ class DiagnosticService:
         
         return report
         
+    def _collect_results(self, report: DiagnosticReport, results: Dict[str, list]) -> None:
+        """Ajoute au rapport les résultats de vérification par environnement"""
+        executed = cached = 0
+        checked_at = {}
+        for env_name, env_results in results.items():
+            for result in env_results:
+                if result.error is not None:
+                    report.warnings.append(f"Erreur checker {result.checker} ({env_name}): {result.error}")
+                    continue
+                report.issues.extend(result.issues)
+                cached += result.cached
+                executed += not result.cached
+            if env_results:
+                checked_at[env_name] = min(r.checked_at for r in env_results).isoformat()
+        report.details["checks"] = {"executed": executed, "cached": cached}
+        report.details["checked_at"] = checked_at
+        
     def _calculate_overall_status(self, report: DiagnosticReport) -> EnvironmentHealth:
         """Calcule le statut global"""
         critical_count = sum(1 for issue in report.issues if issue.level == IssueLevel.CRITICAL)
@@ -363,6 +391,9 @@ class DiagnosticService:
 class EnvironmentIntegrityChecker:
     """Vérificateur d'intégrité des environnements"""
     
+    # Entrées observées (voir diagnostic_scheduler.environment_inputs)
+    inputs = ("path", "pyvenv", "python", "site_packages")
+    
     def check_environment(self, env_info: EnvironmentInfo) -> List[DiagnosticIssue]:
         """Vérifie l'intégrité d'un environnement"""
         issues = []
@@ -430,25 +461,38 @@ class EnvironmentIntegrityChecker:
 class DependencyIntegrityChecker:
     """Vérificateur d'intégrité des dépendances"""
     
+    inputs = ("python_version", "dependencies", "packages")
+    
     def check_environment(self, env_info: EnvironmentInfo) -> List[DiagnosticIssue]:
         issues = []
         
         if env_info.pyproject_info:
-            expected_packages = set(
-                pkg.split('>=')[0].split('==')[0].split('[')[0]
-                for pkg in env_info.pyproject_info.dependencies
+            plan = plan_sync(
+                env_info.pyproject_info.dependencies,
+                {pkg.name: pkg.version for pkg in env_info.packages},
+                python_version=env_info.python_version
             )
-            installed_packages = set(pkg.name for pkg in env_info.packages)
             
-            missing_packages = expected_packages - installed_packages
-            if missing_packages:
+            if plan.install:
+                missing_packages = [requirement_name(spec) for spec in plan.install]
                 issues.append(DiagnosticIssue(
                     level=IssueLevel.WARNING,
                     category="missing_packages",
                     description=f"Packages manquants: {', '.join(missing_packages)}",
                     solution="Synchroniser l'environnement",
                     auto_fixable=True,
-                    metadata={"missing_packages": list(missing_packages)}
+                    metadata={"missing_packages": missing_packages}
+                ))
+                
+            mismatched = plan.upgrade + plan.downgrade
+            if mismatched:
+                issues.append(DiagnosticIssue(
+                    level=IssueLevel.WARNING,
+                    category="version_mismatch",
+                    description=f"Versions incompatibles: {', '.join(mismatched)}",
+                    solution="Synchroniser l'environnement",
+                    auto_fixable=True,
+                    metadata={"upgrade": plan.upgrade, "downgrade": plan.downgrade}
                 ))
         
         return issues
@@ -457,6 +501,9 @@ class DependencyIntegrityChecker:
 class PerformanceChecker:
     """Vérificateur de performance"""
     
+    # La taille suit essentiellement le contenu de site-packages
+    inputs = ("backend", "pyvenv", "site_packages")
+    
     def check_environment(self, env_info: EnvironmentInfo) -> List[DiagnosticIssue]:
         issues = []
         
@@ -494,6 +541,8 @@ class PerformanceChecker:
 class SecurityChecker:
     """Vérificateur de sécurité"""
     
+    inputs = ("packages",)
+    
     def check_environment(self, env_info: EnvironmentInfo) -> List[DiagnosticIssue]:
         return []
 
@@ -501,6 +550,8 @@ class SecurityChecker:
 class CacheHealthChecker:
     """Vérificateur de santé du cache"""
     
+    inputs = ("packages",)
+    
     def check_environment(self, env_info: EnvironmentInfo) -> List[DiagnosticIssue]:
         return []
 
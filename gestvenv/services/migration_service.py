@@ -13,6 +13,7 @@ from dataclasses import dataclass , field
 from ..core.models import PyProjectInfo
 from ..core.exceptions import MigrationError, ValidationError
 from ..utils import TomlHandler, ValidationUtils, PathUtils
+from ..utils.requirements_parser import iter_requirement_lines
 
 logger = logging.getLogger(__name__)
 
@@ -456,25 +457,19 @@ class MigrationService:
         dev_deps = []
         
         try:
-            with open(req_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Ignorer commentaires et lignes vides
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Ignorer options pip
-                    if line.startswith('-'):
-                        continue
+            content = req_path.read_text(encoding='utf-8')
+            for line in iter_requirement_lines(content):
+                # Ignorer options pip
+                if line.startswith('-'):
+                    continue
+                
+                # Classification dev vs main
+                if any(keyword in line.lower() for keyword in 
+                      ['test', 'dev', 'debug', 'lint', 'format', 'coverage']):
+                    dev_deps.append(line)
+                else:
+                    main_deps.append(line)
                     
-                    # Classification dev vs main
-                    if any(keyword in line.lower() for keyword in 
-                          ['test', 'dev', 'debug', 'lint', 'format', 'coverage']):
-                        dev_deps.append(line)
-                    else:
-                        main_deps.append(line)
-                        
         except Exception as e:
             raise ValidationError(f"Erreur parsing {req_path}: {e}")
         
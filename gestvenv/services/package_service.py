@@ -2,8 +2,10 @@
 Service de gestion des packages pour GestVenv v1.1
 """
 
+import functools
 import logging
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -21,10 +23,34 @@ from ..core.exceptions import (
 )
 from ..backends.base import PackageBackend
 from ..backends.backend_manager import BackendManager
+from ..utils.file_locks import environment_lock
+from ..utils.package_details import package_index
+from ..utils.requirements_parser import normalize_name, parse_requirement, requirement_name
+from ..utils.sync_planner import (
+    PROTECTED_PACKAGES,
+    find_lock_file,
+    installed_dependencies,
+    installed_snapshot,
+    plan_sync,
+    read_lock_requirements
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _locks_environment(method):
+    """Exécute la méthode sous le verrou exclusif de l'environnement
+
+    Deux processus (CLI, API web) ne modifient pas le même environnement en
+    même temps ; les appels imbriqués d'un même thread réutilisent le verrou.
+    """
+    @functools.wraps(method)
+    def wrapper(self, env: EnvironmentInfo, *args, **kwargs):
+        with environment_lock(env.path):
+            return method(self, env, *args, **kwargs)
+    return wrapper
+
+
 class PackageService:
     """Service unifié de gestion des packages"""
     
@@ -32,6 +58,7 @@ class PackageService:
         self.backend_manager = backend_manager
         self.cache_service = cache_service
         
+    @_locks_environment
     def install_package(
         self, 
         env: EnvironmentInfo, 
@@ -71,6 +98,7 @@ class PackageService:
                 # Mise à jour environnement
                 env.packages = backend.list_packages(env.path)
                 env.updated_at = time.time()
+                package_index.invalidate(env.path)
                 
                 return InstallResult(
                     success=True,
@@ -97,6 +125,7 @@ class PackageService:
                 execution_time=time.time() - start_time
             )
     
+    @_locks_environment
     def uninstall_package(self, env: EnvironmentInfo, package: str) -> bool:
         """Désinstalle un package"""
         try:
@@ -107,12 +136,14 @@ class PackageService:
                 # Mise à jour environnement
                 env.packages = backend.list_packages(env.path)
                 env.updated_at = time.time()
+                package_index.invalidate(env.path)
             
             return success
         except Exception as e:
             logger.error(f"Erreur désinstallation {package}: {e}")
             return False
     
+    @_locks_environment
     def update_package(self, env: EnvironmentInfo, package: str) -> bool:
         """Met à jour un package"""
         try:
@@ -122,12 +153,48 @@ class PackageService:
             if success:
                 env.packages = backend.list_packages(env.path)
                 env.updated_at = time.time()
+                package_index.invalidate(env.path)
             
             return success
         except Exception as e:
             logger.error(f"Erreur mise à jour {package}: {e}")
             return False
     
+    @_locks_environment
+    def update_packages(self, env: EnvironmentInfo, packages: List[str]) -> InstallResult:
+        """Met à jour plusieurs packages en un seul appel backend"""
+        start_time = time.time()
+        if not packages:
+            return InstallResult(success=True, message="Aucun package à mettre à jour")
+
+        try:
+            backend = self._get_backend_for_env(env)
+            result = backend.install_packages(env.path, packages, upgrade=True)
+
+            if result.success:
+                env.packages = backend.list_packages(env.path)
+                env.updated_at = datetime.now()
+                package_index.invalidate(env.path)
+
+            result.execution_time = time.time() - start_time
+            return result
+        except Exception as e:
+            return InstallResult(
+                success=False,
+                message=f"Erreur mise à jour: {e}",
+                packages_failed=list(packages),
+                execution_time=time.time() - start_time
+            )
+
+    def update_all_packages(self, env: EnvironmentInfo) -> InstallResult:
+        """Met à jour tous les packages installés (hors outils d'installation)"""
+        installed = self.list_packages(env) or env.packages
+        packages = [
+            pkg.name for pkg in installed
+            if requirement_name(pkg.name) not in PROTECTED_PACKAGES
+        ]
+        return self.update_packages(env, packages)
+
     def list_packages(self, env: EnvironmentInfo) -> List[PackageInfo]:
         """Liste les packages installés"""
         try:
@@ -137,6 +204,7 @@ class PackageService:
             logger.error(f"Erreur listage packages: {e}")
             return []
     
+    @_locks_environment
     def install_from_requirements(self, env: EnvironmentInfo, req_path: Path) -> bool:
         """Installation depuis requirements.txt"""
         try:
@@ -154,12 +222,14 @@ class PackageService:
             if success:
                 env.packages = backend.list_packages(env.path)
                 env.updated_at = time.time()
+                package_index.invalidate(env.path)
             
             return success
         except Exception as e:
             logger.error(f"Erreur installation requirements: {e}")
             return False
     
+    @_locks_environment
     def install_from_pyproject(
         self, 
         env: EnvironmentInfo, 
@@ -184,66 +254,113 @@ class PackageService:
             if success:
                 env.packages = backend.list_packages(env.path)
                 env.updated_at = time.time()
+                package_index.invalidate(env.path)
             
             return success
         except Exception as e:
             logger.error(f"Erreur installation pyproject: {e}")
             return False
     
-    def sync_environment(self, env: EnvironmentInfo) -> SyncResult:
-        """Synchronise l'environnement avec son pyproject.toml"""
+    @_locks_environment
+    def sync_environment(self, env: EnvironmentInfo, groups: Optional[List[str]] = None,
+                         clean: bool = False, upgrade: bool = False) -> SyncResult:
+        """Synchronise l'environnement avec son fichier de verrouillage ou son pyproject.toml
+
+        Le plan (installations, mises à jour, rétrogradations, suppressions) est
+        calculé sur l'instantané de site-packages ; il est exécuté en un appel
+        groupé au backend, et un environnement déjà à jour ne lance aucun
+        sous-processus. Seul un fichier de verrouillage décrit l'ensemble complet
+        des distributions : sans lui, aucune suppression n'est planifiée, sauf
+        avec clean (les dépendances transitives installées sont alors conservées).
+
+        Args:
+            env: Environnement à synchroniser
+            groups: Extras / groupes de dépendances à inclure en plus du groupe principal
+            clean: Supprimer les distributions non requises
+            upgrade: Mettre à jour les dépendances déjà satisfaites (sans verrouillage)
+        """
         start_time = time.time()
         
         try:
-            if not env.pyproject_info:
+            lock_path = find_lock_file(env)
+            if lock_path is not None:
+                expected_deps = read_lock_requirements(
+                    lock_path, python_version=env.python_version, groups=groups
+                )
+            elif env.pyproject_info:
+                expected_deps = env.pyproject_info.extract_dependencies(groups)
+            else:
                 return SyncResult(
                     success=False,
                     message="Aucun pyproject.toml associé",
                     execution_time=time.time() - start_time
                 )
             
-            backend = self._get_backend_for_env(env)
-            
-            # Analyse des différences
-            current_packages = {pkg.name: pkg.version for pkg in env.packages}
-            expected_deps = env.pyproject_info.extract_dependencies()
-            expected_packages = {
-                dep.split('>=')[0].split('==')[0].split('[')[0]: dep
-                for dep in expected_deps
+            installed = installed_snapshot(env.path) or {
+                pkg.name: pkg.version for pkg in env.packages
             }
+            protected = PROTECTED_PACKAGES
+            if clean and lock_path is None:
+                protected = PROTECTED_PACKAGES | installed_dependencies(
+                    env.path, expected_deps, env.python_version
+                )
+            plan = plan_sync(
+                expected_deps,
+                installed,
+                python_version=env.python_version,
+                exact=lock_path is not None or clean,
+                protected=protected
+            )
             
-            packages_to_add = []
-            packages_to_remove = []
-            packages_to_update = []
-            
-            # Packages à ajouter
-            for pkg_name, pkg_spec in expected_packages.items():
-                if pkg_name not in current_packages:
-                    packages_to_add.append(pkg_spec)
+            # Versions épinglées par un verrouillage : rien à mettre à jour au-delà du plan
+            upgrade_specs = []
+            if upgrade and lock_path is None:
+                satisfied = set(plan.satisfied)
+                for spec in expected_deps:
+                    parsed = parse_requirement(spec)
+                    if parsed is not None and parsed.normalized_name in satisfied:
+                        upgrade_specs.append(spec)
             
-            # Packages à supprimer (qui ne sont plus dans pyproject.toml)
-            for pkg_name in current_packages:
-                if pkg_name not in expected_packages:
-                    packages_to_remove.append(pkg_name)
+            if plan.is_empty and not upgrade_specs:
+                return SyncResult(
+                    success=True,
+                    message="Environnement déjà synchronisé",
+                    execution_time=time.time() - start_time
+                )
             
-            # Installation/suppression
+            backend = self._get_backend_for_env(env)
             warnings = []
             
-            for package in packages_to_add:
-                install_result = self.install_package(env, package)
-                if not install_result.success:
-                    warnings.append(f"Échec installation {package}")
+            if not (plan.exact and backend.sync_packages(env.path, plan.target)):
+                if plan.install_specs:
+                    install_result = backend.install_packages(env.path, plan.install_specs)
+                    if not install_result.success:
+                        warnings.append(f"Échec installation: {', '.join(install_result.packages_failed)}")
+                
+                if plan.remove and not backend.uninstall_packages(env.path, plan.remove):
+                    warnings.append(f"Échec suppression: {', '.join(plan.remove)}")
+            
+            if upgrade_specs:
+                upgrade_result = backend.install_packages(env.path, upgrade_specs, upgrade=True)
+                if not upgrade_result.success:
+                    warnings.append(f"Échec mise à jour: {', '.join(upgrade_result.packages_failed)}")
+            
+            env.packages = backend.list_packages(env.path)
+            env.updated_at = datetime.now()
+            package_index.invalidate(env.path)
             
-            for package in packages_to_remove:
-                if not self.uninstall_package(env, package):
-                    warnings.append(f"Échec suppression {package}")
+            upgraded = []
+            if upgrade_specs:
+                before = {normalize_name(name): version for name, version in installed.items()}
+                after = {normalize_name(pkg.name): pkg.version for pkg in env.packages}
+                upgraded = [key for key in plan.satisfied if after.get(key) != before.get(key)]
             
             return SyncResult(
-                success=True,
-                message="Synchronisation terminée",
-                packages_added=packages_to_add,
-                packages_removed=packages_to_remove,
-                packages_updated=packages_to_update,
+                success=not warnings,
+                message="Synchronisation terminée" if not warnings else "Synchronisation incomplète",
+                packages_added=plan.install,
+                packages_removed=plan.remove,
+                packages_updated=plan.upgrade + plan.downgrade + upgraded,
                 warnings=warnings,
                 execution_time=time.time() - start_time
             )
@@ -268,6 +385,7 @@ class PackageService:
             logger.error(f"Erreur création lock file: {e}")
             return None
     
+    @_locks_environment
     def install_from_lock(self, env: EnvironmentInfo, lock_path: Path) -> bool:
         """Installation depuis fichier de verrouillage"""
         try:
@@ -279,6 +397,7 @@ class PackageService:
                 if success:
                     env.packages = backend.list_packages(env.path)
                     env.updated_at = time.time()
+                    package_index.invalidate(env.path)
                 
                 return success
             
@@ -311,8 +430,7 @@ class PackageService:
             # Dans une vraie implémentation, utiliser un resolver de dépendances
             resolved = {}
             for package in packages:
-                pkg_name = package.split('>=')[0].split('==')[0].split('[')[0]
-                resolved[pkg_name] = package
+                resolved[requirement_name(package)] = package
             
             return resolved
         except Exception as e:
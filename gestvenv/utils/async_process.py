@@ -0,0 +1,213 @@
+"""
+Exécution asynchrone de sous-processus pour GestVenv v2.0
+
+Lance une commande avec asyncio (sans thread dédié), diffuse stdout/stderr
+ligne par ligne vers un rappel, applique un délai maximal et tue le groupe
+de processus complet (pip lance ses propres sous-processus de build) en cas
+de dépassement ou d'annulation de la tâche appelante.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Rappel de sortie : (flux "stdout"/"stderr", ligne sans fin de ligne)
+OutputCallback = Callable[[str, str], Union[None, Awaitable[None]]]
+
+# Délai accordé après SIGTERM avant SIGKILL
+TERMINATE_GRACE_PERIOD = 3.0
+
+# Taille maximale d'une ligne lue (les journaux de build peuvent être longs)
+STREAM_LIMIT = 1024 * 1024
+
+
+@dataclass
+class CommandResult:
+    """Résultat d'une commande exécutée de manière asynchrone"""
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+async def _pump(
+    stream: Optional[asyncio.StreamReader],
+    name: str,
+    lines: List[str],
+    on_output: Optional[OutputCallback]
+) -> None:
+    """Lit un flux ligne par ligne et notifie le rappel"""
+    if stream is None:
+        return
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:
+            # Ligne dépassant STREAM_LIMIT : lecture du bloc disponible
+            raw = await stream.read(STREAM_LIMIT)
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        lines.append(line)
+        if on_output is not None:
+            try:
+                outcome = on_output(name, line)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                logger.debug(f"Erreur rappel de sortie: {e}")
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    """Envoie un signal au groupe du processus (au processus seul sous Windows)"""
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def terminate_process_group(
+    process: asyncio.subprocess.Process,
+    grace_period: float = TERMINATE_GRACE_PERIOD
+) -> None:
+    """Termine le groupe de processus : SIGTERM, puis SIGKILL après le délai de grâce"""
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=grace_period)
+    except asyncio.TimeoutError:
+        pass
+    # Le chef de groupe peut être sorti en laissant des descendants
+    if os.name != "nt":
+        _signal_group(process, signal.SIGKILL)
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+
+
+async def run_command_async(
+    cmd: Sequence[str],
+    cwd: Optional[Union[str, Path]] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    on_output: Optional[OutputCallback] = None,
+    grace_period: float = TERMINATE_GRACE_PERIOD
+) -> CommandResult:
+    """Exécute une commande et diffuse sa sortie
+
+    Args:
+        cmd: Commande et arguments
+        cwd: Répertoire de travail
+        env: Variables d'environnement (défaut: héritées)
+        timeout: Délai maximal en secondes (None: illimité)
+        on_output: Rappel (flux, ligne) synchrone ou coroutine
+        grace_period: Délai entre SIGTERM et SIGKILL
+
+    Returns:
+        CommandResult ; un exécutable introuvable donne returncode 127
+
+    Raises:
+        asyncio.CancelledError: si la tâche appelante est annulée, après
+            terminaison du groupe de processus
+    """
+    start = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *[str(part) for part in cmd],
+            cwd=str(cwd) if cwd is not None else None,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=os.name != "nt",
+        )
+    except (FileNotFoundError, PermissionError) as e:
+        return CommandResult(returncode=127, stderr=str(e), duration=time.perf_counter() - start)
+
+    result = await wait_streaming(process, timeout, on_output, grace_period, describe=cmd)
+    result.duration = time.perf_counter() - start
+    return result
+
+
+async def wait_streaming(
+    process: asyncio.subprocess.Process,
+    timeout: Optional[float] = None,
+    on_output: Optional[OutputCallback] = None,
+    grace_period: float = TERMINATE_GRACE_PERIOD,
+    describe: Optional[Union[str, Sequence[str]]] = None
+) -> CommandResult:
+    """Attend un processus déjà lancé en diffusant sa sortie
+
+    Les flux non redirigés (stdout/stderr à None) sont ignorés. Le processus
+    doit avoir été lancé dans sa propre session pour que la terminaison
+    atteigne tout le groupe.
+
+    Args:
+        process: Processus lancé par asyncio
+        timeout: Délai maximal en secondes (None: illimité)
+        on_output: Rappel (flux, ligne) synchrone ou coroutine
+        grace_period: Délai entre SIGTERM et SIGKILL
+        describe: Commande affichée dans les journaux
+
+    Raises:
+        asyncio.CancelledError: si la tâche appelante est annulée, après
+            terminaison du groupe de processus
+    """
+    start = time.perf_counter()
+    stdout: List[str] = []
+    stderr: List[str] = []
+    readers = asyncio.gather(
+        _pump(process.stdout, "stdout", stdout, on_output),
+        _pump(process.stderr, "stderr", stderr, on_output),
+    )
+
+    async def finish() -> int:
+        await readers
+        return await process.wait()
+
+    timed_out = False
+    try:
+        returncode = await asyncio.wait_for(finish(), timeout=timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        if describe is not None and not isinstance(describe, str):
+            describe = " ".join(map(str, describe))
+        logger.warning(f"Délai dépassé ({timeout}s): {describe or process.pid}")
+        await terminate_process_group(process, grace_period)
+        returncode = process.returncode if process.returncode is not None else -1
+    except asyncio.CancelledError:
+        await terminate_process_group(process, grace_period)
+        readers.cancel()
+        raise
+
+    if timed_out:
+        # Tuyaux éventuellement conservés par un descendant sorti du groupe
+        readers.cancel()
+        try:
+            await readers
+        except asyncio.CancelledError:
+            pass
+
+    return CommandResult(
+        returncode=returncode,
+        stdout="\n".join(stdout),
+        stderr="\n".join(stderr),
+        duration=time.perf_counter() - start,
+        timed_out=timed_out,
+    )
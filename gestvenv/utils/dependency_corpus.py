@@ -0,0 +1,85 @@
+"""
+Dépendances synthétiques pour les benchmarks et les tests de parsing
+
+Spécifications PEP 508 variées (versions, extras, marqueurs, URL), fichiers
+requirements.txt volumineux et pyproject.toml de monorepo, reproductibles
+par graine.
+"""
+
+import random
+from typing import List, Optional
+
+
+_SPEC_TEMPLATES = (
+    "{name}",
+    "{name}=={major}.{minor}.{patch}",
+    "{name}>={major}.{minor}",
+    "{name}>={major}.{minor},<{next_major}",
+    "{name}~={major}.{minor}.{patch}",
+    "{name}[extra{minor},cli]>={major}.{minor}",
+    "{name}!={major}.{minor}.*",
+    '{name}>={major}.{minor} ; python_version >= "3.{minor}"',
+    "{name} @ https://files.example.org/{name}-{major}.{minor}.tar.gz",
+)
+
+
+def generate_specs(count: int, seed: int = 0, distinct: Optional[int] = None) -> List[str]:
+    """Génère des spécifications de dépendances variées
+
+    Args:
+        count: Nombre de spécifications
+        seed: Graine du générateur
+        distinct: Nombre de noms distincts (défaut: count, aucun doublon de nom)
+    """
+    rng = random.Random(seed)
+    distinct = distinct or count
+    specs = []
+    for i in range(count):
+        major, minor, patch = rng.randrange(1, 30), rng.randrange(0, 12), rng.randrange(0, 20)
+        template = _SPEC_TEMPLATES[i % len(_SPEC_TEMPLATES)]
+        specs.append(template.format(
+            name=f"package_{i % distinct:05d}",
+            major=major, minor=minor, patch=patch, next_major=major + 1,
+        ))
+    return specs
+
+
+def generate_requirements(lines: int, seed: int = 0) -> str:
+    """Contenu requirements.txt avec commentaires, options et continuations"""
+    out = ["# Fichier généré pour benchmark", "--index-url https://pypi.org/simple"]
+    for i, spec in enumerate(generate_specs(lines, seed)):
+        if i % 50 == 0:
+            out.append(f"# Section {i // 50}")
+        if i % 97 == 0:
+            out.append(f"{spec}  # commentaire en ligne")
+        else:
+            out.append(spec)
+    return "\n".join(out) + "\n"
+
+
+def generate_monorepo_pyproject(deps: int, groups: int = 40, seed: int = 0) -> str:
+    """pyproject.toml de monorepo : nombreuses dépendances et groupes optionnels"""
+    specs = generate_specs(deps, seed)
+    per_group = max(1, deps // (groups * 2))
+    lines = [
+        "[project]",
+        'name = "monorepo"',
+        'version = "1.0.0"',
+        'description = "Benchmark monorepo"',
+        'requires-python = ">=3.9"',
+        "dependencies = [",
+    ]
+    # Chaînes littérales TOML : les marqueurs contiennent des guillemets doubles
+    lines.extend(f"    '{spec}'," for spec in specs)
+    lines.append("]")
+    lines.append("")
+    lines.append("[project.optional-dependencies]")
+    for g in range(groups):
+        group_specs = specs[g * per_group:(g + 1) * per_group]
+        lines.append(f"group{g} = [")
+        lines.extend(f"    '{spec}'," for spec in group_specs)
+        lines.append("]")
+    lines.append("")
+    lines.append("[tool.gestvenv]")
+    lines.append('backend = "uv"')
+    return "\n".join(lines) + "\n"
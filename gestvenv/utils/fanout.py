@@ -0,0 +1,232 @@
+"""
+Exécution d'opérations sur plusieurs environnements pour GestVenv v2.0
+
+Répartit une opération (sync, update, doctor, ...) sur un ensemble
+d'environnements avec un pool de workers borné : limite globale dérivée du
+nombre de CPU et plafond de concurrence par backend. Chaque résultat est
+remis dès qu'il est disponible (affichage en flux), puis agrégé.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from .async_utils import gather_with_concurrency, run_in_executor
+
+# Plafonds par défaut : les backends partageant un cache global (pip)
+# supportent mal de nombreuses écritures concurrentes
+DEFAULT_BACKEND_LIMITS: Dict[str, int] = {
+    "pip": 4,
+    "poetry": 2,
+    "pdm": 2,
+}
+
+MAX_DEFAULT_JOBS = 8
+
+
+def default_jobs(requested: Optional[int] = None) -> int:
+    """Nombre de workers : demandé, sinon min(CPU, MAX_DEFAULT_JOBS)
+
+    Une valeur demandée reste bornée par le double du nombre de CPU
+    (les opérations sont majoritairement des sous-processus en attente d'E/S).
+    """
+    cpus = os.cpu_count() or 1
+    if requested is None or requested < 1:
+        return max(1, min(cpus, MAX_DEFAULT_JOBS))
+    return max(1, min(requested, cpus * 2))
+
+
+@dataclass
+class EnvOperationResult:
+    """Résultat d'une opération sur un environnement"""
+    env_name: str
+    backend: str
+    success: bool
+    message: str = ""
+    duration: float = 0.0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit en dictionnaire sérialisable"""
+        return asdict(self)
+
+
+@dataclass
+class FanOutSummary:
+    """Résultats agrégés d'une exécution multi-environnements"""
+    operation: str
+    results: List[EnvOperationResult] = field(default_factory=list)
+    jobs: int = 1
+    total_time: float = 0.0
+
+    @property
+    def succeeded(self) -> List[EnvOperationResult]:
+        return [r for r in self.results if r.success]
+
+    @property
+    def failed(self) -> List[EnvOperationResult]:
+        return [r for r in self.results if not r.success]
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Résumé sérialisable (sans le détail par environnement)"""
+        cumulative = sum(r.duration for r in self.results)
+        return {
+            "operation": self.operation,
+            "total": len(self.results),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "failed_envs": [r.env_name for r in self.failed],
+            "jobs": self.jobs,
+            "total_time": self.total_time,
+            "cumulative_time": cumulative,
+        }
+
+
+def _env_backend(env: Any) -> str:
+    backend = getattr(env, "backend_type", None)
+    return str(getattr(backend, "value", backend or "auto"))
+
+
+def _to_result(env: Any, value: Any, duration: float) -> EnvOperationResult:
+    """Normalise la valeur retournée par une opération
+
+    Acceptés : EnvOperationResult, dict ('success', 'message' et détails),
+    objet exposant success/message (SyncResult, InstallResult...), booléen.
+    """
+    name, backend = env.name, _env_backend(env)
+    if isinstance(value, EnvOperationResult):
+        value.duration = value.duration or duration
+        return value
+    if isinstance(value, Mapping):
+        details = dict(value)
+        success = bool(details.pop("success", True))
+        message = str(details.pop("message", ""))
+        return EnvOperationResult(name, backend, success, message, duration, details)
+    if isinstance(value, bool):
+        return EnvOperationResult(name, backend, value, "", duration)
+    if hasattr(value, "success"):
+        return EnvOperationResult(
+            name, backend, bool(value.success), str(getattr(value, "message", "")), duration
+        )
+    return EnvOperationResult(name, backend, True, "" if value is None else str(value), duration)
+
+
+def _interleave_by_backend(envs: Iterable[Any]) -> List[Any]:
+    """Alterne les backends pour qu'un backend plafonné n'occupe pas tous les workers"""
+    queues: Dict[str, deque] = defaultdict(deque)
+    for env in envs:
+        queues[_env_backend(env)].append(env)
+
+    ordered = []
+    while queues:
+        for backend in list(queues):
+            ordered.append(queues[backend].popleft())
+            if not queues[backend]:
+                del queues[backend]
+    return ordered
+
+
+class FanOutExecutor:
+    """Exécute une opération synchrone sur plusieurs environnements en parallèle"""
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        backend_limits: Optional[Mapping[str, int]] = None
+    ):
+        self.jobs = default_jobs(jobs)
+        limits = dict(DEFAULT_BACKEND_LIMITS)
+        limits.update(backend_limits or {})
+        self.backend_limits = {
+            backend: max(1, min(limit, self.jobs)) for backend, limit in limits.items()
+        }
+
+    def limit_for(self, backend: str) -> int:
+        """Concurrence maximale pour un backend"""
+        return self.backend_limits.get(backend, self.jobs)
+
+    async def run_async(
+        self,
+        operation_name: str,
+        envs: Iterable[Any],
+        operation: Callable[[Any], Any],
+        on_start: Optional[Callable[[Any], None]] = None,
+        on_result: Optional[Callable[[EnvOperationResult], None]] = None
+    ) -> FanOutSummary:
+        """Exécute operation(env) pour chaque environnement
+
+        Args:
+            operation_name: Nom affiché de l'opération
+            envs: Environnements (objets exposant name et backend_type)
+            operation: Fonction bloquante exécutée dans le pool de threads
+            on_start: Rappel au démarrage d'un environnement
+            on_result: Rappel à chaque résultat, dans l'ordre de terminaison
+
+        Returns:
+            FanOutSummary, résultats dans l'ordre des environnements fournis
+        """
+        envs = list(envs)
+        started = time.perf_counter()
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        workers = asyncio.Semaphore(self.jobs)
+
+        async def run_one(env: Any) -> EnvOperationResult:
+            backend = _env_backend(env)
+            semaphore = semaphores.setdefault(backend, asyncio.Semaphore(self.limit_for(backend)))
+            # Plafond du backend d'abord : une tâche en attente de son backend
+            # n'occupe pas de worker
+            async with semaphore, workers:
+                if on_start:
+                    on_start(env)
+                t0 = time.perf_counter()
+                try:
+                    value = await run_in_executor(operation, env, executor=executor)
+                    result = _to_result(env, value, time.perf_counter() - t0)
+                except Exception as e:
+                    result = EnvOperationResult(
+                        env.name, backend, False, f"{type(e).__name__}: {e}",
+                        time.perf_counter() - t0
+                    )
+            if on_result:
+                on_result(result)
+            return result
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.jobs, thread_name_prefix="gestvenv_fanout_"
+        )
+        # Coroutines en vol : `jobs` par backend, de sorte qu'un backend plafonné
+        # ne puisse pas priver les autres de workers
+        in_flight = self.jobs * max(1, len({_env_backend(env) for env in envs}))
+        try:
+            results = await gather_with_concurrency(
+                in_flight, *(run_one(env) for env in _interleave_by_backend(envs))
+            )
+        finally:
+            executor.shutdown(wait=True)
+
+        by_name = {r.env_name: r for r in results}
+        return FanOutSummary(
+            operation=operation_name,
+            results=[by_name[env.name] for env in envs],
+            jobs=self.jobs,
+            total_time=time.perf_counter() - started,
+        )
+
+    def run(
+        self,
+        operation_name: str,
+        envs: Iterable[Any],
+        operation: Callable[[Any], Any],
+        on_start: Optional[Callable[[Any], None]] = None,
+        on_result: Optional[Callable[[EnvOperationResult], None]] = None
+    ) -> FanOutSummary:
+        """Version synchrone de run_async (crée sa propre boucle)"""
+        return asyncio.run(self.run_async(operation_name, envs, operation, on_start, on_result))
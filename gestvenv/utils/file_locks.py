@@ -0,0 +1,439 @@
+"""
+Verrous fichier inter-processus pour GestVenv
+
+Les processus qui modifient un même environnement ou le cache (CLI, API
+web, démon) se coordonnent par des verrous flock :
+- partagés (lecture) ou exclusifs (écriture) : un verrou par environnement,
+  par entrée de cache (répartis sur 256 fichiers) et pour l'index du cache ;
+- réentrants dans un même thread : une acquisition imbriquée réutilise le
+  verrou déjà détenu ; une acquisition exclusive imbriquée dans un verrou
+  partagé est refusée (flock ne convertit pas atomiquement : un échec de
+  conversion peut perdre le verrou partagé) ;
+- délai d'attente borné : LockTimeoutError indique le détenteur ;
+- le détenteur exclusif inscrit son pid dans le fichier : un détenteur
+  terminé dont le verrou reste pris (descripteur hérité par un processus
+  enfant) est signalé comme périmé ;
+- sans fcntl (Windows) : fichier créé en exclusivité, supprimé s'il est
+  périmé (détenteur terminé ou plus ancien que STALE_LOCK_SECONDS) ;
+- temps d'attente mesurés par catégorie (lock_statistics) et attentes
+  longues journalisées.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from ..core.exceptions import LockTimeoutError
+
+try:
+    import fcntl
+except ImportError:  # Windows : fichier de verrou créé en exclusivité
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Attente entre deux tentatives (doublée à chaque échec jusqu'au plafond)
+LOCK_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+# Délai d'attente par défaut (une installation peut être longue)
+DEFAULT_LOCK_TIMEOUT = 600.0
+
+# Âge au-delà duquel un fichier de verrou (sans fcntl) est considéré périmé
+STALE_LOCK_SECONDS = 3600.0
+
+# Attente au-delà de laquelle le détenteur est journalisé
+SLOW_WAIT_SECONDS = 1.0
+
+CATEGORY_ENVIRONMENT = "environment"
+CATEGORY_CACHE_ENTRY = "cache_entry"
+CATEGORY_CACHE_INDEX = "cache_index"
+
+PathLike = Union[str, Path]
+
+
+def locks_root() -> Path:
+    """Répertoire des verrous propres à l'utilisateur
+
+    Hors du répertoire du cache : vider le cache ne supprime pas un verrou
+    détenu par un autre processus.
+    """
+    return Path.home() / ".gestvenv" / "locks"
+
+
+# ===== Statistiques =====
+
+@dataclass
+class LockStats:
+    """Attentes de verrou cumulées pour une catégorie"""
+    acquisitions: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    stale: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+
+_stats: Dict[str, LockStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(category: str, waited: float = 0.0, contended: bool = False,
+            timeout: bool = False, stale: bool = False) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(category, LockStats())
+        if timeout:
+            stats.timeouts += 1
+        elif not stale:
+            stats.acquisitions += 1
+        if stale:
+            stats.stale += 1
+        if contended:
+            stats.contended += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+
+
+def lock_statistics() -> Dict[str, Dict[str, Any]]:
+    """Attentes de verrou du processus courant, par catégorie"""
+    with _stats_lock:
+        return {category: asdict(stats) for category, stats in _stats.items()}
+
+
+def reset_lock_statistics() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+# ===== Détenteurs =====
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        return True
+
+
+def _holder_is_stale(holder: Optional[Dict[str, Any]]) -> bool:
+    """Détenteur inscrit sur cet hôte et terminé depuis"""
+    if not holder or holder.get("host") != socket.gethostname():
+        return False
+    pid = holder.get("pid")
+    return isinstance(pid, int) and not _pid_alive(pid)
+
+
+@dataclass
+class _Holding:
+    """Verrou détenu par un thread (acquisitions imbriquées comptées)"""
+    fd: int
+    exclusive: bool
+    count: int = 1
+
+
+# (chemin, thread) -> verrou détenu ; seules les acquisitions synchrones
+# sont réentrantes (plusieurs tâches asyncio partagent un même thread)
+_held: Dict[Tuple[str, int], _Holding] = {}
+_held_lock = threading.Lock()
+
+
+class FileLock:
+    """Verrou fichier inter-processus, partagé ou exclusif
+
+    Utilisable avec `with` (attente bloquante) ou `async with` (attente par
+    scrutation, sans bloquer la boucle). Une instance ne se détient qu'une
+    fois à la fois.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        exclusive: bool = True,
+        timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+        category: str = "file",
+        stale_after: float = STALE_LOCK_SECONDS
+    ):
+        self.path = Path(path)
+        # Sans fcntl, un fichier de verrou n'a qu'un détenteur
+        self.exclusive = exclusive or fcntl is None
+        self.timeout = timeout
+        self.category = category
+        self.stale_after = stale_after
+        self.waited = 0.0
+        self._fd: Optional[int] = None
+        self._holding: Optional[_Holding] = None
+        self._slow_logged = False
+
+    @property
+    def _key(self) -> Tuple[str, int]:
+        return (str(self.path), threading.get_ident())
+
+    # ===== Acquisition =====
+
+    def try_acquire(self) -> bool:
+        """Tente d'obtenir le verrou sans attendre"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            return self._try_create()
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        if self.exclusive:
+            self._write_holder(fd)
+        return True
+
+    def _try_create(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            if not self._break_if_stale():
+                return False
+            return self._try_create()
+        self._fd = fd
+        self._write_holder(fd)
+        return True
+
+    def _break_if_stale(self) -> bool:
+        """Supprime un fichier de verrou périmé (plateformes sans fcntl)"""
+        try:
+            age = time.time() - self.path.stat().st_mtime
+        except FileNotFoundError:
+            return True
+        holder = self.holder()
+        if age < self.stale_after and not _holder_is_stale(holder):
+            return False
+        logger.warning(f"Verrou périmé supprimé: {self.path} (détenteur: {holder})")
+        _record(self.category, stale=True)
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Obtient le verrou en attendant au plus `timeout` secondes
+
+        Returns:
+            Temps d'attente en secondes
+        """
+        if self._reenter():
+            return 0.0
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        delay = LOCK_POLL_INTERVAL
+        contended = False
+        while not self.try_acquire():
+            contended = True
+            waited = time.monotonic() - start
+            self._check_wait(waited, timeout)
+            time.sleep(self._sleep_for(delay, waited, timeout))
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+        return self._acquired(time.monotonic() - start if contended else 0.0, register=True)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """Comme acquire, sans bloquer la boucle d'événements (non réentrant)"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        delay = LOCK_POLL_INTERVAL
+        contended = False
+        while not self.try_acquire():
+            contended = True
+            waited = time.monotonic() - start
+            self._check_wait(waited, timeout)
+            await asyncio.sleep(self._sleep_for(delay, waited, timeout))
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+        return self._acquired(time.monotonic() - start if contended else 0.0, register=False)
+
+    def _reenter(self) -> bool:
+        """Acquisition imbriquée dans un verrou déjà détenu par ce thread"""
+        with _held_lock:
+            holding = _held.get(self._key)
+        if holding is None:
+            return False
+        if self.exclusive and not holding.exclusive:
+            raise RuntimeError(
+                f"Verrou {self.path} détenu en partage par ce thread : "
+                "acquisition exclusive imbriquée impossible"
+            )
+        holding.count += 1
+        self._holding = holding
+        _record(self.category)
+        return True
+
+    @staticmethod
+    def _sleep_for(delay: float, waited: float, timeout: Optional[float]) -> float:
+        if timeout is None:
+            return delay
+        return max(0.0, min(delay, timeout - waited))
+
+    def _check_wait(self, waited: float, timeout: Optional[float]) -> None:
+        """Journalise une attente longue ; LockTimeoutError au-delà du délai"""
+        if timeout is not None and waited >= timeout:
+            holder = self.holder()
+            stale = _holder_is_stale(holder)
+            _record(self.category, waited, contended=True, timeout=True, stale=stale)
+            message = f"Verrou {self.path} non obtenu après {waited:.1f}s"
+            if holder:
+                message += f" (détenu par le processus {holder.get('pid')}"
+                message += ", terminé : descripteur hérité par un sous-processus ?)" if stale else ")"
+            raise LockTimeoutError(message, lock_path=str(self.path), holder=holder)
+
+        if waited >= SLOW_WAIT_SECONDS and not self._slow_logged:
+            self._slow_logged = True
+            logger.info(f"En attente du verrou {self.path} (détenteur: {self.holder() or 'inconnu'})")
+
+    def _acquired(self, waited: float, register: bool) -> float:
+        self.waited = waited
+        self._slow_logged = False
+        _record(self.category, waited, contended=waited > 0)
+        if waited >= SLOW_WAIT_SECONDS:
+            logger.info(f"Verrou {self.path} obtenu après {waited:.2f}s d'attente")
+        if register:
+            self._holding = _Holding(fd=self._fd, exclusive=self.exclusive)
+            with _held_lock:
+                _held[self._key] = self._holding
+        return waited
+
+    # ===== Libération =====
+
+    def release(self) -> None:
+        holding, self._holding = self._holding, None
+        if holding is not None and holding.count > 1:
+            # Acquisition imbriquée : le verrou englobant reste détenu
+            holding.count -= 1
+            return
+
+        if holding is not None:
+            with _held_lock:
+                if _held.get(self._key) is holding:
+                    del _held[self._key]
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        if fcntl is None:
+            os.close(fd)
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        if self.exclusive:
+            os.ftruncate(fd, 0)
+        # La fermeture libère le verrou
+        os.close(fd)
+
+    # ===== Détenteur =====
+
+    def _write_holder(self, fd: int) -> None:
+        data = json.dumps({
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "acquired_at": time.time(),
+        }).encode()
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, data)
+
+    def holder(self) -> Optional[Dict[str, Any]]:
+        """Détenteur exclusif inscrit dans le fichier (None si inconnu)"""
+        try:
+            text = self.path.read_text(encoding="utf-8")
+            return json.loads(text) if text.strip() else None
+        except (OSError, ValueError):
+            return None
+
+    # ===== Gestionnaires de contexte =====
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> 'FileLock':
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+# ===== Verrous nommés =====
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode(), usedforsecurity=False).hexdigest()  # nosec B324
+
+
+def environment_lock(
+    env_path: PathLike,
+    exclusive: bool = True,
+    timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+    root: Optional[Path] = None
+) -> FileLock:
+    """Verrou d'un environnement (identifié par son chemin)"""
+    env_path = Path(env_path)
+    name = f"{env_path.name}-{_digest(str(env_path.resolve()))[:12]}.lock"
+    return FileLock(
+        (root or locks_root()) / "environments" / name,
+        exclusive=exclusive,
+        timeout=timeout,
+        category=CATEGORY_ENVIRONMENT
+    )
+
+
+def cache_entry_lock(
+    cache_key: str,
+    exclusive: bool = True,
+    timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+    root: Optional[Path] = None
+) -> FileLock:
+    """Verrou d'une entrée du cache (256 fichiers partagés par les entrées)"""
+    stripe = _digest(cache_key)[:2]
+    return FileLock(
+        (root or locks_root()) / "cache" / "entries" / f"{stripe}.lock",
+        exclusive=exclusive,
+        timeout=timeout,
+        category=CATEGORY_CACHE_ENTRY
+    )
+
+
+def cache_index_lock(
+    exclusive: bool = True,
+    timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+    root: Optional[Path] = None
+) -> FileLock:
+    """Verrou de l'index et des statistiques du cache"""
+    return FileLock(
+        (root or locks_root()) / "cache" / "index.lock",
+        exclusive=exclusive,
+        timeout=timeout,
+        category=CATEGORY_CACHE_INDEX
+    )
+
+
+def write_json_atomic(path: PathLike, data: Any, **dump_options) -> None:
+    """Écrit un fichier JSON par remplacement (jamais lu à moitié écrit)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_options)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,390 @@
+"""
+Index des modules importables d'un environnement (complétion IDE, analyse des imports)
+
+Modules de premier niveau, sous-modules (d'après RECORD) et bibliothèque
+standard du Python de l'environnement, chacun associé à sa distribution :
+- en mémoire, un trie par composant (`requests` -> `adapters`) : la
+  complétion parcourt le chemin puis filtre les enfants d'un seul nœud ;
+- mis à jour de façon incrémentale : seules les distributions ajoutées ou
+  retirées modifient le trie, et seuls les RECORD nouveaux sont relus
+  (PackageDetailsIndex) ;
+- persisté sous forme de table triée avec table d'offsets, chargée par mmap
+  au redémarrage sans désérialisation (recherche dichotomique sur le
+  fichier, mêmes résultats que le trie).
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .package_details import PackageDetailsIndex, _signature, package_index
+from .sync_planner import _site_packages_dirs
+
+logger = logging.getLogger(__name__)
+
+# Distribution associée aux modules de la bibliothèque standard
+STDLIB = "<stdlib>"
+
+INDEX_MAGIC = b"GVMI1\n"
+_OFFSET = struct.Struct("<I")
+
+# Noms d'import différents du nom de distribution (suggestions hors environnement)
+KNOWN_DISTRIBUTIONS = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "jwt": "PyJWT",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "yaml": "PyYAML",
+    "zmq": "pyzmq",
+}
+
+_STDLIB_SCRIPT = (
+    "import sys\n"
+    "names = getattr(sys, 'stdlib_module_names', None)\n"
+    "if names is None:\n"
+    "    import pkgutil, sysconfig\n"
+    "    names = set(sys.builtin_module_names)\n"
+    "    names.update(m.name for m in pkgutil.iter_modules([sysconfig.get_paths()['stdlib']]))\n"
+    "print('\\n'.join(sorted(names)))\n"
+)
+
+Completion = Tuple[str, Optional[str]]
+
+
+class _Node:
+    __slots__ = ("children", "distribution")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.distribution: Optional[str] = None
+
+
+class ModuleTrie:
+    """Trie des modules par composant pointé"""
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, module: str, distribution: str) -> None:
+        node = self._root
+        for part in module.split("."):
+            node = node.children.setdefault(part, _Node())
+        if node.distribution is None:
+            node.distribution = distribution
+
+    def remove(self, module: str, distribution: str) -> None:
+        """Retire le module s'il appartient à distribution (nœuds vides élagués)"""
+        parts = module.split(".")
+        path = [self._root]
+        for part in parts:
+            node = path[-1].children.get(part)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].distribution == distribution:
+            path[-1].distribution = None
+        for depth in range(len(parts), 0, -1):
+            node = path[depth]
+            if node.children or node.distribution is not None:
+                break
+            del path[depth - 1].children[parts[depth - 1]]
+
+    def _find(self, module: str) -> Optional[_Node]:
+        node = self._root
+        for part in module.split(".") if module else []:
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, module: str) -> bool:
+        return bool(module) and self._find(module) is not None
+
+    def distribution(self, module: str) -> Optional[str]:
+        """Distribution du module ou de son plus proche parent connu"""
+        node, found = self._root, None
+        for part in module.split("."):
+            node = node.children.get(part)
+            if node is None:
+                break
+            found = node.distribution or found
+        return found
+
+    def complete(self, prefix: str, limit: int = 100) -> List[Completion]:
+        """Modules complétant prefix au même niveau (`requests.ad` -> `requests.adapters`)"""
+        parent, _, partial = prefix.rpartition(".")
+        node = self._find(parent)
+        if node is None:
+            return []
+        base = f"{parent}." if parent else ""
+        results = []
+        for name in sorted(node.children):
+            if name.startswith(partial):
+                results.append((base + name, node.children[name].distribution))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def items(self) -> Iterator[Completion]:
+        """Tous les nœuds (espaces de noms compris), en ordre de parcours"""
+        stack = [("", self._root)]
+        while stack:
+            base, node = stack.pop()
+            for name, child in node.children.items():
+                full = base + name
+                yield full, child.distribution
+                stack.append((full + ".", child))
+
+
+class MappedModuleTable:
+    """Table triée persistée, interrogée via mmap
+
+    Format : magic, en-tête JSON sur une ligne, offsets (uint32), puis un
+    enregistrement `module\\tdistribution\\n` par nœud du trie, trié par octets.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise ValueError(f"Not a module index: {path}")
+            header_end = self._map.find(b"\n", len(INDEX_MAGIC)) + 1
+            self.header = json.loads(self._map[len(INDEX_MAGIC):header_end])
+            self._count = self.header["count"]
+            self._offsets = header_end
+            self._data = header_end + self._count * _OFFSET.size
+        except (ValueError, KeyError):
+            self._map.close()
+            raise
+
+    @staticmethod
+    def write(path: Path, entries: Iterator[Completion], header: Dict) -> None:
+        records = sorted(
+            (module.encode("utf-8"), (distribution or "").encode("utf-8"))
+            for module, distribution in entries
+        )
+        offsets, data, position = [], [], 0
+        for module, distribution in records:
+            record = module + b"\t" + distribution + b"\n"
+            offsets.append(position)
+            data.append(record)
+            position += len(record)
+        header = dict(header, count=len(records))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as handle:
+            handle.write(INDEX_MAGIC)
+            handle.write(json.dumps(header).encode("utf-8") + b"\n")
+            handle.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+            handle.write(b"".join(data))
+        os.replace(temporary, path)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _record(self, index: int) -> Tuple[bytes, bytes]:
+        start = self._data + _OFFSET.unpack_from(self._map, self._offsets + index * _OFFSET.size)[0]
+        end = self._map.find(b"\n", start)
+        module, _, distribution = self._map[start:end].partition(b"\t")
+        return module, distribution
+
+    def _bisect(self, key: bytes) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _lookup(self, module: str) -> Optional[bytes]:
+        key = module.encode("utf-8")
+        index = self._bisect(key)
+        if index < self._count:
+            name, distribution = self._record(index)
+            if name == key:
+                return distribution
+        return None
+
+    def __contains__(self, module: str) -> bool:
+        return bool(module) and self._lookup(module) is not None
+
+    def distribution(self, module: str) -> Optional[str]:
+        parts = module.split(".")
+        for depth in range(len(parts), 0, -1):
+            distribution = self._lookup(".".join(parts[:depth]))
+            if distribution:
+                return distribution.decode("utf-8")
+        return None
+
+    def complete(self, prefix: str, limit: int = 100) -> List[Completion]:
+        parent, _, partial = prefix.rpartition(".")
+        base = f"{parent}.".encode("utf-8") if parent else b""
+        start = base + partial.encode("utf-8")
+        results = []
+        index = self._bisect(start)
+        while index < self._count and len(results) < limit:
+            name, distribution = self._record(index)
+            if not name.startswith(start):
+                break
+            # Les parents précèdent leurs descendants : chaque enfant est une
+            # entrée exacte, son sous-arbre est sauté ("." < "/")
+            results.append((name.decode("utf-8"), distribution.decode("utf-8") or None))
+            index = self._bisect(name + b"/")
+        return results
+
+    def items(self) -> Iterator[Completion]:
+        for index in range(self._count):
+            name, distribution = self._record(index)
+            yield name.decode("utf-8"), distribution.decode("utf-8") or None
+
+
+ModuleIndex = Union[ModuleTrie, MappedModuleTable]
+
+
+def stdlib_modules(env_path: Path) -> Set[str]:
+    """Modules de la bibliothèque standard du Python de l'environnement"""
+    versions = {site_dir.parent.name for site_dir in _site_packages_dirs(env_path)}
+    current = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    if hasattr(sys, "stdlib_module_names") and (not versions or versions == {current}):
+        return set(sys.stdlib_module_names)
+
+    python = env_path / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+    try:
+        result = subprocess.run(
+            [str(python), "-c", _STDLIB_SCRIPT],
+            capture_output=True, text=True, timeout=30, check=True
+        )
+        return set(result.stdout.split())
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Could not list stdlib modules of {env_path}: {e}")
+        return set(getattr(sys, "stdlib_module_names", sys.builtin_module_names))
+
+
+class _Entry:
+    __slots__ = ("signature", "index", "distributions", "names")
+
+    def __init__(self, signature, index: ModuleIndex, distributions=None, names=None):
+        self.signature = signature
+        self.index = index
+        # Clé (nom normalisé, version) -> modules, pour les mises à jour incrémentales
+        self.distributions: Optional[Dict[Tuple[str, str], List[str]]] = distributions
+        self.names: Dict[str, str] = names or {}
+
+
+class ModuleIndexRegistry:
+    """Index de modules par environnement, persistés dans cache_dir"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, details: Optional[PackageDetailsIndex] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".gestvenv" / "cache" / "module-index"
+        self.details = details or package_index
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, env_path: Union[str, Path]) -> ModuleIndex:
+        """Index à jour de l'environnement (reconstruit si site-packages a changé)"""
+        env_path = Path(env_path)
+        key = str(env_path)
+        signature = [list(_signature(site_dir)) for site_dir in _site_packages_dirs(env_path)]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(env_path, signature)
+            if entry is None or entry.signature != signature:
+                entry = self._build(env_path, signature, entry)
+            self._entries[key] = entry
+            return entry.index
+
+    def suggest(self, module: str) -> Optional[str]:
+        """Distribution fournissant module, d'après les index chargés puis les alias connus"""
+        top_level = module.split(".", 1)[0]
+        with self._lock:
+            indexes = [entry.index for entry in self._entries.values()]
+        for index in indexes:
+            distribution = index.distribution(module)
+            if distribution and distribution != STDLIB:
+                return distribution
+        return KNOWN_DISTRIBUTIONS.get(top_level)
+
+    def invalidate(self, env_path: Optional[Union[str, Path]] = None) -> None:
+        with self._lock:
+            if env_path is None:
+                entries, self._entries = list(self._entries.values()), {}
+            else:
+                entry = self._entries.pop(str(Path(env_path)), None)
+                entries = [entry] if entry else []
+        for entry in entries:
+            if isinstance(entry.index, MappedModuleTable):
+                entry.index.close()
+
+    def _index_path(self, env_path: Path) -> Path:
+        digest = hashlib.sha1(str(env_path).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.idx"
+
+    def _load(self, env_path: Path, signature) -> Optional[_Entry]:
+        path = self._index_path(env_path)
+        if not path.exists():
+            return None
+        try:
+            table = MappedModuleTable(path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring module index {path}: {e}")
+            return None
+        return _Entry(table.header.get("signature"), table)
+
+    def _build(self, env_path: Path, signature, previous: Optional[_Entry]) -> _Entry:
+        packages = self.details.packages(env_path)
+        distributions = {
+            (package.normalized_name, package.version): package.modules for package in packages
+        }
+        names = {package.normalized_name: package.name for package in packages}
+
+        if previous is not None and isinstance(previous.index, ModuleTrie) and previous.distributions is not None:
+            trie = previous.index
+            for dist_key in previous.distributions.keys() - distributions.keys():
+                for module in previous.distributions[dist_key]:
+                    trie.remove(module, previous.names[dist_key[0]])
+            added = distributions.keys() - previous.distributions.keys()
+        else:
+            trie = ModuleTrie()
+            stdlib = None
+            if previous is not None:
+                stdlib = [module for module, distribution in previous.index.items() if distribution == STDLIB]
+            for module in stdlib or stdlib_modules(env_path):
+                trie.insert(module, STDLIB)
+            added = distributions.keys()
+        if isinstance(getattr(previous, "index", None), MappedModuleTable):
+            previous.index.close()
+
+        for dist_key in added:
+            for module in distributions[dist_key]:
+                trie.insert(module, names[dist_key[0]])
+
+        try:
+            MappedModuleTable.write(self._index_path(env_path), trie.items(),
+                                    {"env": str(env_path), "signature": signature})
+        except OSError as e:
+            logger.debug(f"Could not persist module index for {env_path}: {e}")
+        self.builds += 1
+        return _Entry(signature, trie, distributions, names)
+
+
+# Index partagé (API web)
+module_indexes = ModuleIndexRegistry()
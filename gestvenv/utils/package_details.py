@@ -0,0 +1,245 @@
+"""
+Détails des packages installés, lus directement dans site-packages
+
+Un seul passage par distribution (*.dist-info) : METADATA (en-têtes),
+top_level.txt, RECORD (modules importables) et entry_points.txt, sans
+sous-processus pip. Les résultats sont mis en cache par environnement :
+- la signature (mtime des répertoires site-packages) change à chaque
+  installation ou désinstallation, ce qui invalide le cache ;
+- seules les distributions nouvelles sont relues (cache par répertoire
+  dist-info, dont le nom inclut la version).
+"""
+
+import configparser
+import csv
+import io
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, fields as dataclass_fields
+from email.parser import HeaderParser
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .requirements_parser import normalize_name
+from .sync_planner import _site_packages_dirs
+
+logger = logging.getLogger(__name__)
+
+# Suffixes des modules importables listés dans RECORD
+_MODULE_SUFFIXES = (".py", ".so", ".pyd")
+
+
+@dataclass
+class PackageInfo:
+    """Métadonnées d'une distribution installée"""
+    name: str
+    version: str
+    location: str = ""
+    summary: str = ""
+    home_page: str = ""
+    author: str = ""
+    license: str = ""
+    requires_dist: List[str] = field(default_factory=list)
+    top_level: List[str] = field(default_factory=list)
+    modules: List[str] = field(default_factory=list)
+    entry_points: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def normalized_name(self) -> str:
+        return normalize_name(self.name)
+
+    def to_dict(self, selected: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Dictionnaire des champs, éventuellement restreint à selected"""
+        names = [f.name for f in dataclass_fields(self)]
+        if selected is not None:
+            wanted = set(selected)
+            names = [name for name in names if name in wanted]
+        return {name: getattr(self, name) for name in names}
+
+
+def _module_name(path: str) -> Optional[str]:
+    """Nom de module importable d'un chemin RECORD (None si non importable)"""
+    if path.startswith("..") or "__pycache__" in path or ".dist-info/" in path:
+        return None
+    if not path.endswith(_MODULE_SUFFIXES):
+        return None
+    parts = path.split("/")
+    # Extensions compilées : foo.cpython-311-x86_64-linux-gnu.so -> foo
+    parts[-1] = parts[-1].split(".", 1)[0]
+    if parts[-1] == "__init__":
+        parts.pop()
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None
+    return ".".join(parts)
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+
+def _parse_entry_points(text: str) -> Dict[str, List[str]]:
+    parser = configparser.ConfigParser(interpolation=None, delimiters=("=",))
+    parser.optionxform = str
+    try:
+        parser.read_string(text)
+    except configparser.Error:
+        return {}
+    return {
+        group: [f"{name} = {value}" for name, value in parser.items(group)]
+        for group in parser.sections()
+    }
+
+
+def read_distribution(info_dir: Path) -> Optional[PackageInfo]:
+    """Lit une distribution (*.dist-info ou *.egg-info) en un passage"""
+    metadata_text = _read_text(info_dir / "METADATA")
+    if metadata_text is None:
+        metadata_text = _read_text(info_dir / "PKG-INFO")
+    if metadata_text is None:
+        return None
+
+    headers = HeaderParser().parsestr(metadata_text)
+    name = headers.get("Name")
+    if not name:
+        return None
+
+    modules: List[str] = []
+    record = _read_text(info_dir / "RECORD")
+    if record:
+        seen = set()
+        for row in csv.reader(io.StringIO(record)):
+            module = _module_name(row[0]) if row else None
+            if module and module not in seen:
+                seen.add(module)
+                modules.append(module)
+        modules.sort()
+
+    top_level_text = _read_text(info_dir / "top_level.txt")
+    if top_level_text is not None:
+        top_level = sorted({line.strip() for line in top_level_text.splitlines() if line.strip()})
+    else:
+        top_level = sorted({module.split(".", 1)[0] for module in modules})
+    if not modules:
+        modules = list(top_level)
+
+    entry_points_text = _read_text(info_dir / "entry_points.txt")
+
+    return PackageInfo(
+        name=name,
+        version=headers.get("Version", ""),
+        location=str(info_dir.parent),
+        summary=headers.get("Summary", "") or "",
+        home_page=headers.get("Home-page", "") or _project_url(headers) or "",
+        author=headers.get("Author", "") or headers.get("Author-email", "") or "",
+        license=headers.get("License", "") or "",
+        requires_dist=headers.get_all("Requires-Dist") or [],
+        top_level=top_level,
+        modules=modules,
+        entry_points=_parse_entry_points(entry_points_text) if entry_points_text else {},
+    )
+
+
+def _project_url(headers) -> Optional[str]:
+    """Première Project-URL (Homepage de préférence) en l'absence de Home-page"""
+    urls = headers.get_all("Project-URL") or []
+    for url in urls:
+        label, _, value = url.partition(",")
+        if label.strip().lower() in ("homepage", "home"):
+            return value.strip()
+    return urls[0].partition(",")[2].strip() if urls else None
+
+
+@dataclass
+class _EnvironmentEntry:
+    signature: Tuple[Tuple[str, int], ...] = ()
+    packages: Dict[str, PackageInfo] = field(default_factory=dict)
+    # Par répertoire *.dist-info (nom incluant la version) : relu seulement s'il apparaît
+    distributions: Dict[str, Optional[PackageInfo]] = field(default_factory=dict)
+
+
+class PackageDetailsIndex:
+    """Cache des détails de packages par environnement"""
+
+    def __init__(self):
+        self._entries: Dict[str, _EnvironmentEntry] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def packages(self, env_path: Union[str, Path]) -> List[PackageInfo]:
+        """Distributions installées, triées par nom normalisé"""
+        entry = self._refresh(Path(env_path))
+        return [entry.packages[name] for name in sorted(entry.packages)]
+
+    def get(self, env_path: Union[str, Path], package: str) -> Optional[PackageInfo]:
+        """Détails d'une distribution (nom comparé après normalisation PEP 503)"""
+        return self._refresh(Path(env_path)).packages.get(normalize_name(package))
+
+    def page(
+        self,
+        env_path: Union[str, Path],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        query: Optional[str] = None
+    ) -> Tuple[int, List[PackageInfo]]:
+        """Tranche de la liste (filtrée par préfixe de nom) et nombre total"""
+        packages = self.packages(env_path)
+        if query:
+            prefix = normalize_name(query)
+            packages = [p for p in packages if p.normalized_name.startswith(prefix)]
+        end = None if limit is None else offset + limit
+        return len(packages), packages[offset:end]
+
+    def invalidate(self, env_path: Optional[Union[str, Path]] = None) -> None:
+        """Oubli du cache d'un environnement (de tous sans argument)"""
+        with self._lock:
+            if env_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(env_path)), None)
+
+    def _refresh(self, env_path: Path) -> _EnvironmentEntry:
+        site_dirs = _site_packages_dirs(env_path)
+        signature = tuple(_signature(site_dir) for site_dir in site_dirs)
+        key = str(env_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                return entry
+
+            previous = entry.distributions if entry is not None else {}
+            entry = _EnvironmentEntry(signature=signature)
+            for site_dir in site_dirs:
+                try:
+                    names = os.listdir(site_dir)
+                except OSError:
+                    continue
+                for dirname in names:
+                    if not dirname.endswith((".dist-info", ".egg-info")):
+                        continue
+                    dist_key = os.path.join(site_dir, dirname)
+                    if dist_key in previous:
+                        info = previous[dist_key]
+                    else:
+                        info = read_distribution(site_dir / dirname)
+                        self.reads += 1
+                    entry.distributions[dist_key] = info
+                    if info is not None:
+                        entry.packages.setdefault(info.normalized_name, info)
+            self._entries[key] = entry
+            return entry
+
+
+def _signature(site_dir: Path) -> Tuple[str, int]:
+    try:
+        return str(site_dir), site_dir.stat().st_mtime_ns
+    except OSError:
+        return str(site_dir), 0
+
+
+# Index partagé (API web, complétion IDE)
+package_index = PackageDetailsIndex()
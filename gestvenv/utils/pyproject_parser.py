@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 from .toml_handler import TomlHandler
+from .requirements_parser import iter_requirement_lines, parse_requirement, requirement_name
 from ..core.models import PyProjectInfo
 from ..core.exceptions import PyProjectParsingError, ValidationError
 
@@ -71,24 +72,18 @@ class PyProjectParser:
         
         try:
             dependencies = []
+            content = req_path.read_text(encoding='utf-8')
             
-            with open(req_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Ignorer commentaires et lignes vides
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Ignorer options pip
-                    if line.startswith('-'):
-                        continue
-                    
-                    # Validation et ajout dépendance
-                    if PyProjectParser._validate_dependency_spec(line):
-                        dependencies.append(line)
-                    else:
-                        logger.warning(f"Ligne {line_num} ignorée: {line}")
+            for line in iter_requirement_lines(content):
+                # Ignorer options pip
+                if line.startswith('-'):
+                    continue
+                
+                # Validation et ajout dépendance
+                if PyProjectParser._validate_dependency_spec(line):
+                    dependencies.append(line)
+                else:
+                    logger.warning(f"Ligne ignorée: {line}")
             
             project_name = req_path.parent.name or "my-project"
             
@@ -220,32 +215,24 @@ class PyProjectParser:
         if any(char in spec for char in dangerous_chars):
             return False
         
-        # Validation basique format package
-        # Nom package + version optionnelle + extras optionnels
-        pattern = r'^[a-zA-Z0-9][a-zA-Z0-9._-]*(\[[a-zA-Z0-9,._-]+\])?(==|>=|<=|>|<|~=|!=)?[a-zA-Z0-9._-]*$'
-        return bool(re.match(pattern, spec))
+        # Spécification PEP 508 valide (parser partagé)
+        return parse_requirement(spec) is not None
     
     @staticmethod
     def _normalize_dependency_name(dep: str) -> str:
-        """Normalise un nom de dépendance"""
-        # Extraction nom (avant version/extras)
-        name_match = re.match(r'^([a-zA-Z0-9][a-zA-Z0-9._-]*)', dep)
-        if name_match:
-            return name_match.group(1).lower().replace('_', '-')
-        return dep
+        """Normalise un nom de dépendance (PEP 503)"""
+        return requirement_name(dep)
     
     @staticmethod
     def _parse_dependency_extras(dep: str) -> List[str]:
         """Parse les extras d'une dépendance"""
-        extras_match = re.search(r'\[([a-zA-Z0-9,._-]+)\]', dep)
-        if extras_match:
-            return [extra.strip() for extra in extras_match.group(1).split(',')]
-        return []
+        parsed = parse_requirement(dep)
+        return list(parsed.extras) if parsed else []
     
     @staticmethod
     def _parse_dependency_version(dep: str) -> Optional[str]:
         """Parse la contrainte de version d'une dépendance"""
-        version_match = re.search(r'(==|>=|<=|>|<|~=|!=)([a-zA-Z0-9._-]+)', dep)
-        if version_match:
-            return f"{version_match.group(1)}{version_match.group(2)}"
+        parsed = parse_requirement(dep)
+        if parsed and parsed.specifier:
+            return parsed.specifier
         return None
\ No newline at end of file
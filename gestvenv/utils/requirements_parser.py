@@ -1,11 +1,153 @@
 """
 Parser de fichiers requirements.txt pour GestVenv v2.0
+
+Fournit également le parser de spécifications partagé (PEP 508) utilisé par
+les autres parsers : chemin rapide par regex compilée pour les formes
+courantes, repli sur packaging.requirements sinon, le tout mémoïsé (LRU).
 """
 
 import re
-from pathlib import Path
-from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from packaging.requirements import InvalidRequirement, Requirement as PackagingRequirement
+from packaging.utils import canonicalize_name
+
+# Éléments de grammaire pour le chemin rapide. Les versions acceptées sont un
+# sous-ensemble strict de PEP 440 : tout ce qui sort de ce sous-ensemble est
+# confié à packaging, ce qui garantit des résultats identiques.
+_NAME = r"[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?"
+_RELEASE = r"\d+(?:\.\d+)*"
+_SUFFIX = r"(?:(?:a|b|rc)\d+)?(?:\.post\d+)?(?:\.dev\d+)?"
+_CLAUSE = (
+    rf"(?:(?:==|!=)\s*{_RELEASE}(?:{_SUFFIX}|\.\*)"
+    rf"|(?:<=|>=|<|>)\s*{_RELEASE}{_SUFFIX}"
+    rf"|~=\s*\d+(?:\.\d+)+{_SUFFIX})"
+)
+
+_SIMPLE_REQUIREMENT = re.compile(
+    rf"^(?P<name>{_NAME})\s*"
+    rf"(?:\[\s*(?P<extras>{_NAME}(?:\s*,\s*{_NAME})*)?\s*\])?\s*"
+    rf"(?P<spec>{_CLAUSE}(?:\s*,\s*{_CLAUSE})*)?$"
+)
+_SPEC_SEPARATOR = re.compile(r"\s*,\s*")
+_WHITESPACE = re.compile(r"\s+")
+_INLINE_COMMENT = re.compile(r"(?:^|\s+)#.*$")
+_NAME_PREFIX = re.compile(_NAME)
+
+
+@dataclass(frozen=True)
+class ParsedRequirement:
+    """Spécification de dépendance normalisée (immuable, partagée par le cache)"""
+    name: str
+    normalized_name: str
+    specifier: str = ""
+    extras: Tuple[str, ...] = ()
+    marker: Optional[str] = None
+    url: Optional[str] = None
+
+    @property
+    def pinned_version(self) -> Optional[str]:
+        """Version exacte si la spécification est un unique '=='"""
+        spec = self.specifier
+        if spec.startswith("==") and not spec.startswith("===") \
+                and "," not in spec and not spec.endswith(".*"):
+            return spec[2:]
+        return None
+
+
+def normalize_name(name: str) -> str:
+    """Normalise un nom de distribution (PEP 503)"""
+    return canonicalize_name(name)
+
+
+@lru_cache(maxsize=32768)
+def parse_requirement(spec: str) -> Optional[ParsedRequirement]:
+    """Parse une spécification de dépendance PEP 508
+
+    Args:
+        spec: Spécification (ex: 'requests[socks]>=2.0,<3 ; python_version>"3.8"')
+
+    Returns:
+        ParsedRequirement, ou None si la spécification est invalide
+    """
+    spec = spec.strip()
+    if not spec:
+        return None
+    return _parse_fast(spec) or _parse_with_packaging(spec)
+
+
+def _parse_fast(spec: str) -> Optional[ParsedRequirement]:
+    """Chemin rapide : nom, extras et contraintes simples, sans marqueur ni URL"""
+    match = _SIMPLE_REQUIREMENT.match(spec)
+    if not match:
+        return None
+
+    name = match.group("name")
+    extras = match.group("extras")
+    clauses = match.group("spec")
+    specifier = ""
+    if clauses:
+        # Même forme que str(SpecifierSet) : clauses sans espaces, triées
+        specifier = ",".join(sorted(
+            _WHITESPACE.sub("", clause) for clause in _SPEC_SEPARATOR.split(clauses)
+        ))
+
+    return ParsedRequirement(
+        name=name,
+        normalized_name=canonicalize_name(name),
+        specifier=specifier,
+        extras=tuple(sorted({e.strip() for e in extras.split(",")})) if extras else (),
+    )
+
+
+def _parse_with_packaging(spec: str) -> Optional[ParsedRequirement]:
+    """Parsing complet via packaging.requirements"""
+    try:
+        req = PackagingRequirement(spec)
+    except InvalidRequirement:
+        return None
+
+    return ParsedRequirement(
+        name=req.name,
+        normalized_name=canonicalize_name(req.name),
+        specifier=str(req.specifier),
+        extras=tuple(sorted(req.extras)),
+        marker=str(req.marker) if req.marker else None,
+        url=req.url,
+    )
+
+
+def requirement_name(spec: str) -> str:
+    """Nom normalisé d'une spécification, avec repli sur le préfixe du nom"""
+    parsed = parse_requirement(spec)
+    if parsed:
+        return parsed.normalized_name
+    match = _NAME_PREFIX.match(spec.strip())
+    return canonicalize_name(match.group(0)) if match else spec.strip().lower()
+
+
+def iter_requirement_lines(content: str) -> Iterator[str]:
+    """Itère sur les lignes logiques d'un contenu requirements.txt
+
+    Gère les continuations ('\\' en fin de ligne) et retire les commentaires
+    ('#' en début de ligne ou précédé d'un espace, ce qui préserve '#egg=').
+    Les lignes d'options pip (-r, -e, --index-url...) sont conservées.
+    """
+    pending = ""
+    for raw_line in content.splitlines():
+        line = _INLINE_COMMENT.sub("", raw_line).strip()
+        if line.endswith("\\"):
+            pending += line[:-1].rstrip() + " "
+            continue
+        line = (pending + line).strip()
+        pending = ""
+        if line:
+            yield line
+    if pending.strip():
+        yield pending.strip()
 
 
 @dataclass
@@ -37,19 +179,7 @@ class Requirement:
 class RequirementsParser:
     """Parser pour fichiers requirements.txt"""
 
-    # Pattern pour parser une ligne requirements.txt
-    # Gère: package==1.0, package>=1.0, package[extra]>=1.0, -e git+url
-    REQUIREMENT_PATTERN = re.compile(
-        r'^'
-        r'(?P<editable>-e\s+)?'  # -e pour editable
-        r'(?P<name>[a-zA-Z0-9][-a-zA-Z0-9._]*)'  # nom du package
-        r'(?:\[(?P<extras>[^\]]+)\])?'  # extras optionnels [extra1,extra2]
-        r'(?P<version_spec>(?:[<>=!~]=?|@)[^;#\s]*)?'  # version spec
-        r'(?:\s*;\s*(?P<markers>[^#]*))?'  # markers optionnels
-        r'(?:\s*#.*)?'  # commentaires
-        r'$'
-    )
-
+    # Gère: -e git+url#egg=name, https://.../pkg.git
     URL_PATTERN = re.compile(
         r'^'
         r'(?P<editable>-e\s+)?'
@@ -89,13 +219,7 @@ class RequirementsParser:
         """
         self.requirements = []
 
-        for line in content.splitlines():
-            line = line.strip()
-
-            # Ignorer les lignes vides et commentaires
-            if not line or line.startswith('#'):
-                continue
-
+        for line in iter_requirement_lines(content):
             # Ignorer les options pip (-i, --index-url, etc.)
             if line.startswith('-') and not line.startswith('-e'):
                 continue
@@ -129,20 +253,17 @@ class RequirementsParser:
                 editable=bool(groups.get('editable'))
             )
 
-        # Essayer le pattern standard
-        match = self.REQUIREMENT_PATTERN.match(line)
-        if match:
-            groups = match.groupdict()
-            extras = []
-            if groups.get('extras'):
-                extras = [e.strip() for e in groups['extras'].split(',')]
-
+        # Spécification PEP 508 via le parser partagé
+        editable = line.startswith('-e ')
+        parsed = parse_requirement(line[3:] if editable else line)
+        if parsed:
             return Requirement(
-                name=groups['name'],
-                version_spec=groups.get('version_spec'),
-                extras=extras,
-                markers=groups.get('markers', '').strip() or None,
-                editable=bool(groups.get('editable'))
+                name=parsed.name,
+                version_spec=parsed.specifier or None,
+                extras=list(parsed.extras),
+                markers=parsed.marker,
+                editable=editable,
+                url=parsed.url
             )
 
         return None
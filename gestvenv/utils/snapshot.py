@@ -0,0 +1,515 @@
+"""
+Instantanés binaires d'environnements pour GestVenv v2.0
+
+Format .gvsnap : flux tar (PAX) compressé en zstd multi-thread (gzip si le
+module zstandard est absent) contenant, dans l'ordre :
+- snapshot.json : en-tête (chemin source, Python, plateforme, métadonnées) ;
+- env/... : arborescence du venv, empreinte sha256 de chaque fichier dans
+  l'en-tête PAX du membre ;
+- manifest.json : empreintes, tailles et modes de tous les fichiers.
+
+Export et import se font en flux (aucune mise en mémoire de l'archive) ;
+les chemins absolus sont réécrits à l'import. Un magasin adressé par
+contenu optionnel permet de ne pas réécrire les fichiers déjà présents
+(lien physique vers l'objet existant).
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import stat
+import sys
+import tarfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..core.exceptions import SnapshotError
+from .venv_clone import DEFAULT_EXCLUDES, is_mutable, relocate_venv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAPSHOT_FORMAT = "gestvenv-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".gvsnap"
+
+HEADER_NAME = "snapshot.json"
+MANIFEST_NAME = "manifest.json"
+ENV_PREFIX = "env"
+HASH_PAX_KEY = "GESTVENV.sha256"
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Fichiers lus en mémoire d'un bloc (empreinte et écriture en une lecture)
+SMALL_FILE_LIMIT = 8 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+# Seuls liens absolus admis hors du venv : l'interpréteur de base
+INTERPRETER_DIRS = ("bin", "Scripts")
+INTERPRETER_PREFIXES = ("python", "pypy")
+
+O_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+O_BINARY = getattr(os, "O_BINARY", 0)
+
+
+@dataclass
+class SnapshotStats:
+    """Bilan d'un export ou d'un import d'instantané"""
+    codec: str = ""
+    files: int = 0
+    symlinks: int = 0
+    bytes: int = 0
+    deduplicated_files: int = 0
+    deduplicated_bytes: int = 0
+    rewritten: int = 0
+    archive_size: int = 0
+    duration: float = 0.0
+    header: Dict[str, Any] = field(default_factory=dict)
+
+
+def default_codec() -> str:
+    """zstd si disponible, sinon gzip"""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _platform_tag() -> Dict[str, str]:
+    return {"platform": sys.platform, "machine": platform.machine()}
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_member(tar: tarfile.TarFile, name: str, data: Dict[str, Any]) -> None:
+    payload = json.dumps(data, indent=2, default=str).encode("utf-8")
+    info = tarfile.TarInfo(name)
+    info.size = len(payload)
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(payload))
+
+
+def _iter_tree(root: Path, rel: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], os.DirEntry]]:
+    """Parcours en profondeur (répertoire avant son contenu), liens non suivis"""
+    with os.scandir(root) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not rel and entry.name in DEFAULT_EXCLUDES:
+                continue
+            yield rel + (entry.name,), entry
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_tree(Path(entry.path), rel + (entry.name,))
+
+
+class _ZstdWriter(io.RawIOBase):
+    """Adaptateur en écriture pour tarfile (ferme le cadre sans fermer le fichier)"""
+
+    def __init__(self, raw: BinaryIO, level: int, threads: int):
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads)
+        self._writer = compressor.stream_writer(raw, closefd=False)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self._writer.write(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._writer.close()
+        super().close()
+
+
+def export_snapshot(
+    env_path: Union[str, Path],
+    output: Union[str, Path],
+    metadata: Optional[Dict[str, Any]] = None,
+    codec: Optional[str] = None,
+    level: int = 3,
+    threads: int = -1
+) -> SnapshotStats:
+    """Exporte un venv dans une archive .gvsnap
+
+    Args:
+        env_path: Racine du venv
+        output: Fichier archive à créer
+        metadata: Métadonnées GestVenv de l'environnement (to_dict)
+        codec: "zstd" ou "gzip" (défaut: zstd si disponible)
+        level: Niveau de compression
+        threads: Threads de compression zstd (-1: nombre de CPU)
+
+    Returns:
+        SnapshotStats de l'export
+    """
+    start = time.perf_counter()
+    env_path = Path(env_path).absolute()
+    output = Path(output)
+    codec = codec or default_codec()
+    if codec == "zstd" and zstandard is None:
+        raise SnapshotError("Compression zstd indisponible (pip install zstandard)")
+    if codec not in ("zstd", "gzip"):
+        raise SnapshotError(f"Compression inconnue: {codec}")
+    if not (env_path / "pyvenv.cfg").is_file():
+        raise SnapshotError(f"pyvenv.cfg introuvable dans {env_path}")
+
+    stats = SnapshotStats(codec=codec)
+    stats.header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source_path": str(env_path),
+        "source_paths": sorted({str(env_path), str(env_path.resolve())}),
+        **_platform_tag(),
+        "environment": metadata or {},
+    }
+    manifest: Dict[str, Any] = {"files": {}, "symlinks": {}}
+
+    partial = output.with_name(output.name + ".partial")
+    try:
+        with open(partial, "wb") as raw:
+            if codec == "zstd":
+                stream = _ZstdWriter(raw, level, threads)
+            else:
+                stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=min(max(level, 1), 9))
+            tar = tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT)
+            try:
+                _json_member(tar, HEADER_NAME, stats.header)
+                _write_tree(tar, env_path, manifest, stats)
+                _json_member(tar, MANIFEST_NAME, manifest)
+            finally:
+                tar.close()
+                stream.close()
+        os.replace(partial, output)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    stats.archive_size = output.stat().st_size
+    stats.duration = time.perf_counter() - start
+    return stats
+
+
+def _write_tree(tar: tarfile.TarFile, env_path: Path, manifest: Dict[str, Any],
+                stats: SnapshotStats) -> None:
+    """Ajoute l'arborescence du venv au flux tar"""
+    for rel, entry in _iter_tree(env_path):
+        rel_name = "/".join(rel)
+        st = entry.stat(follow_symlinks=False)
+        info = tarfile.TarInfo(f"{ENV_PREFIX}/{rel_name}")
+        info.mode = stat.S_IMODE(st.st_mode)
+        info.mtime = int(st.st_mtime)
+
+        if entry.is_symlink():
+            info.type = tarfile.SYMTYPE
+            info.linkname = os.readlink(entry.path)
+            tar.addfile(info)
+            manifest["symlinks"][rel_name] = info.linkname
+            stats.symlinks += 1
+        elif entry.is_dir(follow_symlinks=False):
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+        elif entry.is_file(follow_symlinks=False):
+            info.size = st.st_size
+            if st.st_size <= SMALL_FILE_LIMIT:
+                with open(entry.path, "rb") as f:
+                    data = f.read()
+                info.size = len(data)
+                digest = hashlib.sha256(data).hexdigest()
+                info.pax_headers = {HASH_PAX_KEY: digest}
+                tar.addfile(info, io.BytesIO(data))
+            else:
+                # Gros fichier : empreinte en première passe, puis copie en flux
+                digest = _sha256_file(Path(entry.path))
+                info.pax_headers = {HASH_PAX_KEY: digest}
+                with open(entry.path, "rb") as f:
+                    tar.addfile(info, f)
+            manifest["files"][rel_name] = {"sha256": digest, "size": info.size, "mode": info.mode}
+            stats.files += 1
+            stats.bytes += info.size
+
+
+class _ObjectStore:
+    """Magasin de fichiers adressé par contenu (objects/ab/<sha256>-<mode>)"""
+
+    def __init__(self, root: Optional[Path]):
+        self.root = Path(root) if root else None
+
+    def path_for(self, digest: str, mode: int) -> Optional[Path]:
+        if self.root is None:
+            return None
+        return self.root / digest[:2] / f"{digest}-{mode:o}"
+
+    def link_into(self, digest: str, mode: int, size: int, dest: Path) -> bool:
+        """Crée dest comme lien physique vers l'objet existant"""
+        obj = self.path_for(digest, mode)
+        try:
+            # Objet modifié sur place (taille ou contenu) : pas réutilisé
+            if obj is None or obj.stat().st_size != size or _sha256_file(obj) != digest:
+                return False
+        except OSError:
+            return False
+        try:
+            os.link(obj, dest)
+            return True
+        except OSError:
+            # Autre système de fichiers : le magasin n'est plus utilisé
+            self.root = None
+            return False
+
+    def adopt(self, digest: str, mode: int, src: Path) -> None:
+        """Enregistre un fichier extrait comme objet (lien physique)"""
+        obj = self.path_for(digest, mode)
+        if obj is None or obj.exists():
+            return
+        try:
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            os.link(src, obj)
+        except FileExistsError:
+            pass
+        except OSError:
+            self.root = None
+
+
+def _open_archive(raw: BinaryIO) -> Tuple[str, tarfile.TarFile, Optional[Any]]:
+    """Ouvre le flux tar après détection de la compression"""
+    magic = raw.read(4)
+    raw.seek(0)
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise SnapshotError("Archive zstd : module zstandard requis (pip install zstandard)")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        return "zstd", tarfile.open(fileobj=reader, mode="r|"), reader
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip", tarfile.open(fileobj=raw, mode="r|gz"), None
+    raise SnapshotError("Format d'archive non reconnu")
+
+
+def _safe_relpath(name: str) -> str:
+    """Chemin relatif à env/, sans composant absolu ni remontée"""
+    if not name.startswith(ENV_PREFIX + "/"):
+        raise SnapshotError(f"Membre inattendu dans l'archive: {name}")
+    rel = name[len(ENV_PREFIX) + 1:]
+    parts = rel.split("/")
+    if not rel or rel.startswith("/") or any(p in ("", "..") for p in parts) or "\\" in rel:
+        raise SnapshotError(f"Chemin non sûr dans l'archive: {name}")
+    return rel
+
+
+def _safe_symlink(rel: str, link: str, depth: int, old_paths: List[str], target: Path) -> str:
+    """Cible de lien symbolique restant dans l'environnement
+
+    Cible relative : remontées (..) en tête uniquement, sans dépasser la
+    racine. Cible absolue : dans le venv source (réécrite vers target), ou
+    interpréteur de base pour les liens bin/python* d'un venv.
+    """
+    if os.path.isabs(link):
+        for old in old_paths:
+            if old and (link == old or link.startswith(old + "/")):
+                tail = link[len(old):].lstrip("/")
+                if ".." in tail.split("/"):
+                    break
+                return str(target / tail) if tail else str(target)
+        else:
+            parent, _, name = rel.rpartition("/")
+            if parent in INTERPRETER_DIRS and name.startswith(INTERPRETER_PREFIXES):
+                return link
+        raise SnapshotError(f"Lien symbolique hors de l'environnement: {ENV_PREFIX}/{rel} -> {link}")
+
+    parts = [p for p in link.split("/") if p not in ("", ".")]
+    ups = 0
+    while ups < len(parts) and parts[ups] == "..":
+        ups += 1
+    if not parts or ".." in parts[ups:] or ups > depth or "\\" in link:
+        raise SnapshotError(f"Lien symbolique hors de l'environnement: {ENV_PREFIX}/{rel} -> {link}")
+    return link
+
+
+def read_snapshot_header(archive: Union[str, Path]) -> Dict[str, Any]:
+    """Lit l'en-tête d'une archive sans la décompresser entièrement"""
+    with open(archive, "rb") as raw:
+        _, tar, reader = _open_archive(raw)
+        try:
+            member = tar.next()
+            if member is None or member.name != HEADER_NAME:
+                raise SnapshotError("En-tête d'instantané absent")
+            header = json.load(tar.extractfile(member))
+        finally:
+            tar.close()
+            if reader is not None:
+                reader.close()
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Archive qui n'est pas un instantané GestVenv")
+    return header
+
+
+def import_snapshot(
+    archive: Union[str, Path],
+    target: Union[str, Path],
+    object_store: Optional[Union[str, Path]] = None,
+    check_platform: bool = True
+) -> SnapshotStats:
+    """Restaure un venv depuis une archive .gvsnap
+
+    L'extraction se fait dans un répertoire temporaire voisin, vérifié
+    contre le manifeste, relocalisé puis renommé en target.
+
+    Args:
+        archive: Archive .gvsnap
+        target: Racine du venv à créer (ne doit pas exister)
+        object_store: Magasin adressé par contenu (optionnel)
+        check_platform: Refuser une archive d'une autre plateforme
+
+    Returns:
+        SnapshotStats ; header contient l'en-tête de l'archive
+    """
+    start = time.perf_counter()
+    target = Path(target).absolute()
+    if target.exists():
+        raise SnapshotError(f"{target} existe déjà")
+
+    stats = SnapshotStats()
+    staging = target.with_name(f".{target.name}.importing-{os.getpid()}")
+    if staging.exists():
+        shutil.rmtree(staging)
+    store = _ObjectStore(object_store)
+
+    try:
+        with open(archive, "rb") as raw:
+            stats.codec, tar, reader = _open_archive(raw)
+            try:
+                manifest = _extract_members(tar, staging, target, store, stats, check_platform)
+            finally:
+                tar.close()
+                if reader is not None:
+                    reader.close()
+
+        _verify_manifest(manifest, stats)
+        old_paths = stats.header.get("source_paths") or [stats.header["source_path"]]
+        mutable = [staging / rel for rel in manifest["files"] if is_mutable(Path(rel))]
+        stats.rewritten = relocate_venv(staging, old_paths, mutable, new_path=target)
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    stats.archive_size = Path(archive).stat().st_size
+    stats.duration = time.perf_counter() - start
+    return stats
+
+
+def _extract_members(tar: tarfile.TarFile, staging: Path, target: Path, store: _ObjectStore,
+                     stats: SnapshotStats, check_platform: bool) -> Dict[str, Any]:
+    """Extrait le flux membre par membre ; retourne le manifeste"""
+    member = tar.next()
+    if member is None or member.name != HEADER_NAME:
+        raise SnapshotError("En-tête d'instantané absent")
+    stats.header = json.load(tar.extractfile(member))
+    if stats.header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Archive qui n'est pas un instantané GestVenv")
+    if stats.header.get("version", 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(f"Version d'instantané non supportée: {stats.header.get('version')}")
+    if check_platform:
+        expected = _platform_tag()
+        found = {key: stats.header.get(key) for key in expected}
+        if found != expected:
+            raise SnapshotError(
+                f"Instantané créé pour {found['platform']}/{found['machine']}, "
+                f"incompatible avec {expected['platform']}/{expected['machine']}"
+            )
+
+    old_paths = stats.header.get("source_paths") or [stats.header.get("source_path", "")]
+    staging.mkdir(parents=True)
+    real_staging = os.path.realpath(staging)
+    extracted: Dict[str, str] = {}
+    dir_times = []
+    manifest = None
+
+    while True:
+        member = tar.next()
+        if member is None:
+            break
+        # Flux : pas d'accès aléatoire, inutile de conserver les TarInfo lus
+        tar.members.clear()
+        if member.name == MANIFEST_NAME:
+            manifest = json.load(tar.extractfile(member))
+            continue
+        rel = _safe_relpath(member.name)
+        dest = staging / rel
+        # Jamais d'écriture à travers un lien symbolique extrait
+        parent = os.path.realpath(dest.parent)
+        if parent != real_staging and not parent.startswith(real_staging + os.sep):
+            raise SnapshotError(f"Chemin hors de l'environnement: {member.name}")
+        # Membre en double : il pourrait remplacer ou suivre un lien déjà extrait
+        if os.path.lexists(dest):
+            raise SnapshotError(f"Membre en double dans l'archive: {member.name}")
+
+        if member.isdir():
+            dest.mkdir()
+            dir_times.append((dest, member.mode, member.mtime))
+        elif member.issym():
+            depth = len(Path(os.path.relpath(parent, real_staging)).parts) if parent != real_staging else 0
+            os.symlink(_safe_symlink(rel, member.linkname, depth, old_paths, target), dest)
+            stats.symlinks += 1
+        elif member.isfile():
+            digest = member.pax_headers.get(HASH_PAX_KEY)
+            if digest and not is_mutable(Path(rel)) and store.link_into(digest, member.mode, member.size, dest):
+                # Contenu déjà présent : flux consommé sans écriture
+                stats.deduplicated_files += 1
+                stats.deduplicated_bytes += member.size
+            else:
+                digest = _write_member(tar, member, dest)
+                if not is_mutable(Path(rel)):
+                    store.adopt(digest, member.mode, dest)
+            extracted[rel] = digest
+            stats.files += 1
+            stats.bytes += member.size
+        else:
+            raise SnapshotError(f"Type de membre non supporté: {member.name}")
+
+    for path, mode, mtime in reversed(dir_times):
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+
+    if manifest is None:
+        raise SnapshotError("Manifeste absent : archive tronquée")
+    manifest["_extracted"] = extracted
+    return manifest
+
+
+def _write_member(tar: tarfile.TarFile, member: tarfile.TarInfo, dest: Path) -> str:
+    """Écrit un membre en flux et retourne son empreinte"""
+    digest = hashlib.sha256()
+    source = tar.extractfile(member)
+    # Création exclusive, sans suivre de lien : rien n'est écrit hors de dest
+    fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_EXCL | O_NOFOLLOW | O_BINARY, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            f.write(chunk)
+    os.chmod(dest, member.mode)
+    os.utime(dest, (member.mtime, member.mtime))
+    return digest.hexdigest()
+
+
+def _verify_manifest(manifest: Dict[str, Any], stats: SnapshotStats) -> None:
+    """Compare les fichiers extraits au manifeste"""
+    extracted = manifest.pop("_extracted")
+    expected = {rel: entry["sha256"] for rel, entry in manifest["files"].items()}
+    missing = sorted(set(expected) - set(extracted))
+    if missing:
+        raise SnapshotError(f"{len(missing)} fichier(s) manquant(s) dans l'archive: {missing[:5]}")
+    corrupted = sorted(rel for rel, digest in extracted.items() if expected.get(rel) != digest)
+    if corrupted:
+        raise SnapshotError(f"Empreintes invalides: {corrupted[:5]}")
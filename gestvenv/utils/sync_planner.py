@@ -0,0 +1,465 @@
+"""
+Planification de synchronisation pour GestVenv v2.0
+
+Compare les dépendances attendues (pyproject.toml ou fichier de verrouillage)
+à l'instantané des distributions installées : noms normalisés (PEP 503),
+spécificateurs complets et marqueurs évalués pour l'interpréteur de
+l'environnement. Le plan obtenu est minimal et s'exécute en un seul appel
+groupé au backend ; un environnement déjà synchronisé produit un plan vide,
+sans aucun sous-processus.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from packaging.markers import InvalidMarker, Marker, default_environment
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+from .requirements_parser import ParsedRequirement, iter_requirement_lines, normalize_name, parse_requirement
+
+logger = logging.getLogger(__name__)
+
+# Outils d'installation jamais désinstallés par une synchronisation exacte
+PROTECTED_PACKAGES = frozenset({"pip", "setuptools", "wheel"})
+
+# Verrouillages TOML à tables [[package]] ; les autres sont au format requirements
+TOML_LOCK_FILES = frozenset({"uv.lock", "poetry.lock", "pdm.lock"})
+
+
+@dataclass
+class SyncPlan:
+    """Plan de synchronisation minimal"""
+    install: List[str] = field(default_factory=list)
+    upgrade: List[str] = field(default_factory=list)
+    downgrade: List[str] = field(default_factory=list)
+    remove: List[str] = field(default_factory=list)
+    satisfied: List[str] = field(default_factory=list)
+    # Ensemble cible complet (plan issu d'un verrouillage uniquement)
+    target: List[str] = field(default_factory=list)
+    exact: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        """Aucune action nécessaire"""
+        return not (self.install or self.upgrade or self.downgrade or self.remove)
+
+    @property
+    def install_specs(self) -> List[str]:
+        """Spécifications à passer en un seul appel d'installation"""
+        return self.install + self.upgrade + self.downgrade
+
+    def summary(self) -> Dict[str, int]:
+        """Nombre d'actions par catégorie"""
+        return {
+            "install": len(self.install),
+            "upgrade": len(self.upgrade),
+            "downgrade": len(self.downgrade),
+            "remove": len(self.remove),
+            "satisfied": len(self.satisfied),
+        }
+
+
+@lru_cache(maxsize=256)
+def marker_environment(python_version: Optional[str] = None) -> Dict[str, str]:
+    """Environnement d'évaluation des marqueurs PEP 508
+
+    Args:
+        python_version: Version Python de l'environnement cible (ex: '3.11'),
+            l'interpréteur courant par défaut
+    """
+    env = default_environment()
+    if python_version:
+        parts = python_version.strip().split(".")
+        if len(parts) >= 2 and all(p.isdigit() for p in parts[:2]):
+            env["python_version"] = ".".join(parts[:2])
+            env["python_full_version"] = ".".join(parts[:3]) if len(parts) >= 3 \
+                else f"{env['python_version']}.0"
+    return env
+
+
+@lru_cache(maxsize=8192)
+def _specifier_set(specifier: str) -> Optional[SpecifierSet]:
+    try:
+        return SpecifierSet(specifier)
+    except InvalidSpecifier:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _marker(marker: str) -> Optional[Marker]:
+    try:
+        return Marker(marker)
+    except InvalidMarker:
+        return None
+
+
+def _marker_applies(marker: Optional[str], environment: Mapping[str, str]) -> bool:
+    if not marker:
+        return True
+    parsed = _marker(marker)
+    if parsed is None:
+        logger.debug(f"Marqueur invalide ignoré: {marker}")
+        return True
+    # 'extra' n'a de sens que lors de la résolution des dépendances d'un package
+    return parsed.evaluate({**environment, "extra": ""})
+
+
+def _format_requirement(name: str, extras: Tuple[str, ...], specifier: str,
+                        url: Optional[str]) -> str:
+    """Spécification passée au backend (marqueurs déjà évalués)"""
+    extras_part = f"[{','.join(extras)}]" if extras else ""
+    if url:
+        return f"{name}{extras_part} @ {url}"
+    return f"{name}{extras_part}{specifier}"
+
+
+def _merge(requirements: Iterable[str], environment: Mapping[str, str]
+           ) -> Dict[str, ParsedRequirement]:
+    """Regroupe les spécifications applicables par nom normalisé"""
+    merged: Dict[str, ParsedRequirement] = {}
+    for spec in requirements:
+        parsed = parse_requirement(spec)
+        if parsed is None:
+            logger.warning(f"Spécification ignorée: {spec}")
+            continue
+        if not _marker_applies(parsed.marker, environment):
+            continue
+
+        previous = merged.get(parsed.normalized_name)
+        if previous is None:
+            merged[parsed.normalized_name] = parsed
+            continue
+
+        clauses = ",".join(s for s in (previous.specifier, parsed.specifier) if s)
+        merged[parsed.normalized_name] = ParsedRequirement(
+            name=previous.name,
+            normalized_name=previous.normalized_name,
+            specifier=str(_specifier_set(clauses) or clauses),
+            extras=tuple(sorted(set(previous.extras) | set(parsed.extras))),
+            url=previous.url or parsed.url,
+        )
+    return merged
+
+
+def _is_upgrade(installed: str, specifiers: SpecifierSet) -> bool:
+    """Vrai si la version installée est sous les bornes non satisfaites"""
+    try:
+        current = Version(installed)
+    except InvalidVersion:
+        return True
+    for spec in specifiers:
+        if spec.contains(current, prereleases=True):
+            continue
+        try:
+            bound = Version(spec.version.rstrip(".*"))
+        except InvalidVersion:
+            continue
+        if current > bound and spec.operator != "!=":
+            return False
+    return True
+
+
+def plan_sync(
+    requirements: Iterable[str],
+    installed: Mapping[str, str],
+    python_version: Optional[str] = None,
+    exact: bool = False,
+    protected: Iterable[str] = PROTECTED_PACKAGES
+) -> SyncPlan:
+    """Calcule le plan de synchronisation minimal
+
+    Args:
+        requirements: Spécifications PEP 508 attendues
+        installed: Distributions installées {nom: version}
+        python_version: Version Python de l'environnement (évaluation des marqueurs)
+        exact: Les spécifications forment l'ensemble complet (fichier de
+            verrouillage) : les distributions en trop sont à supprimer
+        protected: Distributions jamais supprimées
+
+    Returns:
+        SyncPlan
+    """
+    environment = marker_environment(python_version)
+    expected = _merge(requirements, environment)
+    current = {normalize_name(name): version for name, version in installed.items()}
+    plan = SyncPlan(exact=exact)
+
+    for key, req in expected.items():
+        spec = _format_requirement(req.name, req.extras, req.specifier, req.url)
+        version = current.get(key)
+        if version is None:
+            plan.install.append(spec)
+            continue
+
+        specifiers = _specifier_set(req.specifier) if req.specifier else None
+        if req.url or specifiers is None or specifiers.contains(version, prereleases=True):
+            plan.satisfied.append(key)
+        elif _is_upgrade(version, specifiers):
+            plan.upgrade.append(spec)
+        else:
+            plan.downgrade.append(spec)
+
+    if exact:
+        keep = {normalize_name(name) for name in protected}
+        plan.remove = sorted(key for key in current if key not in expected and key not in keep)
+        plan.target = [
+            _format_requirement(req.name, req.extras, req.specifier, req.url)
+            for req in expected.values()
+        ]
+        # uv pip sync supprime tout ce qui n'est pas listé : on fige les outils protégés
+        plan.target.extend(
+            f"{key}=={current[key]}" for key in sorted(keep) if key in current and key not in expected
+        )
+
+    return plan
+
+
+# Groupes toujours installés (poetry : main, pdm : default)
+DEFAULT_LOCK_GROUPS = frozenset({"main", "default"})
+
+
+def _is_project(package: Mapping) -> bool:
+    """Le projet lui-même (editable/virtual) n'est pas une dépendance verrouillée"""
+    source = package.get("source") or {}
+    return isinstance(source, dict) and ("editable" in source or "virtual" in source)
+
+
+def _resolution_applies(package: Mapping, environment: Mapping[str, str]) -> bool:
+    markers = package.get("resolution-markers") or []
+    return not markers or any(_marker_applies(marker, environment) for marker in markers)
+
+
+def _uv_lock_packages(packages: List[Mapping], environment: Mapping[str, str],
+                      groups: frozenset) -> List[Mapping]:
+    """Entrées uv.lock atteintes depuis le projet
+
+    Les marqueurs d'uv.lock portent sur les arêtes : le graphe est parcouru
+    depuis le projet en ne suivant que les dépendances dont le marqueur
+    s'applique, les extras et groupes de développement n'étant suivis que
+    pour les groupes sélectionnés (et les extras demandés par une arête).
+    """
+    roots = [package for package in packages if _is_project(package)]
+    if not roots:
+        return [package for package in packages if package.get("name")]
+
+    by_name: Dict[str, List[Mapping]] = {}
+    for package in packages:
+        if package.get("name"):
+            by_name.setdefault(normalize_name(package["name"]), []).append(package)
+
+    def targets(edge: Mapping) -> List[Mapping]:
+        candidates = by_name.get(normalize_name(edge.get("name", "")), [])
+        if edge.get("version"):
+            candidates = [c for c in candidates if str(c.get("version")) == str(edge["version"])]
+        if len(candidates) > 1:
+            candidates = [c for c in candidates if _resolution_applies(c, environment)] or candidates
+        return candidates
+
+    def edges(package: Mapping, extras: frozenset, is_root: bool) -> Iterable[Mapping]:
+        yield from package.get("dependencies") or []
+        tables = [package.get("optional-dependencies") or {}]
+        if is_root:
+            tables.append(package.get("dev-dependencies") or {})
+        for table in tables:
+            for group, deps in table.items():
+                if normalize_name(group) in extras:
+                    yield from deps
+
+    seen: Dict[int, frozenset] = {}
+    stack = [(root, groups, True) for root in roots]
+    while stack:
+        package, extras, is_root = stack.pop()
+        known = seen.get(id(package))
+        if known is not None and extras <= known:
+            continue
+        seen[id(package)] = extras | (known or frozenset())
+        for edge in edges(package, extras, is_root):
+            if not _marker_applies(edge.get("marker"), environment):
+                continue
+            wanted = frozenset(normalize_name(e) for e in edge.get("extra") or [])
+            for target in targets(edge):
+                stack.append((target, wanted, False))
+
+    return [package for package in packages
+            if id(package) in seen and not _is_project(package)]
+
+
+def _grouped_lock_packages(data: Mapping, environment: Mapping[str, str],
+                           groups: frozenset) -> List[Mapping]:
+    """Entrées poetry.lock / pdm.lock des groupes sélectionnés
+
+    Les marqueurs sont portés par chaque entrée (markers pour poetry, éventuellement
+    par groupe ; marker pour pdm). Les packages optionnels de poetry ne sont
+    retenus que s'ils appartiennent à un extra sélectionné.
+    """
+    active = DEFAULT_LOCK_GROUPS | groups
+    extras = {
+        normalize_name(dep.split()[0])
+        for group, deps in (data.get("extras") or {}).items() if normalize_name(group) in groups
+        for dep in deps if dep.strip()
+    }
+
+    selected = []
+    for package in data.get("package", []):
+        name = package.get("name")
+        if not name or _is_project(package):
+            continue
+        member_of = package.get("groups") or ([package["category"]] if package.get("category") else [])
+        member_of = [normalize_name(group) for group in member_of]
+        if member_of and not active.intersection(member_of):
+            continue
+        if package.get("optional") and normalize_name(name) not in extras:
+            continue
+
+        markers = package.get("markers", package.get("marker"))
+        if isinstance(markers, dict):
+            # Un marqueur par groupe : il suffit que l'un des groupes actifs s'applique
+            keyed = {normalize_name(group): marker for group, marker in markers.items()}
+            in_groups = [g for g in member_of if g in active] or [g for g in keyed if g in active]
+            applies = not in_groups or any(_marker_applies(keyed.get(g), environment) for g in in_groups)
+        else:
+            applies = _marker_applies(markers, environment)
+        if applies:
+            selected.append(package)
+    return selected
+
+
+def read_lock_requirements(lock_path: Path, python_version: Optional[str] = None,
+                           groups: Optional[Iterable[str]] = None) -> List[str]:
+    """Spécifications épinglées d'un fichier de verrouillage
+
+    Formats supportés : uv.lock / poetry.lock / pdm.lock (tables [[package]])
+    et fichiers de type requirements (pip-compile, pip freeze). Seules les
+    entrées dont les marqueurs s'appliquent à l'interpréteur cible et qui
+    appartiennent aux groupes principaux ou sélectionnés sont retenues.
+
+    Args:
+        lock_path: Fichier de verrouillage
+        python_version: Version Python de l'environnement cible
+        groups: Extras / groupes de dépendances à inclure en plus du groupe principal
+    """
+    lock_path = Path(lock_path)
+    if lock_path.name in TOML_LOCK_FILES:
+        from .toml_handler import TomlHandler
+
+        data = TomlHandler.load(lock_path)
+        environment = marker_environment(python_version)
+        selected_groups = frozenset(normalize_name(group) for group in groups or ())
+        if lock_path.name == "uv.lock":
+            packages = _uv_lock_packages(data.get("package", []), environment, selected_groups)
+        else:
+            packages = _grouped_lock_packages(data, environment, selected_groups)
+
+        versions: Dict[str, List[str]] = {}
+        names: Dict[str, str] = {}
+        for package in packages:
+            key = normalize_name(package["name"])
+            names.setdefault(key, package["name"])
+            versions.setdefault(key, []).append(str(package.get("version", "")))
+
+        specs = []
+        for key, found in versions.items():
+            # Plusieurs versions (résolution par plateforme) : aucune n'est imposée
+            if len(set(found)) == 1 and found[0]:
+                specs.append(f"{names[key]}=={found[0]}")
+            else:
+                specs.append(names[key])
+        return specs
+
+    content = lock_path.read_text(encoding="utf-8")
+    specs = []
+    for line in iter_requirement_lines(content):
+        if line.startswith("-"):
+            continue
+        # Options par ligne (--hash=...) de pip-compile
+        specs.append(line.split(" --", 1)[0].strip())
+    return specs
+
+
+def find_lock_file(env) -> Optional[Path]:
+    """Fichier de verrouillage d'un environnement, s'il existe"""
+    if env.lock_file_path and Path(env.lock_file_path).exists():
+        return Path(env.lock_file_path)
+    return None
+
+
+def _site_packages_dirs(env_path: Path) -> List[Path]:
+    if os.name == "nt":
+        candidate = env_path / "Lib" / "site-packages"
+        return [candidate] if candidate.is_dir() else []
+    lib = env_path / "lib"
+    if not lib.is_dir():
+        return []
+    return [p / "site-packages" for p in lib.glob("python*") if (p / "site-packages").is_dir()]
+
+
+def installed_snapshot(env_path: Path) -> Dict[str, str]:
+    """Distributions installées, lues dans site-packages sans sous-processus
+
+    Seuls les noms des répertoires *.dist-info / *.egg-info sont lus.
+
+    Returns:
+        {nom normalisé: version}, vide si site-packages est introuvable
+    """
+    snapshot: Dict[str, str] = {}
+    for site_packages in _site_packages_dirs(Path(env_path)):
+        try:
+            entries = os.scandir(site_packages)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                stem, dot, suffix = entry.name.rpartition(".")
+                if not dot or suffix not in ("dist-info", "egg-info"):
+                    continue
+                parts = stem.split("-")
+                if len(parts) >= 2:
+                    snapshot[normalize_name(parts[0])] = parts[1]
+    return snapshot
+
+
+def installed_dependencies(env_path: Path, requirements: Iterable[str],
+                           python_version: Optional[str] = None) -> Set[str]:
+    """Distributions installées requises, directement ou non, par les spécifications
+
+    Les Requires-Dist des distributions de site-packages sont suivis (extras
+    et marqueurs évalués) : sans fichier de verrouillage, c'est ce qui protège
+    les dépendances transitives d'une synchronisation avec nettoyage.
+
+    Returns:
+        Noms normalisés atteints (spécifications comprises)
+    """
+    from importlib.metadata import distributions
+
+    requires: Dict[str, List[str]] = {}
+    for site_packages in _site_packages_dirs(Path(env_path)):
+        for dist in distributions(path=[str(site_packages)]):
+            name = dist.metadata["Name"]
+            if name:
+                requires.setdefault(normalize_name(name), dist.requires or [])
+
+    environment = marker_environment(python_version)
+    stack = [(req.normalized_name, req.extras) for req in _merge(requirements, environment).values()]
+    seen: Dict[str, frozenset] = {}
+    while stack:
+        key, extras = stack.pop()
+        extras = frozenset(normalize_name(extra) for extra in extras)
+        if key in seen and extras <= seen[key]:
+            continue
+        seen[key] = seen.get(key, frozenset()) | extras
+        for line in requires.get(key, []):
+            dependency = parse_requirement(line)
+            if dependency is None:
+                continue
+            marker = _marker(dependency.marker) if dependency.marker else None
+            if marker is not None and not any(
+                marker.evaluate({**environment, "extra": extra}) for extra in extras | {""}
+            ):
+                continue
+            stack.append((dependency.normalized_name, dependency.extras))
+    return set(seen)
@@ -7,6 +7,7 @@ Utilise une approche hybride :
 - Fallback vers implémentation basique si nécessaire
 """
 
+import re
 import sys
 from pathlib import Path
 from typing import Dict, Any, Union, TextIO
@@ -14,6 +15,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Expressions compilées du parser fallback
+_TABLE_HEADER = re.compile(r'^\[\s*([^\[\]]+?)\s*\]$')
+_KEY_VALUE = re.compile(r'^("[^"]*"|\'[^\']*\'|[A-Za-z0-9_.-]+)\s*=\s*(.*)$')
+_QUOTED_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"|\'([^\']*)\'')
+_TRAILING_COMMENT = re.compile(r'^((?:[^#"\']|"(?:[^"\\]|\\.)*"|\'[^\']*\')*)#.*$')
+
 # Import conditionnel selon la version Python
 if sys.version_info >= (3, 11):
     import tomllib
@@ -212,64 +219,103 @@ class TomlHandler:
     
     @staticmethod
     def _parse_basic_toml(content: str) -> Dict[str, Any]:
-        """Parser TOML basique (fallback)"""
+        """Parser TOML basique (fallback)
+
+        Couvre le sous-ensemble utilisé par pyproject.toml : tables, chaînes,
+        booléens, nombres et tableaux (y compris multi-lignes) de chaînes
+        pouvant contenir des virgules (ex: "pkg[a,b]>=1,<2").
+        """
         data = {}
         current_section = data
-        section_path = []
+        pending_key = None
+        pending_parts = []
+        pending_depth = 0
         
-        for line_num, line in enumerate(content.split('\n'), 1):
-            line = line.strip()
+        for line in content.split('\n'):
+            # Commentaires retirés hors chaînes
+            line = _TRAILING_COMMENT.sub(r'\1', line).strip()
+            
+            # Suite d'un tableau multi-lignes
+            if pending_key is not None:
+                pending_parts.append(line)
+                pending_depth += TomlHandler._bracket_balance(line)
+                if pending_depth <= 0:
+                    current_section[pending_key] = TomlHandler._parse_basic_value(
+                        " ".join(pending_parts)
+                    )
+                    pending_key = None
+                continue
             
-            # Ignorer commentaires et lignes vides
-            if not line or line.startswith('#'):
+            # Ignorer lignes vides
+            if not line:
                 continue
             
             # Section [table]
-            if line.startswith('[') and line.endswith(']'):
-                section_name = line[1:-1].strip()
-                section_path = section_name.split('.')
+            header = _TABLE_HEADER.match(line)
+            if header:
+                section_path = [part.strip().strip('"') for part in header.group(1).split('.')]
                 
                 # Créer la structure imbriquée
                 current_section = data
-                for part in section_path[:-1]:
-                    if part not in current_section:
-                        current_section[part] = {}
-                    current_section = current_section[part]
-                
-                if section_path[-1] not in current_section:
-                    current_section[section_path[-1]] = {}
-                current_section = current_section[section_path[-1]]
+                for part in section_path:
+                    current_section = current_section.setdefault(part, {})
                 continue
             
             # Paires clé = valeur
-            if '=' in line:
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
+            key_value = _KEY_VALUE.match(line)
+            if key_value:
+                key = key_value.group(1).strip('"\'')
+                value = key_value.group(2).strip()
                 
-                # Parsing basique des valeurs
-                if value.startswith('"') and value.endswith('"'):
-                    # String
-                    current_section[key] = value[1:-1]
-                elif value.lower() in ('true', 'false'):
-                    # Boolean
-                    current_section[key] = value.lower() == 'true'
-                elif value.startswith('[') and value.endswith(']'):
-                    # Array
-                    array_content = value[1:-1].strip()
-                    if array_content:
-                        items = [item.strip().strip('"') for item in array_content.split(',')]
-                        current_section[key] = items
-                    else:
-                        current_section[key] = []
-                elif value.isdigit():
-                    # Integer
-                    current_section[key] = int(value)
-                elif '.' in value and value.replace('.', '').isdigit():
-                    # Float
-                    current_section[key] = float(value)
-                else:
-                    # String sans quotes
-                    current_section[key] = value
+                depth = TomlHandler._bracket_balance(value) if value.startswith('[') else 0
+                if depth > 0:
+                    pending_key, pending_parts, pending_depth = key, [value], depth
+                    continue
+                current_section[key] = TomlHandler._parse_basic_value(value)
         
-        return data
\ No newline at end of file
+        return data
+    
+    @staticmethod
+    def _bracket_balance(text: str) -> int:
+        """Crochets ouverts moins crochets fermés, hors chaînes"""
+        unquoted = _QUOTED_STRING.sub('""', text)
+        return unquoted.count('[') - unquoted.count(']')
+    
+    @staticmethod
+    def _parse_basic_value(value: str) -> Any:
+        """Parse une valeur TOML scalaire ou tableau (fallback)"""
+        quoted = _QUOTED_STRING.fullmatch(value)
+        if quoted:
+            # String
+            return TomlHandler._quoted_text(quoted)
+        
+        if value.lower() in ('true', 'false'):
+            # Boolean
+            return value.lower() == 'true'
+        if value.startswith('[') and value.endswith(']'):
+            # Array : chaînes extraites par regex, sinon séparation sur ','
+            array_content = value[1:-1].strip()
+            if not array_content:
+                return []
+            if _QUOTED_STRING.search(array_content):
+                return [TomlHandler._quoted_text(m) for m in _QUOTED_STRING.finditer(array_content)]
+            return [
+                TomlHandler._parse_basic_value(item.strip())
+                for item in array_content.split(',') if item.strip()
+            ]
+        if value.isdigit():
+            # Integer
+            return int(value)
+        if '.' in value and value.replace('.', '').isdigit():
+            # Float
+            return float(value)
+        # String sans quotes
+        return value
+    
+    @staticmethod
+    def _quoted_text(match: "re.Match") -> str:
+        """Texte d'une chaîne TOML capturée par _QUOTED_STRING"""
+        if match.group(1) is not None:
+            return match.group(1).replace('\\"', '"').replace('\\\\', '\\')
+        return match.group(2)
+
@@ -0,0 +1,340 @@
+"""
+Clonage rapide d'environnements virtuels pour GestVenv v2.0
+
+Copie l'arborescence d'un venv sans réinstallation :
+- reflinks (FICLONE, copy-on-write) lorsque le système de fichiers les supporte ;
+- sinon liens physiques pour les fichiers immuables (modules, extensions,
+  bytecode) et copies réelles pour les fichiers modifiables ou réécrits.
+
+Seuls les chemins absolus de pyvenv.cfg, des scripts de bin/ (Scripts/),
+des fichiers .pth et des RECORD sont réécrits ; les empreintes RECORD des
+fichiers réécrits sont recalculées.
+"""
+
+import base64
+import csv
+import errno
+import hashlib
+import io
+import os
+import re
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl Linux _IOW(0x94, 9, int) : clone des extents du fichier source
+FICLONE = 0x40049409
+
+# Répertoires de scripts (en-têtes #! et scripts d'activation)
+SCRIPT_DIRS = {"bin", "Scripts"}
+
+# Métadonnées de distribution susceptibles de contenir des chemins absolus
+DIST_INFO_MUTABLE = {"RECORD", "INSTALLER", "REQUESTED", "direct_url.json"}
+
+# Fichiers propres à GestVenv, régénérés pour la cible
+DEFAULT_EXCLUDES = {".gestvenv-metadata.json"}
+
+# Taille lue pour détecter un fichier binaire
+BINARY_SNIFF_SIZE = 8192
+
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.EPERM, errno.EBADF,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+    getattr(errno, "ENOTTY", errno.EINVAL),
+}
+
+
+@dataclass
+class CloneStats:
+    """Bilan d'un clonage d'environnement (strategy : méthode principale utilisée)"""
+    strategy: str = "copy"
+    files: int = 0
+    reflinked: int = 0
+    hardlinked: int = 0
+    copied: int = 0
+    symlinks: int = 0
+    rewritten: int = 0
+    duration: float = 0.0
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def reflink(src: Union[str, Path], dst: Union[str, Path]) -> bool:
+    """Clone src vers dst par FICLONE ; False si non supporté (dst non créé)"""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        except OSError as e:
+            os.close(dst_fd)
+            os.unlink(dst)
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                return False
+            raise
+        os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    shutil.copystat(src, dst)
+    return True
+
+
+def is_mutable(rel_path: Path) -> bool:
+    """Fichier devant être copié (et éventuellement réécrit) plutôt que lié
+
+    Fichiers de premier niveau (pyvenv.cfg), scripts, .pth et métadonnées
+    dist-info modifiées par l'installeur. Les modules et le bytecode sont
+    remplacés par écriture atomique (renommage), un lien physique est sûr.
+    """
+    parts = rel_path.parts
+    if len(parts) == 1 or parts[0] in SCRIPT_DIRS:
+        return True
+    if rel_path.suffix == ".pth":
+        return True
+    return (
+        len(parts) >= 2
+        and parts[-2].endswith((".dist-info", ".egg-info"))
+        and parts[-1] in DIST_INFO_MUTABLE
+    )
+
+
+def _path_pattern(paths: Iterable[str]) -> "re.Pattern[bytes]":
+    """Occurrences d'un chemin source non suivies d'un caractère de nom"""
+    alternatives = sorted({os.fsencode(p) for p in paths}, key=len, reverse=True)
+    return re.compile(
+        b"(?:" + b"|".join(re.escape(a) for a in alternatives) + b")(?![\\w.-])"
+    )
+
+
+def rewrite_paths(path: Path, pattern: "re.Pattern[bytes]", replacement: bytes) -> bool:
+    """Remplace les chemins source dans un fichier texte ; ignore les binaires"""
+    data = path.read_bytes()
+    if b"\0" in data[:BINARY_SNIFF_SIZE]:
+        return False
+    updated, count = pattern.subn(lambda _: replacement, data)
+    if not count:
+        return False
+    path.write_bytes(updated)
+    return True
+
+
+def _record_hash(path: Path) -> Tuple[str, str]:
+    """Empreinte au format RECORD (sha256 base64 url sans remplissage) et taille"""
+    data = path.read_bytes()
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode("ascii")
+    return f"sha256={digest}", str(len(data))
+
+
+def refresh_record(record_path: Path, rewritten: Set[Path]) -> bool:
+    """Recalcule les empreintes RECORD des fichiers réécrits"""
+    base = record_path.parent.parent
+    with open(record_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    changed = False
+    for row in rows:
+        if len(row) < 3 or not row[1]:
+            continue
+        target = Path(os.path.normpath(base / row[0]))
+        if target in rewritten and target.is_file():
+            row[1], row[2] = _record_hash(target)
+            changed = True
+
+    if changed:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        record_path.write_text(buffer.getvalue(), encoding="utf-8")
+    return changed
+
+
+def relocate_venv(
+    root: Union[str, Path],
+    old_paths: Iterable[str],
+    files: Optional[Iterable[Union[str, Path]]] = None,
+    new_path: Optional[Union[str, Path]] = None
+) -> int:
+    """Réécrit les chemins absolus d'un venv déplacé
+
+    Args:
+        root: Racine actuelle du venv
+        old_paths: Anciens chemins absolus de la racine
+        files: Fichiers à traiter (défaut: fichiers modifiables du venv)
+        new_path: Chemin définitif (défaut: root), si le venv est encore
+            dans un répertoire temporaire
+
+    Returns:
+        Nombre de fichiers réécrits (RECORD mis à jour inclus)
+    """
+    root = Path(root)
+    if files is None:
+        files = [
+            Path(dirpath) / name
+            for dirpath, _, names in os.walk(root)
+            for name in names
+            if is_mutable((Path(dirpath) / name).relative_to(root))
+        ]
+    pattern = _path_pattern(old_paths)
+    replacement = os.fsencode(str(new_path or root))
+
+    rewritten: Set[Path] = set()
+    records: List[Path] = []
+    for path in map(Path, files):
+        if path.is_symlink() or not path.is_file():
+            continue
+        if path.name == "RECORD":
+            records.append(path)
+        if rewrite_paths(path, pattern, replacement):
+            rewritten.add(Path(os.path.normpath(path)))
+
+    count = len(rewritten)
+    for record in records:
+        if refresh_record(record, rewritten) and record not in rewritten:
+            count += 1
+    return count
+
+
+class _TreeCloner:
+    """Parcours de l'arborescence source et choix de la méthode par fichier"""
+
+    def __init__(self, source: Path, target: Path, strategy: str, excludes: Set[str]):
+        self.source = source
+        self.target = target
+        self.excludes = excludes
+        self.stats = CloneStats()
+        self.use_reflink = strategy in ("auto", "reflink")
+        self.use_hardlink = strategy in ("auto", "hardlink")
+        self.source_paths = {str(source), str(source.resolve())}
+        self.pattern = _path_pattern(self.source_paths)
+        self.replacement = os.fsencode(str(target))
+        self.rewritten: Set[Path] = set()
+        self.records: List[Path] = []
+
+    def run(self) -> CloneStats:
+        self.target.mkdir(parents=True)
+        self._clone_dir(self.source, self.target, Path())
+        for record in self.records:
+            if refresh_record(record, self.rewritten):
+                self.stats.rewritten += 1
+        return self.stats
+
+    def _clone_dir(self, src_dir: Path, dst_dir: Path, rel_dir: Path) -> None:
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                rel = rel_dir / entry.name
+                if not rel_dir.parts and entry.name in self.excludes:
+                    continue
+                dst = dst_dir / entry.name
+                if entry.is_symlink():
+                    self._clone_symlink(entry.path, dst)
+                elif entry.is_dir():
+                    dst.mkdir()
+                    self._clone_dir(Path(entry.path), dst, rel)
+                    shutil.copystat(entry.path, dst)
+                else:
+                    self._clone_file(Path(entry.path), dst, rel)
+
+    def _clone_symlink(self, src: str, dst: Path) -> None:
+        link = os.readlink(src)
+        for source_path in self.source_paths:
+            if link == source_path or link.startswith(source_path + os.sep):
+                link = str(self.target) + link[len(source_path):]
+                break
+        os.symlink(link, dst)
+        self.stats.symlinks += 1
+
+    def _clone_file(self, src: Path, dst: Path, rel: Path) -> None:
+        self.stats.files += 1
+        mutable = is_mutable(rel)
+
+        if self.use_reflink:
+            if reflink(src, dst):
+                self.stats.reflinked += 1
+            else:
+                # Système de fichiers sans copy-on-write : bascule définitive
+                self.use_reflink = False
+                self._link_or_copy(src, dst, mutable)
+        else:
+            self._link_or_copy(src, dst, mutable)
+
+        if mutable:
+            if rel.name == "RECORD":
+                self.records.append(dst)
+            if rewrite_paths(dst, self.pattern, self.replacement):
+                self.rewritten.add(Path(os.path.normpath(dst)))
+                self.stats.rewritten += 1
+
+    def _link_or_copy(self, src: Path, dst: Path, mutable: bool) -> None:
+        if self.use_hardlink and not mutable:
+            try:
+                os.link(src, dst)
+                self.stats.hardlinked += 1
+                return
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS and e.errno != errno.EMLINK:
+                    raise
+                # Autre système de fichiers : copies uniquement
+                self.use_hardlink = False
+        shutil.copy2(src, dst)
+        self.stats.copied += 1
+
+
+def clone_venv(
+    source: Union[str, Path],
+    target: Union[str, Path],
+    strategy: str = "auto",
+    excludes: Optional[Iterable[str]] = None
+) -> CloneStats:
+    """Clone un environnement virtuel sans réinstaller ses packages
+
+    Args:
+        source: Racine du venv source (contenant pyvenv.cfg)
+        target: Racine du clone (ne doit pas exister)
+        strategy: "auto" (reflink, sinon liens physiques), "reflink",
+            "hardlink" ou "copy"
+        excludes: Noms de premier niveau à ne pas copier
+
+    Returns:
+        CloneStats ; strategy indique la méthode effectivement utilisée
+
+    Raises:
+        FileNotFoundError: source n'est pas un environnement virtuel
+        FileExistsError: target existe déjà
+    """
+    if strategy not in ("auto", "reflink", "hardlink", "copy"):
+        raise ValueError(f"Stratégie de clonage inconnue: {strategy}")
+
+    source, target = Path(source).absolute(), Path(target).absolute()
+    if not (source / "pyvenv.cfg").is_file():
+        raise FileNotFoundError(f"pyvenv.cfg introuvable dans {source}")
+    if target.exists():
+        raise FileExistsError(f"{target} existe déjà")
+
+    start = time.perf_counter()
+    cloner = _TreeCloner(
+        source, target, strategy, DEFAULT_EXCLUDES if excludes is None else set(excludes)
+    )
+    try:
+        stats = cloner.run()
+    except BaseException:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    if stats.reflinked:
+        stats.strategy = "reflink"
+    elif stats.hardlinked:
+        stats.strategy = "hardlink"
+    else:
+        stats.strategy = "copy"
+    stats.duration = time.perf_counter() - start
+    return stats
@@ -114,6 +114,40 @@ class TestCachePerformance:
 
         assert duration < 1.0, f"Nettoyage trop lent: {duration}s pour {num_files} fichiers"
 
+    @pytest.mark.benchmark
+    def test_synthetic_cache_benchmark_suite(self):
+        """Exécute la suite de benchmarks cache sur une petite échelle"""
+        from benchmarks.benchmark_cache import run_benchmarks, async_available
+
+        results = run_benchmarks(sizes=[200], iterations=5, time_budget=2.0)
+
+        suites = {"sync", "async"} if async_available() else {"sync"}
+        operations = {
+            "cache_package", "get_cached_package[version]",
+            "get_cached_package[latest]", "is_package_cached[version]",
+            "is_package_cached[any]", "get_cache_stats", "_cleanup_lru",
+            "export_cache", "import_cache",
+        }
+        assert {(r.suite, r.operation) for r in results} == {
+            (suite, op) for suite in suites for op in operations
+        }
+        for result in results:
+            assert result.scale == 200
+            assert result.iterations >= 1
+            assert result.p99_ms >= result.p50_ms
+            assert result.peak_rss_mb > 0
+
+    @pytest.mark.benchmark
+    def test_synthetic_cache_benchmark_respects_size_budget(self):
+        """Les échelles au-delà du budget sont ignorées"""
+        from benchmarks.benchmark_cache import run_benchmarks
+
+        results = run_benchmarks(sizes=[50, 100_000], iterations=1,
+                                 suites=("sync",), max_entries=50)
+
+        assert results
+        assert {r.scale for r in results} == {50}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
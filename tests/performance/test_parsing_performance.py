@@ -116,6 +116,35 @@ description = "A project with many dependencies"
         assert "project" in data
         assert duration < 0.5, f"Parsing large TOML trop lent: {duration}s"
 
+    @pytest.mark.benchmark
+    def test_large_requirements_fast_path(self, temp_dir):
+        """Parsing d'un requirements.txt de 10k lignes via le parser partagé"""
+        from gestvenv.utils.dependency_corpus import generate_requirements
+        from gestvenv.utils.requirements_parser import RequirementsParser, parse_requirement
+
+        req_file = temp_dir / "requirements.txt"
+        req_file.write_text(generate_requirements(10_000), encoding="utf-8")
+        parse_requirement.cache_clear()
+
+        start = time.perf_counter()
+        deps = RequirementsParser().parse_file(str(req_file))
+        duration = time.perf_counter() - start
+
+        assert len(deps) == 10_000
+        assert duration < 5.0, f"Parsing requirements trop lent: {duration}s"
+
+    @pytest.mark.benchmark
+    def test_parsing_benchmark_suite(self):
+        """Exécute la suite de benchmarks parsing sur une petite échelle"""
+        from benchmarks.benchmark_parsing import run_benchmarks
+
+        results = run_benchmarks(lines=500, deps=200, iterations=2, time_budget=2.0)
+
+        operations = {r.operation for r in results}
+        assert "parse_requirement[warm]" in operations
+        assert "PyProjectParser.parse_pyproject_toml" in operations
+        assert all(r.iterations >= 1 for r in results)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+"""
+Tests unitaires pour les variantes asynchrones de PackageBackend
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from gestvenv.backends.base import BackendCapabilities, PackageBackend
+from gestvenv.backends.pip_backend import PipBackend
+from gestvenv.core.models import InstallResult, PackageInfo
+
+
+class FakeBackend(PackageBackend):
+    """Backend minimal : commandes factices exécutées par l'interpréteur courant"""
+
+    def __init__(self, script: Optional[str] = None):
+        self.script = script
+        self.sync_calls: List[str] = []
+        super().__init__()
+
+    def _check_availability(self) -> bool:
+        return True
+
+    def _get_version(self) -> Optional[str]:
+        return "1.0"
+
+    def _init_capabilities(self) -> BackendCapabilities:
+        return BackendCapabilities()
+
+    def create_environment(self, path: Path, python_version: str) -> bool:
+        return True
+
+    def install_package(self, env_path: Path, package: str, **kwargs) -> InstallResult:
+        self.sync_calls.append(package)
+        return InstallResult(success=True, message="sync", packages_installed=[package])
+
+    def uninstall_package(self, env_path: Path, package: str) -> bool:
+        return True
+
+    def update_package(self, env_path: Path, package: str) -> bool:
+        return True
+
+    def list_packages(self, env_path: Path) -> List[PackageInfo]:
+        return [PackageInfo("sync", "1.0")]
+
+    def _install_command(self, env_path, packages, **kwargs):
+        if self.script is None:
+            return None
+        return [sys.executable, "-c", self.script, *packages]
+
+    def _list_command(self, env_path):
+        if self.script is None:
+            return None
+        data = json.dumps([{"name": "requests", "version": "2.31.0"}])
+        return [sys.executable, "-c", f"print({data!r})"]
+
+
+class TestAsyncBackend:
+    """Tests pour les variantes asynchrones"""
+
+    def test_install_streams_output(self, tmp_path):
+        """Installation : sortie diffusée ligne par ligne"""
+        script = "import sys\nfor p in sys.argv[1:]: print('Installing', p, flush=True)"
+        backend = FakeBackend(script)
+        lines = []
+
+        result = asyncio.run(backend.install_packages_async(
+            tmp_path, ["requests", "click"], on_output=lambda s, l: lines.append(l)
+        ))
+
+        assert result.success
+        assert result.packages_installed == ["requests", "click"]
+        assert lines == ["Installing requests", "Installing click"]
+        assert backend.sync_calls == []
+
+    def test_install_failure_and_timeout(self, tmp_path):
+        """Échec et délai dépassé rapportés dans InstallResult"""
+        failing = FakeBackend("import sys; print('boom', file=sys.stderr); sys.exit(1)")
+        result = asyncio.run(failing.install_package_async(tmp_path, "requests"))
+        assert not result.success and result.packages_failed == ["requests"]
+        assert "boom" in result.message
+
+        slow = FakeBackend("import time; time.sleep(30)")
+        result = asyncio.run(slow.install_package_async(tmp_path, "requests", timeout=0.3))
+        assert not result.success
+        assert result.message == "Timeout lors de l'installation"
+
+    def test_invalid_spec_rejected(self, tmp_path):
+        """Spécifications dangereuses refusées sans lancer de processus"""
+        result = asyncio.run(FakeBackend("").install_packages_async(tmp_path, ["x; rm -rf /"]))
+        assert not result.success and result.packages_failed == ["x; rm -rf /"]
+
+    def test_fallback_to_sync_methods(self, tmp_path):
+        """Sans commande native : délégation aux méthodes synchrones"""
+        backend = FakeBackend()
+
+        result = asyncio.run(backend.install_packages_async(tmp_path, ["a", "b"]))
+        packages = asyncio.run(backend.list_packages_async(tmp_path))
+
+        assert result.success and backend.sync_calls == ["a", "b"]
+        assert [p.name for p in packages] == ["sync"]
+
+    def test_list_parses_json(self, tmp_path):
+        """Listage asynchrone au format pip list JSON"""
+        packages = asyncio.run(FakeBackend("").list_packages_async(tmp_path))
+        assert [(p.name, p.version, p.backend_used) for p in packages] == [("requests", "2.31.0", "fake")]
+
+    def test_pip_commands(self, tmp_path):
+        """Commandes pip construites pour l'exécutable de l'environnement"""
+        backend = PipBackend()
+        assert backend._install_command(tmp_path, ["requests"]) is None
+
+        pip_exe = backend._get_pip_executable(tmp_path)
+        pip_exe.parent.mkdir(parents=True)
+        pip_exe.touch()
+        assert backend._install_command(tmp_path, ["requests", "click"], upgrade=True) == [
+            str(pip_exe), "install", "--upgrade", "requests", "click"
+        ]
+        assert backend._uninstall_command(tmp_path, ["requests"]) == [
+            str(pip_exe), "uninstall", "-y", "requests"
+        ]
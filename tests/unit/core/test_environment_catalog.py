@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour le catalogue des environnements
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from gestvenv.core.environment_catalog import EnvironmentCatalog
+from gestvenv.core.exceptions import ValidationError
+from gestvenv.core.models import BackendType, EnvironmentInfo, PackageInfo
+
+
+def write_env(envs_path: Path, name: str, day: int, backend: BackendType = BackendType.PIP,
+              packages: int = 0) -> Path:
+    env_info = EnvironmentInfo(name=name, path=envs_path / name, python_version="3.11",
+                               backend_type=backend)
+    env_info.last_used = datetime(2026, 1, day)
+    env_info.created_at = datetime(2025, 1, 31 - day)
+    env_info.packages = [PackageInfo(name=f"pkg{i}", version="1.0") for i in range(packages)]
+    env_dir = envs_path / name
+    env_dir.mkdir(parents=True, exist_ok=True)
+    metadata = env_dir / ".gestvenv-metadata.json"
+    metadata.write_text(json.dumps(env_info.to_dict(), default=str))
+    return metadata
+
+
+@pytest.fixture
+def envs_path(tmp_path):
+    path = tmp_path / "environments"
+    for i, name in enumerate(["delta", "alpha", "charlie", "bravo", "echo"]):
+        write_env(path, name, day=i + 1, backend=BackendType.UV if i % 2 else BackendType.PIP,
+                  packages=i)
+    return path
+
+
+def make_catalog(envs_path: Path, index_path=None, loads=None):
+    def load(name):
+        if loads is not None:
+            loads.append(name)
+        data = json.loads((envs_path / name / ".gestvenv-metadata.json").read_text())
+        return EnvironmentInfo.from_dict(data)
+
+    return EnvironmentCatalog(lambda: envs_path, load, index_path=index_path)
+
+
+class TestEnvironmentCatalog:
+    """Tests pour EnvironmentCatalog"""
+
+    def test_sorts_and_paginates_with_cursor(self, envs_path):
+        catalog = make_catalog(envs_path)
+
+        names, cursor = [], None
+        while True:
+            page, cursor = catalog.query(sort="name", cursor=cursor, limit=2)
+            names.extend(summary.name for summary in page)
+            if cursor is None:
+                break
+
+        assert names == ["alpha", "bravo", "charlie", "delta", "echo"]
+        used, _ = catalog.query(sort="used")
+        assert [s.name for s in used] == ["echo", "bravo", "charlie", "alpha", "delta"]
+        size, _ = catalog.query(sort="size", limit=1)
+        assert [s.name for s in size] == ["echo"]
+
+    def test_filters_are_applied_before_pagination(self, envs_path):
+        catalog = make_catalog(envs_path)
+
+        page, cursor = catalog.query(sort="name", limit=1, backend="uv")
+        rest, end = catalog.query(sort="name", cursor=cursor, backend="uv")
+
+        assert [s.name for s in page + rest] == ["alpha", "bravo"]
+        assert end is None
+
+        # Plusieurs états de santé séparés par des virgules (statut de l'API web)
+        assert len(catalog.query(sort="name", health="has_errors,unknown")[0]) == 5
+        assert catalog.query(sort="name", health="has_errors,corrupted")[0] == []
+
+    def test_loads_full_environments_lazily(self, envs_path):
+        loads = []
+        catalog = make_catalog(envs_path, loads=loads)
+
+        page, _ = catalog.query(sort="name", limit=3)
+        environments = catalog.iter_environments(page)
+        first = next(environments)
+
+        assert first.name == "alpha"
+        assert loads == ["alpha"]
+
+    def test_index_rereads_only_changed_metadata(self, envs_path, tmp_path):
+        index_path = tmp_path / "catalog.json"
+        make_catalog(envs_path, index_path).summaries()
+
+        metadata = write_env(envs_path, "alpha", day=28)
+        stat = metadata.stat()
+        os.utime(metadata, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        catalog = make_catalog(envs_path, index_path)
+        used, _ = catalog.query(sort="used", limit=1)
+
+        assert catalog.reads == 1
+        assert used[0].name == "alpha"
+
+    def test_rejects_cursor_from_another_sort(self, envs_path):
+        catalog = make_catalog(envs_path)
+        _, cursor = catalog.query(sort="name", limit=1)
+
+        with pytest.raises(ValidationError):
+            catalog.query(sort="used", cursor=cursor)
+        with pytest.raises(ValidationError):
+            catalog.query(sort="name", cursor="not-a-cursor")
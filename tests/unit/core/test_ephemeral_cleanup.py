@@ -0,0 +1,185 @@
+"""
+Tests unitaires pour le planificateur de nettoyage des environnements éphémères
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from gestvenv.core.ephemeral import cleanup
+from gestvenv.core.ephemeral.cleanup import CleanupScheduler
+from gestvenv.core.ephemeral.models import EphemeralConfig, EphemeralEnvironment, EphemeralStatus
+
+
+class FakeManager:
+    """Gestionnaire factice enregistrant les nettoyages"""
+
+    def __init__(self, delay=0.0, failures=0, **config):
+        self.config = EphemeralConfig(**config)
+        self.cleanup_scheduler = CleanupScheduler(self)
+        self.delay = delay
+        self.failures = failures
+        self.environments = []
+        self.cleaned = []
+        self.active = 0
+        self.peak = 0
+
+    async def list_environments(self):
+        return list(self.environments)
+
+    async def _cleanup_environment(self, env, force=False):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("storage busy")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.cleaned.append((env.id, force))
+        if env in self.environments:
+            self.environments.remove(env)
+        self.cleanup_scheduler.unregister(env.id)
+
+
+def make_env(ttl=None, idle_in=60.0, max_idle_time=300):
+    """Environnement prêt dont l'échéance d'inactivité tombe dans idle_in secondes"""
+    now = datetime.now()
+    return EphemeralEnvironment(
+        ttl=ttl,
+        max_idle_time=max_idle_time,
+        status=EphemeralStatus.READY,
+        last_activity=now - timedelta(seconds=max_idle_time - idle_in),
+    )
+
+
+class TestCleanupScheduler:
+    """Tests pour CleanupScheduler"""
+
+    def test_ttl_expiry_is_precise(self):
+        """Nettoyage à l'échéance TTL, sans attendre un cycle périodique"""
+        async def scenario():
+            manager = FakeManager(cleanup_interval=60)
+            scheduler = manager.cleanup_scheduler
+            await scheduler.start()
+            env = make_env(ttl=1)
+            env.created_at = datetime.now() - timedelta(seconds=0.9)
+            scheduler.register(env)
+
+            await asyncio.sleep(0.3)
+            await scheduler.stop()
+            return manager, env
+
+        manager, env = asyncio.run(scenario())
+
+        assert manager.cleaned == [(env.id, False)]
+        assert manager.cleanup_scheduler.cleanup_history[-1].reason == "ttl_expired"
+
+    def test_activity_postpones_idle_cleanup(self):
+        """Une activité repousse l'échéance d'inactivité"""
+        async def scenario():
+            manager = FakeManager()
+            scheduler = manager.cleanup_scheduler
+            await scheduler.start()
+            env = make_env(idle_in=0.15, max_idle_time=1)
+            scheduler.register(env)
+
+            env.update_activity()
+            await asyncio.sleep(0.3)
+            postponed = (list(manager.cleaned), scheduler.next_deadline(), env.idle_deadline)
+
+            await asyncio.sleep(1.0)
+            await scheduler.stop()
+            return manager, env, postponed
+
+        manager, env, (cleaned_early, next_deadline, idle_deadline) = asyncio.run(scenario())
+
+        assert cleaned_early == []
+        assert next_deadline == idle_deadline
+        assert manager.cleaned == [(env.id, False)]
+        assert manager.cleanup_scheduler.cleanup_history[-1].reason == "inactive_timeout"
+
+    def test_idle_timer_has_no_due_work(self):
+        """Sans échéance atteinte, rien n'est traité"""
+        async def scenario():
+            manager = FakeManager()
+            manager.cleanup_scheduler.register(make_env(idle_in=60))
+            return manager, await manager.cleanup_scheduler.run_due()
+
+        manager, launched = asyncio.run(scenario())
+
+        assert launched == 0 and manager.cleaned == []
+
+    def test_concurrent_cleanups_are_bounded(self):
+        """Nettoyages simultanés bornés par max_concurrent_cleanups"""
+        async def scenario():
+            manager = FakeManager(delay=0.05, max_concurrent_cleanups=2)
+            for _ in range(6):
+                manager.cleanup_scheduler.register(make_env(idle_in=-1))
+            launched = await manager.cleanup_scheduler.run_due()
+            return manager, launched
+
+        manager, launched = asyncio.run(scenario())
+
+        assert launched == 6 and len(manager.cleaned) == 6
+        assert manager.peak == 2
+
+    def test_unregistered_and_running_envs_are_skipped(self):
+        """Environnement retiré ignoré ; commande en cours non considérée inactive"""
+        async def scenario():
+            manager = FakeManager()
+            scheduler = manager.cleanup_scheduler
+            removed, running = make_env(idle_in=-1), make_env(idle_in=-1)
+            running.status = EphemeralStatus.RUNNING
+            scheduler.register(removed)
+            scheduler.register(running)
+            scheduler.unregister(removed.id)
+            return manager, await scheduler.run_due()
+
+        manager, launched = asyncio.run(scenario())
+
+        assert launched == 0 and manager.cleaned == []
+
+    def test_failed_cleanup_is_retried_with_backoff(self, monkeypatch):
+        """Un nettoyage en échec est réarmé puis aboutit à la tentative suivante"""
+        monkeypatch.setattr(cleanup, "RETRY_DELAY", 0.1)
+
+        async def scenario():
+            manager = FakeManager(failures=1)
+            scheduler = manager.cleanup_scheduler
+            await scheduler.start()
+            env = make_env(idle_in=-1)
+            scheduler.register(env)
+
+            await asyncio.sleep(0.05)
+            first = (list(manager.cleaned), scheduler.next_deadline() - time.time())
+            await asyncio.sleep(0.2)
+            await scheduler.stop()
+            return manager, env, first
+
+        manager, env, (cleaned_after_failure, retry_in) = asyncio.run(scenario())
+
+        assert cleaned_after_failure == []
+        assert 0 < retry_in <= 0.1
+        assert manager.cleaned == [(env.id, False)]
+        assert manager.cleanup_scheduler.cleanup_history[-1].reason == "inactive_timeout"
+
+    def test_failed_environments_are_swept_by_the_loop(self):
+        """Les environnements FAILED sont nettoyés tous les cleanup_interval"""
+        async def scenario():
+            manager = FakeManager(cleanup_interval=0.1)
+            failed, ready = make_env(idle_in=60), make_env(idle_in=60)
+            failed.status = EphemeralStatus.FAILED
+            manager.environments = [failed, ready]
+            scheduler = manager.cleanup_scheduler
+            scheduler.register(failed)
+            scheduler.register(ready)
+            await scheduler.start()
+
+            await asyncio.sleep(0.25)
+            await scheduler.stop()
+            return manager, failed
+
+        manager, failed = asyncio.run(scenario())
+
+        assert manager.cleaned == [(failed.id, True)]
+        assert manager.cleanup_scheduler.cleanup_history[-1].reason == "failed_state"
@@ -0,0 +1,195 @@
+"""
+Tests unitaires pour le pool de containers des environnements éphémères
+"""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+from gestvenv.core.ephemeral.containers import ContainerPool, ContainerRuntime
+from gestvenv.core.ephemeral.lifecycle import LifecycleController
+from gestvenv.core.ephemeral.models import (
+    EphemeralConfig,
+    EphemeralEnvironment,
+    IsolationLevel,
+    ResourceLimits,
+)
+from gestvenv.utils.async_process import CommandResult
+
+
+class FakeRuntime(ContainerRuntime):
+    """Runtime factice : containers en mémoire, appels enregistrés"""
+
+    name = "fake"
+
+    def __init__(self, image_present=False, reset_fails=False):
+        self.images = {"gestvenv-ephemeral-3.11"} if image_present else set()
+        self.reset_fails = reset_fails
+        self.inspections = 0
+        self.builds = []
+        self.running = {}
+        self.execs = []
+        self._next = 0
+
+    async def available(self):
+        return True
+
+    async def image_exists(self, image):
+        self.inspections += 1
+        return image in self.images
+
+    async def build_image(self, image, dockerfile):
+        await asyncio.sleep(0.01)
+        self.builds.append(image)
+        self.images.add(image)
+
+    async def run(self, spec):
+        self._next += 1
+        container_id = f"c{self._next}"
+        self.running[container_id] = spec
+        return container_id
+
+    async def exec(self, container_id, argv, timeout=None):
+        self.execs.append((container_id, argv[-1]))
+        failed = self.reset_fails and "kill" in argv[-1]
+        return CommandResult(returncode=1 if failed else 0)
+
+    async def remove(self, container_id):
+        self.running.pop(container_id)
+
+
+def make_pool(tmp_path, runtime, **config):
+    config = EphemeralConfig(base_storage_path=tmp_path, **config)
+    return ContainerPool(config, lambda: tmp_path, runtime=runtime)
+
+
+def make_env(tmp_path, name, **limits):
+    return EphemeralEnvironment(
+        python_version="3.11",
+        isolation_level=IsolationLevel.CONTAINER,
+        storage_path=tmp_path / name,
+        resource_limits=ResourceLimits(**limits),
+    )
+
+
+class TestContainerPool:
+    """Tests pour ContainerPool"""
+
+    def test_image_checked_and_built_once(self, tmp_path):
+        """Existence de l'image mémorisée, une seule construction"""
+        runtime = FakeRuntime()
+        pool = make_pool(tmp_path, runtime, container_pool_size=0)
+
+        async def scenario():
+            await asyncio.gather(*(pool.acquire(make_env(tmp_path, f"env{i}")) for i in range(4)))
+
+        asyncio.run(scenario())
+
+        assert runtime.builds == ["gestvenv-ephemeral-3.11"]
+        assert runtime.inspections == 1
+        spec = next(iter(runtime.running.values()))
+        assert spec.volumes == [f"{tmp_path / '.container-slots' / spec.name}:/ephemeral:rw"]
+
+    def test_released_container_is_reused(self, tmp_path):
+        """Libération : réinitialisation puis réutilisation pour un autre environnement"""
+        runtime = FakeRuntime(image_present=True)
+        pool = make_pool(tmp_path, runtime, container_pool_size=1)
+        first, second = make_env(tmp_path, "env1"), make_env(tmp_path, "env2")
+
+        async def scenario():
+            first_id = await pool.acquire(first)
+            await pool.release(first)
+            second_id = await pool.acquire(second)
+            await asyncio.gather(*pool._refills)
+            return first_id, second_id
+
+        first_id, second_id = asyncio.run(scenario())
+
+        assert first_id == second_id
+        assert (second_id, "ln -sfn /ephemeral/workspace /workspace") in runtime.execs
+        # Premier environnement rendu à son emplacement, second déplacé dans le slot
+        assert (tmp_path / "env1").is_dir() and not (tmp_path / "env1").is_symlink()
+        assert (tmp_path / "env2").is_symlink()
+        assert pool.stats()["hits"] == 1 and pool.stats()["idle"] == 1
+
+    def test_container_only_sees_its_own_environment(self, tmp_path):
+        """Montage limité au slot du container : environnements voisins invisibles"""
+        runtime = FakeRuntime(image_present=True)
+        pool = make_pool(tmp_path, runtime, container_pool_size=0)
+        first, second = make_env(tmp_path, "env1"), make_env(tmp_path, "env2")
+        for env in (first, second):
+            env.storage_path.mkdir()
+            (env.storage_path / "secret.txt").write_text(env.storage_path.name)
+
+        async def scenario():
+            return await pool.acquire(first), await pool.acquire(second)
+
+        first_id, second_id = asyncio.run(scenario())
+
+        for container_id, own, sibling in ((first_id, "env1", "env2"), (second_id, "env2", "env1")):
+            (volume,) = runtime.running[container_id].volumes
+            mounted = Path(volume.split(":")[0])
+            visible = {p.read_text() for p in mounted.rglob("secret.txt")}
+            assert visible == {own}
+            assert not (tmp_path / sibling).resolve().is_relative_to(mounted)
+        # Côté hôte, le chemin de l'environnement reste utilisable
+        assert (tmp_path / "env1" / "secret.txt").read_text() == "env1"
+
+    def test_failed_reset_discards_container(self, tmp_path):
+        """Réinitialisation en échec : container supprimé, pas réutilisé"""
+        runtime = FakeRuntime(image_present=True, reset_fails=True)
+        pool = make_pool(tmp_path, runtime, container_pool_size=1)
+        env = make_env(tmp_path, "env1")
+
+        async def scenario():
+            container_id = await pool.acquire(env)
+            await asyncio.gather(*pool._refills)
+            await pool.release(env)
+            return container_id
+
+        container_id = asyncio.run(scenario())
+
+        assert container_id not in runtime.running
+        assert pool.stats()["discarded"] == 1
+        assert (tmp_path / "env1").is_dir() and not (tmp_path / "env1").is_symlink()
+        # Seul le slot du container réalimenté subsiste
+        idle = [c.slot for queue in pool._idle.values() for c in queue]
+        assert list((tmp_path / ".container-slots").iterdir()) == idle
+
+    def test_profiles_follow_creation_limits(self, tmp_path):
+        """Limites fixées à la création : un profil par combinaison"""
+        runtime = FakeRuntime(image_present=True)
+        pool = make_pool(tmp_path, runtime, container_pool_size=0)
+
+        async def scenario():
+            small = await pool.acquire(make_env(tmp_path, "small", max_memory=256))
+            isolated = await pool.acquire(make_env(tmp_path, "isolated", network_access=False))
+            return runtime.running[small], runtime.running[isolated]
+
+        small, isolated = asyncio.run(scenario())
+
+        assert small.memory == "256m" and small.network is None
+        assert isolated.memory is None and isolated.network == "none"
+
+
+class TestLifecycleContainers:
+    """Isolation CONTAINER du contrôleur de cycle de vie"""
+
+    def test_setup_and_cleanup_use_pool(self, tmp_path):
+        runtime = FakeRuntime(image_present=True)
+        pool = make_pool(tmp_path, runtime, container_pool_size=0)
+        controller = LifecycleController(SimpleNamespace(container_pool=pool))
+        env = make_env(tmp_path, "env1")
+
+        async def scenario():
+            await controller._setup_container_isolation(env)
+            container_id = env.container_id
+            await controller._cleanup_isolation(env)
+            return container_id
+
+        container_id = asyncio.run(scenario())
+
+        assert container_id == "c1"
+        assert env.container_id is None
+        assert pool.stats()["leased"] == 0
+
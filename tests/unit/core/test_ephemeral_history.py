@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour l'historique en colonnes des ressources éphémères
+"""
+
+from datetime import datetime
+
+import pytest
+
+from gestvenv.core.ephemeral.history import ResourceHistory, ResourceRing
+from gestvenv.core.ephemeral.models import ResourceUsage
+
+
+def sample(ts, memory=0.0, cpu=0.0, disk=0.0, procs=0):
+    return ResourceUsage(memory_mb=memory, disk_mb=disk, cpu_percent=cpu,
+                         active_processes=procs, timestamp=datetime.fromtimestamp(ts))
+
+
+class TestResourceRing:
+    """Tests pour ResourceRing"""
+
+    def test_wraps_and_keeps_chronological_order(self):
+        """Capacité fixe : les mesures les plus anciennes sont écrasées"""
+        ring = ResourceRing(4)
+        for i in range(6):
+            ring.append(1000 + i, float(i), 0, 0, 0)
+
+        assert len(ring) == 4
+        assert list(ring.column("memory_mb")) == [2.0, 3.0, 4.0, 5.0]
+        assert list(ring.column("memory_mb", since=1004)) == [4.0, 5.0]
+        assert ring.last()["timestamp"] == 1005
+
+    def test_summary(self):
+        """min / max / moyenne / percentiles"""
+        ring = ResourceRing(200)
+        for i in range(1, 101):
+            ring.append(i, float(i), 0, 0, 0)
+
+        stats = ring.summary("memory_mb")
+
+        assert (stats["min"], stats["max"], stats["mean"]) == (1.0, 100.0, 50.5)
+        assert (stats["p50"], stats["p95"]) == (50.0, 95.0)
+        assert ResourceRing(3).summary("memory_mb") == {}
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            ResourceRing(0)
+
+
+class TestResourceHistory:
+    """Tests pour ResourceHistory"""
+
+    def test_downsampled_tier(self):
+        """Niveau long terme : pic mémoire et CPU moyen par intervalle"""
+        history = ResourceHistory(samples=10, downsample_seconds=60, longterm_buckets=10)
+        for ts, memory, cpu in ((6000, 10, 20), (6030, 50, 40), (6060, 5, 90), (6125, 1, 0)):
+            history.record(sample(ts, memory=memory, cpu=cpu))
+
+        assert list(history.longterm.column("timestamp")) == [6000.0, 6060.0]
+        assert list(history.longterm.column("memory_mb")) == [50.0, 5.0]
+        assert list(history.longterm.column("cpu_percent")) == [30.0, 90.0]
+
+    def test_latest_and_usages(self):
+        """Compatibilité avec l'API ResourceUsage"""
+        history = ResourceHistory(samples=3)
+        for i in range(5):
+            history.record(sample(7000 + i, memory=i, procs=i))
+
+        assert history.latest().memory_mb == 4.0 and history.latest().active_processes == 4
+        assert [u.memory_mb for u in history.usages()] == [2.0, 3.0, 4.0]
+        assert history.summary()["memory_mb"]["max"] == 4.0
@@ -0,0 +1,120 @@
+"""
+Tests unitaires pour le suivi des ressources des environnements éphémères
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from gestvenv.core.ephemeral import monitoring
+from gestvenv.core.ephemeral.cgroups import CgroupInfo, CgroupManager
+from gestvenv.core.ephemeral.models import EphemeralEnvironment, EphemeralStatus
+from gestvenv.core.ephemeral.monitoring import IncrementalDiskUsage, ResourceTracker
+
+
+def write_cgroup(path, memory=0, usage_usec=0, pids=0):
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "memory.current").write_text(f"{memory}\n")
+    (path / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (path / "io.stat").write_text("8:0 rbytes=100 wbytes=200 rios=1 wios=2\n"
+                                  "8:16 rbytes=10 wbytes=20 rios=1 wios=1\n")
+    (path / "pids.current").write_text(f"{pids}\n")
+
+
+@pytest.fixture
+def fake_cgroups(monkeypatch):
+    manager = CgroupManager()
+    monkeypatch.setattr(monitoring, "cgroup_manager", manager)
+    return manager
+
+
+class TestIncrementalDiskUsage:
+    """Tests pour IncrementalDiskUsage"""
+
+    def test_only_modified_directories_are_rescanned(self, tmp_path, monkeypatch):
+        """Répertoires inchangés réutilisés ; ajout de fichier détecté"""
+        for name in ("a", "b", "c"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "f").write_bytes(b"x" * 100)
+        usage = IncrementalDiskUsage(tmp_path, full_scan_every=100)
+        assert usage.measure() == 300
+
+        scanned = []
+        original = IncrementalDiskUsage._scan
+        monkeypatch.setattr(IncrementalDiskUsage, "_scan",
+                            staticmethod(lambda path, mtime: scanned.append(path) or original(path, mtime)))
+        (tmp_path / "b" / "g").write_bytes(b"y" * 50)
+        os.utime(tmp_path / "b", ns=(1, 1))
+
+        assert usage.measure() == 350
+        assert scanned == [str(tmp_path / "b")]
+
+    def test_periodic_full_scan_catches_in_place_growth(self, tmp_path):
+        """Fichier modifié en place pris en compte au recalcul complet"""
+        target = tmp_path / "log"
+        target.write_bytes(b"x" * 10)
+        usage = IncrementalDiskUsage(tmp_path, full_scan_every=2)
+        assert usage.measure() == 10
+
+        mtime = os.stat(tmp_path).st_mtime_ns
+        with open(target, "ab") as f:
+            f.write(b"x" * 10)
+        os.utime(tmp_path, ns=(mtime, mtime))
+
+        assert usage.measure() == 10
+        assert usage.measure() == 20
+
+
+class TestCgroupSampling:
+    """Lecture des compteurs cgroup v2"""
+
+    def test_sample_counters(self, tmp_path):
+        """Compteurs mémoire, CPU, I/O et PIDs lus depuis les fichiers"""
+        manager = CgroupManager()
+        write_cgroup(tmp_path / "cg", memory=4096, usage_usec=1500, pids=3)
+        manager._cgroups["env"] = CgroupInfo(name="cg", path=tmp_path / "cg")
+
+        info = manager.sample_counters("env")
+
+        assert (info.memory_current, info.memory_peak, info.cpu_usage_usec) == (4096, 4096, 1500)
+        assert (info.io_read_bytes, info.io_write_bytes, info.pids_current) == (110, 220, 3)
+        assert manager.sample_counters("missing") is None
+
+    def test_tracker_prefers_cgroup_counters(self, tmp_path, fake_cgroups, monkeypatch):
+        """Avec un cgroup, aucun parcours psutil ; CPU calculé depuis le compteur cumulé"""
+        def no_psutil(*args, **kwargs):
+            raise AssertionError("psutil ne doit pas être utilisé")
+        monkeypatch.setattr(monitoring.psutil, "Process", no_psutil)
+
+        envs = []
+        for i in range(3):
+            env = EphemeralEnvironment(status=EphemeralStatus.READY, pid=os.getpid(),
+                                       storage_path=tmp_path / f"env{i}")
+            env.storage_path.mkdir()
+            (env.storage_path / "data").write_bytes(b"x" * 1024 * 1024)
+            env.cgroup_path = tmp_path / f"cg{i}"
+            write_cgroup(env.cgroup_path, memory=(i + 1) * 1024 * 1024, pids=i + 1)
+            fake_cgroups._cgroups[env.id] = CgroupInfo(name=f"cg{i}", path=env.cgroup_path)
+            envs.append(env)
+
+        tracker = ResourceTracker(SimpleNamespace())
+        first = asyncio.run(tracker.sample_environments(envs))
+        write_cgroup(envs[0].cgroup_path, memory=1024 * 1024, usage_usec=10_000_000, pids=1)
+        second = asyncio.run(tracker.sample_environments(envs))
+
+        assert [u.memory_mb for u in first] == [1.0, 2.0, 3.0]
+        assert [u.active_processes for u in first] == [1, 2, 3]
+        assert all(u.disk_mb == 1.0 and u.cpu_percent == 0.0 for u in first)
+        assert second[0].cpu_percent > 0 and second[1].cpu_percent == 0.0
+
+    def test_tracker_falls_back_to_psutil(self, tmp_path, fake_cgroups):
+        """Sans cgroup, mesure de l'arbre des processus"""
+        env = EphemeralEnvironment(status=EphemeralStatus.READY, pid=os.getpid(),
+                                   storage_path=tmp_path)
+        tracker = ResourceTracker(SimpleNamespace())
+
+        usage = asyncio.run(tracker._measure_environment_resources(env))
+
+        assert usage.active_processes >= 1 and usage.memory_mb > 0
@@ -0,0 +1,212 @@
+"""
+Tests unitaires pour le moteur de politiques de limites des environnements éphémères
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from gestvenv.core.ephemeral import policies
+from gestvenv.core.ephemeral.cgroups import CgroupInfo, ResourceLimits as CgroupLimits
+from gestvenv.core.ephemeral.cleanup import CleanupScheduler
+from gestvenv.core.ephemeral.exceptions import ResourceExhaustedException
+from gestvenv.core.ephemeral.manager import EphemeralManager
+from gestvenv.core.ephemeral.models import (
+    EphemeralConfig,
+    EphemeralEnvironment,
+    EphemeralStatus,
+    EvictionOrder,
+    LimitAction,
+    LimitPolicy,
+    ResourceLimits,
+    ResourceUsage,
+)
+from gestvenv.core.ephemeral.policies import LimitPolicyEngine, LimitState
+
+
+class FakeCgroups:
+    """Gestionnaire cgroups factice enregistrant les écritures"""
+
+    def __init__(self):
+        self._cgroups = {}
+        self.updates = []
+        self.frozen = []
+
+    async def update_limits(self, env_id, limits):
+        self.updates.append((env_id, limits))
+        self._cgroups[env_id].limits = limits
+        return True
+
+    async def set_frozen(self, env_id, frozen):
+        self.frozen.append((env_id, frozen))
+        return True
+
+
+class FakeManager:
+    """Gestionnaire factice : environnements en mémoire, nettoyages enregistrés"""
+
+    def __init__(self, failures=0, **config):
+        self.config = EphemeralConfig(**config)
+        self.cleanup_scheduler = CleanupScheduler(self)
+        self.lifecycle_controller = SimpleNamespace(
+            process_manager=SimpleNamespace(active_processes={})
+        )
+        self.environments = {}
+        self.cleaned = []
+        self.failures = failures
+
+    async def list_environments(self):
+        return list(self.environments.values())
+
+    async def _cleanup_environment(self, env, force=False):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("storage busy")
+        self.cleaned.append(env.id)
+        self.environments.pop(env.id, None)
+
+
+@pytest.fixture
+def cgroups(monkeypatch):
+    fake = FakeCgroups()
+    monkeypatch.setattr(policies, "cgroup_manager", fake)
+    return fake
+
+
+def make_env(manager, max_memory=100, idle=0, priority=0, cgroups=None):
+    env = EphemeralEnvironment(
+        status=EphemeralStatus.READY,
+        resource_limits=ResourceLimits(max_memory=max_memory, max_processes=None),
+        last_activity=datetime.now() - timedelta(seconds=idle),
+        priority=priority,
+    )
+    manager.environments[env.id] = env
+    if cgroups is not None:
+        cgroups._cgroups[env.id] = CgroupInfo(
+            name=env.id, path=None, limits=CgroupLimits(max_memory_mb=max_memory)
+        )
+    return env
+
+
+def usage(memory_mb=0.0, disk_mb=0.0):
+    return ResourceUsage(memory_mb=memory_mb, disk_mb=disk_mb, cpu_percent=0.0, active_processes=0)
+
+
+class TestLimitPolicyEngine:
+    """Tests pour LimitPolicyEngine"""
+
+    def test_warn_throttle_and_restore(self, cgroups):
+        """Alerte, ralentissement via cgroups puis retour aux limites d'origine"""
+        manager = FakeManager()
+        engine = LimitPolicyEngine(manager)
+        env = make_env(manager, cgroups=cgroups)
+
+        async def scenario():
+            return [
+                (await engine.evaluate(env, usage(memory_mb=mb))).action
+                for mb in (50, 85, 95, 40)
+            ]
+
+        actions = asyncio.run(scenario())
+
+        assert actions == [None, LimitAction.WARN, LimitAction.THROTTLE, None]
+        throttled, restored = (limits for _, limits in cgroups.updates)
+        assert throttled.memory_high_mb == 80 and throttled.max_cpu_percent == 50
+        assert restored.memory_high_mb is None and restored.max_cpu_percent is None
+        assert engine.state_of(env.id) == LimitState.NORMAL
+
+    def test_breach_escalates_to_freeze_then_evict(self, cgroups):
+        """Dépassement prolongé : ralentir, geler, évincer"""
+        manager = FakeManager(limit_policy=LimitPolicy(escalate_after=1))
+        engine = LimitPolicyEngine(manager)
+        env = make_env(manager, cgroups=cgroups)
+
+        async def scenario():
+            actions = [(await engine.evaluate(env, usage(memory_mb=120))).action for _ in range(3)]
+            await asyncio.gather(*manager.cleanup_scheduler._cleanup_tasks)
+            return actions
+
+        actions = asyncio.run(scenario())
+
+        assert actions == [LimitAction.THROTTLE, LimitAction.FREEZE, LimitAction.EVICT]
+        assert cgroups.frozen == [(env.id, True)]
+        assert manager.cleaned == [env.id]
+        assert manager.cleanup_scheduler.cleanup_history[-1].reason == "limit_exceeded"
+
+    @pytest.mark.parametrize("order,expected", [
+        (EvictionOrder.LRU, "idle"),
+        (EvictionOrder.PRIORITY, "low"),
+    ])
+    def test_global_eviction_order(self, cgroups, order, expected):
+        """Éviction globale selon l'ordre LRU ou la priorité"""
+        manager = FakeManager(max_total_memory_mb=150, limit_policy=LimitPolicy(eviction_order=order))
+        engine = LimitPolicyEngine(manager)
+        envs = {
+            "idle": make_env(manager, idle=600, priority=5),
+            "low": make_env(manager, idle=10, priority=-1),
+            "busy": make_env(manager, idle=0, priority=5),
+        }
+
+        async def scenario():
+            return await engine.enforce_global(
+                {env.id: usage(memory_mb=60) for env in envs.values()}, wait=True
+            )
+
+        evicted = asyncio.run(scenario())
+
+        assert evicted == [envs[expected].id]
+        assert manager.cleaned == [envs[expected].id]
+
+    def test_only_idle_environments_are_evicted(self, cgroups):
+        """Une commande en cours (RUNNING ou processus actif) protège de l'éviction"""
+        manager = FakeManager(max_total_memory_mb=50)
+        engine = LimitPolicyEngine(manager)
+        running = make_env(manager, idle=900)
+        running.status = EphemeralStatus.RUNNING
+        spawning = make_env(manager, idle=600)
+        manager.lifecycle_controller.process_manager.active_processes[spawning.id] = [object()]
+        idle = make_env(manager, idle=10)
+
+        async def scenario():
+            return await engine.enforce_global(
+                {env.id: usage(memory_mb=60) for env in (running, spawning, idle)}, wait=True
+            )
+
+        assert asyncio.run(scenario()) == [idle.id]
+        assert manager.cleaned == [idle.id]
+
+    def test_failed_eviction_restores_state(self, cgroups):
+        """Un nettoyage en échec ne laisse pas l'environnement en cours d'éviction"""
+        manager = FakeManager(failures=1)
+        engine = LimitPolicyEngine(manager)
+        env = make_env(manager)
+
+        async def scenario():
+            first = await engine.make_room()
+            state = engine.state_of(env.id)
+            return first, state, await engine.make_room()
+
+        first, state, second = asyncio.run(scenario())
+
+        assert first == [] and state == LimitState.NORMAL
+        assert second == [env.id] and manager.cleaned == [env.id]
+
+
+class TestAdmissionControl:
+    """Admission selon l'usage courant mesuré"""
+
+    def test_admission_uses_current_usage_not_peaks(self, tmp_path):
+        """Un ancien pic mémoire ne bloque plus les nouvelles créations"""
+        manager = EphemeralManager(EphemeralConfig(base_storage_path=tmp_path, max_total_memory_mb=100))
+        env = EphemeralEnvironment(status=EphemeralStatus.READY, peak_memory_mb=500)
+        manager.active_environments[env.id] = env
+        asyncio.run(manager.resource_tracker.start_monitoring(env))
+        manager.resource_tracker.resource_history[env.id].record(usage(memory_mb=20))
+
+        asyncio.run(manager._check_resource_limits())
+
+        manager.resource_tracker.resource_history[env.id].record(usage(memory_mb=150))
+        with pytest.raises(ResourceExhaustedException):
+            asyncio.run(manager._check_resource_limits())
@@ -0,0 +1,112 @@
+"""
+Tests unitaires pour l'exécution de commandes dans les environnements éphémères
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from gestvenv.core.ephemeral.lifecycle import ProcessManager, needs_shell
+from gestvenv.core.ephemeral.models import EphemeralEnvironment, EphemeralStatus
+
+
+@pytest.fixture
+def env(tmp_path):
+    """Environnement dont venv/bin contient un exécutable « tool »"""
+    venv = tmp_path / "venv"
+    (venv / "bin").mkdir(parents=True)
+    tool = venv / "bin" / "tool"
+    tool.write_text(f"#!{sys.executable}\nimport os, sys\nprint(os.environ['VIRTUAL_ENV'], *sys.argv[1:])\n")
+    tool.chmod(0o755)
+    return EphemeralEnvironment(status=EphemeralStatus.READY, storage_path=tmp_path, venv_path=venv)
+
+
+class TestNeedsShell:
+    """Tests pour needs_shell"""
+
+    @pytest.mark.parametrize("command", [
+        "python -m pytest -q",
+        "python -c 'import sys; print(sys.argv)'",
+        'echo "a | b"',
+        "pip install 'requests>=2.0'",
+    ])
+    def test_plain_commands_run_directly(self, command):
+        assert not needs_shell(command)
+
+    @pytest.mark.parametrize("command", [
+        "pip list | grep requests",
+        "cd src && pytest",
+        "python script.py > out.log",
+        'echo "$HOME"',
+        "ls *.py",
+        "FOO=1 python script.py",
+        "source venv/bin/activate",
+        "echo 'unterminated",
+    ])
+    def test_shell_features_keep_shell(self, command):
+        assert needs_shell(command)
+
+
+class TestProcessManager:
+    """Tests pour ProcessManager"""
+
+    def test_direct_exec_resolves_from_venv(self, env):
+        """Exécutable résolu dans venv/bin, arguments transmis sans shell"""
+        result = asyncio.run(ProcessManager().run_command(env, ["tool", "a>b", "$x"]))
+
+        assert result.success
+        assert result.stdout == f"{env.venv_path} a>b $x"
+        assert result.command == "tool 'a>b' '$x'"
+
+    def test_shell_mode_without_activation(self, env):
+        """Mode shell : venv déjà dans le PATH, pas de script activate requis"""
+        result = asyncio.run(ProcessManager().run_command(env, "tool one | tr a-z A-Z"))
+
+        assert result.success
+        assert result.stdout == f"{env.venv_path} ONE".upper()
+
+    def test_execution_environment_is_cached(self, env):
+        """Environnement d'exécution calculé une fois, oublié au nettoyage"""
+        manager = ProcessManager()
+        first = manager._build_execution_environment(env)
+
+        assert manager._build_execution_environment(env) is first
+        assert first["PATH"].startswith(f"{env.venv_path}/bin{os.pathsep}")
+
+        asyncio.run(manager.cleanup_processes(env))
+        assert manager._build_execution_environment(env) is not first
+
+    def test_output_is_streamed(self, env):
+        """Lignes transmises au rappel avant la fin du processus"""
+        code = "import sys, time\nprint('first', flush=True)\ntime.sleep(0.5)\nprint('second')"
+        seen = []
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            result = await ProcessManager().run_command(
+                env, [sys.executable, "-c", code],
+                on_output=lambda stream, line: seen.append((line, loop.time() - start))
+            )
+            return result, loop.time() - start
+
+        result, total = asyncio.run(scenario())
+
+        assert result.stdout == "first\nsecond"
+        assert [line for line, _ in seen] == ["first", "second"]
+        assert seen[0][1] < total - 0.3
+
+    def test_timeout_and_missing_executable(self, env):
+        """Délai dépassé : -1 ; exécutable introuvable : 127"""
+        manager = ProcessManager()
+
+        timed_out = asyncio.run(manager.run_command(
+            env, [sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.3
+        ))
+        missing = asyncio.run(manager.run_command(env, "gestvenv-commande-inexistante"))
+
+        assert timed_out.returncode == -1 and timed_out.stderr == "Command timed out"
+        assert missing.returncode == 127
+        assert manager.active_processes[env.id] == []
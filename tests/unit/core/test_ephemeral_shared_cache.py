@@ -0,0 +1,226 @@
+"""
+Tests unitaires pour le cache de packages partagé des environnements éphémères
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+import zipfile
+
+import pytest
+
+from gestvenv.core.ephemeral.containers import ContainerPool
+from gestvenv.core.ephemeral.lifecycle import ProcessManager
+from gestvenv.core.ephemeral.models import EphemeralConfig, EphemeralEnvironment
+from gestvenv.core.ephemeral import shared_cache
+from gestvenv.core.ephemeral.shared_cache import (
+    GC_LOCK,
+    SharedPackageCache,
+    _FileLock,
+    is_pip_command,
+    uses_package_cache,
+)
+
+
+class FakeCacheService:
+    """CacheService factice enregistrant les wheels reçues"""
+
+    enabled = True
+
+    def __init__(self):
+        self.packages = {}
+
+    def is_package_cached(self, package, version=None, platform=None):
+        return (package, version, platform) in self.packages
+
+    def cache_package(self, package, version, platform, data, backend="pip"):
+        self.packages[(package, version, platform)] = (data, backend)
+        return True
+
+
+def wheel_files(name, version, tag="py3-none-any"):
+    return {
+        f"{name}/__init__.py": "x = 1\n",
+        f"{name}-{version}.dist-info/WHEEL": f"Wheel-Version: 1.0\nTag: {tag}\n",
+        f"{name}-{version}.dist-info/METADATA": f"Name: {name}\nVersion: {version}\n",
+    }
+
+
+def wheel_bytes(name, version, tag="py3-none-any"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for path, content in wheel_files(name, version, tag).items():
+            archive.writestr(path, content)
+    return buffer.getvalue()
+
+
+def write_file(path, data, age=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedPackageCache(tmp_path / "shared", max_mb=1)
+
+
+class TestSharedPackageCache:
+    """Tests pour SharedPackageCache"""
+
+    @pytest.mark.parametrize("command,expected", [
+        ("pip install requests", True),
+        (["/venv/bin/pip3.11", "install", "x"], True),
+        ("python -m pip list | grep x", True),
+        (["uv", "pip", "install", "x"], False),
+        ("uv sync", False),
+        ("python -m pipx run x", False),
+    ])
+    def test_is_pip_command(self, command, expected):
+        assert is_pip_command(command) is expected
+
+    @pytest.mark.parametrize("command,expected", [
+        ("pip install requests", True),
+        (["uv", "pip", "install", "x"], True),
+        ("/usr/local/bin/uvx ruff check .", True),
+        ("python -m uv sync", True),
+        ("python script.py", False),
+        (["pytest", "-q"], False),
+    ])
+    def test_uses_package_cache(self, command, expected):
+        assert uses_package_cache(command) is expected
+
+    def test_pip_commands_are_serialized(self, cache):
+        """Commandes pip sérialisées, les autres restent concurrentes"""
+        active = {"pip": 0, "other": 0}
+        peaks = {"pip": 0, "other": 0}
+
+        async def command(kind):
+            async with cache.access(pip=kind == "pip"):
+                active[kind] += 1
+                peaks[kind] = max(peaks[kind], active[kind])
+                await asyncio.sleep(0.05)
+                active[kind] -= 1
+
+        async def scenario():
+            await asyncio.gather(*(command(kind) for kind in ["pip", "other"] * 3))
+
+        asyncio.run(scenario())
+
+        assert peaks == {"pip": 1, "other": 3}
+
+    def test_collect_enforces_quota_oldest_first(self, cache):
+        """Quota : fichiers pip les plus anciens supprimés, rien pendant une commande"""
+        old = cache.pip_dir / "http-v2" / "old.body"
+        new = cache.pip_dir / "http-v2" / "new.body"
+        write_file(old, b"o" * 700_000, age=3600)
+        write_file(new, b"n" * 700_000)
+
+        async def collect_during_command():
+            async with cache.access():
+                return cache.collect()
+
+        assert asyncio.run(collect_during_command()) == 0
+        assert cache.gc_pending
+        assert cache.collect() == 700_000
+        assert not cache.gc_pending
+        assert not old.exists() and new.exists()
+        assert cache.collect() == 0
+
+    def test_busy_cache_is_collected_once_released(self, cache, monkeypatch):
+        """Un passage reporté est repris par maintain() une fois le cache libéré"""
+        monkeypatch.setattr(shared_cache, "GC_RETRY_INTERVAL", 0.05)
+        write_file(cache.pip_dir / "http-v2" / "old.body", b"o" * 1_500_000, age=3600)
+
+        async def command():
+            async with cache.access():
+                await asyncio.sleep(0.1)
+
+        async def scenario():
+            running = asyncio.create_task(command())
+            await asyncio.sleep(0.01)
+            result = await cache.maintain()
+            await running
+            return result
+
+        assert asyncio.run(scenario())["freed_bytes"] == 1_500_000
+        assert not cache.gc_pending
+
+    def test_lock_wait_is_bounded(self, cache):
+        """L'attente du verrou partagé est bornée"""
+        gc = _FileLock(cache.root / GC_LOCK)
+        cache.ensure()
+        assert gc.try_acquire(exclusive=True)
+
+        async def scenario():
+            async with cache.access(timeout=0.1):
+                pass
+
+        try:
+            with pytest.raises(shared_cache.TimeoutException):
+                asyncio.run(scenario())
+        finally:
+            gc.release()
+
+    def test_warm_feeds_persistent_cache_once(self, cache):
+        """Wheels pip (corps HTTP) et uv (archives) versées une seule fois"""
+        write_file(cache.pip_dir / "http-v2" / "a" / "b.body",
+                   wheel_bytes("requests", "2.31.0"))
+        write_file(cache.pip_dir / "selfcheck.json", b"{}")
+        for path, content in wheel_files("numpy", "1.26.0", "cp311-cp311-manylinux_2_17_x86_64").items():
+            write_file(cache.uv_dir / "archive-v0" / "abc" / path, content.encode())
+        service = FakeCacheService()
+
+        assert cache.warm(service) == 2
+        assert cache.warm(service) == 0
+
+        data, backend = service.packages[("numpy", "1.26.0", "manylinux_2_17_x86_64")]
+        assert backend == "uv"
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert "numpy/__init__.py" in archive.namelist()
+        assert service.packages[("requests", "2.31.0", "any")][1] == "pip"
+
+
+class TestProcessManagerSharedCache:
+    """Exécution des commandes avec le cache partagé"""
+
+    def test_commands_use_shared_cache(self, cache, tmp_path):
+        env = EphemeralEnvironment(storage_path=tmp_path / "env")
+        exec_env = ProcessManager(cache)._build_execution_environment(env)
+
+        assert exec_env["PIP_CACHE_DIR"] == str(cache.pip_dir)
+        assert exec_env["UV_CACHE_DIR"] == str(cache.uv_dir)
+
+    def test_only_package_commands_wait_for_the_cache(self, cache, tmp_path):
+        """Une commande sans pip/uv ignore le verrou ; une commande pip l'attend dans son délai"""
+        env = EphemeralEnvironment(storage_path=tmp_path / "env")
+        env.storage_path.mkdir()
+        manager = ProcessManager(cache)
+        gc = _FileLock(cache.root / GC_LOCK)
+        cache.ensure()
+        assert gc.try_acquire(exclusive=True)
+
+        async def scenario():
+            plain = await manager.run_command(env, [sys.executable, "-c", "print('ok')"], timeout=5)
+            pip = await manager.run_command(env, [sys.executable, "-m", "pip", "--version"], timeout=0.2)
+            return plain, pip
+
+        try:
+            plain, pip = asyncio.run(scenario())
+        finally:
+            gc.release()
+
+        assert plain.returncode == 0 and plain.stdout.strip() == "ok"
+        assert pip.returncode == -1
+        assert "shared package cache" in pip.stderr
+
+    def test_pooled_containers_mount_shared_cache(self, cache, tmp_path):
+        pool = ContainerPool(EphemeralConfig(base_storage_path=tmp_path), lambda: tmp_path,
+                             shared_cache=cache)
+        spec = pool._spec("image", ("docker", "3.11", True, None, None))
+
+        assert f"{cache.uv_dir}:/cache/uv:rw" in spec.volumes
+        assert spec.environment["PIP_CACHE_DIR"] == "/cache/pip"
@@ -0,0 +1,136 @@
+"""
+Tests unitaires pour le cache de templates des environnements éphémères
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from gestvenv.core.ephemeral.lifecycle import LifecycleController
+from gestvenv.core.ephemeral.models import EphemeralConfig, EphemeralEnvironment, StorageBackend
+from gestvenv.core.ephemeral.templates import TemplateCache, template_key
+from gestvenv.core.models import BackendType
+
+
+class FakeBuilder:
+    """Construction factice d'un venv (chemins absolus dans les fichiers modifiables)"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, venv_path):
+        self.calls.append(venv_path)
+        await asyncio.sleep(self.delay)
+        (venv_path / "bin").mkdir(parents=True)
+        (venv_path / "lib").mkdir()
+        (venv_path / "pyvenv.cfg").write_text(f"home = /usr/bin\ncommand = venv {venv_path}\n")
+        (venv_path / "bin" / "activate").write_text(f'VIRTUAL_ENV="{venv_path}"\n')
+        (venv_path / "lib" / "module.py").write_text("x = 1\n" * 100)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return EphemeralConfig(storage_backend=StorageBackend.DISK, base_storage_path=tmp_path / "storage")
+
+
+@pytest.fixture
+def cache(config):
+    return TemplateCache(config, lambda: config.base_storage_path)
+
+
+class TestTemplateCache:
+    """Tests pour TemplateCache"""
+
+    def test_key_ignores_order_and_name_case(self):
+        """Clé indépendante de l'ordre et de la casse des noms"""
+        key = template_key("3.11", "uv", ["Requests>=2.0", "click"])
+        assert key == template_key("3.11", "uv", ["click", "requests>=2.0"])
+        assert key != template_key("3.12", "uv", ["click", "requests>=2.0"])
+        assert key != template_key("3.11", "pip", ["click", "requests>=2.0"])
+        assert key != template_key("3.11", "uv", ["click", "requests>=2.1"])
+
+    def test_builds_once_then_clones(self, cache, tmp_path):
+        """Premier usage : construction ; suivants : clone relocalisé"""
+        builder = FakeBuilder()
+        first = tmp_path / "env1" / "venv"
+        second = tmp_path / "env2" / "venv"
+
+        asyncio.run(cache.materialize("3.11", "uv", ["click"], first, builder))
+        stats = asyncio.run(cache.materialize("3.11", "uv", ["click"], second, builder))
+
+        assert len(builder.calls) == 1
+        assert stats.files == 3
+        assert cache.hits == 1 and cache.misses == 1
+        assert str(second) in (second / "bin" / "activate").read_text()
+        assert ".building-" not in (second / "pyvenv.cfg").read_text()
+        assert (second / "lib" / "module.py").read_text() == "x = 1\n" * 100
+
+    def test_concurrent_requests_share_one_build(self, cache, tmp_path):
+        """Demandes simultanées d'un même template : une seule construction"""
+        builder = FakeBuilder(delay=0.05)
+
+        async def scenario():
+            await asyncio.gather(*(
+                cache.materialize("3.11", "pip", [], tmp_path / f"env{i}" / "venv", builder)
+                for i in range(4)
+            ))
+
+        asyncio.run(scenario())
+
+        assert len(builder.calls) == 1
+        assert all((tmp_path / f"env{i}" / "venv" / "pyvenv.cfg").is_file() for i in range(4))
+
+    def test_lru_eviction(self, config, cache, tmp_path):
+        """Éviction du template le moins récemment utilisé"""
+        config.template_cache_max_entries = 2
+        builder = FakeBuilder()
+
+        async def scenario():
+            for i, packages in enumerate((["a"], ["b"], ["a"], ["c"])):
+                await cache.materialize("3.11", "uv", packages, tmp_path / f"env{i}" / "venv", builder)
+
+        asyncio.run(scenario())
+
+        assert cache.evictions == 1
+        assert not cache.template_path(template_key("3.11", "uv", ["b"])).exists()
+        assert cache.template_path(template_key("3.11", "uv", ["a"])).exists()
+        # Les clones survivent à l'éviction de leur template
+        assert (tmp_path / "env1" / "venv" / "lib" / "module.py").is_file()
+
+    def test_size_cap_and_persistent_index(self, config, cache, tmp_path):
+        """Taille maximale respectée et index relu par une nouvelle instance"""
+        config.template_cache_max_mb = 0
+        builder = FakeBuilder()
+
+        asyncio.run(cache.materialize("3.11", "uv", ["a"], tmp_path / "env0" / "venv", builder))
+        assert cache.stats()["entries"] == 0
+
+        config.template_cache_max_mb = 10
+        asyncio.run(cache.materialize("3.11", "uv", ["b"], tmp_path / "env1" / "venv", builder))
+        reloaded = TemplateCache(config, lambda: config.base_storage_path)
+        assert reloaded.stats()["entries"] == 1
+
+
+class TestLifecycleTemplates:
+    """Création d'environnements éphémères depuis les templates"""
+
+    def test_create_virtual_environment_uses_cache(self, cache, tmp_path, monkeypatch):
+        """Deux environnements identiques : un seul venv construit"""
+        controller = LifecycleController(SimpleNamespace(template_cache=cache))
+        builder = FakeBuilder()
+        monkeypatch.setattr(controller, "_build_virtual_environment",
+                            lambda env, path: builder(path))
+
+        envs = [
+            EphemeralEnvironment(backend=BackendType.UV, packages=["click"],
+                                 storage_path=tmp_path / f"env{i}")
+            for i in range(2)
+        ]
+        for env in envs:
+            asyncio.run(controller._create_virtual_environment(env))
+
+        assert len(builder.calls) == 1
+        assert all((env.venv_path / "pyvenv.cfg").is_file() for env in envs)
+        assert envs[1].tags["template_clone"] in ("reflink", "hardlink", "copy")
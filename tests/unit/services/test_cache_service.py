@@ -0,0 +1,52 @@
+"""
+Tests unitaires du service de cache
+"""
+
+import asyncio
+import json
+
+from gestvenv.core.models import Config
+from gestvenv.services.async_cache_service import async_cache_context
+from gestvenv.services.cache_service import CacheService
+
+
+def make_service():
+    return CacheService(Config(cache_settings={"enabled": True, "compression": False}))
+
+
+def test_index_and_stats_writes_from_two_instances_are_merged(tmp_path, monkeypatch):
+    # Deux instances : deux processus gestvenv (CLI et API web) sur le même cache
+    monkeypatch.setenv("HOME", str(tmp_path))
+    first, second = make_service(), make_service()
+
+    assert first.cache_package("alpha", "1.0", "any", b"alpha-wheel")
+    assert second.cache_package("beta", "2.0", "any", b"beta-wheel")
+
+    index = json.loads(first.index_path.read_text())
+    assert sorted(meta["package"] for meta in index.values()) == ["alpha", "beta"]
+    assert json.loads(first.stats_path.read_text())["packages_cached"] == 2
+    assert (tmp_path / ".gestvenv" / "locks" / "cache" / "index.lock").exists()
+
+    # Suppression par une instance : l'entrée de l'autre est conservée
+    second._remove_cache_entry(second._generate_cache_key("beta", "2.0", "any"))
+    assert first.get_cached_package("alpha", "1.0", "any") == b"alpha-wheel"
+    index = json.loads(first.index_path.read_text())
+    assert [meta["package"] for meta in index.values()] == ["alpha"]
+
+
+def test_async_context_exit_keeps_entries_from_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    other = make_service()
+
+    async def scenario():
+        async with async_cache_context(Config(cache_settings={"enabled": True,
+                                                              "compression": False})) as service:
+            await service.cache_package("alpha", "1.0", "any", b"alpha-wheel")
+            # Écriture d'un autre processus pendant la session async
+            assert other.cache_package("beta", "2.0", "any", b"beta-wheel")
+
+    asyncio.run(scenario())
+
+    index = json.loads(other.index_path.read_text())
+    assert sorted(meta["package"] for meta in index.values()) == ["alpha", "beta"]
+    assert json.loads(other.stats_path.read_text())["packages_cached"] == 2
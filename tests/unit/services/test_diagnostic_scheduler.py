@@ -0,0 +1,113 @@
+"""
+Tests unitaires pour le planificateur incrémental des diagnostics
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from gestvenv.core.models import DiagnosticIssue, EnvironmentInfo, IssueLevel
+from gestvenv.services.diagnostic_scheduler import DiagnosticResultStore, DiagnosticScheduler
+
+
+class CountingChecker:
+    """Vérificateur dépendant de site-packages, qui compte ses exécutions"""
+
+    inputs = ("pyvenv", "site_packages")
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def check_environment(self, env_info):
+        self.calls.append(env_info.name)
+        self.threads.add(threading.get_ident())
+        return [DiagnosticIssue(level=IssueLevel.WARNING, category="size",
+                                description=f"{env_info.name} volumineux", metadata={"path": env_info.path})]
+
+
+class VolatileChecker:
+    """Vérificateur sans entrées déclarées : toujours relancé"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def check_environment(self, env_info):
+        self.calls += 1
+        return []
+
+
+def make_env(root: Path, name: str) -> EnvironmentInfo:
+    env_path = root / name
+    (env_path / "lib" / "python3.11" / "site-packages").mkdir(parents=True)
+    (env_path / "pyvenv.cfg").write_text("version = 3.11.7\n")
+    return EnvironmentInfo(name=name, path=env_path, python_version="3.11")
+
+
+def bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def environments(tmp_path):
+    return [make_env(tmp_path / "envs", f"env{i}") for i in range(4)]
+
+
+class TestDiagnosticScheduler:
+    """Tests pour DiagnosticScheduler"""
+
+    def test_reruns_only_checks_whose_inputs_changed(self, tmp_path, environments):
+        checker, volatile = CountingChecker(), VolatileChecker()
+        store_path = tmp_path / "diagnostics.json"
+        scheduler = DiagnosticScheduler([checker, volatile], DiagnosticResultStore(store_path), jobs=4)
+
+        first = scheduler.check_environments(environments)
+        assert sorted(checker.calls) == ["env0", "env1", "env2", "env3"]
+
+        bump_mtime(environments[2].path / "lib" / "python3.11" / "site-packages")
+        second = scheduler.check_environments(environments)
+
+        assert sorted(checker.calls) == ["env0", "env1", "env2", "env2", "env3"]
+        assert volatile.calls == 8
+        assert [r.cached for r in second["env0"]] == [True, False]
+        assert second["env1"][0].issues[0].description == first["env1"][0].issues[0].description
+        assert scheduler.stats()["reused"] == 3
+
+    def test_results_survive_a_new_process(self, tmp_path, environments):
+        store_path = tmp_path / "diagnostics.json"
+        DiagnosticScheduler([CountingChecker()], DiagnosticResultStore(store_path)).check_environments(environments)
+
+        checker = CountingChecker()
+        results = DiagnosticScheduler([checker], DiagnosticResultStore(store_path)).check_environments(environments)
+
+        assert checker.calls == []
+        assert all(r[0].cached and r[0].issues[0].level is IssueLevel.WARNING for r in results.values())
+
+    def test_full_run_ignores_cached_results(self, tmp_path, environments):
+        checker = CountingChecker()
+        scheduler = DiagnosticScheduler([checker], DiagnosticResultStore(tmp_path / "d.json"), jobs=4)
+
+        scheduler.check_environments(environments)
+        scheduler.check_environments(environments, full=True)
+
+        assert len(checker.calls) == 8
+
+    def test_failed_check_is_not_cached(self, tmp_path, environments):
+        class FailingChecker:
+            inputs = ("pyvenv",)
+            calls = 0
+
+            def check_environment(self, env_info):
+                FailingChecker.calls += 1
+                raise RuntimeError("pip ne répond pas")
+
+        scheduler = DiagnosticScheduler([FailingChecker()], DiagnosticResultStore(tmp_path / "d.json"))
+
+        results = scheduler.check_environments(environments[:1])
+        scheduler.check_environments(environments[:1])
+
+        assert results["env0"][0].error == "pip ne répond pas"
+        assert FailingChecker.calls == 2
@@ -272,3 +272,77 @@ class TestLogging:
         mock_basic_config.assert_called_once()
         args, kwargs = mock_basic_config.call_args
         assert kwargs['level'] == pytest.importorskip('logging').WARNING
+
+
+class TestFanOutCommands:
+    """Tests des options multi-environnements (--all/--envs)"""
+
+    @patch('gestvenv.cli_main.EnvironmentManager')
+    def test_sync_all_jsonl(self, mock_env_manager_class, cli_runner):
+        """sync --all --jsonl : un objet par environnement puis un résumé"""
+        import json
+
+        envs = [create_mock_environment(name=n) for n in ("beta", "alpha")]
+        mock_manager = Mock()
+        mock_manager.list_environments.return_value = envs
+        mock_manager.config_manager.config.backend_configs = {}
+        mock_manager.sync_environment.side_effect = lambda name, **options: Mock(
+            success=name == "alpha", message="ok" if name == "alpha" else "échec",
+            packages_added=[], packages_removed=[], packages_updated=[]
+        )
+        mock_env_manager_class.return_value = mock_manager
+
+        result = cli_runner.invoke(cli, ['sync', '--all', '--jsonl', '--jobs', '2'])
+
+        lines = [json.loads(line) for line in result.output.strip().splitlines()]
+        assert result.exit_code == 1
+        assert sorted(l["env_name"] for l in lines if l["type"] == "result") == ["alpha", "beta"]
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["failed_envs"] == ["beta"]
+
+    @patch('gestvenv.cli_main.EnvironmentManager')
+    def test_sync_envs_unknown(self, mock_env_manager_class, cli_runner):
+        """--envs avec un environnement inconnu"""
+        mock_manager = Mock()
+        mock_manager.get_environment_info.return_value = None
+        mock_env_manager_class.return_value = mock_manager
+
+        result = cli_runner.invoke(cli, ['sync', '--envs', 'absent'])
+
+        assert result.exit_code != 0
+        assert "absent" in result.output
+
+    @patch('gestvenv.cli_main.EnvironmentManager')
+    def test_sync_all_forwards_options(self, mock_env_manager_class, cli_runner):
+        """--groups, --clean et --upgrade sont transmis à chaque environnement"""
+        mock_manager = Mock()
+        mock_manager.list_environments.return_value = [create_mock_environment(name="alpha")]
+        mock_manager.config_manager.config.backend_configs = {}
+        mock_manager.sync_environment.return_value = Mock(
+            success=True, message="ok", packages_added=[], packages_removed=[], packages_updated=[]
+        )
+        mock_env_manager_class.return_value = mock_manager
+
+        result = cli_runner.invoke(
+            cli, ['sync', '--all', '--jsonl', '--groups', 'dev, docs', '--clean', '--upgrade']
+        )
+
+        assert result.exit_code == 0
+        mock_manager.sync_environment.assert_called_once_with(
+            "alpha", groups=["dev", "docs"], clean=True, upgrade=True
+        )
+
+    @patch('gestvenv.cli_main.EnvironmentManager')
+    def test_update_all_envs_requires_packages(self, mock_env_manager_class, cli_runner):
+        """update --all-envs sans package ni --all : erreur d'usage, rien n'est lancé"""
+        mock_manager = Mock()
+        mock_manager.list_environments.return_value = [create_mock_environment(name="alpha")]
+        mock_manager.config_manager.config.backend_configs = {}
+        mock_env_manager_class.return_value = mock_manager
+
+        result = cli_runner.invoke(cli, ['update', '--all-envs'])
+
+        assert result.exit_code == 2
+        assert "--all" in result.output
+        mock_manager.package_service.update_packages.assert_not_called()
+        mock_manager.package_service.update_all_packages.assert_not_called()
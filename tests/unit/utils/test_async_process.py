@@ -0,0 +1,116 @@
+"""
+Tests unitaires pour l'exécution asynchrone de sous-processus
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from gestvenv.utils.async_process import run_command_async
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # Zombie en attente de récolte par son parent : considéré comme terminé
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+class TestRunCommandAsync:
+    """Tests pour run_command_async"""
+
+    def test_streams_lines_while_running(self):
+        """Chaque ligne est transmise au rappel avant la fin du processus"""
+        received = []
+
+        def on_output(stream, line):
+            received.append((stream, line, time.perf_counter()))
+
+        code = ("import sys, time\n"
+                "print('one', flush=True)\n"
+                "print('warn', file=sys.stderr, flush=True)\n"
+                "time.sleep(0.3)\n"
+                "print('two', flush=True)")
+        result = asyncio.run(run_command_async(python(code), on_output=on_output))
+
+        assert result.success
+        assert result.stdout == "one\ntwo"
+        assert result.stderr == "warn"
+        assert ("stdout", "one") in [(s, l) for s, l, _ in received]
+        times = {line: t for _, line, t in received}
+        assert times["two"] - times["one"] >= 0.2
+
+    def test_async_callback_and_failure(self):
+        """Rappels coroutines acceptés, code retour propagé"""
+        lines = []
+
+        async def on_output(stream, line):
+            lines.append(line)
+
+        result = asyncio.run(run_command_async(
+            python("print('x'); raise SystemExit(3)"), on_output=on_output
+        ))
+
+        assert result.returncode == 3 and not result.success
+        assert lines == ["x"]
+
+    def test_missing_executable(self):
+        """Exécutable introuvable : résultat en échec, pas d'exception"""
+        result = asyncio.run(run_command_async(["gestvenv-commande-inexistante"]))
+        assert result.returncode == 127 and not result.success
+
+    def test_timeout_kills_process(self):
+        """Délai dépassé : processus tué et sortie partielle conservée"""
+        code = "import time; print('start', flush=True); time.sleep(30)"
+        started = time.perf_counter()
+        result = asyncio.run(run_command_async(python(code), timeout=0.5, grace_period=0.5))
+
+        assert result.timed_out and not result.success
+        assert result.stdout == "start"
+        assert time.perf_counter() - started < 10
+
+    @pytest.mark.skipif(os.name == "nt", reason="groupes de processus POSIX")
+    def test_cancellation_kills_process_group(self):
+        """Annulation : le groupe complet (petits-enfants inclus) est tué"""
+        code = ("import subprocess, sys, time\n"
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                "print(child.pid, flush=True)\n"
+                "time.sleep(60)")
+        pids = []
+
+        async def scenario():
+            ready = asyncio.Event()
+
+            def on_output(stream, line):
+                pids.append(int(line))
+                ready.set()
+
+            task = asyncio.create_task(
+                run_command_async(python(code), on_output=on_output, grace_period=0.5)
+            )
+            await asyncio.wait_for(ready.wait(), timeout=10)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+
+        deadline = time.time() + 5
+        while pid_alive(pids[0]) and time.time() < deadline:
+            time.sleep(0.05)
+        assert not pid_alive(pids[0])
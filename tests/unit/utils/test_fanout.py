@@ -0,0 +1,125 @@
+"""
+Tests unitaires pour l'exécution multi-environnements
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from gestvenv.core.models import BackendType, SyncResult
+from gestvenv.utils.fanout import (
+    EnvOperationResult,
+    FanOutExecutor,
+    _interleave_by_backend,
+    default_jobs,
+)
+
+
+def make_envs(count, backend=BackendType.UV, prefix="env"):
+    return [SimpleNamespace(name=f"{prefix}{i}", backend_type=backend) for i in range(count)]
+
+
+class ConcurrencyProbe:
+    """Opération factice mesurant la concurrence maximale atteinte"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+
+    def __call__(self, env):
+        backend = env.backend_type.value
+        with self.lock:
+            self.active[backend] = self.active.get(backend, 0) + 1
+            self.active["*"] = self.active.get("*", 0) + 1
+            for key in (backend, "*"):
+                self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[backend] -= 1
+            self.active["*"] -= 1
+        return {"success": True, "message": "ok"}
+
+
+class TestFanOutExecutor:
+    """Tests pour FanOutExecutor"""
+
+    @pytest.fixture(autouse=True)
+    def eight_cpus(self, monkeypatch):
+        """Nombre de CPU fixé : les bornes de concurrence ne dépendent pas de la machine"""
+        monkeypatch.setattr("os.cpu_count", lambda: 8)
+
+    def test_default_jobs_bounds(self, monkeypatch):
+        """Nombre de workers borné par le nombre de CPU"""
+        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        assert default_jobs() == 4
+        assert default_jobs(3) == 3
+        assert default_jobs(100) == 8
+        assert default_jobs(0) == 4
+
+    def test_runs_concurrently_within_limit(self):
+        """Les opérations s'exécutent en parallèle sans dépasser --jobs"""
+        probe = ConcurrencyProbe()
+        executor = FanOutExecutor(jobs=4)
+
+        started = time.perf_counter()
+        summary = executor.run("probe", make_envs(12), probe)
+        elapsed = time.perf_counter() - started
+
+        assert summary.success and len(summary.results) == 12
+        assert 1 < probe.peak["*"] <= 4
+        assert elapsed < 12 * probe.delay
+
+    def test_backend_cap(self):
+        """Plafond de concurrence par backend"""
+        probe = ConcurrencyProbe()
+        executor = FanOutExecutor(jobs=6, backend_limits={"pip": 1})
+        envs = make_envs(4, BackendType.PIP, "p") + make_envs(4, BackendType.UV, "u")
+
+        executor.run("probe", envs, probe)
+
+        assert probe.peak["pip"] == 1
+        assert probe.peak["uv"] > 1
+
+    def test_streams_results_and_keeps_input_order(self):
+        """Résultats remis au fil de l'eau, résumé dans l'ordre d'entrée"""
+        envs = make_envs(3)
+        delays = {"env0": 0.15, "env1": 0.0, "env2": 0.05}
+        streamed = []
+
+        def operation(env):
+            time.sleep(delays[env.name])
+            return SyncResult(success=True, message=env.name)
+
+        summary = FanOutExecutor(jobs=3).run("sync", envs, operation, on_result=streamed.append)
+
+        assert [r.env_name for r in streamed] == ["env1", "env2", "env0"]
+        assert [r.env_name for r in summary.results] == ["env0", "env1", "env2"]
+        assert all(r.duration >= 0 for r in summary.results)
+
+    def test_failures_are_isolated(self):
+        """Une exception n'interrompt pas les autres environnements"""
+        def operation(env):
+            if env.name == "env1":
+                raise RuntimeError("boom")
+            return env.name != "env2"
+
+        summary = FanOutExecutor(jobs=2).run("op", make_envs(3), operation)
+
+        assert [r.success for r in summary.results] == [True, False, False]
+        assert summary.results[1].message == "RuntimeError: boom"
+        data = summary.to_dict()
+        assert data["failed"] == 2 and data["failed_envs"] == ["env1", "env2"]
+
+    def test_interleave_by_backend(self):
+        """Alternance des backends dans l'ordre de soumission"""
+        envs = make_envs(3, BackendType.PIP, "p") + make_envs(1, BackendType.UV, "u")
+        assert [e.name for e in _interleave_by_backend(envs)] == ["p0", "u0", "p1", "p2"]
+
+    def test_result_serialization(self):
+        """Résultat sérialisable en JSON lines"""
+        result = EnvOperationResult("env", "uv", True, "ok", 0.5, {"added": ["x"]})
+        assert result.to_dict()["details"] == {"added": ["x"]}
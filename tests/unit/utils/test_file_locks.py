@@ -0,0 +1,150 @@
+"""
+Tests unitaires des verrous fichier inter-processus
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from gestvenv.core.exceptions import LockTimeoutError
+from gestvenv.utils import file_locks
+from gestvenv.utils.file_locks import (
+    FileLock,
+    environment_lock,
+    lock_statistics,
+    reset_lock_statistics,
+)
+
+pytestmark = pytest.mark.skipif(file_locks.fcntl is None, reason="flock indisponible")
+
+
+@pytest.fixture(autouse=True)
+def clean_statistics():
+    reset_lock_statistics()
+    yield
+    reset_lock_statistics()
+
+
+def hold_in_subprocess(path, exclusive=True):
+    """Processus détenant le verrou jusqu'à fermeture de son entrée standard"""
+    script = textwrap.dedent(f"""
+        import sys
+        from gestvenv.utils.file_locks import FileLock
+        lock = FileLock({str(path)!r}, exclusive={exclusive})
+        lock.acquire()
+        print("locked", flush=True)
+        sys.stdin.read()
+        lock.release()
+    """)
+    process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    assert process.stdout.readline().strip() == "locked"
+    return process
+
+
+def release_subprocess(process):
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+def test_exclusive_lock_held_by_other_process_times_out(tmp_path):
+    path = tmp_path / "env.lock"
+    process = hold_in_subprocess(path)
+    try:
+        with pytest.raises(LockTimeoutError) as excinfo:
+            FileLock(path, timeout=0.2, category="test").acquire()
+    finally:
+        release_subprocess(process)
+
+    assert excinfo.value.holder["pid"] == process.pid
+    stats = lock_statistics()["test"]
+    assert stats["timeouts"] == 1 and stats["acquisitions"] == 0
+    assert stats["wait_max"] >= 0.2
+
+    # Libéré par l'autre processus : obtenu sans attente
+    with FileLock(path, timeout=0.2, category="test") as lock:
+        assert lock.waited == 0.0
+
+
+def test_shared_locks_coexist_and_block_writers(tmp_path):
+    path = tmp_path / "entry.lock"
+    process = hold_in_subprocess(path, exclusive=False)
+    try:
+        with FileLock(path, exclusive=False, timeout=0.2):
+            pass
+        with pytest.raises(LockTimeoutError):
+            FileLock(path, exclusive=True, timeout=0.1).acquire()
+    finally:
+        release_subprocess(process)
+
+
+def test_nested_acquisitions_in_same_thread_are_reentrant(tmp_path):
+    path = tmp_path / "env.lock"
+    with FileLock(path, exclusive=True, timeout=0.2):
+        # Acquisitions imbriquées, partagée ou exclusive : verrou réutilisé
+        with FileLock(path, exclusive=False, timeout=0.2):
+            with FileLock(path, exclusive=True, timeout=0.2):
+                assert json.loads(path.read_text())["pid"]
+        # Toujours détenu après les sorties imbriquées
+        assert not FileLock(path, exclusive=False).try_acquire()
+    assert FileLock(path, timeout=0).try_acquire()
+
+
+def test_nested_exclusive_in_shared_is_refused_and_keeps_shared_lock(tmp_path):
+    path = tmp_path / "env.lock"
+    process = hold_in_subprocess(path, exclusive=False)
+    try:
+        with FileLock(path, exclusive=False, timeout=0.2):
+            with pytest.raises(RuntimeError, match="imbriquée"):
+                FileLock(path, exclusive=True, timeout=0.2).acquire()
+            release_subprocess(process)
+            # L'autre lecteur parti, le verrou partagé de ce thread bloque toujours un écrivain
+            assert not FileLock(path, exclusive=True).try_acquire()
+        assert FileLock(path, timeout=0).try_acquire()
+    finally:
+        if process.poll() is None:
+            release_subprocess(process)
+
+
+def test_async_acquisition_waits_for_release(tmp_path):
+    path = tmp_path / "index.lock"
+
+    async def scenario():
+        first = FileLock(path, category="test")
+        await first.acquire_async()
+        asyncio.get_running_loop().call_later(0.1, first.release)
+        second = FileLock(path, category="test")
+        waited = await second.acquire_async(timeout=5)
+        second.release()
+        return waited
+
+    assert asyncio.run(scenario()) >= 0.05
+    assert lock_statistics()["test"]["contended"] == 1
+
+
+def test_stale_lock_file_is_broken_without_flock(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_locks, "fcntl", None)
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True)
+    path = tmp_path / "env.lock"
+    path.write_text(json.dumps({
+        "pid": int(finished.stdout), "host": file_locks.socket.gethostname(), "acquired_at": 0
+    }))
+
+    with FileLock(path, timeout=0.5, category="test"):
+        assert json.loads(path.read_text())["pid"] != int(finished.stdout)
+    assert not path.exists()
+    assert lock_statistics()["test"]["stale"] == 1
+
+
+def test_environment_lock_is_keyed_by_path(tmp_path):
+    first = environment_lock(tmp_path / "a" / "env", root=tmp_path / "locks")
+    second = environment_lock(tmp_path / "b" / "env", root=tmp_path / "locks")
+    assert first.path != second.path
+    assert first.path.name.startswith("env-")
@@ -0,0 +1,135 @@
+"""
+Tests unitaires pour l'index des modules importables
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from gestvenv.utils.module_index import (
+    STDLIB,
+    MappedModuleTable,
+    ModuleIndexRegistry,
+    ModuleTrie,
+)
+from gestvenv.utils.package_details import PackageDetailsIndex
+
+
+def add_distribution(site_packages: Path, name: str, version: str, modules) -> None:
+    info_dir = site_packages / f"{name}-{version}.dist-info"
+    info_dir.mkdir(parents=True)
+    (info_dir / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+    (info_dir / "RECORD").write_text("".join(f"{path},,\n" for path in modules))
+
+
+def bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def venv(tmp_path):
+    python = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    site_packages = tmp_path / "venv" / "lib" / python / "site-packages"
+    site_packages.mkdir(parents=True)
+    add_distribution(site_packages, "requests", "2.31.0",
+                     ["requests/__init__.py", "requests/adapters.py", "requests/api.py"])
+    add_distribution(site_packages, "protobuf", "4.25.0",
+                     ["google/protobuf/__init__.py", "google/protobuf/message.py"])
+    return tmp_path / "venv", site_packages
+
+
+def make_registry(tmp_path, details=None):
+    return ModuleIndexRegistry(tmp_path / "index", details or PackageDetailsIndex())
+
+
+class TestModuleTrie:
+    """Tests pour ModuleTrie"""
+
+    def test_complete_and_remove(self):
+        trie = ModuleTrie()
+        for module in ("requests", "requests.adapters", "requests.adapters.ssl", "requests.api"):
+            trie.insert(module, "requests")
+        trie.insert("reprlib", STDLIB)
+
+        assert trie.complete("re") == [("reprlib", STDLIB), ("requests", "requests")]
+        assert trie.complete("requests.a") == [("requests.adapters", "requests"), ("requests.api", "requests")]
+        assert trie.distribution("requests.adapters.missing") == "requests"
+
+        for module in ("requests", "requests.adapters", "requests.adapters.ssl", "requests.api"):
+            trie.remove(module, "requests")
+        assert "requests" not in trie
+        assert trie.complete("") == [("reprlib", STDLIB)]
+
+
+class TestModuleIndexRegistry:
+    """Tests pour ModuleIndexRegistry"""
+
+    def test_index_covers_packages_submodules_and_stdlib(self, tmp_path, venv):
+        env_path, _ = venv
+        index = make_registry(tmp_path).get(env_path)
+
+        assert ("requests.adapters", "requests") in index.complete("requests.ad")
+        assert index.complete("google.") == [("google.protobuf", "protobuf")]
+        assert "google" in index and "json" in index
+        assert index.distribution("json") == STDLIB
+        assert index.distribution("google.protobuf.message") == "protobuf"
+
+    def test_persisted_index_is_mapped_after_restart(self, tmp_path, venv):
+        env_path, _ = venv
+        expected = make_registry(tmp_path).get(env_path).complete("re")
+
+        details = PackageDetailsIndex()
+        registry = make_registry(tmp_path, details)
+        index = registry.get(env_path)
+
+        assert isinstance(index, MappedModuleTable)
+        assert index.complete("re") == expected
+        assert index.complete("requests.") == [("requests.adapters", "requests"), ("requests.api", "requests")]
+        assert details.reads == 0 and registry.builds == 0
+
+    def test_incremental_update(self, tmp_path, venv):
+        """Seules les distributions ajoutées sont lues, les retirées disparaissent"""
+        env_path, site_packages = venv
+        details = PackageDetailsIndex()
+        registry = make_registry(tmp_path, details)
+        registry.get(env_path)
+
+        add_distribution(site_packages, "six", "1.16.0", ["six.py"])
+        (site_packages / "protobuf-4.25.0.dist-info" / "RECORD").unlink()
+        (site_packages / "protobuf-4.25.0.dist-info" / "METADATA").unlink()
+        (site_packages / "protobuf-4.25.0.dist-info").rmdir()
+        bump_mtime(site_packages)
+        index = registry.get(env_path)
+
+        assert details.reads == 3
+        assert index.distribution("six") == "six"
+        assert "google" not in index
+        assert "requests.api" in index
+
+    def test_suggest_from_other_environments(self, tmp_path, venv):
+        env_path, _ = venv
+        registry = make_registry(tmp_path)
+        registry.get(env_path)
+
+        assert registry.suggest("google.protobuf") == "protobuf"
+        assert registry.suggest("yaml") == "PyYAML"
+        assert registry.suggest("unknown_module") is None
+
+    def test_completion_latency_on_large_environment(self, tmp_path, venv):
+        env_path, site_packages = venv
+        for i in range(500):
+            add_distribution(site_packages, f"pkg{i}", "1.0",
+                             [f"pkg{i}/__init__.py"] + [f"pkg{i}/mod{j}.py" for j in range(20)])
+        bump_mtime(site_packages)
+        make_registry(tmp_path).get(env_path)
+
+        for index in (make_registry(tmp_path).get(env_path), make_registry(tmp_path)._build(env_path, None, None).index):
+            start = time.perf_counter()
+            for _ in range(20):
+                assert len(index.complete("pkg1", 100)) == 100
+                assert len(index.complete("pkg42.mod1")) == 11
+            assert (time.perf_counter() - start) / 40 < 0.01
@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour l'index des détails de packages installés
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from gestvenv.utils.package_details import PackageDetailsIndex, read_distribution
+
+
+def add_distribution(site_packages: Path, name: str, version: str, modules=(), top_level=None,
+                     entry_points=None, summary="") -> Path:
+    info_dir = site_packages / f"{name}-{version}.dist-info"
+    info_dir.mkdir(parents=True)
+    (info_dir / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\nSummary: {summary}\n"
+        "Requires-Dist: idna>=2.5\n"
+        "Project-URL: Homepage, https://example.org\n"
+    )
+    records = list(modules) + [f"{name}-{version}.dist-info/METADATA", "../../bin/tool"]
+    (info_dir / "RECORD").write_text("".join(f"{path},,\n" for path in records))
+    if top_level is not None:
+        (info_dir / "top_level.txt").write_text("\n".join(top_level) + "\n")
+    if entry_points is not None:
+        (info_dir / "entry_points.txt").write_text(entry_points)
+    return info_dir
+
+
+def bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def site_packages(tmp_path):
+    path = tmp_path / "venv" / "lib" / "python3.11" / "site-packages"
+    path.mkdir(parents=True)
+    return path
+
+
+class TestReadDistribution:
+    """Tests pour read_distribution"""
+
+    def test_reads_metadata_modules_and_entry_points(self, site_packages):
+        info_dir = add_distribution(
+            site_packages, "requests", "2.31.0",
+            modules=["requests/__init__.py", "requests/adapters.py",
+                     "requests/__pycache__/api.cpython-311.pyc",
+                     "_speedups.cpython-311-x86_64-linux-gnu.so"],
+            top_level=["requests"],
+            entry_points="[console_scripts]\nreq = requests.cli:main\n",
+            summary="HTTP for Humans",
+        )
+
+        info = read_distribution(info_dir)
+
+        assert (info.name, info.version, info.summary) == ("requests", "2.31.0", "HTTP for Humans")
+        assert info.home_page == "https://example.org"
+        assert info.requires_dist == ["idna>=2.5"]
+        assert info.modules == ["_speedups", "requests", "requests.adapters"]
+        assert info.top_level == ["requests"]
+        assert info.entry_points == {"console_scripts": ["req = requests.cli:main"]}
+
+    def test_top_level_derived_from_record(self, site_packages):
+        info = read_distribution(add_distribution(site_packages, "six", "1.16.0", modules=["six.py"]))
+
+        assert info.top_level == ["six"]
+        assert info.to_dict(["name", "version"]) == {"name": "six", "version": "1.16.0"}
+
+
+class TestPackageDetailsIndex:
+    """Tests pour PackageDetailsIndex"""
+
+    def test_cached_until_site_packages_changes(self, site_packages):
+        """Relecture seulement des distributions ajoutées"""
+        env_path = site_packages.parents[2]
+        add_distribution(site_packages, "requests", "2.31.0", modules=["requests/__init__.py"])
+        add_distribution(site_packages, "Flask_Login", "0.6.3", modules=["flask_login/__init__.py"])
+        index = PackageDetailsIndex()
+
+        assert [p.name for p in index.packages(env_path)] == ["Flask_Login", "requests"]
+        index.packages(env_path)
+        assert index.reads == 2
+
+        add_distribution(site_packages, "six", "1.16.0", modules=["six.py"])
+        bump_mtime(site_packages)
+
+        assert index.get(env_path, "flask-login").version == "0.6.3"
+        assert index.get(env_path, "six").top_level == ["six"]
+        assert index.reads == 3
+
+        index.invalidate(env_path)
+        index.packages(env_path)
+        assert index.reads == 6
+
+    def test_page_filters_by_prefix(self, site_packages):
+        env_path = site_packages.parents[2]
+        for name in ("pytest", "pytest_cov", "requests"):
+            add_distribution(site_packages, name, "1.0", modules=[f"{name}.py"])
+        index = PackageDetailsIndex()
+
+        total, page = index.page(env_path, offset=1, limit=1, query="PyTest")
+
+        assert total == 2
+        assert [p.name for p in page] == ["pytest_cov"]
+        assert index.page(env_path, limit=10)[0] == 3
@@ -0,0 +1,202 @@
+"""
+Tests unitaires pour le parser de spécifications partagé
+
+Sorties de référence (golden) : le chemin rapide par regex doit produire
+exactement le même résultat que packaging.requirements.
+"""
+
+import sys
+
+import pytest
+
+from gestvenv.cli.commands.diff import parse_pyproject, parse_requirements
+from gestvenv.services.migration_service import MigrationService
+from gestvenv.utils.pyproject_parser import PyProjectParser
+from gestvenv.utils.requirements_parser import (
+    ParsedRequirement,
+    RequirementsParser,
+    _parse_fast,
+    _parse_with_packaging,
+    iter_requirement_lines,
+    normalize_name,
+    parse_requirement,
+)
+from gestvenv.utils.toml_handler import TomlHandler
+from gestvenv.utils.dependency_corpus import generate_monorepo_pyproject, generate_specs
+
+
+REQUIREMENTS_CORPUS = """# Dépendances principales
+--index-url https://pypi.org/simple
+requests==2.31.0
+Flask_Login>=0.6  # authentification
+click >= 8.0 , < 9
+uvicorn[standard,  httptools]~=0.23.1
+numpy!=1.25.*
+importlib-metadata ; python_version < "3.10"
+mypkg @ https://example.org/mypkg-1.0.tar.gz
+-r other.txt
+-e git+https://github.com/org/repo.git#egg=repo
+pytest-cov \\
+    >=4.0
+black
+"""
+
+GOLDEN_REQUIREMENTS = [
+    {"name": "requests", "version_spec": "==2.31.0", "extras": [], "markers": None,
+     "editable": False, "url": None},
+    {"name": "Flask_Login", "version_spec": ">=0.6", "extras": [], "markers": None,
+     "editable": False, "url": None},
+    {"name": "click", "version_spec": "<9,>=8.0", "extras": [], "markers": None,
+     "editable": False, "url": None},
+    {"name": "uvicorn", "version_spec": "~=0.23.1", "extras": ["httptools", "standard"],
+     "markers": None, "editable": False, "url": None},
+    {"name": "numpy", "version_spec": "!=1.25.*", "extras": [], "markers": None,
+     "editable": False, "url": None},
+    {"name": "importlib-metadata", "version_spec": None, "extras": [],
+     "markers": 'python_version < "3.10"', "editable": False, "url": None},
+    {"name": "mypkg", "version_spec": None, "extras": [], "markers": None,
+     "editable": False, "url": "https://example.org/mypkg-1.0.tar.gz"},
+    {"name": "repo", "version_spec": None, "extras": [], "markers": None,
+     "editable": True, "url": "git+https://github.com/org/repo.git"},
+    {"name": "pytest-cov", "version_spec": ">=4.0", "extras": [], "markers": None,
+     "editable": False, "url": None},
+    {"name": "black", "version_spec": None, "extras": [], "markers": None,
+     "editable": False, "url": None},
+]
+
+
+class TestParseRequirement:
+    """Tests pour parse_requirement"""
+
+    @pytest.mark.parametrize("spec", [
+        "requests",
+        "Requests[socks, security]>=2.0, <3",
+        "flask==2.*",
+        "x~=1.4.2",
+        "a>=1.0rc1",
+        "a == 1.0.post1.dev2",
+        "zope.interface>=5",
+    ] + generate_specs(500))
+    def test_fast_path_equivalent_to_packaging(self, spec):
+        """Le chemin rapide produit le même résultat que packaging"""
+        fast = _parse_fast(spec)
+        if fast is not None:
+            assert fast == _parse_with_packaging(spec)
+
+    def test_fast_path_covers_common_forms(self):
+        """Les formes courantes ne passent pas par packaging"""
+        for spec in ("requests", "click>=8.0,<9", "uvicorn[standard]~=0.23.1"):
+            assert _parse_fast(spec) is not None
+
+    def test_fallback_on_markers_and_urls(self):
+        """Marqueurs et URLs sont confiés à packaging"""
+        parsed = parse_requirement('pkg[a]>=1 ; sys_platform == "linux"')
+        assert parsed.marker == 'sys_platform == "linux"'
+        assert parse_requirement("pkg @ https://x/pkg.whl").url == "https://x/pkg.whl"
+
+    def test_invalid_spec(self):
+        """Spécification invalide"""
+        assert parse_requirement("x>=abc") is None
+        assert parse_requirement("~=1") is None
+        assert parse_requirement("") is None
+
+    def test_memoization(self):
+        """Les résultats sont mémoïsés et immuables"""
+        parse_requirement.cache_clear()
+        first = parse_requirement("requests>=2.0")
+        second = parse_requirement("requests>=2.0")
+        assert first is second
+        assert parse_requirement.cache_info().hits == 1
+        with pytest.raises(AttributeError):
+            first.name = "other"
+
+    def test_pinned_version(self):
+        """Version exacte"""
+        assert parse_requirement("a==1.2").pinned_version == "1.2"
+        assert parse_requirement("a==1.*").pinned_version is None
+        assert parse_requirement("a>=1.2").pinned_version is None
+        assert ParsedRequirement("a", "a").pinned_version is None
+
+    def test_normalize_name(self):
+        """Normalisation PEP 503"""
+        assert normalize_name("Flask_Login") == "flask-login"
+        assert normalize_name("zope.interface") == "zope-interface"
+
+
+class TestGoldenOutputs:
+    """Sorties de référence des parsers consommateurs"""
+
+    def test_iter_requirement_lines(self):
+        """Lignes logiques : commentaires retirés, continuations jointes"""
+        lines = list(iter_requirement_lines(REQUIREMENTS_CORPUS))
+        assert "Flask_Login>=0.6" in lines
+        assert "pytest-cov >=4.0" in lines
+        assert "-e git+https://github.com/org/repo.git#egg=repo" in lines
+        assert not any(line.startswith("#") for line in lines)
+
+    def test_requirements_parser(self):
+        """RequirementsParser"""
+        parser = RequirementsParser()
+        parser.parse_string(REQUIREMENTS_CORPUS)
+        assert parser.to_dict_list() == GOLDEN_REQUIREMENTS
+
+    def test_diff_parse_requirements(self, tmp_path):
+        """diff.parse_requirements"""
+        req = tmp_path / "requirements.txt"
+        req.write_text(REQUIREMENTS_CORPUS, encoding="utf-8")
+
+        assert parse_requirements(req) == {
+            "requests": "2.31.0",
+            "flask-login": ">=0.6",
+            "click": "<9,>=8.0",
+            "uvicorn": "~=0.23.1",
+            "numpy": "!=1.25.*",
+            "importlib-metadata": "*",
+            "mypkg": "*",
+            "pytest-cov": ">=4.0",
+            "black": "*",
+        }
+
+    def test_diff_parse_pyproject(self, tmp_path, sample_pyproject_content):
+        """diff.parse_pyproject"""
+        pyproject = tmp_path / "pyproject.toml"
+        pyproject.write_text(sample_pyproject_content, encoding="utf-8")
+
+        assert parse_pyproject(pyproject) == {"requests": ">=2.25.0", "click": ">=8.0"}
+
+    def test_migration_parse_requirements_file(self, tmp_path, monkeypatch):
+        """MigrationService._parse_requirements_file"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        req = tmp_path / "requirements.txt"
+        req.write_text(REQUIREMENTS_CORPUS, encoding="utf-8")
+
+        main_deps, dev_deps = MigrationService()._parse_requirements_file(req)
+
+        assert main_deps == [
+            "requests==2.31.0",
+            "Flask_Login>=0.6",
+            "click >= 8.0 , < 9",
+            "uvicorn[standard,  httptools]~=0.23.1",
+            "numpy!=1.25.*",
+            'importlib-metadata ; python_version < "3.10"',
+            "mypkg @ https://example.org/mypkg-1.0.tar.gz",
+            "black",
+        ]
+        assert dev_deps == ["pytest-cov >=4.0"]
+
+    def test_pyproject_parser_helpers(self):
+        """Helpers de PyProjectParser"""
+        assert PyProjectParser._normalize_dependency_name("Flask_Login[x]>=1") == "flask-login"
+        assert PyProjectParser._parse_dependency_extras("uvicorn[standard, h2]") == ["h2", "standard"]
+        assert PyProjectParser._parse_dependency_version("click >= 8.0") == ">=8.0"
+        assert PyProjectParser._parse_dependency_version("click") is None
+        assert PyProjectParser._validate_dependency_spec("click>=8.0,<9")
+        assert not PyProjectParser._validate_dependency_spec("click; rm -rf /")
+
+    @pytest.mark.skipif(sys.version_info < (3, 11), reason="tomllib requis")
+    def test_basic_toml_fallback_matches_tomllib(self):
+        """Le parser TOML de secours reproduit tomllib sur un pyproject de monorepo"""
+        import tomllib
+
+        content = generate_monorepo_pyproject(300, groups=10)
+        assert TomlHandler._parse_basic_toml(content) == tomllib.loads(content)
@@ -0,0 +1,214 @@
+"""
+Tests unitaires pour les instantanés binaires d'environnements
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from gestvenv.core.environment_manager import EnvironmentManager
+from gestvenv.core.exceptions import SnapshotError
+from gestvenv.core.models import EnvironmentInfo, ExportFormat, PackageInfo
+from gestvenv.utils import snapshot
+from gestvenv.utils.snapshot import export_snapshot, import_snapshot, read_snapshot_header
+
+
+def make_venv(root: Path) -> None:
+    """Venv factice : module, script avec chemin absolu, lien symbolique"""
+    site = root / "lib" / "python3.11" / "site-packages"
+    (site / "pkg").mkdir(parents=True)
+    (site / "pkg" / "__init__.py").write_text("VALUE = 1\n")
+    (site / "pkg" / "big.bin").write_bytes(os.urandom(4096))
+    (root / "bin").mkdir()
+    (root / "bin" / "tool").write_text(f"#!{root}/bin/python\nimport pkg\n")
+    (root / "bin" / "tool").chmod(0o755)
+    (root / "bin" / "python").symlink_to(sys.executable)
+    (root / "pyvenv.cfg").write_text(f"home = {Path(sys.executable).parent}\nversion = 3.11.4\n")
+    (root / ".gestvenv-metadata.json").write_text("{}")
+
+
+def gzip_archive(path: Path, members) -> None:
+    """Archive forgée : liste de (nom, contenu) ; contenu str = cible de lien"""
+    with tarfile.open(path, "w:gz") as tar:
+        for name, payload in members:
+            info = tarfile.TarInfo(name)
+            if isinstance(payload, str):
+                info.type = tarfile.SYMTYPE
+                info.linkname = payload
+                tar.addfile(info)
+                continue
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+
+
+class TestSnapshotArchive:
+    """Tests pour export_snapshot / import_snapshot"""
+
+    def test_gzip_roundtrip_relocates(self, tmp_path):
+        """Export puis import ailleurs : contenu identique, chemins réécrits"""
+        source, target = tmp_path / "src", tmp_path / "restored"
+        make_venv(source)
+        archive = tmp_path / "env.gvsnap"
+
+        exported = export_snapshot(source, archive, {"name": "demo"}, codec="gzip")
+        imported = import_snapshot(archive, target)
+
+        assert exported.files == imported.files == 4
+        assert imported.codec == "gzip" and imported.header["environment"] == {"name": "demo"}
+        assert (target / "lib/python3.11/site-packages/pkg/big.bin").read_bytes() == \
+            (source / "lib/python3.11/site-packages/pkg/big.bin").read_bytes()
+        assert (target / "bin" / "tool").read_text().startswith(f"#!{target}/bin/python")
+        assert os.access(target / "bin" / "tool", os.X_OK)
+        assert os.readlink(target / "bin" / "python") == sys.executable
+        assert not (target / ".gestvenv-metadata.json").exists()
+        assert not list(tmp_path.glob(".restored.importing-*"))
+
+    @pytest.mark.skipif(snapshot.zstandard is None, reason="zstandard non installé")
+    @pytest.mark.skipif(os.name == "nt", reason="arborescence venv POSIX")
+    def test_zstd_real_venv_runs(self, tmp_path):
+        """Un vrai venv restauré depuis zstd fonctionne à son nouvel emplacement"""
+        source, target = tmp_path / "src", tmp_path / "dst"
+        subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(source)], check=True)
+        archive = tmp_path / "env.gvsnap"
+
+        assert export_snapshot(source, archive).codec == "zstd"
+        assert read_snapshot_header(archive)["source_path"] == str(source)
+        import_snapshot(archive, target)
+
+        prefix = subprocess.run(
+            [str(target / "bin" / "python"), "-c", "import sys; print(sys.prefix)"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        assert Path(prefix) == target
+
+    def test_object_store_skips_shared_files(self, tmp_path):
+        """Second import : fichiers immuables liés depuis le magasin"""
+        source = tmp_path / "src"
+        make_venv(source)
+        archive = tmp_path / "env.gvsnap"
+        export_snapshot(source, archive, codec="gzip")
+        store = tmp_path / "objects"
+
+        first = import_snapshot(archive, tmp_path / "a", object_store=store)
+        second = import_snapshot(archive, tmp_path / "b", object_store=store)
+
+        assert first.deduplicated_files == 0
+        assert second.deduplicated_files == 2
+        module = "lib/python3.11/site-packages/pkg/__init__.py"
+        assert os.path.samefile(tmp_path / "a" / module, tmp_path / "b" / module)
+        # Les scripts relocalisés ne sont jamais partagés
+        assert not os.path.samefile(tmp_path / "a" / "bin" / "tool", tmp_path / "b" / "bin" / "tool")
+
+    def test_rejects_unsafe_and_truncated_archives(self, tmp_path):
+        """Traversée de chemin, en-tête ou manifeste absents refusés"""
+        header = json.dumps({"format": "gestvenv-snapshot", "version": 1, "source_path": "/x",
+                             **snapshot._platform_tag()}).encode()
+
+        evil = tmp_path / "evil.gvsnap"
+        gzip_archive(evil, [("snapshot.json", header), ("env/../escape", b"x")])
+        with pytest.raises(SnapshotError, match="non sûr"):
+            import_snapshot(evil, tmp_path / "t1")
+        assert not (tmp_path / "escape").exists()
+
+        truncated = tmp_path / "truncated.gvsnap"
+        gzip_archive(truncated, [("snapshot.json", header), ("env/pyvenv.cfg", b"home = /usr\n")])
+        with pytest.raises(SnapshotError, match="Manifeste absent"):
+            import_snapshot(truncated, tmp_path / "t2")
+        assert not (tmp_path / "t2").exists()
+
+        headless = tmp_path / "headless.gvsnap"
+        gzip_archive(headless, [("env/pyvenv.cfg", b"")])
+        with pytest.raises(SnapshotError, match="En-tête"):
+            import_snapshot(headless, tmp_path / "t3")
+
+    @pytest.mark.skipif(os.name == "nt", reason="liens symboliques POSIX")
+    def test_never_writes_through_symlinks(self, tmp_path):
+        """Lien puis fichier de même nom, liens sortants : rien n'est écrit dehors"""
+        header = json.dumps({"format": "gestvenv-snapshot", "version": 1, "source_path": "/x",
+                             **snapshot._platform_tag()}).encode()
+        victim = tmp_path / "victim"
+        victim.write_bytes(b"original")
+
+        cases = [
+            ("env/evil", str(victim), "hors de l'environnement"),
+            ("env/evil", "../victim", "hors de l'environnement"),
+            ("env/lib/evil", "../../victim", "hors de l'environnement"),
+            ("env/evil", "pyvenv.cfg", "en double"),
+        ]
+        for index, (name, link, error) in enumerate(cases):
+            archive = tmp_path / f"evil{index}.gvsnap"
+            members = [("snapshot.json", header), ("env/pyvenv.cfg", b"")]
+            if name.startswith("env/lib/"):
+                members.append(("env/lib", b""))
+            gzip_archive(archive, members + [(name, link), (name, b"overwritten")])
+            with pytest.raises(SnapshotError, match=error):
+                import_snapshot(archive, tmp_path / f"t{index}")
+            assert victim.read_bytes() == b"original"
+
+    def test_object_store_rehashes_reused_objects(self, tmp_path):
+        """Objet du magasin altéré à taille égale : réécrit depuis l'archive"""
+        source = tmp_path / "src"
+        make_venv(source)
+        archive = tmp_path / "env.gvsnap"
+        export_snapshot(source, archive, codec="gzip")
+        store = tmp_path / "objects"
+        import_snapshot(archive, tmp_path / "a", object_store=store)
+
+        module = "lib/python3.11/site-packages/pkg/__init__.py"
+        obj = next(o for o in store.rglob("*") if o.is_file() and o.read_bytes() == b"VALUE = 1\n")
+        obj.unlink()
+        obj.write_text("VALUE = 2\n")
+
+        second = import_snapshot(archive, tmp_path / "b", object_store=store)
+        assert second.deduplicated_files == 1
+        assert (tmp_path / "b" / module).read_text() == "VALUE = 1\n"
+
+    def test_rejects_other_platform(self, tmp_path, monkeypatch):
+        """Instantané d'une autre plateforme refusé"""
+        source = tmp_path / "src"
+        make_venv(source)
+        archive = tmp_path / "env.gvsnap"
+        monkeypatch.setattr(snapshot, "_platform_tag", lambda: {"platform": "win32", "machine": "AMD64"})
+        export_snapshot(source, archive, codec="gzip")
+        monkeypatch.undo()
+
+        with pytest.raises(SnapshotError, match="incompatible"):
+            import_snapshot(archive, tmp_path / "dst")
+
+
+class TestEnvironmentSnapshot:
+    """Tests pour l'export/import SNAPSHOT d'EnvironmentManager"""
+
+    def test_export_import_roundtrip(self, tmp_path, monkeypatch):
+        """Export .gvsnap puis import sous un autre nom, sans réinstallation"""
+        envs = tmp_path / "envs"
+        config_manager = Mock()
+        config_manager.get_environments_path = Mock(return_value=envs)
+        manager = EnvironmentManager(config_manager)
+        manager._cache_service = Mock(enabled=True, cache_path=tmp_path / "cache")
+        manager._package_service = Mock()
+
+        make_venv(envs / "source")
+        source_env = EnvironmentInfo("source", envs / "source", "3.11")
+        source_env.packages = [PackageInfo("pkg", "1.0")]
+        manager._save_environment_metadata(source_env)
+
+        monkeypatch.chdir(tmp_path)
+        exported = manager.export_environment("source", ExportFormat.SNAPSHOT)
+        assert exported.success, exported.message
+        assert exported.output_path.suffix == ".gvsnap"
+
+        result = manager.import_environment(exported.output_path, name="copy")
+
+        assert result.success, result.message
+        assert result.environment.path == envs / "copy"
+        assert [p.name for p in result.environment.packages] == ["pkg"]
+        assert manager.get_environment_info("copy").name == "copy"
+        manager._package_service.install_package.assert_not_called()
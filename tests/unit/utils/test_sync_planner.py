@@ -0,0 +1,416 @@
+"""
+Tests unitaires pour le planificateur de synchronisation
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+from gestvenv.core.models import EnvironmentInfo, InstallResult, PackageInfo, PyProjectInfo
+from gestvenv.services.package_service import PackageService
+from gestvenv.utils.sync_planner import (
+    installed_snapshot,
+    marker_environment,
+    plan_sync,
+    read_lock_requirements,
+)
+
+
+UV_LOCK = '''version = 1
+requires-python = ">=3.9"
+
+[[package]]
+name = "myproject"
+version = "0.1.0"
+source = { editable = "." }
+dependencies = [
+    { name = "requests" },
+    { name = "flask-login" },
+    { name = "pywin32", marker = "sys_platform == 'win32'" },
+]
+
+[package.optional-dependencies]
+socks = [{ name = "pysocks" }]
+
+[package.dev-dependencies]
+dev = [{ name = "pytest" }]
+
+[[package]]
+name = "requests"
+version = "2.31.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "Flask_Login"
+version = "0.6.3"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "pywin32"
+version = "306"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "pysocks"
+version = "1.7.1"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "pytest"
+version = "8.0.0"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [
+    { name = "colorama", marker = "sys_platform == 'win32'" },
+    { name = "iniconfig" },
+]
+
+[[package]]
+name = "colorama"
+version = "0.4.6"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "iniconfig"
+version = "2.0.0"
+source = { registry = "https://pypi.org/simple" }
+'''
+
+POETRY_LOCK = '''[[package]]
+name = "requests"
+version = "2.31.0"
+optional = false
+groups = ["main"]
+
+[[package]]
+name = "pywin32"
+version = "306"
+optional = false
+groups = ["main"]
+markers = "sys_platform == \\"win32\\""
+
+[[package]]
+name = "pytest"
+version = "8.0.0"
+optional = false
+groups = ["dev"]
+
+[[package]]
+name = "pysocks"
+version = "1.7.1"
+optional = true
+groups = ["main"]
+
+[extras]
+socks = ["pysocks"]
+'''
+
+PDM_LOCK = '''[[package]]
+name = "requests"
+version = "2.31.0"
+groups = ["default"]
+
+[[package]]
+name = "pywin32"
+version = "306"
+groups = ["default"]
+marker = "sys_platform == \\"win32\\""
+
+[[package]]
+name = "pytest"
+version = "8.0.0"
+groups = ["dev"]
+'''
+
+
+def platform_environment(sys_platform: str, os_name: str, platform_system: str):
+    """Environnement de marqueurs d'un interpréteur 3.11 de la plateforme donnée"""
+    return {
+        "implementation_name": "cpython", "implementation_version": "3.11.4",
+        "os_name": os_name, "platform_machine": "x86_64", "platform_release": "",
+        "platform_system": platform_system, "platform_version": "",
+        "python_full_version": "3.11.4", "platform_python_implementation": "CPython",
+        "python_version": "3.11", "sys_platform": sys_platform,
+    }
+
+
+LINUX = platform_environment("linux", "posix", "Linux")
+WINDOWS = platform_environment("win32", "nt", "Windows")
+
+
+@contextmanager
+def on_platform(environment):
+    """Évalue les marqueurs comme sur la plateforme donnée"""
+    marker_environment.cache_clear()
+    try:
+        with patch("gestvenv.utils.sync_planner.default_environment", return_value=dict(environment)):
+            yield
+    finally:
+        marker_environment.cache_clear()
+
+
+def make_site_packages(env_path: Path, distributions):
+    """Crée un site-packages factice contenant des répertoires *.dist-info"""
+    site_packages = env_path / "lib" / "python3.11" / "site-packages"
+    site_packages.mkdir(parents=True)
+    for name, version in distributions:
+        (site_packages / f"{name}-{version}.dist-info").mkdir()
+    return site_packages
+
+
+class TestPlanSync:
+    """Tests pour plan_sync"""
+
+    def test_unchanged_environment_is_empty(self):
+        """Un environnement à jour produit un plan vide"""
+        plan = plan_sync(["requests>=2.25", "Flask_Login==0.6.3"],
+                         {"requests": "2.31.0", "flask-login": "0.6.3"})
+        assert plan.is_empty
+        assert sorted(plan.satisfied) == ["flask-login", "requests"]
+
+    def test_install_upgrade_downgrade(self):
+        """Classification des actions selon les spécificateurs complets"""
+        plan = plan_sync(
+            ["requests>=2.28,<3", "click~=8.0", "flask==2.0.0", "numpy"],
+            {"requests": "2.25.0", "click": "9.1", "numpy": "1.26.0"}
+        )
+        assert plan.install == ["flask==2.0.0"]
+        assert plan.upgrade == ["requests<3,>=2.28"]
+        assert plan.downgrade == ["click~=8.0"]
+        assert plan.remove == []
+
+    def test_names_are_normalized(self):
+        """Noms comparés après normalisation PEP 503"""
+        plan = plan_sync(["Zope.Interface>=5"], {"zope_interface": "6.0"})
+        assert plan.is_empty
+
+    def test_markers_evaluated_for_env_python(self):
+        """Les marqueurs sont évalués pour la version Python de l'environnement"""
+        deps = ['tomli>=2 ; python_version < "3.11"']
+        assert plan_sync(deps, {}, python_version="3.10").install == ["tomli>=2"]
+        assert plan_sync(deps, {}, python_version="3.12").is_empty
+        assert marker_environment("3.10")["python_full_version"] == "3.10.0"
+
+    def test_duplicates_are_merged(self):
+        """Contraintes d'un même package fusionnées"""
+        plan = plan_sync(["requests>=2.0", "requests[socks]<3"], {"requests": "3.1"})
+        assert plan.downgrade == ["requests[socks]<3,>=2.0"]
+
+    def test_exact_plan_removes_extraneous(self):
+        """Un plan exact supprime les distributions absentes du verrouillage"""
+        plan = plan_sync(
+            ["requests==2.31.0"],
+            {"requests": "2.31.0", "chardet": "5.0", "pip": "24.0", "setuptools": "69.0"},
+            exact=True
+        )
+        assert plan.remove == ["chardet"]
+        assert plan.target == ["requests==2.31.0", "pip==24.0", "setuptools==69.0"]
+
+    def test_non_exact_plan_never_removes(self):
+        """Sans verrouillage, les dépendances transitives sont conservées"""
+        plan = plan_sync(["requests"], {"requests": "2.31.0", "urllib3": "2.0"})
+        assert plan.is_empty
+
+
+class TestSnapshotAndLock:
+    """Tests pour l'instantané installé et la lecture des verrouillages"""
+
+    def test_installed_snapshot(self, tmp_path):
+        """Lecture des dist-info/egg-info sans sous-processus"""
+        site_packages = make_site_packages(tmp_path, [("Flask_Login", "0.6.3"), ("requests", "2.31.0")])
+        (site_packages / "legacy-1.0-py3.11.egg-info").mkdir()
+        (site_packages / "requests").mkdir()
+
+        assert installed_snapshot(tmp_path) == {
+            "flask-login": "0.6.3", "requests": "2.31.0", "legacy": "1.0"
+        }
+        assert installed_snapshot(tmp_path / "absent") == {}
+
+    def test_read_uv_lock(self, tmp_path):
+        """uv.lock : le projet lui-même est ignoré"""
+        lock = tmp_path / "uv.lock"
+        lock.write_text(UV_LOCK, encoding="utf-8")
+        with on_platform(LINUX):
+            assert read_lock_requirements(lock) == ["requests==2.31.0", "Flask_Login==0.6.3"]
+
+    def test_read_uv_lock_follows_markers_and_selected_groups(self, tmp_path):
+        """uv.lock : arêtes filtrées par marqueur, extras et groupes dev sur demande"""
+        lock = tmp_path / "uv.lock"
+        lock.write_text(UV_LOCK, encoding="utf-8")
+
+        with on_platform(WINDOWS):
+            assert read_lock_requirements(lock) == [
+                "requests==2.31.0", "Flask_Login==0.6.3", "pywin32==306"
+            ]
+        with on_platform(LINUX):
+            assert read_lock_requirements(lock, groups=["dev", "socks"]) == [
+                "requests==2.31.0", "Flask_Login==0.6.3", "pysocks==1.7.1",
+                "pytest==8.0.0", "iniconfig==2.0.0"
+            ]
+
+    @pytest.mark.parametrize("filename, content", [("poetry.lock", POETRY_LOCK), ("pdm.lock", PDM_LOCK)])
+    def test_read_grouped_lock_skips_other_platforms_and_dev(self, tmp_path, filename, content):
+        """poetry.lock / pdm.lock : marqueurs par entrée et groupes non sélectionnés"""
+        lock = tmp_path / filename
+        lock.write_text(content, encoding="utf-8")
+
+        with on_platform(LINUX):
+            assert read_lock_requirements(lock, python_version="3.11") == ["requests==2.31.0"]
+            assert "pytest==8.0.0" in read_lock_requirements(lock, groups=["dev"])
+        with on_platform(WINDOWS):
+            assert "pywin32==306" in read_lock_requirements(lock)
+
+    def test_read_poetry_lock_includes_selected_extras(self, tmp_path):
+        """poetry.lock : un package optionnel n'est retenu qu'avec son extra"""
+        lock = tmp_path / "poetry.lock"
+        lock.write_text(POETRY_LOCK, encoding="utf-8")
+
+        with on_platform(LINUX):
+            assert read_lock_requirements(lock, groups=["socks"]) == [
+                "requests==2.31.0", "pysocks==1.7.1"
+            ]
+
+    def test_read_requirements_lock(self, tmp_path):
+        """Verrouillage pip-compile avec empreintes"""
+        lock = tmp_path / "requirements.lock"
+        lock.write_text(
+            "--index-url https://pypi.org/simple\n"
+            "requests==2.31.0 \\\n    --hash=sha256:abc\n"
+            "idna==3.6  # via requests\n",
+            encoding="utf-8"
+        )
+        assert read_lock_requirements(lock) == ["requests==2.31.0", "idna==3.6"]
+
+
+class TestPackageServiceSync:
+    """Tests pour PackageService.sync_environment"""
+
+    @pytest.fixture
+    def backend(self):
+        backend = Mock()
+        backend.sync_packages.return_value = False
+        backend.install_packages.return_value = InstallResult(success=True, message="ok")
+        backend.uninstall_packages.return_value = True
+        backend.list_packages.return_value = []
+        return backend
+
+    @pytest.fixture
+    def service(self, backend):
+        manager = Mock()
+        manager.get_backend.return_value = backend
+        return PackageService(manager)
+
+    def make_env(self, tmp_path, dependencies, installed):
+        make_site_packages(tmp_path, installed)
+        return EnvironmentInfo(
+            name="test",
+            path=tmp_path,
+            python_version="3.11",
+            pyproject_info=PyProjectInfo(name="test", dependencies=dependencies)
+        )
+
+    def test_noop_sync_launches_no_subprocess(self, service, backend, tmp_path):
+        """Environnement inchangé : aucun appel backend ni sous-processus"""
+        env = self.make_env(tmp_path, ["requests>=2.0"], [("requests", "2.31.0")])
+
+        with patch("subprocess.run") as mock_run, patch("subprocess.Popen") as mock_popen:
+            result = service.sync_environment(env)
+
+        assert result.success
+        assert result.message == "Environnement déjà synchronisé"
+        mock_run.assert_not_called()
+        mock_popen.assert_not_called()
+        backend.install_packages.assert_not_called()
+        backend.list_packages.assert_not_called()
+
+    def test_sync_batches_changes(self, service, backend, tmp_path):
+        """Installations et mises à jour en un seul appel groupé"""
+        env = self.make_env(tmp_path, ["requests>=2.31", "click>=8", "urllib3"],
+                            [("requests", "2.25.0"), ("urllib3", "2.0.0")])
+
+        result = service.sync_environment(env)
+
+        assert result.success
+        backend.install_packages.assert_called_once_with(tmp_path, ["click>=8", "requests>=2.31"])
+        backend.uninstall_packages.assert_not_called()
+        assert result.packages_added == ["click>=8"]
+        assert result.packages_updated == ["requests>=2.31"]
+        assert result.packages_removed == []
+
+    def test_sync_from_lock_uses_exact_sync(self, service, backend, tmp_path):
+        """Verrouillage : synchronisation exacte native du backend"""
+        env = self.make_env(tmp_path, ["requests"], [("requests", "2.25.0"), ("chardet", "5.0")])
+        env.lock_file_path = tmp_path / "uv.lock"
+        env.lock_file_path.write_text(UV_LOCK, encoding="utf-8")
+        backend.sync_packages.return_value = True
+
+        with on_platform(LINUX):
+            result = service.sync_environment(env)
+
+        assert result.success
+        backend.sync_packages.assert_called_once_with(
+            tmp_path, ["requests==2.31.0", "Flask_Login==0.6.3"]
+        )
+        backend.install_packages.assert_not_called()
+        assert result.packages_removed == ["chardet"]
+
+    def test_sync_from_lock_fallback(self, service, backend, tmp_path):
+        """Sans synchronisation native : installation et suppression groupées"""
+        env = self.make_env(tmp_path, ["requests"], [("requests", "2.31.0"), ("chardet", "5.0")])
+        env.lock_file_path = tmp_path / "uv.lock"
+        env.lock_file_path.write_text(UV_LOCK, encoding="utf-8")
+
+        with on_platform(LINUX):
+            result = service.sync_environment(env)
+
+        backend.install_packages.assert_called_once_with(tmp_path, ["Flask_Login==0.6.3"])
+        backend.uninstall_packages.assert_called_once_with(tmp_path, ["chardet"])
+        assert result.success
+
+    def test_clean_sync_keeps_installed_dependencies(self, service, backend, tmp_path):
+        """Nettoyage sans verrouillage : dépendances transitives (Requires-Dist) conservées"""
+        env = self.make_env(tmp_path, ["requests"], [
+            ("requests", "2.31.0"), ("urllib3", "2.0.0"), ("PySocks", "1.7.1"), ("chardet", "5.0"),
+        ])
+        site_packages = tmp_path / "lib" / "python3.11" / "site-packages"
+        (site_packages / "requests-2.31.0.dist-info" / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: requests\nVersion: 2.31.0\n"
+            "Requires-Dist: urllib3<3,>=1.21.1\n"
+            "Requires-Dist: PySocks!=1.5.7,>=1.5.6; extra == \"socks\"\n",
+            encoding="utf-8"
+        )
+
+        result = service.sync_environment(env, clean=True)
+
+        backend.uninstall_packages.assert_called_once_with(tmp_path, ["chardet", "pysocks"])
+        assert result.packages_removed == ["chardet", "pysocks"]
+
+    def test_upgrade_reinstalls_satisfied_dependencies(self, service, backend, tmp_path):
+        """--upgrade : dépendances satisfaites mises à jour en un appel"""
+        env = self.make_env(tmp_path, ["requests>=2.0", "click>=8"], [("requests", "2.25.0")])
+        backend.list_packages.return_value = [
+            PackageInfo("requests", "2.32.0"), PackageInfo("click", "8.1.7")
+        ]
+
+        result = service.sync_environment(env, upgrade=True)
+
+        assert result.success
+        assert backend.install_packages.call_args_list[-1] == call(
+            tmp_path, ["requests>=2.0"], upgrade=True
+        )
+        assert result.packages_updated == ["requests"]
+
+    def test_needs_sync_uses_specifiers(self):
+        """needs_sync évalue les versions, pas seulement les noms"""
+        env = EnvironmentInfo(
+            name="test",
+            path=Path("/test"),
+            python_version="3.11",
+            pyproject_info=PyProjectInfo(name="test", dependencies=["requests>=2.31"])
+        )
+        env.packages = [PackageInfo("Requests", "2.25.0")]
+        assert env.needs_sync() is True
+
+        env.packages = [PackageInfo("Requests", "2.31.0"), PackageInfo("urllib3", "2.0")]
+        assert env.needs_sync() is False
@@ -0,0 +1,169 @@
+"""
+Tests unitaires pour le clonage rapide d'environnements virtuels
+"""
+
+import base64
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from gestvenv.core.environment_manager import EnvironmentManager
+from gestvenv.core.models import BackendType, EnvironmentInfo, EnvironmentResult, PackageInfo
+from gestvenv.utils.venv_clone import clone_venv, is_mutable
+
+
+def record_hash(data: bytes) -> str:
+    return "sha256=" + base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode()
+
+
+def make_fake_venv(root: Path) -> Path:
+    """Arborescence de venv minimale avec chemins absolus"""
+    site = root / "lib" / "python3.11" / "site-packages"
+    (site / "flask").mkdir(parents=True)
+    (site / "flask" / "__init__.py").write_text("VERSION = '3.0'\n")
+    (root / "bin").mkdir()
+    (root / "pyvenv.cfg").write_text(
+        f"home = /usr/bin\nversion = 3.11.4\ncommand = /usr/bin/python3 -m venv {root}\n"
+    )
+    (root / "bin" / "activate").write_text(f'VIRTUAL_ENV="{root}"\nexport VIRTUAL_ENV\n')
+    script = f"#!{root}/bin/python\nfrom flask.cli import main\nmain()\n".encode()
+    (root / "bin" / "flask").write_bytes(script)
+    (root / "bin" / "python").symlink_to(sys.executable)
+    (root / "lib64").symlink_to("lib")
+    dist_info = site / "flask-3.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "RECORD").write_text(
+        f"flask/__init__.py,sha256=abc,14\n"
+        f"../../../bin/flask,{record_hash(script)},{len(script)}\n"
+        f"flask-3.0.dist-info/RECORD,,\n"
+    )
+    (root / ".gestvenv-metadata.json").write_text("{}")
+    # Préfixe du chemin source : ne doit pas être réécrit
+    (site / "other.pth").write_text(f"{root}-extra/src\n")
+    return site
+
+
+class TestCloneVenv:
+    """Tests pour clone_venv"""
+
+    def test_hardlink_clone_rewrites_paths(self, tmp_path):
+        """Fichiers immuables liés, chemins absolus réécrits"""
+        source, target = tmp_path / "src", tmp_path / "dst"
+        site = make_fake_venv(source)
+
+        stats = clone_venv(source, target, strategy="hardlink")
+
+        target_site = target / "lib" / "python3.11" / "site-packages"
+        assert stats.strategy == "hardlink"
+        assert os.path.samefile(site / "flask" / "__init__.py", target_site / "flask" / "__init__.py")
+        assert not os.path.samefile(source / "bin" / "flask", target / "bin" / "flask")
+
+        assert f"-m venv {target}\n" in (target / "pyvenv.cfg").read_text()
+        assert (target / "bin" / "activate").read_text().startswith(f'VIRTUAL_ENV="{target}"')
+        script = (target / "bin" / "flask").read_bytes()
+        assert script.startswith(f"#!{target}/bin/python\n".encode())
+        assert (source / "bin" / "flask").read_bytes().startswith(f"#!{source}/".encode())
+
+        record = (target_site / "flask-3.0.dist-info" / "RECORD").read_text()
+        assert f"../../../bin/flask,{record_hash(script)},{len(script)}" in record
+        assert (target_site / "other.pth").read_text() == f"{source}-extra/src\n"
+
+        assert os.readlink(target / "bin" / "python") == sys.executable
+        assert os.readlink(target / "lib64") == "lib"
+        assert not (target / ".gestvenv-metadata.json").exists()
+
+    def test_copy_strategy_and_errors(self, tmp_path):
+        """Copie réelle sur demande ; source invalide ou cible existante refusées"""
+        source = tmp_path / "src"
+        site = make_fake_venv(source)
+
+        stats = clone_venv(source, tmp_path / "copy", strategy="copy")
+        assert stats.strategy == "copy" and stats.hardlinked == 0
+        assert not os.path.samefile(
+            site / "flask" / "__init__.py",
+            tmp_path / "copy" / "lib" / "python3.11" / "site-packages" / "flask" / "__init__.py"
+        )
+
+        with pytest.raises(FileExistsError):
+            clone_venv(source, tmp_path / "copy")
+        with pytest.raises(FileNotFoundError):
+            clone_venv(tmp_path / "absent", tmp_path / "other")
+
+    def test_mutable_classification(self):
+        """Scripts, pyvenv.cfg, .pth et RECORD copiés ; modules liés"""
+        assert is_mutable(Path("pyvenv.cfg"))
+        assert is_mutable(Path("bin/pip"))
+        assert is_mutable(Path("lib/python3.11/site-packages/a-1.0.dist-info/RECORD"))
+        assert not is_mutable(Path("lib/python3.11/site-packages/a-1.0.dist-info/METADATA"))
+        assert not is_mutable(Path("lib/python3.11/site-packages/a/core.cpython-311.so"))
+
+    @pytest.mark.skipif(os.name == "nt", reason="arborescence venv POSIX")
+    def test_cloned_real_venv_runs(self, tmp_path):
+        """Un vrai venv cloné fonctionne avec son propre préfixe"""
+        source, target = tmp_path / "src", tmp_path / "dst"
+        subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(source)], check=True)
+
+        clone_venv(source, target)
+
+        prefix = subprocess.run(
+            [str(target / "bin" / "python"), "-c", "import sys; print(sys.prefix)"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        assert Path(prefix) == target
+        assert str(target) in (target / "bin" / "activate").read_text()
+
+
+class TestCloneEnvironment:
+    """Tests pour EnvironmentManager.clone_environment"""
+
+    @pytest.fixture
+    def env_manager(self, tmp_path):
+        config_manager = Mock()
+        config_manager.get_environments_path = Mock(return_value=tmp_path)
+        return EnvironmentManager(config_manager)
+
+    def make_source(self, tmp_path):
+        make_fake_venv(tmp_path / "source")
+        env = EnvironmentInfo("source", tmp_path / "source", "3.11", backend_type=BackendType.UV)
+        env.packages = [PackageInfo("flask", "3.0")]
+        return env
+
+    def test_same_runtime_uses_tree_copy(self, env_manager, tmp_path):
+        """Même Python et même backend : aucune réinstallation"""
+        source_env = self.make_source(tmp_path)
+        env_manager._package_service = Mock()
+
+        with patch.object(env_manager, "get_environment_info", return_value=source_env), \
+             patch.object(env_manager, "create_environment") as mock_create:
+            result = env_manager.clone_environment("source", "target")
+
+        assert result.success
+        mock_create.assert_not_called()
+        env_manager._package_service.install_package.assert_not_called()
+        assert (tmp_path / "target" / ".gestvenv-metadata.json").exists()
+        assert result.environment.packages[0].name == "flask"
+        assert result.environment.metadata["cloned_from"] == "source"
+
+    def test_different_python_reinstalls(self, env_manager, tmp_path):
+        """Version Python différente : création et réinstallation"""
+        source_env = self.make_source(tmp_path)
+        target_env = EnvironmentInfo("target", tmp_path / "target", "3.12")
+        env_manager._package_service = Mock()
+        env_manager._package_service.install_package.return_value = Mock(success=True)
+        env_manager._backend_manager = Mock()
+        env_manager._backend_manager.get_backend.return_value.list_packages.return_value = []
+
+        with patch.object(env_manager, "get_environment_info", return_value=source_env), \
+             patch.object(env_manager, "_save_environment_metadata"), \
+             patch.object(env_manager, "create_environment", return_value=EnvironmentResult(
+                 success=True, message="ok", environment=target_env)) as mock_create:
+            result = env_manager.clone_environment("source", "target", python_version="3.12")
+
+        assert result.success
+        mock_create.assert_called_once_with(name="target", python_version="3.12", backend="uv")
+        env_manager._package_service.install_package.assert_called_once()
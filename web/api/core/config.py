@@ -51,6 +51,23 @@ class Settings(BaseSettings):
     # Configuration WebSocket
     WS_MAX_CONNECTIONS: int = 100
     
+    # Bus d'événements WebSocket : "memory" (un seul worker) ou "sqlite"
+    # (fichier partagé, diffusion entre workers uvicorn)
+    EVENT_BUS: str = "memory"
+    EVENT_BUS_PATH: str = ""
+    
+    # Cache des réponses en lecture : durées de vie (secondes)
+    RESPONSE_CACHE_TTL_ENVIRONMENTS: float = 10.0
+    RESPONSE_CACHE_TTL_CACHE_INFO: float = 30.0
+    RESPONSE_CACHE_TTL_SYSTEM_INFO: float = 300.0
+    RESPONSE_CACHE_TTL_HEALTH: float = 5.0
+    
+    # Âge maximal du dernier diagnostic servi par /system/health (secondes)
+    HEALTH_REFRESH_INTERVAL: float = 300.0
+    
+    # Opérations longues exécutées simultanément (une seule par environnement)
+    MAX_CONCURRENT_OPERATIONS: int = 4
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
@@ -6,12 +6,17 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
+import json
 import logging
 import os
 from pathlib import Path
 
 from api.routes import environments, packages, cache, system, templates, ide, websocket
-from api.websocket import WebSocketManager
+from api.websocket import websocket_manager, event_emitter
+from api.websocket.bus import event_bus
+from api.services.operation_service import operation_service
+from api.services.response_cache import response_cache
+from api.services.health_service import health_service
 from api.core.config import settings
 
 # Configuration du logging
@@ -39,9 +44,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# WebSocket Manager pour les connexions temps réel
-websocket_manager = WebSocketManager()
-
 # Inclusion des routes API
 app.include_router(environments.router, prefix="/api/v1", tags=["environments"])
 app.include_router(packages.router, prefix="/api/v1", tags=["packages"])
@@ -55,14 +57,28 @@ app.include_router(websocket.router, tags=["websocket"])
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint pour les mises à jour en temps réel."""
-    await websocket_manager.connect(websocket)
+    client_id = await websocket_manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
-            # Traitement des messages WebSocket si nécessaire
-            logger.info(f"Received WebSocket message: {data}")
+            # {"action": "join"|"leave", "room": "operation:<id>"} ou
+            # {"action": "subscribe"|"unsubscribe", "event": "<type>"}
+            try:
+                message = json.loads(data)
+            except ValueError:
+                logger.debug(f"Ignoring non-JSON WebSocket message: {data}")
+                continue
+            action = message.get("action") if isinstance(message, dict) else None
+            if action == "join" and message.get("room"):
+                websocket_manager.join_room(client_id, message["room"])
+            elif action == "leave" and message.get("room"):
+                websocket_manager.leave_room(client_id, message["room"])
+            elif action == "subscribe" and message.get("event"):
+                websocket_manager.subscribe_to_event(client_id, message["event"])
+            elif action == "unsubscribe" and message.get("event"):
+                websocket_manager.unsubscribe_from_event(client_id, message["event"])
     except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket)
+        websocket_manager.disconnect(client_id)
 
 # Route de health check
 @app.get("/api/health")
@@ -102,6 +118,18 @@ async def startup_event():
     """Événements exécutés au démarrage de l'application."""
     logger.info("Starting GestVenv Web API...")
     
+    # Réception des événements publiés par les autres workers
+    await event_bus.start()
+    
+    # Diffusion des mises à jour d'opérations aux clients WebSocket
+    operation_service.add_listener(event_emitter.emit_operation_update)
+    
+    # Invalidation des réponses en cache à la fin des opérations modifiantes
+    operation_service.add_listener(response_cache.on_operation)
+    
+    # Diagnostic périodique en arrière-plan, servi par /system/health
+    health_service.start()
+    
     # Vérifier que GestVenv CLI est disponible
     from api.services.gestvenv_service import GestVenvService
     service = GestVenvService()
@@ -120,6 +148,8 @@ async def shutdown_event():
     """Événements exécutés à l'arrêt de l'application."""
     logger.info("Shutting down GestVenv Web API...")
     await websocket_manager.disconnect_all()
+    await health_service.stop()
+    await event_bus.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -159,6 +159,7 @@ class SystemHealth(BaseModel):
     status: str
     checks: List[Dict[str, Any]]
     recommendations: List[str]
+    checked_at: Optional[datetime] = None
     
     
 # ===== Schémas pour les templates =====
@@ -208,6 +209,7 @@ class Operation(BaseModel):
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    queue_position: Optional[int] = None
 
 
 # ===== Schémas de réponse =====
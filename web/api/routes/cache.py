@@ -2,13 +2,15 @@
 Routes API pour la gestion du cache.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
 import logging
 
-from api.models.schemas import CacheInfo, CacheExport, CacheImport, ApiResponse
+from api.models.schemas import CacheInfo, CacheExport, CacheImport, ApiResponse, OperationStatus
+from api.core.config import settings
 from api.services.gestvenv_service import GestVenvService
-from api.services.operation_service import OperationService
+from api.services.operation_service import operation_service
+from api.services.response_cache import TAG_CACHE, response_cache
 from api.websocket import event_emitter
 
 logger = logging.getLogger(__name__)
@@ -17,24 +19,30 @@ router = APIRouter(prefix="/cache")
 
 # Services
 gestvenv_service = GestVenvService()
-operation_service = OperationService()
 
 
 @router.get("/info", response_model=CacheInfo)
-async def get_cache_info():
+async def get_cache_info(request: Request):
     """
     Récupère les informations du cache.
     
     Returns:
-        Informations du cache
+        Informations du cache (avec ETag, 304 si inchangées)
     """
-    try:
+    async def compute():
         cache_info = await gestvenv_service.get_cache_info()
         
         if not cache_info:
             raise HTTPException(status_code=500, detail="Impossible de récupérer les informations du cache")
         
         return cache_info
+    
+    try:
+        return await response_cache.respond(
+            request, "cache:info", compute,
+            ttl=settings.RESPONSE_CACHE_TTL_CACHE_INFO,
+            tags=(TAG_CACHE,)
+        )
         
     except HTTPException:
         raise
@@ -45,7 +53,6 @@ async def get_cache_info():
 
 @router.post("/clean", response_model=ApiResponse)
 async def clean_cache(
-    background_tasks: BackgroundTasks,
     older_than: Optional[int] = Query(None, description="Nettoyer les éléments plus anciens que X jours"),
     size_limit: Optional[str] = Query(None, description="Nettoyer pour atteindre cette taille max")
 ):
@@ -55,7 +62,6 @@ async def clean_cache(
     Args:
         older_than: Age limite en jours
         size_limit: Taille limite (ex: 500MB)
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -65,11 +71,13 @@ async def clean_cache(
         operation_id = operation_service.create_operation("clean_cache")
         
         # Lancer le nettoyage en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _clean_cache_task,
             operation_id,
             older_than,
-            size_limit
+            size_limit,
+            resource="cache"
         )
         
         return ApiResponse(
@@ -85,15 +93,13 @@ async def clean_cache(
 
 @router.post("/export", response_model=ApiResponse)
 async def export_cache(
-    export_config: CacheExport,
-    background_tasks: BackgroundTasks
+    export_config: CacheExport
 ):
     """
     Exporte le cache vers un fichier archive.
     
     Args:
         export_config: Configuration d'export
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -103,10 +109,12 @@ async def export_cache(
         operation_id = operation_service.create_operation("export_cache")
         
         # Lancer l'export en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _export_cache_task,
             operation_id,
-            export_config
+            export_config,
+            resource="cache"
         )
         
         return ApiResponse(
@@ -122,15 +130,13 @@ async def export_cache(
 
 @router.post("/import", response_model=ApiResponse)
 async def import_cache(
-    import_config: CacheImport,
-    background_tasks: BackgroundTasks
+    import_config: CacheImport
 ):
     """
     Importe un cache depuis un fichier archive.
     
     Args:
         import_config: Configuration d'import
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -140,10 +146,12 @@ async def import_cache(
         operation_id = operation_service.create_operation("import_cache")
         
         # Lancer l'import en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _import_cache_task,
             operation_id,
-            import_config
+            import_config,
+            resource="cache"
         )
         
         return ApiResponse(
@@ -166,7 +174,8 @@ async def _clean_cache_task(operation_id: str, older_than: Optional[int], size_l
             operation_id,
             gestvenv_service.clean_cache,
             older_than,
-            size_limit
+            size_limit,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
         # Émettre un événement WebSocket pour la mise à jour du cache
@@ -184,6 +193,7 @@ async def _export_cache_task(operation_id: str, export_config: CacheExport):
         # TODO: Implémenter l'export via le service GestVenv
         operation_service.update_operation(
             operation_id,
+            status=OperationStatus.COMPLETED,
             progress=100.0,
             message="Export terminé",
             result={"exported_to": export_config.output_path}
@@ -199,6 +209,7 @@ async def _import_cache_task(operation_id: str, import_config: CacheImport):
         # TODO: Implémenter l'import via le service GestVenv
         operation_service.update_operation(
             operation_id,
+            status=OperationStatus.COMPLETED,
             progress=100.0,
             message="Import terminé",
             result={"imported_from": import_config.source_path}
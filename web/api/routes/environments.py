@@ -2,45 +2,71 @@
 Routes API pour la gestion des environnements virtuels.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Path
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncGenerator, List, Optional
+import json
 import logging
 
 from api.models.schemas import (
     Environment, EnvironmentCreate, EnvironmentUpdate, EnvironmentDetails,
-    Package, ApiResponse, Operation
+    Package, ApiResponse, Operation, OperationStatus
 )
+from api.core.config import settings
 from api.services.gestvenv_service import GestVenvService
-from api.services.operation_service import OperationService
+from api.services.operation_service import operation_service
+from api.services.response_cache import TAG_ENVIRONMENTS, response_cache
 from api.websocket import event_emitter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/environments")
 
+# Formats de flux de la liste des environnements
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
 # Services
 gestvenv_service = GestVenvService()
-operation_service = OperationService()
 
 
 @router.get("/", response_model=List[Environment])
 async def list_environments(
+    request: Request,
     backend: Optional[str] = Query(None, description="Filtrer par backend"),
     status: Optional[str] = Query(None, description="Filtrer par statut"),
-    sort_by: str = Query("name", description="Critère de tri (name, created, used, size)")
+    sort_by: str = Query("name", description="Critère de tri (name, created, used, size)"),
+    format: Optional[str] = Query(None, description="Flux : ndjson ou sse (sinon selon l'en-tête Accept)"),
+    cursor: Optional[str] = Query(None, description="Curseur de la page précédente (flux)"),
+    limit: Optional[int] = Query(None, ge=1, description="Taille de page (flux)")
 ):
     """
     Liste tous les environnements virtuels.
     
+    En flux (format=ndjson|sse ou Accept: application/x-ndjson,
+    text/event-stream), chaque environnement est envoyé dès sa lecture ;
+    filtrage (backend, statut), tri et pagination sont faits par le catalogue.
+    
     Args:
         backend: Filtrer par type de backend
         status: Filtrer par statut
         sort_by: Critère de tri
+        format: Format de flux
+        cursor: Curseur de pagination (flux)
+        limit: Taille de page (flux)
     
     Returns:
-        Liste des environnements
+        Liste des environnements (avec ETag, 304 si inchangée) ou flux
     """
-    try:
+    media_type = _stream_media_type(request, format)
+    if media_type:
+        return StreamingResponse(
+            _stream_environments(media_type, backend, status, sort_by, cursor, limit),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    async def compute():
         environments = await gestvenv_service.list_environments()
         
         # Appliquer les filtres
@@ -61,6 +87,13 @@ async def list_environments(
             environments.sort(key=lambda x: x.name)
         
         return environments
+    
+    try:
+        return await response_cache.respond(
+            request, f"environments:{backend}:{status}:{sort_by}", compute,
+            ttl=settings.RESPONSE_CACHE_TTL_ENVIRONMENTS,
+            tags=(TAG_ENVIRONMENTS,)
+        )
         
     except Exception as e:
         logger.error(f"Failed to list environments: {e}")
@@ -69,15 +102,13 @@ async def list_environments(
 
 @router.post("/", response_model=ApiResponse)
 async def create_environment(
-    env_data: EnvironmentCreate,
-    background_tasks: BackgroundTasks
+    env_data: EnvironmentCreate
 ):
     """
     Crée un nouvel environnement virtuel.
     
     Args:
         env_data: Données de l'environnement à créer
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API avec l'ID de l'opération
@@ -87,10 +118,12 @@ async def create_environment(
         operation_id = operation_service.create_operation("create_environment")
         
         # Lancer la création en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _create_environment_task,
             operation_id,
-            env_data
+            env_data,
+            resource=env_data.name
         )
         
         return ApiResponse(
@@ -180,7 +213,6 @@ async def update_environment(
 @router.delete("/{env_name}", response_model=ApiResponse)
 async def delete_environment(
     env_name: str,
-    background_tasks: BackgroundTasks,
     force: bool = Query(False, description="Forcer la suppression")
 ):
     """
@@ -189,7 +221,6 @@ async def delete_environment(
     Args:
         env_name: Nom de l'environnement
         force: Forcer la suppression
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -204,11 +235,13 @@ async def delete_environment(
         operation_id = operation_service.create_operation("delete_environment")
         
         # Lancer la suppression en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _delete_environment_task,
             operation_id,
             env_name,
-            force
+            force,
+            resource=env_name
         )
         
         return ApiResponse(
@@ -241,6 +274,8 @@ async def activate_environment(env_name: str):
         if not success:
             raise HTTPException(status_code=400, detail="Échec de l'activation")
         
+        response_cache.invalidate(TAG_ENVIRONMENTS)
+        
         return ApiResponse(
             success=True,
             message=f"Environnement '{env_name}' activé avec succès"
@@ -286,7 +321,6 @@ async def list_environment_packages(
 @router.post("/{env_name}/sync", response_model=ApiResponse)
 async def sync_environment(
     env_name: str,
-    background_tasks: BackgroundTasks,
     groups: Optional[str] = Query(None, description="Groupes à synchroniser"),
     clean: bool = Query(False, description="Nettoyer les packages non listés")
 ):
@@ -297,7 +331,6 @@ async def sync_environment(
         env_name: Nom de l'environnement
         groups: Groupes à synchroniser
         clean: Nettoyer les packages non listés
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -307,12 +340,14 @@ async def sync_environment(
         operation_id = operation_service.create_operation("sync_environment")
         
         # Lancer la synchronisation en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _sync_environment_task,
             operation_id,
             env_name,
             groups,
-            clean
+            clean,
+            resource=env_name
         )
         
         return ApiResponse(
@@ -326,6 +361,61 @@ async def sync_environment(
         raise HTTPException(status_code=500, detail="Erreur lors de la synchronisation")
 
 
+# ===== Flux de la liste des environnements =====
+
+def _stream_media_type(request: Request, format: Optional[str]) -> Optional[str]:
+    """Type de flux demandé (paramètre format, sinon en-tête Accept), None pour du JSON."""
+    if format == "ndjson":
+        return NDJSON_MEDIA_TYPE
+    if format == "sse":
+        return SSE_MEDIA_TYPE
+    if format is None:
+        accept = request.headers.get("accept", "")
+        for media_type in (NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE):
+            if media_type in accept:
+                return media_type
+    return None
+
+
+def _stream_event(media_type: str, event: str, data: dict) -> str:
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    if media_type == SSE_MEDIA_TYPE:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+async def _stream_environments(
+    media_type: str,
+    backend: Optional[str],
+    status: Optional[str],
+    sort_by: str,
+    cursor: Optional[str],
+    limit: Optional[int]
+) -> AsyncGenerator[str, None]:
+    """
+    Environnements au format NDJSON (un par ligne) ou SSE (événements environment).
+    
+    La fin du flux porte le curseur de la page suivante : dernière ligne
+    {"next_cursor": ...} en NDJSON (si une page suit), événement end en SSE.
+    Une erreur de la CLI est signalée par {"error": ...} / événement error.
+    """
+    next_cursor = None
+    try:
+        async for row in gestvenv_service.stream_environments(sort_by, backend, cursor, limit, status):
+            if "next_cursor" in row:
+                next_cursor = row["next_cursor"]
+                continue
+            environment = gestvenv_service.parse_environment(row)
+            yield _stream_event(media_type, "environment", environment.model_dump(mode="json"))
+    except Exception as e:
+        logger.error(f"Failed to stream environments: {e}")
+        yield _stream_event(media_type, "error", {"error": str(e)})
+        return
+    
+    if media_type == SSE_MEDIA_TYPE or next_cursor:
+        yield _stream_event(media_type, "end", {"next_cursor": next_cursor})
+
+
 # ===== Tâches en arrière-plan =====
 
 async def _create_environment_task(operation_id: str, env_data: EnvironmentCreate):
@@ -338,7 +428,8 @@ async def _create_environment_task(operation_id: str, env_data: EnvironmentCreat
             env_data.python_version,
             env_data.backend,
             env_data.template,
-            env_data.packages
+            env_data.packages,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
         # Émettre un événement WebSocket
@@ -358,7 +449,8 @@ async def _delete_environment_task(operation_id: str, env_name: str, force: bool
             operation_id,
             gestvenv_service.delete_environment,
             env_name,
-            force
+            force,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
         # Émettre un événement WebSocket
@@ -374,6 +466,7 @@ async def _sync_environment_task(operation_id: str, env_name: str, groups: Optio
         # TODO: Implémenter la synchronisation via le service
         operation_service.update_operation(
             operation_id,
+            status=OperationStatus.COMPLETED,
             progress=100.0,
             message="Synchronisation terminée",
             result={"synchronized": True}
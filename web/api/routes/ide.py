@@ -2,32 +2,47 @@
 Routes API pour l'intégration IDE
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 import json
-import importlib.metadata
 import ast
+import re
+
+from gestvenv.utils.async_utils import run_in_executor
+from gestvenv.utils.module_index import STDLIB, module_indexes
+from gestvenv.utils.package_details import PackageInfo, package_index
 
 from ..services.environment_service import EnvironmentService
-from ..models.environment import Environment
 from ..core.dependencies import get_environment_service
 
 router = APIRouter(prefix="/api/v1/ide", tags=["IDE Integration"])
 
+# Nom de module en cours de saisie après `import` / `from`
+_IMPORT_PREFIX = re.compile(r"^\s*(?:import\s+(?:[\w.]+\s*,\s*)*|from\s+)([\w.]*)$")
+
+COMPLETION_LIMIT = 100
+
 
 class PackageDetails(BaseModel):
-    """Détails d'un package avec métadonnées complètes"""
+    """Détails d'un package avec métadonnées complètes
+
+    Avec une sélection de champs (?fields=), seuls les champs demandés sont
+    renseignés et renvoyés.
+    """
     name: str
-    version: str
-    location: str
-    modules: List[str]
-    entry_points: Dict[str, List[str]]
-    metadata: Dict[str, Any]
+    version: str = ""
+    location: str = ""
+    modules: List[str] = []
+    entry_points: Dict[str, List[str]] = {}
+    metadata: Dict[str, Any] = {}
     description: Optional[str] = None
 
 
+PACKAGE_DETAILS_FIELDS = ("name", "version", "location", "modules", "entry_points", "metadata", "description")
+
+
 class CompletionContext(BaseModel):
     """Contexte pour la complétion de code"""
     file_path: str
@@ -62,117 +77,51 @@ class AttributeInfo(BaseModel):
     parameters: Optional[List[Dict[str, Any]]] = None
 
 
-@router.get("/environments/{env_id}/packages", response_model=List[PackageDetails])
+@router.get(
+    "/environments/{env_id}/packages",
+    response_model=List[PackageDetails],
+    response_model_exclude_unset=True
+)
 async def get_packages_with_details(
     env_id: str,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Champs renvoyés, séparés par des virgules"),
+    q: Optional[str] = Query(None, description="Préfixe du nom de package"),
     service: EnvironmentService = Depends(get_environment_service)
 ) -> List[PackageDetails]:
-    """Récupère la liste détaillée des packages avec métadonnées"""
-    env = service.get_environment_info(env_id)
-    if not env:
-        raise HTTPException(status_code=404, detail="Environment not found")
-    
-    packages = []
-    
-    # Utiliser pip pour lister les packages
-    result = service.run_command_in_environment(
-        env_id,
-        "pip list --format=json"
-    )
-    
-    if result.success:
-        package_list = json.loads(result.stdout)
-        
-        for pkg_info in package_list:
-            try:
-                # Récupérer les métadonnées détaillées
-                metadata_result = service.run_command_in_environment(
-                    env_id,
-                    f"pip show {pkg_info['name']} --verbose"
-                )
-                
-                if metadata_result.success:
-                    details = _parse_pip_show(metadata_result.stdout)
-                    
-                    # Récupérer les modules
-                    modules = _get_package_modules(env, pkg_info['name'])
-                    
-                    # Récupérer les entry points
-                    entry_points = _get_entry_points(env, pkg_info['name'])
-                    
-                    # Statistiques PyPI (simulées pour l'instant)
-                    download_stats = {
-                        "last_month": _estimate_downloads(pkg_info['name']),
-                        "last_week": _estimate_downloads(pkg_info['name']) // 4
-                    }
-                    
-                    packages.append(PackageDetails(
-                        name=pkg_info['name'],
-                        version=pkg_info['version'],
-                        location=details.get('location', ''),
-                        modules=modules,
-                        entry_points=entry_points,
-                        metadata={
-                            'home_page': details.get('home-page', ''),
-                            'author': details.get('author', ''),
-                            'license': details.get('license', ''),
-                            'requires_dist': details.get('requires', []),
-                            'download_stats': download_stats
-                        },
-                        description=details.get('summary', '')
-                    ))
-            except Exception as e:
-                # En cas d'erreur, ajouter le package avec des infos minimales
-                packages.append(PackageDetails(
-                    name=pkg_info['name'],
-                    version=pkg_info['version'],
-                    location='',
-                    modules=[pkg_info['name']],
-                    entry_points={},
-                    metadata={}
-                ))
+    """Liste détaillée des packages, lue dans site-packages (cache par environnement)
+
+    Le nombre total de packages (après filtre) est renvoyé dans X-Total-Count.
+    """
+    env_path = _environment_path(service, env_id)
+    selected = _selected_fields(fields)
     
-    return packages
+    total, packages = await run_in_executor(package_index.page, env_path, offset, limit, q)
+    response.headers["X-Total-Count"] = str(total)
+    return [_to_package_details(info, selected) for info in packages]
 
 
-@router.get("/environments/{env_id}/packages/{package_name}", response_model=PackageDetails)
+@router.get(
+    "/environments/{env_id}/packages/{package_name}",
+    response_model=PackageDetails,
+    response_model_exclude_unset=True
+)
 async def get_package_details(
     env_id: str,
     package_name: str,
+    fields: Optional[str] = Query(None, description="Champs renvoyés, séparés par des virgules"),
     service: EnvironmentService = Depends(get_environment_service)
 ) -> PackageDetails:
     """Récupère les détails complets d'un package spécifique"""
-    env = service.get_environment_info(env_id)
-    if not env:
-        raise HTTPException(status_code=404, detail="Environment not found")
+    env_path = _environment_path(service, env_id)
     
-    # Récupérer les infos du package
-    result = service.run_command_in_environment(
-        env_id,
-        f"pip show {package_name} --verbose"
-    )
-    
-    if not result.success:
+    info = await run_in_executor(package_index.get, env_path, package_name)
+    if info is None:
         raise HTTPException(status_code=404, detail=f"Package {package_name} not found")
     
-    details = _parse_pip_show(result.stdout)
-    modules = _get_package_modules(env, package_name)
-    entry_points = _get_entry_points(env, package_name)
-    
-    return PackageDetails(
-        name=package_name,
-        version=details.get('version', ''),
-        location=details.get('location', ''),
-        modules=modules,
-        entry_points=entry_points,
-        metadata={
-            'home_page': details.get('home-page', ''),
-            'author': details.get('author', ''),
-            'license': details.get('license', ''),
-            'requires_dist': details.get('requires', [])
-        },
-        description=details.get('summary', '')
-    )
+    return _to_package_details(info, _selected_fields(fields))
 
 
 @router.get("/environments/{env_id}/python")
@@ -225,15 +174,18 @@ async def get_completion(
     # Dans une vraie implémentation, on utiliserait Jedi ou Rope
     completions = []
     
-    # Si on est dans un contexte d'import
-    if "import" in context.context:
-        packages = await get_packages_with_details(env_id, manager)
-        for pkg in packages:
+    # Contexte d'import : modules de l'environnement et de la stdlib (index en cache)
+    line = context.context.splitlines()[-1] if context.context else ""
+    match = _IMPORT_PREFIX.search(line)
+    if match:
+        index = await run_in_executor(module_indexes.get, _environment_path(service, env_id))
+        for module, distribution in index.complete(match.group(1), COMPLETION_LIMIT):
             completions.append(CompletionItem(
-                label=pkg.name,
+                label=module,
                 kind="Module",
-                detail=f"{pkg.name} {pkg.version}",
-                documentation=pkg.description
+                detail="stdlib" if distribution == STDLIB else distribution,
+                insertText=module.rpartition(".")[2],
+                data={"packageName": distribution} if distribution and distribution != STDLIB else None
             ))
     
     return {"completions": completions}
@@ -242,9 +194,15 @@ async def get_completion(
 @router.post("/analysis/imports")
 async def analyze_imports(
     file_content: str,
-    file_path: str
+    file_path: str,
+    environment_id: Optional[str] = None,
+    service: EnvironmentService = Depends(get_environment_service)
 ) -> ImportAnalysis:
-    """Analyse les imports d'un fichier Python"""
+    """Analyse les imports d'un fichier Python
+
+    Avec environment_id, les modules absents de l'environnement (et de sa
+    bibliothèque standard) sont signalés avec la distribution qui les fournit.
+    """
     imports = []
     missing = []
     suggestions = []
@@ -265,28 +223,31 @@ async def analyze_imports(
                 imports.append({
                     "module": node.module or '',
                     "names": [alias.name for alias in node.names],
-                    "line": node.lineno
+                    "line": node.lineno,
+                    # Imports relatifs : modules du projet, jamais manquants
+                    "level": node.level
                 })
-        
-        # Vérifier les modules manquants (simplifié)
-        # Dans une vraie implémentation, on vérifierait contre l'environnement actif
-        stdlib_modules = {'os', 'sys', 'json', 'math', 'random', 'datetime', 're'}
-        
-        for imp in imports:
-            module = imp['module']
-            if module and module not in stdlib_modules:
-                # Suggérer le package si on le connait
-                if module in ['requests', 'flask', 'django', 'numpy', 'pandas']:
-                    missing.append(module)
-                    suggestions.append({
-                        "name": module,
-                        "version": "latest"
-                    })
     
     except SyntaxError:
         # Fichier non parsable
         pass
     
+    if environment_id and imports:
+        index = await run_in_executor(module_indexes.get, _environment_path(service, environment_id))
+        for imp in imports:
+            module = imp['module']
+            top_level = module.split(".", 1)[0]
+            if not module or imp.get("level") or top_level in index or top_level in missing:
+                continue
+            missing.append(top_level)
+            distribution = module_indexes.suggest(module)
+            suggestions.append({
+                "module": top_level,
+                "name": distribution or top_level,
+                "version": "latest",
+                "known": distribution is not None
+            })
+    
     return ImportAnalysis(
         imports=imports,
         missing=missing,
@@ -354,48 +315,47 @@ async def check_code(
 
 # Fonctions utilitaires
 
-def _parse_pip_show(output: str) -> Dict[str, Any]:
-    """Parse la sortie de pip show"""
-    result = {}
-    for line in output.split('\n'):
-        if ':' in line:
-            key, value = line.split(':', 1)
-            result[key.strip().lower()] = value.strip()
-    
-    # Parser les requirements
-    if 'requires' in result and result['requires']:
-        result['requires'] = [r.strip() for r in result['requires'].split(',')]
-    else:
-        result['requires'] = []
-    
-    return result
-
-
-def _get_package_modules(env: Environment, package_name: str) -> List[str]:
-    """Récupère les modules d'un package"""
-    # Méthode simplifiée - dans une vraie implémentation,
-    # on inspecterait le package installé
-    modules = [package_name]
-    
-    # Ajouter des sous-modules connus
-    known_submodules = {
-        'django': ['django.db', 'django.contrib', 'django.conf', 'django.urls'],
-        'flask': ['flask.blueprints', 'flask.cli', 'flask.helpers'],
-        'numpy': ['numpy.linalg', 'numpy.random', 'numpy.fft'],
-        'pandas': ['pandas.io', 'pandas.plotting', 'pandas.testing']
+def _environment_path(service: EnvironmentService, env_id: str) -> Path:
+    """Chemin de l'environnement (404 s'il est inconnu)"""
+    env = service.get_environment_info(env_id)
+    if not env:
+        raise HTTPException(status_code=404, detail="Environment not found")
+    return Path(env["path"] if isinstance(env, dict) else env.path)
+
+
+def _selected_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Champs demandés (le nom est toujours inclus), None pour tous"""
+    if not fields:
+        return None
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = set(selected) - set(PACKAGE_DETAILS_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ["name"] + [name for name in selected if name != "name"]
+
+
+def _to_package_details(info: PackageInfo, selected: Optional[List[str]] = None) -> PackageDetails:
+    """Conversion vers le modèle de l'API, restreinte aux champs sélectionnés"""
+    values = {
+        "name": lambda: info.name,
+        "version": lambda: info.version,
+        "location": lambda: info.location,
+        "modules": lambda: info.modules,
+        "entry_points": lambda: info.entry_points,
+        "metadata": lambda: {
+            "home_page": info.home_page,
+            "author": info.author,
+            "license": info.license,
+            "requires_dist": info.requires_dist,
+            "top_level": info.top_level,
+            "download_stats": {
+                "last_month": _estimate_downloads(info.name),
+                "last_week": _estimate_downloads(info.name) // 4
+            }
+        },
+        "description": lambda: info.summary,
     }
-    
-    if package_name in known_submodules:
-        modules.extend(known_submodules[package_name])
-    
-    return modules
-
-
-def _get_entry_points(env: Environment, package_name: str) -> Dict[str, List[str]]:
-    """Récupère les entry points d'un package"""
-    # Pour l'instant, retourner un dict vide
-    # Dans une vraie implémentation, on lirait les métadonnées
-    return {}
+    return PackageDetails(**{name: values[name]() for name in (selected or PACKAGE_DETAILS_FIELDS)})
 
 
 def _estimate_downloads(package_name: str) -> int:
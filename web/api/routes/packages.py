@@ -2,13 +2,13 @@
 Routes API pour la gestion des packages.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path
 from typing import List, Optional
 import logging
 
 from api.models.schemas import Package, PackageInstall, ApiResponse
 from api.services.gestvenv_service import GestVenvService
-from api.services.operation_service import OperationService
+from api.services.operation_service import operation_service
 from api.websocket import event_emitter
 
 logger = logging.getLogger(__name__)
@@ -17,13 +17,11 @@ router = APIRouter(prefix="/packages")
 
 # Services
 gestvenv_service = GestVenvService()
-operation_service = OperationService()
 
 
 @router.post("/install", response_model=ApiResponse)
 async def install_package(
     package_data: PackageInstall,
-    background_tasks: BackgroundTasks,
     env_name: str = Query(..., description="Nom de l'environnement")
 ):
     """
@@ -32,7 +30,6 @@ async def install_package(
     Args:
         package_data: Données du package à installer
         env_name: Nom de l'environnement
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API avec l'ID de l'opération
@@ -42,11 +39,13 @@ async def install_package(
         operation_id = operation_service.create_operation("install_package")
         
         # Lancer l'installation en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _install_package_task,
             operation_id,
             env_name,
-            package_data
+            package_data,
+            resource=env_name
         )
         
         return ApiResponse(
@@ -62,7 +61,6 @@ async def install_package(
 
 @router.delete("/{package_name}", response_model=ApiResponse)
 async def uninstall_package(
-    background_tasks: BackgroundTasks,
     package_name: str = Path(..., description="Nom du package"),
     env_name: str = Query(..., description="Nom de l'environnement")
 ):
@@ -72,7 +70,6 @@ async def uninstall_package(
     Args:
         package_name: Nom du package
         env_name: Nom de l'environnement
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -82,11 +79,13 @@ async def uninstall_package(
         operation_id = operation_service.create_operation("uninstall_package")
         
         # Lancer la désinstallation en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _uninstall_package_task,
             operation_id,
             env_name,
-            package_name
+            package_name,
+            resource=env_name
         )
         
         return ApiResponse(
@@ -102,7 +101,6 @@ async def uninstall_package(
 
 @router.post("/update", response_model=ApiResponse)
 async def update_packages(
-    background_tasks: BackgroundTasks,
     env_name: str = Query(..., description="Nom de l'environnement"),
     packages: Optional[List[str]] = Query(None, description="Packages à mettre à jour")
 ):
@@ -112,7 +110,6 @@ async def update_packages(
     Args:
         env_name: Nom de l'environnement
         packages: Liste des packages (tous si None)
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -122,11 +119,13 @@ async def update_packages(
         operation_id = operation_service.create_operation("update_packages")
         
         # Lancer la mise à jour en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _update_packages_task,
             operation_id,
             env_name,
-            packages
+            packages,
+            resource=env_name
         )
         
         message = "Mise à jour de tous les packages démarrée" if not packages else f"Mise à jour de {len(packages)} packages démarrée"
@@ -154,7 +153,8 @@ async def _install_package_task(operation_id: str, env_name: str, package_data:
             package_data.name,
             package_data.group,
             package_data.editable,
-            package_data.upgrade
+            package_data.upgrade,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
         # Émettre un événement WebSocket
@@ -175,7 +175,8 @@ async def _uninstall_package_task(operation_id: str, env_name: str, package_name
             operation_id,
             gestvenv_service.uninstall_package,
             env_name,
-            package_name
+            package_name,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
     except Exception as e:
@@ -189,7 +190,8 @@ async def _update_packages_task(operation_id: str, env_name: str, packages: Opti
             operation_id,
             gestvenv_service.update_packages,
             env_name,
-            packages
+            packages,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
     except Exception as e:
@@ -2,13 +2,17 @@
 Routes API pour les informations système et diagnostic.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional
 import logging
 
-from api.models.schemas import SystemInfo, SystemHealth, ApiResponse, Operation
+from api.core.config import settings
+from api.models.schemas import SystemInfo, SystemHealth, ApiResponse, Operation, OperationStatus
 from api.services.gestvenv_service import GestVenvService
-from api.services.operation_service import OperationService
+from api.services.health_service import health_service
+from api.services.operation_service import operation_service
+from api.services.response_cache import TAG_HEALTH, TAG_SYSTEM, response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,24 +20,30 @@ router = APIRouter(prefix="/system")
 
 # Services
 gestvenv_service = GestVenvService()
-operation_service = OperationService()
 
 
 @router.get("/info", response_model=SystemInfo)
-async def get_system_info():
+async def get_system_info(request: Request):
     """
     Récupère les informations système.
     
     Returns:
-        Informations système
+        Informations système (avec ETag, 304 si inchangées)
     """
-    try:
+    async def compute():
         system_info = await gestvenv_service.get_system_info()
         
         if not system_info:
             raise HTTPException(status_code=500, detail="Impossible de récupérer les informations système")
         
         return system_info
+    
+    try:
+        return await response_cache.respond(
+            request, "system:info", compute,
+            ttl=settings.RESPONSE_CACHE_TTL_SYSTEM_INFO,
+            tags=(TAG_SYSTEM,)
+        )
         
     except HTTPException:
         raise
@@ -43,32 +53,24 @@ async def get_system_info():
 
 
 @router.get("/health", response_model=SystemHealth)
-async def get_system_health():
+async def get_system_health(request: Request):
     """
     Vérifie la santé du système.
     
+    Renvoie le résultat du dernier diagnostic exécuté en arrière-plan ; un
+    nouveau diagnostic est lancé lorsque celui-ci est trop ancien.
+    
     Returns:
-        État de santé du système
+        État de santé du système (avec ETag, 304 si inchangé)
     """
+    async def compute():
+        return health_service.current()
+    
     try:
-        # Exécuter le diagnostic
-        doctor_result = await gestvenv_service.run_doctor()
-        
-        # Parser les résultats du diagnostic
-        checks = []
-        recommendations = []
-        
-        if doctor_result["success"]:
-            status = "healthy"
-            # TODO: Parser la sortie du doctor pour extraire les vérifications
-        else:
-            status = "unhealthy"
-            recommendations.append("Exécuter 'gestvenv doctor --auto-fix' pour réparer les problèmes")
-        
-        return SystemHealth(
-            status=status,
-            checks=checks,
-            recommendations=recommendations
+        return await response_cache.respond(
+            request, "system:health", compute,
+            ttl=settings.RESPONSE_CACHE_TTL_HEALTH,
+            tags=(TAG_HEALTH,)
         )
         
     except Exception as e:
@@ -78,7 +80,6 @@ async def get_system_health():
 
 @router.post("/doctor", response_model=ApiResponse)
 async def run_doctor(
-    background_tasks: BackgroundTasks,
     env_name: Optional[str] = Query(None, description="Environnement à diagnostiquer"),
     auto_fix: bool = Query(False, description="Réparation automatique")
 ):
@@ -88,7 +89,6 @@ async def run_doctor(
     Args:
         env_name: Environnement spécifique à diagnostiquer
         auto_fix: Activer la réparation automatique
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -98,11 +98,13 @@ async def run_doctor(
         operation_id = operation_service.create_operation("run_doctor")
         
         # Lancer le diagnostic en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _run_doctor_task,
             operation_id,
             env_name,
-            auto_fix
+            auto_fix,
+            resource=env_name
         )
         
         message = "Diagnostic système démarré"
@@ -168,6 +170,34 @@ async def get_operation(operation_id: str):
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération de l'opération")
 
 
+@router.get("/operations/{operation_id}/events")
+async def stream_operation_events(operation_id: str):
+    """
+    Suit une opération en Server-Sent Events.
+    
+    Un événement par état publié (progressions fusionnées), le flux se
+    termine avec l'opération.
+    
+    Args:
+        operation_id: ID de l'opération
+    
+    Returns:
+        Flux text/event-stream
+    """
+    if not operation_service.get_operation(operation_id):
+        raise HTTPException(status_code=404, detail="Opération non trouvée")
+    
+    async def events():
+        async for operation in operation_service.stream_operation_progress(operation_id):
+            yield f"event: {operation.status.value}\ndata: {operation.model_dump_json()}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/operations/{operation_id}/cancel", response_model=ApiResponse)
 async def cancel_operation(operation_id: str):
     """
@@ -199,7 +229,6 @@ async def cancel_operation(operation_id: str):
 
 @router.post("/cleanup", response_model=ApiResponse)
 async def cleanup_system(
-    background_tasks: BackgroundTasks,
     orphaned_only: bool = Query(False, description="Nettoyer seulement les environnements orphelins"),
     clean_cache: bool = Query(False, description="Nettoyer aussi le cache")
 ):
@@ -209,7 +238,6 @@ async def cleanup_system(
     Args:
         orphaned_only: Nettoyer seulement les orphelins
         clean_cache: Nettoyer aussi le cache
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -219,11 +247,13 @@ async def cleanup_system(
         operation_id = operation_service.create_operation("cleanup_system")
         
         # Lancer le nettoyage en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _cleanup_system_task,
             operation_id,
             orphaned_only,
-            clean_cache
+            clean_cache,
+            resource="cache"
         )
         
         return ApiResponse(
@@ -242,11 +272,19 @@ async def cleanup_system(
 async def _run_doctor_task(operation_id: str, env_name: Optional[str], auto_fix: bool):
     """Tâche de diagnostic."""
     try:
-        # TODO: Implémenter le diagnostic via le service GestVenv
-        result = await gestvenv_service.run_doctor(env_name)
+        operation_service.update_operation(operation_id, status=OperationStatus.RUNNING)
+        result = await gestvenv_service.run_doctor(
+            env_name,
+            on_output=operation_service.output_reporter(operation_id)
+        )
+        
+        # Un diagnostic complet devient l'état servi par /system/health
+        if env_name is None:
+            health_service.record(result)
         
         operation_service.update_operation(
             operation_id,
+            status=OperationStatus.COMPLETED,
             progress=100.0,
             message="Diagnostic terminé",
             result=result
@@ -262,6 +300,7 @@ async def _cleanup_system_task(operation_id: str, orphaned_only: bool, clean_cac
         # TODO: Implémenter le nettoyage via le service GestVenv
         operation_service.update_operation(
             operation_id,
+            status=OperationStatus.COMPLETED,
             progress=100.0,
             message="Nettoyage terminé",
             result={"orphaned_only": orphaned_only, "clean_cache": clean_cache}
@@ -2,13 +2,13 @@
 Routes API pour la gestion des templates.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from typing import List
 import logging
 
 from api.models.schemas import TemplateInfo, TemplateCreate, ApiResponse
 from api.services.gestvenv_service import GestVenvService
-from api.services.operation_service import OperationService
+from api.services.operation_service import operation_service
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,6 @@ router = APIRouter(prefix="/templates")
 
 # Services
 gestvenv_service = GestVenvService()
-operation_service = OperationService()
 
 
 @router.get("/", response_model=List[TemplateInfo])
@@ -38,15 +37,13 @@ async def list_templates():
 
 @router.post("/create", response_model=ApiResponse)
 async def create_from_template(
-    template_data: TemplateCreate,
-    background_tasks: BackgroundTasks
+    template_data: TemplateCreate
 ):
     """
     Crée un projet depuis un template.
     
     Args:
         template_data: Données de création depuis template
-        background_tasks: Tâches en arrière-plan
     
     Returns:
         Réponse API
@@ -56,10 +53,12 @@ async def create_from_template(
         operation_id = operation_service.create_operation("create_from_template")
         
         # Lancer la création en arrière-plan
-        background_tasks.add_task(
+        operation_service.submit(
+            operation_id,
             _create_from_template_task,
             operation_id,
-            template_data
+            template_data,
+            resource=template_data.project_name
         )
         
         return ApiResponse(
@@ -86,7 +85,8 @@ async def _create_from_template_task(operation_id: str, template_data: TemplateC
             template_data.author,
             template_data.email,
             template_data.version,
-            template_data.output_path
+            template_data.output_path,
+            on_output=operation_service.output_reporter(operation_id)
         )
         
     except Exception as e:
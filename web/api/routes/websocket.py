@@ -6,6 +6,7 @@ import uuid
 import logging
 
 from ..websocket.manager import manager
+from ..websocket.bus import event_bus
 from ..websocket.handlers import WebSocketHandler
 from ..services.environment_service import EnvironmentService
 from ..services.package_service import PackageService
@@ -68,5 +69,6 @@ async def websocket_status():
         "environment_subscriptions": {
             client_id: list(envs)
             for client_id, envs in manager.client_environments.items()
-        }
+        },
+        "event_bus": event_bus.stats()
     }
\ No newline at end of file
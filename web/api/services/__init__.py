@@ -8,6 +8,8 @@ from .environment_service import EnvironmentService
 from .package_service import PackageService
 from .cache_service import CacheService
 from .template_service import TemplateService
+from .response_cache import ResponseCache
+from .health_service import HealthService
 
 __all__ = [
     "GestVenvService", 
@@ -15,5 +17,7 @@ __all__ = [
     "EnvironmentService",
     "PackageService",
     "CacheService",
-    "TemplateService"
+    "TemplateService",
+    "ResponseCache",
+    "HealthService"
 ]
\ No newline at end of file
@@ -9,6 +9,10 @@ import subprocess
 from typing import Dict, Any, List, AsyncGenerator, Optional
 from pathlib import Path
 
+from gestvenv.utils.async_process import (
+    STREAM_LIMIT, OutputCallback, run_command_async, terminate_process_group
+)
+
 from api.core.config import settings
 from api.models.schemas import (
     Environment, EnvironmentStatus, Package, PackageStatus,
@@ -17,6 +21,16 @@ from api.models.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Santé d'un environnement (EnvironmentInfo.health) -> statut de l'API
+HEALTH_STATUS = {
+    "healthy": EnvironmentStatus.HEALTHY,
+    "unknown": EnvironmentStatus.HEALTHY,
+    "needs_update": EnvironmentStatus.WARNING,
+    "has_warnings": EnvironmentStatus.WARNING,
+    "has_errors": EnvironmentStatus.ERROR,
+    "corrupted": EnvironmentStatus.ERROR,
+}
+
 
 class GestVenvService:
     """Service pour exécuter les commandes GestVenv CLI."""
@@ -27,7 +41,8 @@ class GestVenvService:
     async def execute_command(
         self, 
         command: List[str], 
-        timeout: int = 300
+        timeout: int = 300,
+        on_output: Optional[OutputCallback] = None
     ) -> Dict[str, Any]:
         """
         Exécute une commande GestVenv de manière asynchrone.
@@ -35,6 +50,7 @@ class GestVenvService:
         Args:
             command: Liste des arguments de la commande
             timeout: Timeout en secondes
+            on_output: Rappel (flux, ligne) appelé pour chaque ligne produite
             
         Returns:
             Dict contenant returncode, stdout, stderr
@@ -43,33 +59,32 @@ class GestVenvService:
         logger.info(f"Executing command: {' '.join(full_command)}")
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *full_command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            # L'annulation de la tâche appelante tue le groupe de processus
+            completed = await run_command_async(
+                full_command,
+                timeout=timeout,
+                on_output=on_output
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), 
-                timeout=timeout
-            )
+            if completed.timed_out:
+                logger.error(f"Command timeout: {' '.join(full_command)}")
+                return {
+                    "returncode": -1,
+                    "stdout": completed.stdout.strip(),
+                    "stderr": f"Command timeout after {timeout} seconds"
+                }
             
             result = {
-                "returncode": process.returncode,
-                "stdout": stdout.decode('utf-8').strip(),
-                "stderr": stderr.decode('utf-8').strip()
+                "returncode": completed.returncode,
+                "stdout": completed.stdout.strip(),
+                "stderr": completed.stderr.strip()
             }
             
             logger.debug(f"Command result: {result}")
             return result
             
-        except asyncio.TimeoutError:
-            logger.error(f"Command timeout: {' '.join(full_command)}")
-            return {
-                "returncode": -1,
-                "stdout": "",
-                "stderr": f"Command timeout after {timeout} seconds"
-            }
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Command execution failed: {e}")
             return {
@@ -125,29 +140,132 @@ class GestVenvService:
         
         try:
             data = json.loads(result["stdout"]) if result["stdout"] else []
-            environments = []
-            
-            for env_data in data:
-                env = Environment(
-                    name=env_data.get("name", ""),
-                    path=env_data.get("path", ""),
-                    python_version=env_data.get("python_version"),
-                    backend=BackendType(env_data.get("backend", "pip")),
-                    status=EnvironmentStatus(env_data.get("status", "healthy")),
-                    created_at=env_data.get("created_at", "2024-01-01T00:00:00"),
-                    last_used=env_data.get("last_used"),
-                    package_count=env_data.get("package_count", 0),
-                    size_mb=env_data.get("size_mb", 0.0),
-                    active=env_data.get("active", False)
-                )
-                environments.append(env)
-            
-            return environments
+            return [self.parse_environment(env_data) for env_data in data]
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse environments JSON: {e}")
             return []
     
+    def parse_environment(self, env_data: Dict[str, Any]) -> Environment:
+        """Convertit un environnement produit par `gestvenv list` (EnvironmentInfo.to_dict)."""
+        return Environment(
+            name=env_data.get("name", ""),
+            path=env_data.get("path", ""),
+            python_version=env_data.get("python_version"),
+            backend=BackendType(env_data.get("backend_type", "pip")),
+            status=HEALTH_STATUS.get(env_data.get("health"), EnvironmentStatus.HEALTHY),
+            created_at=env_data.get("created_at", "2024-01-01T00:00:00"),
+            last_used=env_data.get("last_used"),
+            package_count=len(env_data.get("packages") or []),
+            size_mb=env_data.get("size_mb", 0.0),
+            active=env_data.get("is_active", False)
+        )
+    
+    @staticmethod
+    def health_filter(status: str) -> List[str]:
+        """États de santé de la CLI correspondant à un statut de l'API."""
+        return [health for health, value in HEALTH_STATUS.items() if value.value == status]
+    
+    async def stream_environments(
+        self,
+        sort: str = "name",
+        backend: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Lit les environnements en flux (`list --format ndjson`).
+        
+        Les filtres (backend, statut via `--health`), le tri et la pagination
+        sont appliqués par le catalogue de la CLI : une page n'est jamais
+        raccourcie par un filtrage après coup. Chaque environnement est remis
+        dès sa lecture.
+        
+        Args:
+            sort: Critère de tri (name, created, used, size)
+            backend: Filtrer par backend
+            cursor: Curseur de la page précédente
+            limit: Nombre maximal d'environnements
+            status: Filtrer par statut de l'API (healthy, warning, error)
+            
+        Yields:
+            Dictionnaires d'environnement, puis {"next_cursor": ...} si une
+            page suivante existe
+        """
+        command = ["list", "--format", "ndjson", "--sort", sort]
+        if backend:
+            command.extend(["--backend", backend])
+        if status:
+            healths = self.health_filter(status)
+            if not healths:
+                # Statut sans équivalent de santé (creating, deleting)
+                return
+            command.extend(["--health", ",".join(healths)])
+        if cursor:
+            command.extend(["--cursor", cursor])
+        if limit:
+            command.extend(["--limit", str(limit)])
+        
+        # La CLI écrit ses erreurs sur stdout : conservées pour le message d'échec
+        messages = []
+        try:
+            async for line in self.stream_output(command):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    messages.append(line)
+        except RuntimeError as e:
+            raise RuntimeError("\n".join(messages) or str(e)) from e
+    
+    async def stream_output(self, command: List[str]) -> AsyncGenerator[str, None]:
+        """
+        Exécute une commande et remet chaque ligne de stdout dès qu'elle est écrite.
+        
+        Si le consommateur s'arrête avant la fin (client déconnecté), le
+        groupe de processus est terminé.
+        
+        Args:
+            command: Liste des arguments de la commande
+            
+        Yields:
+            Lignes de stdout (sans fin de ligne)
+            
+        Raises:
+            RuntimeError: si la commande échoue
+        """
+        full_command = [self.cli_path] + command
+        logger.info(f"Streaming command: {' '.join(full_command)}")
+        
+        process = await asyncio.create_subprocess_exec(
+            *full_command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=True
+        )
+        # stderr lu en parallèle : un tuyau plein bloquerait la commande
+        stderr = asyncio.ensure_future(process.stderr.read())
+        try:
+            while True:
+                raw = await process.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if line:
+                    yield line
+            
+            returncode = await process.wait()
+            if returncode != 0:
+                errors = (await stderr).decode("utf-8", errors="replace").strip()
+                raise RuntimeError(errors or f"Command failed with exit code {returncode}")
+        finally:
+            if process.returncode is None:
+                await terminate_process_group(process)
+            if not stderr.done():
+                stderr.cancel()
+    
     async def get_environment(self, name: str) -> Optional[Environment]:
         """Récupère les détails d'un environnement."""
         result = await self.execute_command(["info", name])
@@ -165,7 +283,8 @@ class GestVenvService:
         python_version: Optional[str] = None,
         backend: Optional[BackendType] = None,
         template: Optional[str] = None,
-        packages: Optional[List[str]] = None
+        packages: Optional[List[str]] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> bool:
         """Crée un nouvel environnement."""
         command = ["create", name]
@@ -182,16 +301,21 @@ class GestVenvService:
         if packages:
             command.extend(["--packages", ",".join(packages)])
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
-    async def delete_environment(self, name: str, force: bool = False) -> bool:
+    async def delete_environment(
+        self,
+        name: str,
+        force: bool = False,
+        on_output: Optional[OutputCallback] = None
+    ) -> bool:
         """Supprime un environnement."""
         command = ["delete", name]
         if force:
             command.append("--force")
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
     async def activate_environment(self, name: str) -> bool:
@@ -247,7 +371,8 @@ class GestVenvService:
         package: str,
         group: Optional[str] = None,
         editable: bool = False,
-        upgrade: bool = False
+        upgrade: bool = False,
+        on_output: Optional[OutputCallback] = None
     ) -> bool:
         """Installe un package dans un environnement."""
         command = ["install", package, "--env", env_name]
@@ -261,19 +386,25 @@ class GestVenvService:
         if upgrade:
             command.append("--upgrade")
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
-    async def uninstall_package(self, env_name: str, package: str) -> bool:
+    async def uninstall_package(
+        self,
+        env_name: str,
+        package: str,
+        on_output: Optional[OutputCallback] = None
+    ) -> bool:
         """Désinstalle un package."""
         command = ["uninstall", package, "--env", env_name, "--yes"]
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
     async def update_packages(
         self, 
         env_name: str, 
-        packages: Optional[List[str]] = None
+        packages: Optional[List[str]] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> bool:
         """Met à jour des packages."""
         command = ["update", "--env", env_name]
@@ -283,7 +414,7 @@ class GestVenvService:
         else:
             command.append("--all")
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
     # ===== Méthodes pour le cache =====
@@ -306,7 +437,8 @@ class GestVenvService:
     async def clean_cache(
         self, 
         older_than: Optional[int] = None,
-        size_limit: Optional[str] = None
+        size_limit: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> bool:
         """Nettoie le cache."""
         command = ["cache", "clean"]
@@ -319,7 +451,7 @@ class GestVenvService:
         
         command.append("--force")
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
     
     # ===== Méthodes pour le système =====
@@ -344,13 +476,17 @@ class GestVenvService:
             memory_usage={"total": 8.0, "used": 4.0, "free": 4.0}
         )
     
-    async def run_doctor(self, env_name: Optional[str] = None) -> Dict[str, Any]:
+    async def run_doctor(
+        self,
+        env_name: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> Dict[str, Any]:
         """Exécute le diagnostic."""
         command = ["doctor"]
         if env_name:
             command.append(env_name)
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         
         return {
             "success": result["returncode"] == 0,
@@ -386,7 +522,8 @@ class GestVenvService:
         author: Optional[str] = None,
         email: Optional[str] = None,
         version: str = "0.1.0",
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None
     ) -> bool:
         """Crée un projet depuis un template."""
         command = ["create-from-template", template_name, project_name]
@@ -403,5 +540,5 @@ class GestVenvService:
         if output_path:
             command.extend(["--output", output_path])
         
-        result = await self.execute_command(command)
+        result = await self.execute_command(command, on_output=on_output)
         return result["returncode"] == 0
\ No newline at end of file
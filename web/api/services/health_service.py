@@ -0,0 +1,128 @@
+"""
+Santé du système servie depuis le dernier diagnostic exécuté en arrière-plan.
+
+/system/health ne lance jamais `gestvenv doctor` dans la requête : il renvoie
+le dernier résultat connu. Le diagnostic est relancé en arrière-plan toutes
+les `max_age` secondes (start/stop au démarrage et à l'arrêt de
+l'application) et, si le résultat est trop ancien, à la demande (un seul à
+la fois). `gestvenv doctor` est incrémental : seules les vérifications dont
+les entrées ont changé sont réexécutées.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from api.core.config import settings
+from api.models.schemas import SystemHealth
+from api.services.gestvenv_service import GestVenvService
+from api.services.response_cache import TAG_HEALTH, response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class HealthService:
+    """Dernier état de santé connu et rafraîchissement en arrière-plan."""
+
+    def __init__(
+        self,
+        gestvenv_service: Optional[GestVenvService] = None,
+        max_age: float = settings.HEALTH_REFRESH_INTERVAL
+    ):
+        self.gestvenv_service = gestvenv_service or GestVenvService()
+        self.max_age = max_age
+        self._last: Optional[SystemHealth] = None
+        self._last_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._periodic_task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Lance le rafraîchissement périodique (un diagnostic tout de suite)."""
+        if self._periodic_task is None or self._periodic_task.done():
+            self._periodic_task = asyncio.ensure_future(self._refresh_periodically())
+        return self._periodic_task
+
+    async def _refresh_periodically(self):
+        while True:
+            await self.refresh_in_background()
+            await asyncio.sleep(self.max_age)
+
+    def current(self) -> SystemHealth:
+        """
+        Dernier état de santé connu, sans attendre de diagnostic.
+
+        Returns:
+            État de santé ("unknown" tant qu'aucun diagnostic n'est terminé)
+        """
+        if self._last_at is None or time.monotonic() - self._last_at > self.max_age:
+            self.refresh_in_background()
+        if self._last is None:
+            return SystemHealth(
+                status="unknown",
+                checks=[],
+                recommendations=["Diagnostic en cours, réessayer dans quelques instants"]
+            )
+        return self._last
+
+    def refresh_in_background(self) -> asyncio.Task:
+        """Lance un diagnostic s'il n'y en a pas déjà un en cours."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self.refresh())
+        return self._refresh_task
+
+    async def refresh(self) -> SystemHealth:
+        """Exécute le diagnostic complet et enregistre son résultat."""
+        try:
+            doctor_result = await self.gestvenv_service.run_doctor()
+        except Exception as e:
+            logger.error(f"Background doctor run failed: {e}")
+            doctor_result = {"success": False, "output": "", "errors": str(e)}
+        return self.record(doctor_result)
+
+    def record(self, doctor_result: Dict[str, Any]) -> SystemHealth:
+        """
+        Enregistre le résultat d'un diagnostic complet.
+
+        Args:
+            doctor_result: Résultat de GestVenvService.run_doctor
+
+        Returns:
+            État de santé correspondant
+        """
+        checks = []
+        recommendations = []
+
+        if doctor_result["success"]:
+            status = "healthy"
+            # TODO: Parser la sortie du doctor pour extraire les vérifications
+        else:
+            status = "unhealthy"
+            recommendations.append("Exécuter 'gestvenv doctor --auto-fix' pour réparer les problèmes")
+
+        self._last = SystemHealth(
+            status=status,
+            checks=checks,
+            recommendations=recommendations,
+            checked_at=datetime.now()
+        )
+        self._last_at = time.monotonic()
+        response_cache.invalidate(TAG_HEALTH)
+        return self._last
+
+    async def stop(self):
+        """Arrête le rafraîchissement et le diagnostic en cours (arrêt de l'application)."""
+        for task in (self._periodic_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._periodic_task = None
+        self._refresh_task = None
+
+
+# Instance partagée par les routes
+health_service = HealthService()
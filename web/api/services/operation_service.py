@@ -1,19 +1,87 @@
 """
 Service pour gérer les opérations longues et le suivi de progression.
+
+Les opérations soumises (submit) passent par un ordonnanceur borné :
+- au plus `max_workers` opérations s'exécutent en même temps ;
+- une seule opération à la fois par ressource (environnement, cache) ;
+- les opérations interactives passent avant les opérations de masse ;
+- les opérations en attente connaissent leur position dans la file.
 """
 
 import asyncio
+import bisect
+import inspect
+import itertools
+import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional, Callable, AsyncGenerator
+from enum import IntEnum
+from typing import Dict, Any, Optional, Callable, AsyncGenerator, List, Set, Tuple
 from dataclasses import dataclass, field
 import logging
 
+from api.core.config import settings
 from api.models.schemas import Operation, OperationStatus
 
 logger = logging.getLogger(__name__)
 
 
+# Étapes reconnues dans la sortie pip/uv : (préfixe, progression minimale)
+OUTPUT_MILESTONES = (
+    ("Collecting", 10.0),
+    ("Resolved", 30.0),
+    ("Downloading", 30.0),
+    ("Prepared", 60.0),
+    ("Installing collected packages", 70.0),
+    ("Uninstalling", 70.0),
+    ("Installed", 95.0),
+    ("Successfully", 95.0),
+)
+
+# Progression maximale atteinte avant la fin effective de l'opération
+MAX_STREAMED_PROGRESS = 95.0
+
+# Intervalle minimal entre deux publications de progression (les mises à
+# jour intermédiaires sont fusionnées, seul le dernier état est publié)
+PROGRESS_PUBLISH_INTERVAL = 0.1
+
+# Conservation des opérations terminées (secondes) et nombre maximal conservé
+COMPLETED_RETENTION_SECONDS = 3600
+MAX_COMPLETED_OPERATIONS = 500
+
+TERMINAL_STATUSES = (OperationStatus.COMPLETED, OperationStatus.FAILED, OperationStatus.CANCELLED)
+
+
+class JobPriority(IntEnum):
+    """Classe de priorité d'une opération (plus petit : plus prioritaire)."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+# Opérations de masse : passent après les opérations interactives en attente
+OPERATION_PRIORITIES: Dict[str, JobPriority] = {
+    "update_packages": JobPriority.BULK,
+    "clean_cache": JobPriority.BULK,
+    "export_cache": JobPriority.BULK,
+    "import_cache": JobPriority.BULK,
+    "run_doctor": JobPriority.BULK,
+    "cleanup_system": JobPriority.BULK,
+}
+
+
+@dataclass(order=True)
+class Job:
+    """Opération soumise à l'ordonnanceur (ordonnée par priorité puis arrivée)."""
+    priority: JobPriority
+    sequence: int
+    operation_id: str = field(compare=False)
+    func: Callable = field(compare=False)
+    args: Tuple[Any, ...] = field(default=(), compare=False)
+    kwargs: Dict[str, Any] = field(default_factory=dict, compare=False)
+    resource: Optional[str] = field(default=None, compare=False)
+    task: Optional[asyncio.Task] = field(default=None, compare=False)
+
+
 @dataclass
 class OperationContext:
     """Contexte d'une opération."""
@@ -27,14 +95,50 @@ class OperationContext:
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     task: Optional[asyncio.Task] = None
+    job: Optional[Job] = None
+    queue_position: Optional[int] = None
+    # Publication : version de l'état, instantané construit une fois par
+    # version, événement remplacé à chaque publication
+    version: int = 0
+    published_version: int = 0
+    published_at: float = 0.0
+    snapshot: Optional[Operation] = None
+    changed: Optional[asyncio.Event] = None
+    flush_handle: Optional[asyncio.Handle] = None
 
 
 class OperationService:
-    """Service pour gérer les opérations asynchrones."""
+    """Service pour gérer les opérations asynchrones.
+    
+    Les mises à jour sont poussées aux abonnés (SSE, WebSocket, rappels) :
+    un événement par opération est déclenché à chaque publication, les
+    progressions rapprochées sont fusionnées (PROGRESS_PUBLISH_INTERVAL) et
+    les changements de statut publiés immédiatement. Les opérations
+    terminées sont évincées après COMPLETED_RETENTION_SECONDS.
+    
+    Les opérations soumises par submit s'exécutent dans la limite de
+    max_workers, une à la fois par ressource, par ordre de priorité.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        retention_seconds: float = COMPLETED_RETENTION_SECONDS,
+        max_completed: int = MAX_COMPLETED_OPERATIONS,
+        max_workers: int = settings.MAX_CONCURRENT_OPERATIONS
+    ):
         self._operations: Dict[str, OperationContext] = {}
         self._callbacks: Dict[str, list] = {}
+        self._listeners: List[Callable] = []
+        self._listener_tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.retention_seconds = retention_seconds
+        self.max_completed = max_completed
+        self.max_workers = max(1, max_workers)
+        # Ordonnanceur : file triée, opérations en cours, ressources occupées
+        self._queue: List[Job] = []
+        self._running: Dict[str, Job] = {}
+        self._busy_resources: Set[str] = set()
+        self._sequence = itertools.count()
     
     def create_operation(self, operation_type: str) -> str:
         """
@@ -55,6 +159,7 @@ class OperationService:
         
         self._operations[operation_id] = operation
         self._callbacks[operation_id] = []
+        self._evict_excess_completed()
         
         logger.info(f"Created operation {operation_id} of type {operation_type}")
         return operation_id
@@ -69,21 +174,8 @@ class OperationService:
         Returns:
             Opération ou None si non trouvée
         """
-        if operation_id not in self._operations:
-            return None
-        
-        ctx = self._operations[operation_id]
-        return Operation(
-            id=ctx.id,
-            type=ctx.type,
-            status=ctx.status,
-            progress=ctx.progress,
-            message=ctx.message,
-            started_at=ctx.started_at,
-            completed_at=ctx.completed_at,
-            result=ctx.result,
-            error=ctx.error
-        )
+        ctx = self._operations.get(operation_id)
+        return self._snapshot(ctx) if ctx else None
     
     def list_operations(self, operation_type: Optional[str] = None) -> list[Operation]:
         """
@@ -95,24 +187,11 @@ class OperationService:
         Returns:
             Liste des opérations
         """
-        operations = []
-        
-        for ctx in self._operations.values():
-            if operation_type and ctx.type != operation_type:
-                continue
-            
-            operation = Operation(
-                id=ctx.id,
-                type=ctx.type,
-                status=ctx.status,
-                progress=ctx.progress,
-                message=ctx.message,
-                started_at=ctx.started_at,
-                completed_at=ctx.completed_at,
-                result=ctx.result,
-                error=ctx.error
-            )
-            operations.append(operation)
+        operations = [
+            self._snapshot(ctx)
+            for ctx in self._operations.values()
+            if not operation_type or ctx.type == operation_type
+        ]
         
         return sorted(operations, key=lambda x: x.started_at, reverse=True)
     
@@ -120,6 +199,9 @@ class OperationService:
         """
         Ajoute un callback pour une opération.
         
+        Appelé à chaque publication (progressions fusionnées) ; une
+        coroutine renvoyée est planifiée sur la boucle.
+        
         Args:
             operation_id: ID de l'opération
             callback: Fonction à appeler lors des mises à jour
@@ -127,6 +209,56 @@ class OperationService:
         if operation_id in self._callbacks:
             self._callbacks[operation_id].append(callback)
     
+    def add_listener(self, listener: Callable):
+        """
+        Ajoute un abonné à toutes les opérations (diffusion WebSocket).
+        
+        Args:
+            listener: Fonction (ou coroutine) recevant l'Operation publiée
+        """
+        self._listeners.append(listener)
+        # Boucle de l'application : les mises à jour venant de threads y sont relayées
+        self._running_loop()
+    
+    def remove_listener(self, listener: Callable):
+        """Retire un abonné ajouté par add_listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def output_reporter(self, operation_id: str) -> Callable[[str, str], None]:
+        """
+        Crée un rappel de sortie qui fait progresser une opération.
+        
+        Chaque ligne émise par la commande devient le message courant ; la
+        progression avance vers MAX_STREAMED_PROGRESS et saute aux étapes
+        reconnues (résolution, téléchargement, installation).
+        
+        Args:
+            operation_id: ID de l'opération
+            
+        Returns:
+            Rappel (flux, ligne) utilisable comme on_output
+        """
+        def report(stream: str, line: str):
+            ctx = self._operations.get(operation_id)
+            text = line.strip()
+            if ctx is None or not text:
+                return
+            
+            progress = ctx.progress + (MAX_STREAMED_PROGRESS - ctx.progress) * 0.05
+            for prefix, floor in OUTPUT_MILESTONES:
+                if text.lstrip("+- ").startswith(prefix):
+                    progress = max(progress, floor)
+                    break
+            
+            self.update_operation(
+                operation_id,
+                progress=min(progress, MAX_STREAMED_PROGRESS),
+                message=text[:200]
+            )
+        
+        return report
+    
     def update_operation(
         self,
         operation_id: str,
@@ -151,10 +283,11 @@ class OperationService:
             return
         
         ctx = self._operations[operation_id]
+        previous_status = ctx.status
         
         if status:
             ctx.status = status
-            if status in [OperationStatus.COMPLETED, OperationStatus.FAILED, OperationStatus.CANCELLED]:
+            if status in TERMINAL_STATUSES:
                 ctx.completed_at = datetime.now()
         
         if progress is not None:
@@ -169,13 +302,263 @@ class OperationService:
         if error:
             ctx.error = error
             ctx.status = OperationStatus.FAILED
+            if ctx.completed_at is None:
+                ctx.completed_at = datetime.now()
+        
+        ctx.version += 1
+        ctx.snapshot = None
+        
+        # Statut, résultat ou erreur : publication immédiate ; progression : fusionnée
+        self._publish(ctx, immediate=ctx.status != previous_status or bool(result) or bool(error))
+    
+    # ===== Publication =====
+    
+    def _snapshot(self, ctx: OperationContext) -> Operation:
+        """Operation construite une seule fois par version de l'état."""
+        if ctx.snapshot is None:
+            ctx.snapshot = Operation(
+                id=ctx.id,
+                type=ctx.type,
+                status=ctx.status,
+                progress=ctx.progress,
+                message=ctx.message,
+                started_at=ctx.started_at,
+                completed_at=ctx.completed_at,
+                result=ctx.result,
+                error=ctx.error,
+                queue_position=ctx.queue_position
+            )
+        return ctx.snapshot
+    
+    def _running_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Boucle courante (mémorisée pour les mises à jour venant de threads)."""
+        try:
+            self._loop = asyncio.get_running_loop()
+            return self._loop
+        except RuntimeError:
+            return None
+    
+    def _publish(self, ctx: OperationContext, immediate: bool = False):
+        """Publie l'état courant, ou planifie une publication différée."""
+        running = self._running_loop()
+        if running is None:
+            if self._loop is not None and self._loop.is_running():
+                # Mise à jour depuis un thread (run_in_executor) : relais vers la boucle
+                self._loop.call_soon_threadsafe(self._publish, ctx, immediate)
+            else:
+                # Hors boucle (scripts, tests synchrones) : rappels uniquement
+                self._flush(ctx)
+            return
+        
+        delay = ctx.published_at + PROGRESS_PUBLISH_INTERVAL - time.monotonic()
+        if immediate or delay <= 0:
+            self._flush(ctx)
+        elif ctx.flush_handle is None:
+            ctx.flush_handle = running.call_later(delay, self._flush, ctx)
+    
+    def _flush(self, ctx: OperationContext):
+        """Réveille les abonnés et appelle les rappels avec le dernier état."""
+        if ctx.flush_handle is not None:
+            ctx.flush_handle.cancel()
+            ctx.flush_handle = None
+        if ctx.published_version == ctx.version:
+            return
+        ctx.published_version = ctx.version
+        ctx.published_at = time.monotonic()
+        
+        if ctx.changed is not None:
+            ctx.changed.set()
+            ctx.changed = None
         
-        # Notifier les callbacks
-        for callback in self._callbacks.get(operation_id, []):
+        operation = self._snapshot(ctx)
+        for callback in self._callbacks.get(ctx.id, []) + self._listeners:
             try:
-                callback(self.get_operation(operation_id))
+                outcome = callback(operation)
+                if inspect.iscoroutine(outcome) and self._running_loop() is None:
+                    outcome.close()
+                elif inspect.isawaitable(outcome):
+                    task = asyncio.ensure_future(outcome)
+                    self._listener_tasks.add(task)
+                    task.add_done_callback(self._listener_tasks.discard)
             except Exception as e:
-                logger.error(f"Callback error for operation {operation_id}: {e}")
+                logger.error(f"Callback error for operation {ctx.id}: {e}")
+        
+        if ctx.status in TERMINAL_STATUSES:
+            self._schedule_eviction(ctx.id)
+    
+    async def subscribe(self, operation_id: str) -> AsyncGenerator[Operation, None]:
+        """
+        Abonnement aux publications d'une opération.
+        
+        Produit l'état courant puis chaque état publié (les états
+        intermédiaires non lus sont fusionnés) jusqu'au statut terminal.
+        
+        Args:
+            operation_id: ID de l'opération
+            
+        Yields:
+            États successifs de l'opération
+        """
+        ctx = self._operations.get(operation_id)
+        if ctx is None:
+            return
+        self._running_loop()
+        
+        seen = ctx.published_version
+        operation = self._snapshot(ctx)
+        yield operation
+        
+        while operation.status not in TERMINAL_STATUSES:
+            if ctx.published_version == seen:
+                if ctx.changed is None:
+                    ctx.changed = asyncio.Event()
+                await ctx.changed.wait()
+            if self._operations.get(operation_id) is not ctx and ctx.published_version == seen:
+                # Évincée sans nouvel état : fin de l'abonnement
+                break
+            seen = ctx.published_version
+            operation = self._snapshot(ctx)
+            yield operation
+    
+    def _schedule_eviction(self, operation_id: str):
+        """Éviction différée d'une opération terminée."""
+        loop = self._running_loop()
+        if loop is not None:
+            loop.call_later(self.retention_seconds, self._evict, operation_id)
+    
+    def _evict(self, operation_id: str):
+        ctx = self._operations.get(operation_id)
+        if ctx is None or ctx.status not in TERMINAL_STATUSES:
+            return
+        del self._operations[operation_id]
+        self._callbacks.pop(operation_id, None)
+        if ctx.flush_handle is not None:
+            ctx.flush_handle.cancel()
+        if ctx.changed is not None:
+            # Les abonnés encore en attente se terminent
+            ctx.changed.set()
+        logger.debug(f"Evicted completed operation {operation_id}")
+    
+    def _evict_excess_completed(self):
+        """Borne le nombre d'opérations terminées conservées (plus anciennes d'abord)."""
+        completed = [ctx for ctx in self._operations.values() if ctx.completed_at is not None]
+        excess = len(completed) - self.max_completed
+        if excess > 0:
+            for ctx in sorted(completed, key=lambda c: c.completed_at)[:excess]:
+                self._evict(ctx.id)
+    
+    # ===== Ordonnancement =====
+    
+    def submit(
+        self,
+        operation_id: str,
+        func: Callable,
+        *args,
+        resource: Optional[str] = None,
+        priority: Optional[JobPriority] = None,
+        **kwargs
+    ) -> bool:
+        """
+        Place une opération dans la file d'exécution.
+        
+        Args:
+            operation_id: ID de l'opération
+            func: Fonction coroutine exécutant l'opération
+            *args: Arguments pour la fonction
+            resource: Ressource utilisée en exclusivité (environnement, cache)
+            priority: Priorité (par défaut selon le type d'opération)
+            **kwargs: Arguments nommés pour la fonction
+            
+        Returns:
+            True si l'opération a été placée dans la file
+        """
+        ctx = self._operations.get(operation_id)
+        if ctx is None or ctx.job is not None:
+            return False
+        
+        if priority is None:
+            priority = OPERATION_PRIORITIES.get(ctx.type, JobPriority.INTERACTIVE)
+        job = Job(
+            priority=priority,
+            sequence=next(self._sequence),
+            operation_id=operation_id,
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            resource=resource
+        )
+        ctx.job = job
+        bisect.insort(self._queue, job)
+        logger.debug(f"Queued operation {operation_id} (priority {priority.name}, resource {resource})")
+        self._dispatch()
+        return True
+    
+    def _dispatch(self):
+        """Démarre les opérations en attente dans la limite des workers libres."""
+        if self._running_loop() is None:
+            return
+        
+        started = False
+        for job in list(self._queue):
+            if len(self._running) >= self.max_workers:
+                break
+            # Ressource occupée : les opérations suivantes peuvent passer
+            if job.resource is not None and job.resource in self._busy_resources:
+                continue
+            self._queue.remove(job)
+            self._start(job)
+            started = True
+        
+        if started or self._queue:
+            self._report_positions()
+    
+    def _start(self, job: Job):
+        self._running[job.operation_id] = job
+        if job.resource is not None:
+            self._busy_resources.add(job.resource)
+        
+        ctx = self._operations.get(job.operation_id)
+        if ctx is not None:
+            ctx.queue_position = None
+            self.update_operation(job.operation_id, status=OperationStatus.RUNNING, message="En cours")
+        job.task = asyncio.ensure_future(self._run_job(job))
+    
+    async def _run_job(self, job: Job):
+        """Exécute une opération puis libère sa place et sa ressource."""
+        try:
+            await job.func(*job.args, **job.kwargs)
+        except asyncio.CancelledError:
+            self._mark_cancelled(job.operation_id, "Opération annulée")
+        except Exception as e:
+            logger.error(f"Operation {job.operation_id} failed: {e}")
+            self.update_operation(job.operation_id, error=str(e))
+        finally:
+            self._running.pop(job.operation_id, None)
+            if job.resource is not None:
+                self._busy_resources.discard(job.resource)
+            self._dispatch()
+    
+    def _report_positions(self):
+        """Publie la position dans la file des opérations en attente."""
+        for position, job in enumerate(self._queue, start=1):
+            ctx = self._operations.get(job.operation_id)
+            if ctx is not None and ctx.queue_position != position:
+                ctx.queue_position = position
+                self.update_operation(job.operation_id, message=f"En attente (position {position})")
+    
+    def _mark_cancelled(self, operation_id: str, message: str):
+        ctx = self._operations.get(operation_id)
+        if ctx is not None and ctx.status not in TERMINAL_STATUSES:
+            ctx.queue_position = None
+            self.update_operation(operation_id, status=OperationStatus.CANCELLED, message=message)
+    
+    def scheduler_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "running": len(self._running),
+            "queued": len(self._queue),
+            "busy_resources": sorted(self._busy_resources),
+        }
     
     async def run_operation(
         self,
@@ -216,11 +599,10 @@ class OperationService:
             )
             
         except asyncio.CancelledError:
-            self.update_operation(
-                operation_id,
-                status=OperationStatus.CANCELLED,
-                message="Opération annulée"
-            )
+            self._mark_cancelled(operation_id, "Opération annulée")
+            # La tâche englobante (ordonnanceur) s'arrête aussi
+            if ctx.job is not None:
+                raise
             
         except Exception as e:
             logger.error(f"Operation {operation_id} failed: {e}")
@@ -234,6 +616,9 @@ class OperationService:
         """
         Annule une opération.
         
+        En attente, elle est retirée de la file ; en cours, sa tâche est
+        annulée, ce qui termine le groupe de processus de la commande.
+        
         Args:
             operation_id: ID de l'opération
             
@@ -244,14 +629,18 @@ class OperationService:
             return False
         
         ctx = self._operations[operation_id]
+        job = ctx.job
         
-        if ctx.task and not ctx.task.done():
-            ctx.task.cancel()
-            self.update_operation(
-                operation_id,
-                status=OperationStatus.CANCELLED,
-                message="Opération annulée par l'utilisateur"
-            )
+        if job is not None and job in self._queue:
+            self._queue.remove(job)
+            self._mark_cancelled(operation_id, "Opération annulée par l'utilisateur")
+            self._report_positions()
+            return True
+        
+        task = job.task if job is not None and job.task is not None else ctx.task
+        if task and not task.done():
+            task.cancel()
+            self._mark_cancelled(operation_id, "Opération annulée par l'utilisateur")
             return True
         
         return False
@@ -273,9 +662,7 @@ class OperationService:
                     to_remove.append(operation_id)
         
         for operation_id in to_remove:
-            del self._operations[operation_id]
-            if operation_id in self._callbacks:
-                del self._callbacks[operation_id]
+            self._evict(operation_id)
             
             logger.info(f"Cleaned up old operation {operation_id}")
     
@@ -292,33 +679,9 @@ class OperationService:
         Yields:
             Mises à jour de l'opération
         """
-        if operation_id not in self._operations:
-            return
-        
-        # État initial
-        operation = self.get_operation(operation_id)
-        if operation:
+        async for operation in self.subscribe(operation_id):
             yield operation
-        
-        # Attendre les mises à jour
-        last_status = operation.status if operation else OperationStatus.PENDING
-        
-        while operation_id in self._operations:
-            await asyncio.sleep(0.5)  # Polling toutes les 500ms
-            
-            operation = self.get_operation(operation_id)
-            if not operation:
-                break
-            
-            # Envoyer si le statut a changé
-            if operation.status != last_status:
-                yield operation
-                last_status = operation.status
-            
-            # Arrêter si l'opération est terminée
-            if operation.status in [
-                OperationStatus.COMPLETED,
-                OperationStatus.FAILED,
-                OperationStatus.CANCELLED
-            ]:
-                break
\ No newline at end of file
+
+
+# Instance partagée par les routes (une opération est visible de toutes les routes)
+operation_service = OperationService()
@@ -0,0 +1,214 @@
+"""
+Cache des réponses des endpoints en lecture (environnements, cache, système).
+
+Chaque entrée conserve le corps JSON déjà sérialisé et son ETag fort
+(empreinte SHA-256 du corps) :
+- durée de vie par endpoint ;
+- invalidation par étiquettes lorsqu'une opération modifiante se termine
+  (abonné de l'OperationService) ;
+- les calculs concurrents d'une même clé sont fusionnés (un seul appel CLI) ;
+- If-None-Match : réponse 304 sans corps lorsque l'ETag correspond.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from api.models.schemas import Operation
+from api.services.operation_service import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Étiquettes d'invalidation
+TAG_ENVIRONMENTS = "environments"
+TAG_CACHE = "cache"
+TAG_SYSTEM = "system"
+TAG_HEALTH = "health"
+
+# Étiquettes invalidées à la fin de chaque type d'opération
+OPERATION_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "create_environment": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "create_from_template": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "delete_environment": (TAG_ENVIRONMENTS,),
+    "sync_environment": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "install_package": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "uninstall_package": (TAG_ENVIRONMENTS,),
+    "update_packages": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "clean_cache": (TAG_CACHE,),
+    "import_cache": (TAG_CACHE,),
+    "cleanup_system": (TAG_ENVIRONMENTS, TAG_CACHE),
+    "run_doctor": (TAG_ENVIRONMENTS, TAG_HEALTH),
+}
+
+
+@dataclass
+class CachedResponse:
+    """Corps sérialisé d'une réponse et son ETag."""
+    body: bytes
+    etag: str
+    expires_at: float
+    tags: Tuple[str, ...]
+
+
+def make_etag(body: bytes) -> str:
+    """ETag fort d'un corps de réponse."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compare un en-tête If-None-Match à un ETag.
+
+    Comparaison faible (RFC 9110) : le préfixe W/ est ignoré.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        candidate[2:] if candidate.startswith("W/") else candidate
+        for candidate in candidates
+    )
+
+
+class ResponseCache:
+    """Cache en mémoire des réponses JSON, par clé et par étiquettes."""
+
+    def __init__(self):
+        self._entries: Dict[str, CachedResponse] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Incrémenté à chaque invalidation : un calcul commencé avant n'est pas conservé
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        tags: Iterable[str] = ()
+    ) -> CachedResponse:
+        """
+        Récupère une réponse en cache, ou la calcule et la sérialise.
+
+        Args:
+            key: Clé de la réponse (endpoint et paramètres)
+            compute: Coroutine produisant la valeur (modèle, liste, dict)
+            ttl: Durée de vie en secondes
+            tags: Étiquettes d'invalidation
+
+        Returns:
+            Réponse en cache
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        tags = tuple(tags)
+        generations = self._generation(tags)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            body = json.dumps(
+                jsonable_encoder(await compute()),
+                ensure_ascii=False,
+                separators=(",", ":")
+            ).encode("utf-8")
+        except Exception as e:
+            self._pending.pop(key, None)
+            future.set_exception(e)
+            # Évite l'avertissement « exception never retrieved » sans attente
+            future.exception()
+            raise
+        except BaseException:
+            self._pending.pop(key, None)
+            future.cancel()
+            raise
+
+        entry = CachedResponse(
+            body=body,
+            etag=make_etag(body),
+            expires_at=time.monotonic() + ttl,
+            tags=tags
+        )
+        if generations == self._generation(tags):
+            self._entries[key] = entry
+        self._pending.pop(key, None)
+        future.set_result(entry)
+        return entry
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        tags: Iterable[str] = ()
+    ) -> Response:
+        """
+        Réponse HTTP avec ETag, 304 si le client possède déjà cette version.
+
+        Args:
+            request: Requête (en-tête If-None-Match)
+            key: Clé de la réponse
+            compute: Coroutine produisant la valeur
+            ttl: Durée de vie en secondes
+            tags: Étiquettes d'invalidation
+
+        Returns:
+            Réponse JSON ou 304 Not Modified
+        """
+        entry = await self.get(key, compute, ttl, tags)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tags: str):
+        """
+        Oublie les réponses portant l'une des étiquettes (toutes sans argument).
+
+        Args:
+            tags: Étiquettes à invalider
+        """
+        if not tags:
+            self._entries.clear()
+            self._epoch += 1
+            return
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        wanted = set(tags)
+        for key in [key for key, entry in self._entries.items() if wanted.intersection(entry.tags)]:
+            del self._entries[key]
+
+    def _generation(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return (self._epoch,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def on_operation(self, operation: Operation):
+        """Abonné de l'OperationService : invalide à la fin des opérations modifiantes."""
+        if operation.status in TERMINAL_STATUSES:
+            tags = OPERATION_INVALIDATIONS.get(operation.type, ())
+            if tags:
+                logger.debug(f"Operation {operation.id} ({operation.type}) invalidates {tags}")
+                self.invalidate(*tags)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Instance partagée par les routes
+response_cache = ResponseCache()
@@ -0,0 +1,77 @@
+"""
+Tests for streamed environment listings (CLI rows, catalog-side filters)
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from gestvenv.core.models import BackendType, EnvironmentHealth, EnvironmentInfo, PackageInfo  # noqa: E402
+
+from api.models.schemas import EnvironmentStatus  # noqa: E402
+from api.routes import environments  # noqa: E402
+from api.services.gestvenv_service import GestVenvService  # noqa: E402
+
+
+def cli_row(name, health=EnvironmentHealth.HEALTHY):
+    """A row exactly as `gestvenv list --format ndjson` writes it"""
+    env = EnvironmentInfo(
+        name=name,
+        path=Path("/envs") / name,
+        python_version="3.11",
+        backend_type=BackendType.UV,
+        health=health,
+        is_active=True,
+        packages=[PackageInfo(name="requests", version="2.31.0")],
+    )
+    return json.loads(json.dumps(env.to_dict(), default=str))
+
+
+def test_parse_environment_reads_cli_keys():
+    service = GestVenvService()
+
+    environment = service.parse_environment(cli_row("api", EnvironmentHealth.HAS_WARNINGS))
+
+    assert environment.backend.value == "uv"
+    assert environment.status == EnvironmentStatus.WARNING
+    assert environment.active is True
+    assert environment.package_count == 1
+    assert service.parse_environment(cli_row("new", EnvironmentHealth.UNKNOWN)).status == \
+        EnvironmentStatus.HEALTHY
+
+
+def test_status_filter_is_passed_to_the_catalog(monkeypatch):
+    commands = []
+    rows = [cli_row("broken", EnvironmentHealth.CORRUPTED), {"next_cursor": "abc"}]
+
+    async def fake_stream_output(command):
+        commands.append(command)
+        for row in rows:
+            yield json.dumps(row)
+
+    monkeypatch.setattr(environments.gestvenv_service, "stream_output", fake_stream_output)
+
+    async def collect(status):
+        stream = environments._stream_environments(
+            "application/x-ndjson", None, status, "name", None, 1
+        )
+        return [json.loads(line) async for line in stream]
+
+    lines = asyncio.run(collect("error"))
+
+    assert commands == [["list", "--format", "ndjson", "--sort", "name",
+                         "--health", "has_errors,corrupted", "--limit", "1"]]
+    # No filtering after paging: the catalog page and its cursor are passed through
+    assert [line.get("status") for line in lines] == ["error", None]
+    assert lines[-1] == {"next_cursor": "abc"}
+
+    # A status without a health equivalent never reaches the CLI
+    assert asyncio.run(collect("creating")) == []
+    assert len(commands) == 1
@@ -0,0 +1,115 @@
+"""
+Tests for the WebSocket event bus (in-memory and cross-process SQLite backends)
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.websocket.bus import InMemoryEventBus, SqliteEventBus  # noqa: E402
+from api.websocket.manager import ConnectionManager  # noqa: E402
+from api.websocket.rooms import WebSocketManager  # noqa: E402
+from api.models.schemas import WSMessage, WSMessageType  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+def test_sqlite_bus_reaches_other_workers(tmp_path):
+    """Each bus sees every event exactly once, whichever worker published it"""
+    path = tmp_path / "events.db"
+
+    async def scenario():
+        first, second = SqliteEventBus(path, poll_interval=0.005), SqliteEventBus(path, poll_interval=0.005)
+        received = {"first": [], "second": []}
+        first.add_handler(lambda topic, payload: received["first"].append((topic, json.loads(payload))))
+        second.add_handler(lambda topic, payload: received["second"].append((topic, json.loads(payload))))
+        await first.start()
+        await second.start()
+        try:
+            await first.publish("ide:all", {"n": 1})
+            await second.publish("ws:room:r", {"n": 2})
+            await wait_for(lambda: len(received["first"]) == 2 and len(received["second"]) == 2)
+            await asyncio.sleep(0.05)
+        finally:
+            await first.stop()
+            await second.stop()
+        return received
+
+    received = asyncio.run(scenario())
+
+    # Own events are delivered at publish time, remote ones when the tail picks them up
+    expected = [("ide:all", {"n": 1}), ("ws:room:r", {"n": 2})]
+    assert sorted(received["first"], key=str) == expected
+    assert sorted(received["second"], key=str) == expected
+
+
+def test_ide_broadcast_across_workers(tmp_path):
+    path = tmp_path / "events.db"
+
+    async def scenario():
+        buses = [SqliteEventBus(path, poll_interval=0.005) for _ in range(2)]
+        workers = [ConnectionManager(bus=bus) for bus in buses]
+        for bus in buses:
+            await bus.start()
+        socket = FakeWebSocket()
+        await workers[1].connect(socket, "vscode")
+        workers[1].subscribe_to_environment("vscode", "env1")
+        try:
+            await workers[0].broadcast_to_environment({"type": "package:installed"}, "env1")
+            await workers[0].broadcast_to_environment({"type": "ignored"}, "env2")
+            await wait_for(lambda: len(socket.sent) == 2)
+            await asyncio.sleep(0.05)
+        finally:
+            workers[1].disconnect("vscode")
+            for bus in buses:
+                await bus.stop()
+        return socket.sent
+
+    sent = asyncio.run(scenario())
+
+    assert [message["type"] for message in sent] == ["connection", "package:installed"]
+
+
+def test_room_manager_event_type_subscription():
+    async def scenario():
+        manager = WebSocketManager(bus=InMemoryEventBus())
+        subscribed, other = FakeWebSocket(), FakeWebSocket()
+        subscribed_id = await manager.connect(subscribed)
+        await manager.connect(other)
+        manager.subscribe_to_event(subscribed_id, WSMessageType.CACHE_UPDATED.value)
+        await manager.broadcast_by_event_type(
+            WSMessageType.CACHE_UPDATED,
+            WSMessage(type=WSMessageType.CACHE_UPDATED, data={"size": 1})
+        )
+        await asyncio.sleep(0.01)
+        await manager.disconnect_all()
+        return subscribed.sent, other.sent
+
+    subscribed, other = asyncio.run(scenario())
+
+    assert [m["type"] for m in subscribed] == ["operation_completed", "cache_updated"]
+    assert len(other) == 1
@@ -0,0 +1,183 @@
+"""
+Route tests for the IDE integration endpoints (package details, completion, imports)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from gestvenv.utils.module_index import ModuleIndexRegistry  # noqa: E402
+from gestvenv.utils.package_details import PackageDetailsIndex  # noqa: E402
+
+from api.core.dependencies import get_environment_service  # noqa: E402
+from api.routes import ide  # noqa: E402
+
+
+def add_distribution(site_packages, name, version, modules, summary=""):
+    info_dir = site_packages / f"{name}-{version}.dist-info"
+    info_dir.mkdir(parents=True)
+    (info_dir / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\nSummary: {summary}\n"
+    )
+    (info_dir / "RECORD").write_text("".join(f"{path},,\n" for path in modules))
+
+
+class FakeEnvironmentService:
+    """Knows a single environment, `demo`"""
+
+    def __init__(self, env_path):
+        self.env_path = env_path
+
+    def get_environment_info(self, env_id):
+        return {"name": env_id, "path": str(self.env_path)} if env_id == "demo" else None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    python = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    env_path = tmp_path / "demo"
+    site_packages = env_path / "lib" / python / "site-packages"
+    site_packages.mkdir(parents=True)
+    add_distribution(site_packages, "requests", "2.31.0",
+                     ["requests/__init__.py", "requests/adapters.py"], summary="HTTP for Humans.")
+    add_distribution(site_packages, "packaging", "24.0",
+                     ["packaging/__init__.py", "packaging/version.py", "packaging/markers.py"])
+    add_distribution(site_packages, "Flask_Login", "0.6.3", ["flask_login/__init__.py"])
+
+    details = PackageDetailsIndex()
+    monkeypatch.setattr(ide, "package_index", details)
+    monkeypatch.setattr(ide, "module_indexes", ModuleIndexRegistry(tmp_path / "index", details))
+
+    app = FastAPI()
+    app.include_router(ide.router)
+    app.dependency_overrides[get_environment_service] = lambda: FakeEnvironmentService(env_path)
+    return TestClient(app)
+
+
+def test_package_list_is_paginated_with_total_count(client):
+    first = client.get("/api/v1/ide/environments/demo/packages", params={"limit": 2})
+    rest = client.get("/api/v1/ide/environments/demo/packages", params={"offset": 2, "limit": 2})
+
+    assert first.status_code == 200
+    assert first.headers["X-Total-Count"] == "3"
+    assert rest.headers["X-Total-Count"] == "3"
+    names = [package["name"] for package in first.json() + rest.json()]
+    assert sorted(names) == ["Flask_Login", "packaging", "requests"]
+    assert len(first.json()) == 2 and len(rest.json()) == 1
+
+
+def test_package_list_prefix_filter_counts_matches_only(client):
+    response = client.get("/api/v1/ide/environments/demo/packages", params={"q": "flask-"})
+
+    assert response.headers["X-Total-Count"] == "1"
+    assert [package["name"] for package in response.json()] == ["Flask_Login"]
+
+
+def test_fields_restrict_the_payload(client):
+    listing = client.get("/api/v1/ide/environments/demo/packages", params={"fields": "version"})
+    details = client.get("/api/v1/ide/environments/demo/packages/requests",
+                         params={"fields": "version,description"})
+
+    assert all(set(package) == {"name", "version"} for package in listing.json())
+    assert details.json() == {"name": "requests", "version": "2.31.0",
+                              "description": "HTTP for Humans."}
+
+
+def test_package_details_use_normalized_names(client):
+    response = client.get("/api/v1/ide/environments/demo/packages/flask-login")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Flask_Login" and body["version"] == "0.6.3"
+    assert body["modules"] == ["flask_login"]
+    assert "metadata" in body and "location" in body
+
+
+def test_unknown_package_environment_and_field_are_rejected(client):
+    missing_package = client.get("/api/v1/ide/environments/demo/packages/numpy")
+    missing_env = client.get("/api/v1/ide/environments/other/packages")
+    missing_env_details = client.get("/api/v1/ide/environments/other/packages/requests")
+    bad_field = client.get("/api/v1/ide/environments/demo/packages", params={"fields": "size"})
+
+    assert missing_package.status_code == 404
+    assert missing_package.json()["detail"] == "Package numpy not found"
+    assert missing_env.status_code == 404 and missing_env_details.status_code == 404
+    assert missing_env.json()["detail"] == "Environment not found"
+    assert bad_field.status_code == 400
+    assert "size" in bad_field.json()["detail"]
+
+
+def complete(client, context, env_id="demo"):
+    return client.post(f"/api/v1/ide/environments/{env_id}/completion", json={
+        "file_path": "main.py", "line": 1, "column": len(context), "context": context
+    })
+
+
+def test_dotted_module_completion(client):
+    response = complete(client, "import packaging.ver")
+
+    assert response.status_code == 200
+    completions = response.json()["completions"]
+    assert [item["label"] for item in completions] == ["packaging.version"]
+    assert completions[0]["insertText"] == "version"
+    assert completions[0]["detail"] == "packaging"
+    assert completions[0]["data"] == {"packageName": "packaging"}
+
+
+def test_completion_of_top_level_and_stdlib_modules(client):
+    labels = {item["label"]: item for item in complete(client, "from req").json()["completions"]}
+    stdlib = complete(client, "import os, jso").json()["completions"]
+
+    assert labels["requests"]["detail"] == "requests"
+    assert [item["label"] for item in stdlib] == ["json"]
+    assert stdlib[0]["detail"] == "stdlib" and stdlib[0]["data"] is None
+    # Outside an import statement nothing is suggested
+    assert complete(client, "x = packaging.ver").json() == {"completions": []}
+    assert complete(client, "import req", env_id="other").status_code == 404
+
+
+def test_import_analysis_reports_missing_modules(client):
+    source = (
+        "import os\n"
+        "import requests.adapters\n"
+        "from packaging.version import Version\n"
+        "from . import sibling\n"
+        "import yaml\n"
+        "from numpy import array\n"
+    )
+
+    response = client.post("/api/v1/ide/analysis/imports", params={
+        "file_content": source, "file_path": "main.py", "environment_id": "demo"
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [imp["module"] for imp in body["imports"]] == [
+        "os", "requests.adapters", "packaging.version", "", "yaml", "numpy"
+    ]
+    assert body["missing"] == ["yaml", "numpy"]
+    assert body["suggestions"] == [
+        {"module": "yaml", "name": "PyYAML", "version": "latest", "known": True},
+        {"module": "numpy", "name": "numpy", "version": "latest", "known": False},
+    ]
+
+
+def test_import_analysis_without_environment_only_lists_imports(client):
+    response = client.post("/api/v1/ide/analysis/imports", params={
+        "file_content": "import yaml\n", "file_path": "main.py"
+    })
+    broken = client.post("/api/v1/ide/analysis/imports", params={
+        "file_content": "import (", "file_path": "main.py", "environment_id": "demo"
+    })
+
+    assert response.json()["missing"] == []
+    assert response.json()["imports"] == [{"module": "yaml", "alias": None, "line": 1}]
+    assert broken.json() == {"imports": [], "missing": [], "suggestions": []}
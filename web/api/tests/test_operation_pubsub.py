@@ -0,0 +1,110 @@
+"""
+Tests for operation publication (coalescing, subscriptions, eviction, thread relay)
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.models.schemas import OperationStatus  # noqa: E402
+from api.services import operation_service as module  # noqa: E402
+from api.services.operation_service import OperationService  # noqa: E402
+
+
+def test_rapid_progress_updates_are_coalesced():
+    published = []
+
+    async def scenario():
+        service = OperationService()
+        operation_id = service.create_operation("install_package")
+        service.add_callback(operation_id, lambda op: published.append(op.progress))
+
+        for progress in range(1, 11):
+            service.update_operation(operation_id, progress=float(progress))
+        # First update goes out at once, the other nine wait for the window
+        assert published == [1.0]
+        await asyncio.sleep(module.PROGRESS_PUBLISH_INTERVAL * 1.5)
+
+    asyncio.run(scenario())
+
+    assert published == [1.0, 10.0]
+
+
+def test_terminal_state_is_published_immediately():
+    published = []
+
+    async def scenario():
+        service = OperationService()
+        operation_id = service.create_operation("install_package")
+        service.add_callback(operation_id, lambda op: published.append((op.status, op.progress)))
+
+        service.update_operation(operation_id, progress=10.0)
+        service.update_operation(operation_id, progress=50.0)
+        # Pending coalesced progress is superseded by the terminal state, sent synchronously
+        service.update_operation(operation_id, status=OperationStatus.COMPLETED, progress=100.0)
+        assert published[-1] == (OperationStatus.COMPLETED, 100.0)
+        await asyncio.sleep(module.PROGRESS_PUBLISH_INTERVAL * 1.5)
+
+    asyncio.run(scenario())
+
+    assert published == [
+        (OperationStatus.PENDING, 10.0),
+        (OperationStatus.COMPLETED, 100.0),
+    ]
+
+
+def test_subscription_ends_when_operation_is_evicted():
+    async def scenario():
+        service = OperationService(retention_seconds=0)
+        operation_id = service.create_operation("sync_environment")
+        service.update_operation(operation_id, status=OperationStatus.RUNNING)
+        states = []
+
+        async def consume():
+            async for operation in service.subscribe(operation_id):
+                states.append(operation.status)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        assert states == [OperationStatus.RUNNING]
+
+        # Completed and evicted before the subscriber gets to run again
+        service.update_operation(operation_id, status=OperationStatus.COMPLETED)
+        service._evict(operation_id)
+        await asyncio.wait_for(consumer, timeout=1)
+        return service, operation_id, states
+
+    service, operation_id, states = asyncio.run(scenario())
+
+    assert states == [OperationStatus.RUNNING, OperationStatus.COMPLETED]
+    assert service.get_operation(operation_id) is None
+
+
+def test_updates_from_worker_threads_are_relayed_to_the_loop():
+    received = []
+
+    async def scenario():
+        service = OperationService()
+        operation_id = service.create_operation("export_cache")
+        service.add_listener(lambda op: received.append((op.status, threading.get_ident())))
+
+        def work():
+            service.update_operation(operation_id, status=OperationStatus.RUNNING)
+            return threading.get_ident()
+
+        worker = await asyncio.get_running_loop().run_in_executor(None, work)
+        # The relayed publication runs on the next loop iteration
+        await asyncio.sleep(0)
+        return worker, threading.get_ident()
+
+    worker, loop_thread = asyncio.run(scenario())
+
+    assert worker != loop_thread
+    assert received == [(OperationStatus.RUNNING, loop_thread)]
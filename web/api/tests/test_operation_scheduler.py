@@ -0,0 +1,116 @@
+"""
+Tests for the bounded operation scheduler (workers, resources, priorities)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.models.schemas import OperationStatus  # noqa: E402
+from api.services.operation_service import JobPriority, OperationService  # noqa: E402
+
+
+def test_global_limit_and_resource_serialisation():
+    running = []
+    peak = {"all": 0, "env-a": 0}
+
+    async def work(resource):
+        running.append(resource)
+        peak["all"] = max(peak["all"], len(running))
+        peak["env-a"] = max(peak["env-a"], running.count("env-a"))
+        await asyncio.sleep(0.01)
+        running.remove(resource)
+
+    async def scenario():
+        service = OperationService(max_workers=2)
+        ids = []
+        for resource in ["env-a", "env-a", "env-a", "env-b", "env-c"]:
+            operation_id = service.create_operation("install_package")
+            service.submit(operation_id, work, resource, resource=resource)
+            ids.append(operation_id)
+        while service.scheduler_stats()["running"] or service.scheduler_stats()["queued"]:
+            await asyncio.sleep(0.005)
+        return service, ids
+
+    service, ids = asyncio.run(scenario())
+
+    assert peak == {"all": 2, "env-a": 1}
+    # The final status is set by the task itself (run_operation), not by the scheduler
+    assert all(service.get_operation(i).status == OperationStatus.RUNNING for i in ids)
+
+
+def test_interactive_jobs_overtake_bulk_and_report_queue_position():
+    order = []
+
+    async def scenario():
+        release = asyncio.Event()
+        service = OperationService(max_workers=1)
+
+        async def blocker():
+            await release.wait()
+
+        async def work(name):
+            order.append(name)
+
+        first = service.create_operation("install_package")
+        service.submit(first, blocker)
+        bulk = service.create_operation("update_packages")
+        service.submit(bulk, work, "bulk")
+        interactive = service.create_operation("install_package")
+        service.submit(interactive, work, "interactive")
+
+        positions = (
+            service.get_operation(interactive).queue_position,
+            service.get_operation(bulk).queue_position,
+        )
+        release.set()
+        while service.scheduler_stats()["running"] or service.scheduler_stats()["queued"]:
+            await asyncio.sleep(0.005)
+        return positions, service.get_operation(bulk).queue_position
+
+    positions, final_position = asyncio.run(scenario())
+
+    assert positions == (1, 2)
+    assert final_position is None
+    assert order == ["interactive", "bulk"]
+
+
+def test_cancel_queued_and_running_operations():
+    async def scenario():
+        service = OperationService(max_workers=1)
+        started = asyncio.Event()
+        cancelled = []
+
+        async def long_running():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        running = service.create_operation("sync_environment")
+        service.submit(running, service.run_operation, running, long_running)
+        queued = service.create_operation("install_package")
+        service.submit(queued, long_running, priority=JobPriority.BULK)
+        await started.wait()
+
+        assert service.cancel_operation(queued)
+        assert service.cancel_operation(running)
+        while service.scheduler_stats()["running"]:
+            await asyncio.sleep(0.005)
+        return service, running, queued, cancelled
+
+    service, running, queued, cancelled = asyncio.run(scenario())
+
+    assert cancelled == [True]
+    assert service.get_operation(running).status == OperationStatus.CANCELLED
+    assert service.get_operation(queued).status == OperationStatus.CANCELLED
+    assert service.scheduler_stats()["queued"] == 0
+    assert service.scheduler_stats()["busy_resources"] == []
@@ -0,0 +1,163 @@
+"""
+Tests for the read endpoints response cache (TTL, ETag, invalidation)
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.models.schemas import Operation, OperationStatus  # noqa: E402
+from api.services.health_service import HealthService  # noqa: E402
+from api.services.response_cache import (  # noqa: E402
+    TAG_CACHE, TAG_ENVIRONMENTS, ResponseCache, etag_matches
+)
+
+
+class FakeRequest:
+    def __init__(self, if_none_match=None):
+        self.headers = {"if-none-match": if_none_match} if if_none_match else {}
+
+
+def operation(op_type, status):
+    return Operation(id="op", type=op_type, status=status, started_at=datetime.now())
+
+
+def test_concurrent_misses_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [{"name": "env"}]
+
+    async def scenario():
+        cache = ResponseCache()
+        entries = await asyncio.gather(*(cache.get("k", compute, ttl=60) for _ in range(10)))
+        again = await cache.get("k", compute, ttl=60)
+        return entries, again, cache.stats()
+
+    entries, again, stats = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert {entry.etag for entry in entries} == {again.etag}
+    assert again.body == b'[{"name":"env"}]'
+    assert stats["misses"] == 1
+
+
+def test_etag_and_not_modified():
+    async def compute():
+        return {"total": 1}
+
+    async def scenario():
+        cache = ResponseCache()
+        first = await cache.respond(FakeRequest(), "k", compute, ttl=60)
+        etag = first.headers["etag"]
+        revalidated = await cache.respond(FakeRequest(f'W/{etag}, "other"'), "k", compute, ttl=60)
+        return first, revalidated
+
+    first, revalidated = asyncio.run(scenario())
+
+    assert first.status_code == 200
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert etag_matches("*", '"x"') and not etag_matches(None, '"x"')
+
+
+def test_mutating_operation_invalidates_tagged_responses():
+    values = {"environments": 1, "cache": 1}
+
+    def compute_for(name):
+        async def compute():
+            return {name: values[name]}
+        return compute
+
+    async def scenario():
+        cache = ResponseCache()
+        await cache.get("envs", compute_for("environments"), ttl=60, tags=(TAG_ENVIRONMENTS,))
+        await cache.get("cache", compute_for("cache"), ttl=60, tags=(TAG_CACHE,))
+        values.update(environments=2, cache=2)
+
+        cache.on_operation(operation("delete_environment", OperationStatus.RUNNING))
+        running = await cache.get("envs", compute_for("environments"), ttl=60, tags=(TAG_ENVIRONMENTS,))
+        cache.on_operation(operation("delete_environment", OperationStatus.COMPLETED))
+        envs = await cache.get("envs", compute_for("environments"), ttl=60, tags=(TAG_ENVIRONMENTS,))
+        cache_info = await cache.get("cache", compute_for("cache"), ttl=60, tags=(TAG_CACHE,))
+        return running, envs, cache_info
+
+    running, envs, cache_info = asyncio.run(scenario())
+
+    assert running.body == b'{"environments":1}'
+    assert envs.body == b'{"environments":2}'
+    assert cache_info.body == b'{"cache":1}'
+
+
+def test_result_computed_across_an_invalidation_is_not_kept():
+    async def scenario():
+        cache = ResponseCache()
+
+        async def compute():
+            cache.invalidate(TAG_ENVIRONMENTS)
+            return {"stale": True}
+
+        await cache.get("envs", compute, ttl=60, tags=(TAG_ENVIRONMENTS,))
+        return cache.stats()
+
+    assert asyncio.run(scenario())["entries"] == 0
+
+
+def test_health_is_served_without_waiting_for_doctor():
+    class SlowDoctor:
+        runs = 0
+
+        async def run_doctor(self):
+            SlowDoctor.runs += 1
+            await asyncio.sleep(0.05)
+            return {"success": True, "output": "", "errors": ""}
+
+    async def scenario():
+        service = HealthService(gestvenv_service=SlowDoctor(), max_age=60)
+        before = service.current()
+        service.current()
+        await service.refresh_in_background()
+        after = service.current()
+        await service.stop()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert before.status == "unknown"
+    assert after.status == "healthy" and after.checked_at is not None
+    assert SlowDoctor.runs == 1
+
+
+def test_health_is_refreshed_periodically_until_stopped():
+    class Doctor:
+        runs = 0
+
+        async def run_doctor(self):
+            Doctor.runs += 1
+            return {"success": True, "output": "", "errors": ""}
+
+    async def scenario():
+        service = HealthService(gestvenv_service=Doctor(), max_age=0.02)
+        service.start()
+        await asyncio.sleep(0.1)
+        status = service.current().status
+        await service.stop()
+        runs = Doctor.runs
+        await asyncio.sleep(0.05)
+        return status, runs
+
+    status, runs = asyncio.run(scenario())
+
+    assert status == "healthy"
+    assert runs >= 3
+    assert Doctor.runs == runs
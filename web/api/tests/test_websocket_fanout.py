@@ -0,0 +1,164 @@
+"""
+Load tests for WebSocket fan-out (per-client queues and backpressure)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+# Routes and services import the API as the `api` package
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.websocket import broadcast  # noqa: E402
+from api.websocket.broadcast import SlowClientPolicy  # noqa: E402
+from api.websocket.manager import ConnectionManager  # noqa: E402
+from api.websocket.rooms import WebSocketManager  # noqa: E402
+from api.models.schemas import WSMessage, WSMessageType  # noqa: E402
+
+CLIENTS = 1000
+MESSAGES = 20
+
+
+class FakeWebSocket:
+    """WebSocket recording sent frames, optionally slow"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.query_params = {}
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+
+@pytest.fixture
+def count_encodes(monkeypatch):
+    calls = []
+    original = broadcast.Frame.encode.__func__
+
+    def encode(cls, message):
+        calls.append(message)
+        return original(cls, message)
+
+    monkeypatch.setattr(broadcast.Frame, "encode", classmethod(encode))
+    return calls
+
+
+def test_environment_broadcast_to_1k_clients_with_slow_client(count_encodes):
+    """Serialised once per message; a stalled client does not delay the others"""
+
+    async def scenario():
+        manager = ConnectionManager(max_queue=8)
+        sockets = {}
+        for i in range(CLIENTS):
+            sockets[f"c{i}"] = FakeWebSocket(delay=60.0 if i == 0 else 0.0)
+            await manager.connect(sockets[f"c{i}"], f"c{i}")
+            manager.subscribe_to_environment(f"c{i}", "env" if i % 2 == 0 else "other")
+
+        count_encodes.clear()
+        start = time.perf_counter()
+        for n in range(MESSAGES):
+            await manager.broadcast_to_environment({"type": "package:installed", "n": n}, "env")
+            await asyncio.sleep(0.001)
+        await asyncio.gather(*(manager.channels[f"c{i}"].flush() for i in range(2, CLIENTS, 2)))
+        elapsed = time.perf_counter() - start
+
+        slow = manager.channels["c0"]
+        result = (elapsed, sockets, slow.dropped, manager.get_environment_subscribers("env"))
+        for client_id in list(manager.active_connections):
+            manager.disconnect(client_id)
+        return result
+
+    elapsed, sockets, dropped, subscribers = asyncio.run(scenario())
+
+    assert len(count_encodes) == MESSAGES
+    assert len(subscribers) == CLIENTS // 2
+    assert all(len(sockets[f"c{i}"].sent) == MESSAGES + 1 for i in range(2, CLIENTS, 2))
+    assert all(len(sockets[f"c{i}"].sent) == 1 for i in range(1, CLIENTS, 2))
+    assert dropped > 0
+    assert elapsed < 5.0
+
+
+def test_disconnect_policy_evicts_slow_client():
+    async def scenario():
+        manager = ConnectionManager(policy=SlowClientPolicy.DISCONNECT, max_queue=4)
+        slow, fast = FakeWebSocket(delay=60.0), FakeWebSocket()
+        await manager.connect(slow, "slow")
+        await manager.connect(fast, "fast")
+        for client_id in ("slow", "fast"):
+            manager.subscribe_to_environment(client_id, "env")
+        for n in range(10):
+            await manager.broadcast_to_environment({"n": n}, "env")
+            await asyncio.sleep(0.001)
+        subscribers = manager.get_environment_subscribers("env")
+        manager.disconnect("fast")
+        await asyncio.sleep(0)
+        return subscribers, list(manager.active_connections), manager.environment_clients, slow, fast
+
+    subscribers, connected, index, slow, fast = asyncio.run(scenario())
+
+    assert subscribers == ["fast"]
+    assert connected == []
+    assert index == {}
+    # The evicted socket is closed by the server; a plain disconnect leaves it to the endpoint
+    assert slow.close_code == broadcast.POLICY_VIOLATION
+    assert fast.close_code is None
+
+
+def test_send_timeout_closes_the_socket():
+    """A send exceeding send_timeout evicts the client and closes its socket"""
+
+    async def scenario():
+        socket, closed = FakeWebSocket(delay=1.0), []
+        channel = broadcast.ClientChannel(
+            "stalled", socket.send_text, on_close=closed.append,
+            send_timeout=0.01, close_socket=lambda code: socket.close(code=code)
+        )
+        channel.offer(broadcast.Frame("{}"))
+        await asyncio.sleep(0.05)
+        return socket, closed
+
+    socket, closed = asyncio.run(scenario())
+
+    assert closed == ["stalled"]
+    assert socket.close_code == broadcast.POLICY_VIOLATION
+
+
+def test_room_broadcast_to_1k_clients(count_encodes):
+    async def scenario():
+        manager = WebSocketManager(max_queue=8)
+        sockets = []
+        for _ in range(CLIENTS):
+            sockets.append(FakeWebSocket())
+            client_id = await manager.connect(sockets[-1])
+            manager.join_room(client_id, "operation:1")
+
+        count_encodes.clear()
+        for n in range(MESSAGES):
+            await manager.broadcast_to_room(
+                "operation:1",
+                WSMessage(type=WSMessageType.OPERATION_PROGRESS, data={"n": n})
+            )
+            await asyncio.sleep(0.001)
+        await asyncio.gather(*(m.channel.flush() for m in manager.active_connections.values()))
+        await manager.disconnect_all()
+        return sockets
+
+    sockets = asyncio.run(scenario())
+
+    assert len(count_encodes) == MESSAGES
+    assert all(len(socket.sent) == MESSAGES + 1 for socket in sockets)
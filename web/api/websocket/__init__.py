@@ -1,8 +1,14 @@
 # WebSocket module for real-time communication
-from .manager import manager as websocket_manager
+from .manager import manager as ide_manager
+from .rooms import WebSocketManager, WebSocketEventEmitter, websocket_manager, event_emitter
+from .broadcast import ClientChannel, Frame, SlowClientPolicy
+from .bus import EventBus, InMemoryEventBus, SqliteEventBus, event_bus
 from .events import EventType, create_event
 
-# Legacy compatibility
-event_emitter = websocket_manager
-
-__all__ = ['websocket_manager', 'event_emitter', 'EventType', 'create_event']
\ No newline at end of file
+__all__ = [
+    'websocket_manager', 'event_emitter', 'ide_manager',
+    'WebSocketManager', 'WebSocketEventEmitter',
+    'ClientChannel', 'Frame', 'SlowClientPolicy',
+    'EventBus', 'InMemoryEventBus', 'SqliteEventBus', 'event_bus',
+    'EventType', 'create_event',
+]
\ No newline at end of file
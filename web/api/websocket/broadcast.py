@@ -0,0 +1,165 @@
+"""Outbound fan-out for WebSocket clients.
+
+Messages are serialised once into a Frame and offered to every recipient's
+ClientChannel. Each channel owns a bounded queue drained by its own writer
+task, so a slow client only delays itself:
+
+- DROP_OLDEST: when the queue is full the oldest frame is discarded
+  (suited to progress/state updates where only the latest matters);
+- DISCONNECT: when the queue is full the client is closed.
+
+A send that takes longer than ``send_timeout`` (or fails) always closes the
+client. An evicted client's socket is closed with POLICY_VIOLATION.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_SEND_TIMEOUT = 10.0
+# WebSocket close code used when the server evicts a client
+POLICY_VIOLATION = 1008
+
+
+class SlowClientPolicy(Enum):
+    """What to do when a client's outbound queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+
+
+class Frame:
+    """A message serialised once, sent to any number of clients."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @classmethod
+    def encode(cls, message: Any) -> "Frame":
+        """Serialise a dict or a pydantic model."""
+        if isinstance(message, Frame):
+            return message
+        if hasattr(message, "model_dump_json"):
+            return cls(message.model_dump_json())
+        return cls(json.dumps(message, default=str))
+
+
+class ClientChannel:
+    """Bounded outbound queue and writer task for one client."""
+
+    def __init__(
+        self,
+        client_id: str,
+        send: Callable[[str], Awaitable[None]],
+        on_close: Optional[Callable[[str], None]] = None,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        policy: SlowClientPolicy = SlowClientPolicy.DROP_OLDEST,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
+        close_socket: Optional[Callable[[int], Awaitable[None]]] = None,
+    ):
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._send = send
+        self._on_close = on_close
+        self._close_socket = close_socket
+        self._closing: Optional[asyncio.Future] = None
+        self._queue: Deque[Frame] = deque()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._writer = asyncio.ensure_future(self._write_loop())
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def offer(self, frame: Frame) -> bool:
+        """Queue a frame without blocking; False if it was not accepted."""
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_queue:
+            if self.policy is SlowClientPolicy.DISCONNECT:
+                logger.warning(f"Client {self.client_id} too slow, disconnecting")
+                self.close(POLICY_VIOLATION)
+                return False
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(frame)
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._idle.set()
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                frame = self._queue.popleft()
+                await asyncio.wait_for(self._send(frame.text), self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"Closing client {self.client_id} after send failure: {e!r}")
+            self.close(POLICY_VIOLATION)
+
+    async def flush(self):
+        """Wait until every queued frame has been sent (or the channel closed)."""
+        if not self.closed:
+            await self._idle.wait()
+
+    def close(self, code: Optional[int] = None):
+        """Stop the writer and notify the owner (idempotent).
+
+        Args:
+            code: Close the socket itself with this code (server-side eviction);
+                None when the owner already knows the connection is gone
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._idle.set()
+        if not self._writer.done() and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None and self._close_socket is not None:
+            self._closing = asyncio.ensure_future(self._close(code))
+        if self._on_close is not None:
+            self._on_close(self.client_id)
+
+    async def _close(self, code: int):
+        try:
+            await self._close_socket(code)
+        except Exception as e:
+            # Already closed by the peer, or the transport is gone
+            logger.debug(f"Closing socket of client {self.client_id} failed: {e!r}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self.pending, "sent": self.sent, "dropped": self.dropped}
+
+
+def fan_out(message: Any, channels: Iterable[ClientChannel]) -> int:
+    """Serialise message once and queue it on every channel.
+
+    Returns:
+        Number of channels that accepted the frame
+    """
+    frame = message if isinstance(message, Frame) else Frame.encode(message)
+    # Copy: a full DISCONNECT channel removes itself from its owner's dict
+    return sum(1 for channel in list(channels) if channel.offer(frame))
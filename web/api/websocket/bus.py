@@ -0,0 +1,214 @@
+"""Event bus shared by the WebSocket endpoints.
+
+Managers publish on topics instead of writing to their sockets; every
+process subscribed to the bus delivers the event to its own local clients.
+This keeps broadcasts working when uvicorn runs several workers:
+
+- InMemoryEventBus: single process, events are dispatched synchronously;
+- SqliteEventBus: events are also appended to a shared SQLite file (WAL)
+  that every worker tails from a reader thread. ``PRAGMA data_version``
+  makes the idle check a no-op until another process commits.
+
+Events are serialised once at publish time; handlers receive
+``(topic, payload_text)``.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from gestvenv.utils.async_utils import run_in_executor
+
+from ..core.config import settings
+from .broadcast import Frame
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[str, str], None]
+
+DEFAULT_POLL_INTERVAL = 0.02
+# Events older than this are pruned from the shared feed
+DEFAULT_RETENTION_SECONDS = 60.0
+PRUNE_EVERY = 500
+
+
+class EventBus(ABC):
+    """Publish/subscribe by topic; handlers run on the event loop."""
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+        self.published = 0
+        self.delivered = 0
+
+    def add_handler(self, handler: EventHandler):
+        self._handlers.append(handler)
+
+    def remove_handler(self, handler: EventHandler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def publish(self, topic: str, message: Any):
+        """Serialise message once and deliver it to every subscriber."""
+        frame = Frame.encode(message)
+        self.published += 1
+        self._dispatch(topic, frame.text)
+        await self._forward(topic, frame.text)
+
+    async def _forward(self, topic: str, payload: str):
+        """Hand the event to other processes (no-op for a local bus)."""
+
+    def _dispatch(self, topic: str, payload: str):
+        self.delivered += 1
+        for handler in list(self._handlers):
+            try:
+                handler(topic, payload)
+            except Exception as e:
+                logger.error(f"Event handler failed for topic {topic}: {e}")
+
+    async def start(self):
+        """Start receiving events from other processes."""
+
+    async def stop(self):
+        """Stop receiving events and release resources."""
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+
+class InMemoryEventBus(EventBus):
+    """Bus limited to the current process."""
+
+
+class SqliteEventBus(EventBus):
+    """Bus shared by the processes using the same SQLite file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+    ):
+        super().__init__()
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.origin = uuid.uuid4().hex
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._inserted = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " topic TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " origin TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        connection.commit()
+        return connection
+
+    def _insert(self, topic: str, payload: str):
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            self._writer.execute(
+                "INSERT INTO events (topic, payload, origin, created) VALUES (?, ?, ?, ?)",
+                (topic, payload, self.origin, time.time()),
+            )
+            self._inserted += 1
+            if self._inserted % PRUNE_EVERY == 0:
+                self._writer.execute(
+                    "DELETE FROM events WHERE created < ?",
+                    (time.time() - self.retention_seconds,),
+                )
+            self._writer.commit()
+
+    async def _forward(self, topic: str, payload: str):
+        try:
+            await run_in_executor(self._insert, topic, payload)
+        except sqlite3.Error as e:
+            logger.error(f"Could not forward event {topic} to other workers: {e}")
+
+    async def start(self):
+        if self._reader is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        connection = await run_in_executor(self._connect)
+        last_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        self._stopping.clear()
+        self._reader = threading.Thread(
+            target=self._tail, args=(connection, last_id), name="event-bus-reader", daemon=True
+        )
+        self._reader.start()
+
+    def _tail(self, connection: sqlite3.Connection, last_id: int):
+        """Reader thread: relay events committed by other processes to the loop."""
+        version = None
+        try:
+            while not self._stopping.is_set():
+                current = connection.execute("PRAGMA data_version").fetchone()[0]
+                if current != version:
+                    version = current
+                    fetched = connection.execute(
+                        "SELECT id, topic, payload, origin FROM events WHERE id > ? ORDER BY id",
+                        (last_id,),
+                    ).fetchall()
+                    if fetched:
+                        last_id = fetched[-1][0]
+                    # Own events were already delivered locally at publish time
+                    rows = [row[:3] for row in fetched if row[3] != self.origin]
+                    if rows and self._loop is not None and not self._loop.is_closed():
+                        self._loop.call_soon_threadsafe(self._deliver_rows, rows)
+                self._stopping.wait(self.poll_interval)
+        except sqlite3.Error as e:
+            logger.error(f"Event bus reader stopped: {e}")
+        finally:
+            connection.close()
+
+    def _deliver_rows(self, rows: List[Tuple[int, str, str]]):
+        for _, topic, payload in rows:
+            self._dispatch(topic, payload)
+
+    async def stop(self):
+        self._stopping.set()
+        if self._reader is not None:
+            await run_in_executor(self._reader.join, 5.0)
+            self._reader = None
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def stats(self) -> dict:
+        return dict(super().stats(), path=str(self.path), running=self._reader is not None)
+
+
+def create_event_bus(backend: str = "memory", path: Optional[Union[str, Path]] = None) -> EventBus:
+    """Bus for the configured backend ("memory" or "sqlite")."""
+    if backend == "sqlite":
+        return SqliteEventBus(path or Path.home() / ".gestvenv" / "web-events.db")
+    if backend != "memory":
+        logger.warning(f"Unknown event bus backend '{backend}', using in-memory bus")
+    return InMemoryEventBus()
+
+
+# Bus shared by both WebSocket endpoint families
+event_bus = create_event_bus(settings.EVENT_BUS, settings.EVENT_BUS_PATH or None)
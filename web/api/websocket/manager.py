@@ -1,30 +1,64 @@
 """WebSocket connection manager for real-time IDE synchronization."""
 
 from typing import Dict, Set, List, Optional, Any
-from fastapi import WebSocket, WebSocketDisconnect
-import json
-import asyncio
+from fastapi import WebSocket
 from datetime import datetime
 import logging
 
+from .broadcast import ClientChannel, Frame, SlowClientPolicy, fan_out
+from .bus import EventBus, InMemoryEventBus, event_bus
+
+# Bus topics (shared with the /ws endpoint, which uses the "ws:" prefix)
+TOPIC_ALL = "ide:all"
+TOPIC_ENVIRONMENT = "ide:env:"
+
 logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for IDE clients."""
+    """Manages WebSocket connections for IDE clients.
     
-    def __init__(self):
+    Broadcasts go through the event bus so that clients connected to other
+    workers receive them too; personal messages stay local.
+    """
+    
+    def __init__(
+        self,
+        policy: SlowClientPolicy = SlowClientPolicy.DROP_OLDEST,
+        max_queue: Optional[int] = None,
+        bus: Optional[EventBus] = None
+    ):
         # Store active connections by client ID
         self.active_connections: Dict[str, WebSocket] = {}
+        # Outbound queue and writer task per client
+        self.channels: Dict[str, ClientChannel] = {}
         # Track which environments each client is watching
         self.client_environments: Dict[str, Set[str]] = {}
+        # Reverse index: environment -> watching clients
+        self.environment_clients: Dict[str, Set[str]] = {}
         # Track client metadata
         self.client_metadata: Dict[str, Dict[str, Any]] = {}
+        self.policy = policy
+        self.max_queue = max_queue
+        self.bus = bus or InMemoryEventBus()
+        self.bus.add_handler(self._deliver)
         
     async def connect(self, websocket: WebSocket, client_id: str, metadata: Optional[Dict] = None):
         """Accept a new WebSocket connection."""
         await websocket.accept()
+        if client_id in self.active_connections:
+            # Reconnection with the same ID replaces the previous socket
+            self.disconnect(client_id)
         self.active_connections[client_id] = websocket
+        channel_options = {"max_queue": self.max_queue} if self.max_queue else {}
+        self.channels[client_id] = ClientChannel(
+            client_id,
+            websocket.send_text,
+            on_close=self.disconnect,
+            policy=self.policy,
+            close_socket=lambda code: websocket.close(code=code),
+            **channel_options
+        )
         self.client_environments[client_id] = set()
         self.client_metadata[client_id] = metadata or {}
         
@@ -42,62 +76,58 @@ class ConnectionManager:
         """Remove a WebSocket connection."""
         if client_id in self.active_connections:
             del self.active_connections[client_id]
-            del self.client_environments[client_id]
+            for environment_id in self.client_environments.pop(client_id):
+                self._remove_subscriber(environment_id, client_id)
             del self.client_metadata[client_id]
+            self.channels.pop(client_id).close()
             logger.info(f"Client {client_id} disconnected")
             
     async def send_personal_message(self, message: Dict, client_id: str):
-        """Send a message to a specific client."""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+        """Queue a message for a specific client."""
+        channel = self.channels.get(client_id)
+        if channel is not None:
+            fan_out(message, [channel])
                 
     async def broadcast_to_environment(self, message: Dict, environment_id: str):
         """Broadcast a message to all clients watching an environment."""
-        disconnected_clients = []
-        
-        for client_id, environments in self.client_environments.items():
-            if environment_id in environments:
-                try:
-                    await self.active_connections[client_id].send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to {client_id}: {e}")
-                    disconnected_clients.append(client_id)
-                    
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+        await self.bus.publish(TOPIC_ENVIRONMENT + environment_id, message)
             
     async def broadcast_to_all(self, message: Dict):
         """Broadcast a message to all connected clients."""
-        disconnected_clients = []
-        
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-                
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+        await self.bus.publish(TOPIC_ALL, message)
+    
+    def _deliver(self, topic: str, payload: str):
+        """Bus handler: queue a published event for the local recipients."""
+        if topic == TOPIC_ALL:
+            channels = list(self.channels.values())
+        elif topic.startswith(TOPIC_ENVIRONMENT):
+            client_ids = self.environment_clients.get(topic[len(TOPIC_ENVIRONMENT):], ())
+            channels = [self.channels[client_id] for client_id in client_ids]
+        else:
+            return
+        if channels:
+            fan_out(Frame(payload), channels)
             
     def subscribe_to_environment(self, client_id: str, environment_id: str):
         """Subscribe a client to environment updates."""
         if client_id in self.client_environments:
             self.client_environments[client_id].add(environment_id)
+            self.environment_clients.setdefault(environment_id, set()).add(client_id)
             logger.info(f"Client {client_id} subscribed to environment {environment_id}")
             
     def unsubscribe_from_environment(self, client_id: str, environment_id: str):
         """Unsubscribe a client from environment updates."""
         if client_id in self.client_environments:
             self.client_environments[client_id].discard(environment_id)
+            self._remove_subscriber(environment_id, client_id)
             logger.info(f"Client {client_id} unsubscribed from environment {environment_id}")
+    
+    def _remove_subscriber(self, environment_id: str, client_id: str):
+        clients = self.environment_clients.get(environment_id)
+        if clients is not None:
+            clients.discard(client_id)
+            if not clients:
+                del self.environment_clients[environment_id]
             
     def get_client_count(self) -> int:
         """Get the number of connected clients."""
@@ -105,12 +135,8 @@ class ConnectionManager:
         
     def get_environment_subscribers(self, environment_id: str) -> List[str]:
         """Get list of clients subscribed to an environment."""
-        subscribers = []
-        for client_id, environments in self.client_environments.items():
-            if environment_id in environments:
-                subscribers.append(client_id)
-        return subscribers
+        return list(self.environment_clients.get(environment_id, ()))
 
 
 # Global connection manager instance
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(bus=event_bus)
\ No newline at end of file
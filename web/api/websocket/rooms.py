@@ -1,17 +1,29 @@
 """
 Gestionnaire WebSocket pour les communications temps réel.
+
+Chaque message diffusé est sérialisé une seule fois puis déposé dans la
+file bornée de chaque destinataire (voir broadcast.py) : un client lent ne
+retarde que lui-même. Les diffusions passent par le bus d'événements
+(bus.py) : les clients connectés aux autres workers les reçoivent aussi.
 """
 
-import asyncio
-import json
 import logging
-from typing import List, Dict, Any
-from fastapi import WebSocket, WebSocketDisconnect
+import uuid
+from typing import Dict, Any, Optional
+from fastapi import WebSocket
+
+from api.models.schemas import Operation, OperationStatus, WSMessage, WSMessageType
 
-from api.models.schemas import WSMessage, WSMessageType
+from .broadcast import ClientChannel, Frame, SlowClientPolicy, fan_out
+from .bus import EventBus, InMemoryEventBus, event_bus
 
 logger = logging.getLogger(__name__)
 
+# Sujets du bus (l'endpoint IDE utilise le préfixe "ide:")
+TOPIC_ALL = "ws:all"
+TOPIC_ROOM = "ws:room:"
+TOPIC_EVENT = "ws:event:"
+
 
 class ConnectionManager:
     """Gestionnaire des connexions WebSocket individuelles."""
@@ -19,14 +31,12 @@ class ConnectionManager:
     def __init__(self):
         self.websocket: WebSocket
         self.client_id: str
+        self.channel: ClientChannel
         self.subscriptions: set = set()
     
     async def send_message(self, message: WSMessage):
-        """Envoie un message au client."""
-        try:
-            await self.websocket.send_text(message.model_dump_json())
-        except Exception as e:
-            logger.error(f"Failed to send message to {self.client_id}: {e}")
+        """Met un message en file d'envoi pour le client."""
+        self.channel.offer(Frame.encode(message))
     
     def subscribe(self, event_type: str):
         """S'abonne à un type d'événement."""
@@ -44,9 +54,21 @@ class ConnectionManager:
 class WebSocketManager:
     """Gestionnaire principal des connexions WebSocket."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        policy: SlowClientPolicy = SlowClientPolicy.DROP_OLDEST,
+        max_queue: Optional[int] = None,
+        bus: Optional[EventBus] = None
+    ):
         self.active_connections: Dict[str, ConnectionManager] = {}
         self.room_subscriptions: Dict[str, set] = {}  # room -> {client_ids}
+        self.policy = policy
+        self.max_queue = max_queue
+        self.bus = bus or InMemoryEventBus()
+        self.bus.add_handler(self._deliver)
+        # Préfixe d'identifiant propre au processus (unicité entre workers)
+        self._client_prefix = f"client_{uuid.uuid4().hex[:6]}"
+        self._next_client = 0
     
     async def connect(self, websocket: WebSocket, client_id: str = None):
         """
@@ -59,11 +81,22 @@ class WebSocketManager:
         await websocket.accept()
         
         if not client_id:
-            client_id = f"client_{len(self.active_connections)}"
+            # Compteur : len(active_connections) réutilisait les identifiants libérés
+            self._next_client += 1
+            client_id = f"{self._client_prefix}_{self._next_client}"
         
         manager = ConnectionManager()
         manager.websocket = websocket
         manager.client_id = client_id
+        channel_options = {"max_queue": self.max_queue} if self.max_queue else {}
+        manager.channel = ClientChannel(
+            client_id,
+            websocket.send_text,
+            on_close=self.disconnect,
+            policy=self.policy,
+            close_socket=lambda code: websocket.close(code=code),
+            **channel_options
+        )
         
         self.active_connections[client_id] = manager
         
@@ -91,11 +124,14 @@ class WebSocketManager:
         """
         if client_id in self.active_connections:
             # Retirer de toutes les rooms
-            for room_clients in self.room_subscriptions.values():
-                room_clients.discard(client_id)
+            for room in [r for r, clients in self.room_subscriptions.items() if client_id in clients]:
+                self.room_subscriptions[room].discard(client_id)
+                if not self.room_subscriptions[room]:
+                    del self.room_subscriptions[room]
             
-            # Supprimer la connexion
-            del self.active_connections[client_id]
+            # Supprimer la connexion (la file d'envoi est fermée)
+            manager = self.active_connections.pop(client_id)
+            manager.channel.close()
             
             logger.info(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
     
@@ -125,18 +161,7 @@ class WebSocketManager:
         Args:
             message: Message à diffuser
         """
-        if not self.active_connections:
-            return
-        
-        logger.info(f"Broadcasting message to {len(self.active_connections)} clients")
-        
-        # Envoyer en parallèle pour de meilleures performances
-        tasks = [
-            manager.send_message(message)
-            for manager in self.active_connections.values()
-        ]
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.bus.publish(TOPIC_ALL, message)
     
     async def broadcast_to_room(self, room: str, message: WSMessage):
         """
@@ -146,19 +171,7 @@ class WebSocketManager:
             room: Nom de la room
             message: Message à diffuser
         """
-        if room not in self.room_subscriptions:
-            return
-        
-        client_ids = self.room_subscriptions[room]
-        logger.info(f"Broadcasting to room '{room}' ({len(client_ids)} clients)")
-        
-        tasks = [
-            self.send_to_client(client_id, message)
-            for client_id in client_ids
-            if client_id in self.active_connections
-        ]
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.bus.publish(TOPIC_ROOM + room, message)
     
     async def broadcast_by_event_type(self, event_type: WSMessageType, message: WSMessage):
         """
@@ -168,22 +181,22 @@ class WebSocketManager:
             event_type: Type d'événement
             message: Message à diffuser
         """
-        subscribers = [
-            manager for manager in self.active_connections.values()
-            if manager.is_subscribed(event_type.value)
-        ]
-        
-        if not subscribers:
+        await self.bus.publish(TOPIC_EVENT + event_type.value, message)
+    
+    def _deliver(self, topic: str, payload: str):
+        """Abonné du bus : dépose un événement publié dans les files des clients locaux."""
+        if topic == TOPIC_ALL:
+            managers = list(self.active_connections.values())
+        elif topic.startswith(TOPIC_ROOM):
+            client_ids = self.room_subscriptions.get(topic[len(TOPIC_ROOM):], ())
+            managers = [self.active_connections[client_id] for client_id in client_ids]
+        elif topic.startswith(TOPIC_EVENT):
+            event_type = topic[len(TOPIC_EVENT):]
+            managers = [m for m in self.active_connections.values() if m.is_subscribed(event_type)]
+        else:
             return
-        
-        logger.info(f"Broadcasting '{event_type}' to {len(subscribers)} subscribers")
-        
-        tasks = [
-            manager.send_message(message)
-            for manager in subscribers
-        ]
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if managers:
+            fan_out(Frame(payload), [manager.channel for manager in managers])
     
     def join_room(self, client_id: str, room: str):
         """
@@ -257,12 +270,16 @@ class WebSocketManager:
                 room: len(clients) 
                 for room, clients in self.room_subscriptions.items()
             },
-            "connected_clients": list(self.active_connections.keys())
+            "connected_clients": list(self.active_connections.keys()),
+            "queues": {
+                client_id: manager.channel.stats()
+                for client_id, manager in self.active_connections.items()
+            }
         }
 
 
 # Instance globale du gestionnaire WebSocket
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(bus=event_bus)
 
 
 class WebSocketEventEmitter:
@@ -314,6 +331,15 @@ class WebSocketEventEmitter:
         )
         await self.manager.broadcast_to_room(f"operation:{operation_id}", ws_message)
     
+    async def emit_operation_update(self, operation: Operation):
+        """Émet l'état publié d'une opération (abonné d'OperationService)."""
+        running = operation.status in (OperationStatus.PENDING, OperationStatus.RUNNING)
+        ws_message = WSMessage(
+            type=WSMessageType.OPERATION_PROGRESS if running else WSMessageType.OPERATION_COMPLETED,
+            data=operation.model_dump(mode="json")
+        )
+        await self.manager.broadcast_to_room(f"operation:{operation.id}", ws_message)
+    
     async def emit_cache_updated(self, cache_stats: Dict[str, Any]):
         """Émet un événement de mise à jour du cache."""
         message = WSMessage(